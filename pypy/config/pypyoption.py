@@ -202,6 +202,11 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
         BoolOption("withstrbuf", "use strings optimized for addition (ver 2)",
                    default=False),
 
+        BoolOption("withrope",
+                   "use strings that are concatenated lazily, as ropes",
+                   default=False,
+                   requires=[("objspace.std.withstrbuf", False)]),
+
         BoolOption("withprebuiltchar",
                    "use prebuilt single-character string objects",
                    default=False),
@@ -227,6 +232,21 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
                              ("objspace.std.withtypeversion", True),
                        ]),
 
+        BoolOption("withunboxedattrs",
+                   "store int and float instance attributes unboxed",
+                   default=False,
+                   requires=[("objspace.std.withmapdict", True)]),
+
+        BoolOption("withsharedkeysdict",
+                   "make dicts with the same string keys share the keys, "
+                   "like instances do with mapdict",
+                   default=False),
+
+        BoolOption("withsmalldicts",
+                   "store small dicts with string keys as two lists "
+                   "searched linearly",
+                   default=False),
+
         BoolOption("withrangelist",
                    "enable special range list implementation that does not "
                    "actually create the full list until the resulting "
@@ -235,6 +255,16 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
         BoolOption("withliststrategies",
                    "enable optimized ways to store lists of primitives ",
                    default=True),
+        BoolOption("withcowslices",
+                   "make slices of lists of ints, floats and strings share "
+                   "the items of the list until one of them is modified",
+                   default=False,
+                   requires=[("objspace.std.withliststrategies", True)]),
+        BoolOption("withrecordlist",
+                   "store lists of same-shaped tuples of ints, floats and "
+                   "strings column by column",
+                   default=False,
+                   requires=[("objspace.std.withliststrategies", True)]),
 
         BoolOption("withtypeversion",
                    "version type objects when changing them",
@@ -299,12 +299,21 @@ class PyPyTarget(object):
         from pypy.module.pypyjit.hooks import pypy_hooks
         return PyPyJitPolicy(pypy_hooks)
 
+    def get_gchooks(self, driver):
+        config = driver.config
+        if (not config.objspace.usemodules.gc or
+                config.translation.gctransformer != "framework"):
+            return None
+        from pypy.module.gc.hook import LowLevelGcHooks
+        return self.space.fromcache(LowLevelGcHooks)
+
     def get_entry_point(self, config):
         from pypy.tool.lib_pypy import import_from_lib_pypy
         rebuild = import_from_lib_pypy('ctypes_config_cache/rebuild')
         rebuild.try_rebuild()
 
         space = make_objspace(config)
+        self.space = space
 
         # manually imports app_main.py
         filename = os.path.join(pypydir, 'interpreter', 'app_main.py')
@@ -317,7 +326,7 @@ class PyPyTarget(object):
 
     def interface(self, ns):
         for name in ['take_options', 'handle_config', 'print_help', 'target',
-                     'jitpolicy', 'get_entry_point',
+                     'jitpolicy', 'get_gchooks', 'get_entry_point',
                      'get_additional_config_options']:
             ns[name] = getattr(self, name)
 
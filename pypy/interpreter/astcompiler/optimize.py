@@ -161,6 +161,10 @@ class OptimizingVisitor(ast.ASTVisitor):
     def default_visitor(self, node):
         return node
 
+    def visit_FunctionDef(self, func):
+        GeneratorExpInliner(self.space).visit_body(func.body)
+        return func
+
     def visit_BinOp(self, binop):
         left = binop.left.as_constant()
         if left is not None:
@@ -323,3 +327,185 @@ class OptimizingVisitor(ast.ASTVisitor):
                     return ast.Const(w_const, subs.lineno, subs.col_offset)
 
         return subs
+
+
+class GeneratorExpInliner(ast.GenericASTVisitor):
+    """Turns, in the body of a function,
+
+        for x in (<elt> for y in <iter> if <cond>):
+            <body>
+
+    into a single loop over <iter> that evaluates <elt> directly,
+
+        for _[y.1] in <iter>:
+            if not <cond>:
+                continue
+            x = <elt>
+            <body>
+        _[y.1] = None
+        del _[y.1]
+
+    so that no generator frame is created, resumed and suspended for
+    every item: the JIT then sees one ordinary loop.  The generator
+    expression cannot escape, as the loop is its only user.  The
+    variable of the generator expression is renamed to a name that
+    cannot clash with the names of the function, and deleted after the
+    loop like the temporaries of list comprehensions (it may be unbound
+    if the loop did not run, hence the assignment).  Only the simple
+    cases are handled: a single 'for' clause with a single name as
+    target, no 'else' clause on the loop, and an <elt> and <cond> that
+    cannot call any code (see _cannot_raise()).  A StopIteration raised
+    by them would end the generator expression, and catching it in the
+    inlined loop would change sys.exc_info() and the exception that a
+    bare 'raise' re-raises.  Module and class bodies are left alone, as
+    the renamed variable would show up in their namespace.
+    """
+    def __init__(self, space):
+        self.space = space
+        self.counter = 0
+        # the statements to insert after the loop that was just inlined
+        self.cleanup = None
+
+    def visit_body(self, body):
+        if body is None:
+            return
+        i = 0
+        while i < len(body):
+            body[i].walkabout(self)
+            i += 1
+            if self.cleanup is not None:
+                for stmt in self.cleanup:
+                    body.insert(i, stmt)
+                    i += 1
+                self.cleanup = None
+
+    def visit_FunctionDef(self, node):
+        # nested functions were already handled by the OptimizingVisitor
+        pass
+
+    def visit_ClassDef(self, node):
+        pass
+
+    def visit_Lambda(self, node):
+        pass
+
+    # only the statements are visited, as the loops are looked for there
+
+    def visit_While(self, node):
+        self.visit_body(node.body)
+        self.visit_body(node.orelse)
+
+    def visit_If(self, node):
+        self.visit_body(node.body)
+        self.visit_body(node.orelse)
+
+    def visit_With(self, node):
+        self.visit_body(node.body)
+
+    def visit_TryExcept(self, node):
+        self.visit_body(node.body)
+        self.visit_sequence(node.handlers)
+        self.visit_body(node.orelse)
+
+    def visit_TryFinally(self, node):
+        self.visit_body(node.body)
+        self.visit_body(node.finalbody)
+
+    def visit_ExceptHandler(self, node):
+        self.visit_body(node.body)
+
+    def visit_For(self, node):
+        self.visit_body(node.body)
+        if node.orelse:
+            self.visit_body(node.orelse)
+        elif isinstance(node.iter, ast.GeneratorExp):
+            self._inline(node, node.iter)
+
+    def _inline(self, node, genexp):
+        if len(genexp.generators) != 1:
+            return
+        comp = genexp.generators[0]
+        if not isinstance(comp.target, ast.Name):
+            return
+        if not _cannot_raise(genexp.elt):
+            return
+        if comp.ifs:
+            for cond in comp.ifs:
+                if not _is_plain_bool(cond):
+                    return
+        self.counter += 1
+        name = comp.target.id
+        tmp = "_[%s.%d]" % (name, self.counter)
+        renamer = _NameRenamer({name: tmp})
+        comp.target.walkabout(renamer)
+        genexp.elt.walkabout(renamer)
+        renamer.visit_sequence(comp.ifs)
+        lineno = genexp.lineno
+        col = genexp.col_offset
+        new_body = []
+        if comp.ifs:
+            for cond in comp.ifs:
+                test = ast.UnaryOp(ast.Not, cond, cond.lineno, cond.col_offset)
+                new_body.append(ast.If(test, [ast.Continue(lineno, col)], None,
+                                       lineno, col))
+        new_body.append(ast.Assign([node.target], genexp.elt, node.lineno,
+                                   node.col_offset))
+        new_body.extend(node.body)
+        node.target = comp.target
+        node.iter = comp.iter
+        node.body = new_body
+        self.cleanup = [
+            ast.Assign([ast.Name(tmp, ast.Store, lineno, col)],
+                       ast.Const(self.space.w_None, lineno, col),
+                       lineno, col),
+            ast.Delete([ast.Name(tmp, ast.Del, lineno, col)], lineno, col)]
+
+
+def _cannot_raise(node):
+    """Check that evaluating the expression node cannot call any code,
+    and in particular cannot raise StopIteration."""
+    if isinstance(node, ast.Name):
+        return node.ctx == ast.Load
+    if isinstance(node, ast.Const) or isinstance(node, ast.Num) or \
+            isinstance(node, ast.Str):
+        return True
+    if isinstance(node, ast.Tuple) or isinstance(node, ast.List):
+        elts = node.elts
+        if elts:
+            for elt in elts:
+                if not _cannot_raise(elt):
+                    return False
+        return True
+    return _is_plain_bool(node)
+
+def _is_plain_bool(node):
+    """Check that the expression node computes a bool without calling any
+    code, so that it can also be tested without calling __nonzero__()."""
+    if isinstance(node, ast.Compare):
+        for op in node.ops:
+            if op != ast.Is and op != ast.IsNot:
+                return False
+        if not _cannot_raise(node.left):
+            return False
+        for comparator in node.comparators:
+            if not _cannot_raise(comparator):
+                return False
+        return True
+    if isinstance(node, ast.UnaryOp):
+        return node.op == ast.Not and _is_plain_bool(node.operand)
+    if isinstance(node, ast.BoolOp):
+        for value in node.values:
+            if not _is_plain_bool(value):
+                return False
+        return True
+    return False
+
+
+class _NameRenamer(ast.GenericASTVisitor):
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+
+    def visit_Name(self, node):
+        if node.id in self.mapping:
+            node.id = self.mapping[node.id]
@@ -252,6 +252,96 @@ class TestCompiler:
                [(2, 0), (4, 0), (5, 3), (6, 0),
                 (7, 3), (8, 0), (8, 6), (9, 3)])
 
+    def test_genexpr_in_for(self):
+        decl = py.code.Source("""
+            def f(seq):
+                x = 'outer'
+                result = []
+                for y in (x * 2 for x in seq if x != 3):
+                    result.append(y)
+                return result, x
+        """)
+        decl = str(decl) + '\n'
+        yield self.st, decl + "r = f(range(5))", "r", ([0, 2, 4, 8], 'outer')
+        decl = py.code.Source("""
+            def f(d):
+                result = 0
+                for z in (a - b for a, b in d.items()):
+                    if z < 0:
+                        break
+                    result += z
+                return result
+        """)
+        decl = str(decl) + '\n'
+        yield self.st, decl + "r = f({5: 1, 7: 4})", "r", 7
+        decl = py.code.Source("""
+            def f(items):
+                it = iter(items)
+                result = []
+                for y in (next(it) for i in range(10)):
+                    result.append(y)
+                return result
+        """)
+        decl = str(decl) + '\n'
+        yield self.st, decl + "r = f('abc')", "r", ['a', 'b', 'c']
+        decl = py.code.Source("""
+            def f(seq):
+                for y in (x for x in seq):
+                    pass
+                else:
+                    return y
+        """)
+        decl = str(decl) + '\n'
+        yield self.st, decl + "r = f([1, 2])", "r", 2
+        decl = py.code.Source("""
+            def f(lst):
+                out = []
+                for y in ((x, 1) for x in lst):
+                    out.append(y)
+                if lst:
+                    for y in (x for x in lst if x is not None):
+                        break
+                while 1:
+                    for y in (x for x in []):
+                        pass
+                    break
+                return sorted(locals())
+        """)
+        decl = str(decl) + '\n'
+        yield (self.st, decl + "r = f([1, 2]), f([])", "r",
+               (['lst', 'out', 'y'], ['lst', 'out']))
+        decl = py.code.Source("""
+            def stop(x):
+                if x == 2:
+                    raise StopIteration
+                return x
+            def f(seq):
+                import sys
+                result = []
+                for y in (stop(x) for x in seq):
+                    result.append(y)
+                return result, sys.exc_info()
+        """)
+        decl = str(decl) + '\n'
+        yield (self.st, decl + "r = f([1, 2, 3])", "r",
+               ([1], (None, None, None)))
+        decl = py.code.Source("""
+            def stop(x):
+                raise StopIteration
+            def f(seq):
+                try:
+                    1 / 0
+                except ZeroDivisionError:
+                    for y in (stop(x) for x in seq):
+                        pass
+                    try:
+                        raise
+                    except ZeroDivisionError:
+                        return 'ZeroDivisionError'
+        """)
+        decl = str(decl) + '\n'
+        yield self.st, decl + "r = f([1])", "r", 'ZeroDivisionError'
+
     def test_comparisons(self):
         yield self.st, "x = 3 in {3: 5}", "x", True
         yield self.st, "x = 3 not in {3: 5}", "x", False
@@ -1014,6 +1104,34 @@ class TestOptimizations:
         assert ops.JUMP_ABSOLUTE not in counts
         assert counts[ops.RETURN_VALUE] == 2
 
+    def test_inline_genexpr_in_for(self):
+        source = """def f(l):
+        total = 0
+        for y, z in ((x, x) for x in l if x is not None):
+            total += y
+        return total
+        """
+        counts = self.count_instructions(source)
+        assert ops.MAKE_FUNCTION not in counts
+        assert counts[ops.FOR_ITER] == 1
+
+        # these can call code that raises StopIteration
+        for genexp in ["(x * 2 for x in l)", "(x for x in l if x)",
+                       "(f(x) for x in l)", "(x for x in l if not x)"]:
+            source = """def f(l):
+            for y in %s:
+                pass
+            """ % (genexp,)
+            counts = self.count_instructions(source)
+            assert counts[ops.MAKE_FUNCTION] == 1
+
+        source = """def f(l):
+        for y in (x for x in l for z in x):
+            pass
+        """
+        counts = self.count_instructions(source)
+        assert counts[ops.MAKE_FUNCTION] == 1
+
     def test_const_fold_subscr(self):
         source = """def f():
         return (0, 1)[0]
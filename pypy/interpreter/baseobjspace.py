@@ -671,8 +671,14 @@ class ObjSpace(object):
         cui = self.code_unique_ids
         cui.code_callback = callback
 
+    def register_warmup_callback(self, callback):
+        cui = self.code_unique_ids
+        cui.warmup_callback = callback
+
     def register_code_object(self, pycode):
         cui = self.code_unique_ids
+        if cui.warmup_callback is not None:
+            cui.warmup_callback(self, pycode)
         if cui.code_callback is None:
             return
         cui.code_callback(self, pycode)
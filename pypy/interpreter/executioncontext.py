@@ -589,3 +589,4 @@ class CodeUniqueIds(object):
         else:
             self.code_unique_id = 0x7000000000000000
         self.code_callback = None
+        self.warmup_callback = None
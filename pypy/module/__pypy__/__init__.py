@@ -108,6 +108,11 @@ class Module(MixedModule):
             if self.space.config.objspace.std.withmapdict:
                 self.extra_interpdef('mapdict_cache_counter',
                                      'interp_magic.mapdict_cache_counter')
+        if self.space.config.objspace.std.withcowslices:
+            self.extra_interpdef('list_cow_counters',
+                                 'interp_magic.list_cow_counters')
+            self.extra_interpdef('reset_list_cow_counters',
+                                 'interp_magic.reset_list_cow_counters')
         PYC_MAGIC = get_pyc_magic(self.space)
         self.extra_interpdef('PYC_MAGIC', 'space.wrap(%d)' % PYC_MAGIC)
         #
@@ -4,7 +4,7 @@ from pypy.interpreter.pyframe import PyFrame
 from pypy.interpreter.mixedmodule import MixedModule
 from rpython.rlib.objectmodel import we_are_translated
 from pypy.objspace.std.dictmultiobject import W_DictMultiObject
-from pypy.objspace.std.listobject import W_ListObject
+from pypy.objspace.std.listobject import W_ListObject, COWStats
 from pypy.objspace.std.setobject import W_BaseSetObject
 from pypy.objspace.std.typeobject import MethodCache
 from pypy.objspace.std.mapdict import MapAttrCache
@@ -53,6 +53,20 @@ def mapdict_cache_counter(space, name):
     return space.newtuple([space.newint(cache.hits.get(name, 0)),
                            space.newint(cache.misses.get(name, 0))])
 
+def list_cow_counters(space):
+    """Return a tuple (shared, copied): the number of lists that were
+    created sharing the items of another list, and the number of times
+    that such a list had to copy the items after all."""
+    assert space.config.objspace.std.withcowslices
+    stats = space.fromcache(COWStats)
+    return space.newtuple([space.newint(stats.shared),
+                           space.newint(stats.copied)])
+
+def reset_list_cow_counters(space):
+    """Reset the counters returned by list_cow_counters() to zero."""
+    assert space.config.objspace.std.withcowslices
+    space.fromcache(COWStats).reset()
+
 def builtinify(space, w_func):
     from pypy.interpreter.function import Function, BuiltinFunction
     func = space.interp_w(Function, w_func)
@@ -32,5 +32,20 @@ class Module(MixedModule):
                 'get_typeids_z': 'referents.get_typeids_z',
                 'get_typeids_list': 'referents.get_typeids_list',
                 'GcRef': 'referents.W_GcRef',
+                'get_stats': 'interp_gc.get_stats',
+                'set_max_pause': 'interp_gc.set_max_pause',
+                'release_memory': 'interp_gc.release_memory',
+                'set_gc_minor_hook': 'hook.set_gc_minor_hook',
+                'set_gc_collect_step_hook': 'hook.set_gc_collect_step_hook',
+                'GcMinorStats': 'hook.W_GcMinorStats',
+                'GcCollectStepStats': 'hook.W_GcCollectStepStats',
                 })
+            # calls the hooks with the events recorded by the GC
+            from pypy.module.gc.hook import GcHooksAction
+            space.actionflag.register_periodic_action(
+                space.fromcache(GcHooksAction), use_bytecode_counter=False)
         MixedModule.__init__(self, space, w_name)
+
+    def startup(self, space):
+        from pypy.module.gc.interp_gc import GcTimer
+        space.fromcache(GcTimer).startup()
@@ -0,0 +1,250 @@
+import sys
+
+from pypy.interpreter.baseobjspace import W_Root
+from pypy.interpreter.error import OperationError
+from pypy.interpreter.executioncontext import AsyncAction, PeriodicAsyncAction
+from pypy.interpreter.typedef import (TypeDef, GetSetProperty,
+                                      interp_attrproperty)
+from pypy.module.gc.interp_gc import GcTimer
+from rpython.memory.gc import incminimark
+from rpython.memory.gc.hook import GcHooks
+from rpython.rlib.nonconst import NonConstant
+
+
+class GcEvents(object):
+    """The events of one kind that were reported by the GC but not yet
+    passed to the app-level hook."""
+
+    def __init__(self, space):
+        self.w_hook = space.w_None
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.duration = 0
+        self.duration_min = sys.maxint
+        self.duration_max = 0
+
+    def fix_annotation(self):
+        # The LowLevelGcHooks that write these fields are only annotated
+        # together with the GC, after the rest of PyPy.  Make sure that
+        # the fields are not annotated as constants before that.
+        if NonConstant(False):
+            self.count = NonConstant(-42)
+            self.duration = NonConstant(-42)
+            self.duration_min = NonConstant(-42)
+            self.duration_max = NonConstant(-42)
+
+
+class GcMinorEvents(GcEvents):
+    total_memory_used = 0
+    pinned_objects = 0
+
+    def fix_annotation(self):
+        GcEvents.fix_annotation(self)
+        if NonConstant(False):
+            self.total_memory_used = NonConstant(-42)
+            self.pinned_objects = NonConstant(-42)
+
+
+class GcCollectStepEvents(GcEvents):
+    oldstate = 0
+    newstate = 0
+
+    def fix_annotation(self):
+        GcEvents.fix_annotation(self)
+        if NonConstant(False):
+            self.oldstate = NonConstant(-42)
+            self.newstate = NonConstant(-42)
+
+
+class Cache(object):
+    in_recursion = False
+
+    def __init__(self, space):
+        self.gc_minor = GcMinorEvents(space)
+        self.gc_collect_step = GcCollectStepEvents(space)
+
+
+class LowLevelGcHooks(GcHooks):
+    """The hooks called by the GC.  They cannot run any app-level code,
+    so they only record the events and ask for the GcHooksAction to run
+    before the next bytecode.  Several events that occur before it runs
+    are reported together to the app-level hooks.
+
+    Installed by targetpypystandalone.get_gchooks().
+    """
+
+    def __init__(self, space):
+        self.space = space
+        self.cache = space.fromcache(Cache)
+
+    def is_gc_minor_enabled(self):
+        return self.cache.gc_minor.enabled
+
+    def is_gc_collect_step_enabled(self):
+        return self.cache.gc_collect_step.enabled
+
+    def on_gc_minor(self, duration, total_memory_used, pinned_objects):
+        events = self.cache.gc_minor
+        events.count += 1
+        events.duration += duration
+        if duration < events.duration_min:
+            events.duration_min = duration
+        if duration > events.duration_max:
+            events.duration_max = duration
+        events.total_memory_used = total_memory_used
+        events.pinned_objects = pinned_objects
+        self.space.actionflag.reset_ticker(-1)
+
+    def on_gc_collect_step(self, duration, oldstate, newstate):
+        events = self.cache.gc_collect_step
+        events.count += 1
+        events.duration += duration
+        if duration < events.duration_min:
+            events.duration_min = duration
+        if duration > events.duration_max:
+            events.duration_max = duration
+        events.oldstate = oldstate
+        events.newstate = newstate
+        self.space.actionflag.reset_ticker(-1)
+
+
+class GcHooksAction(PeriodicAsyncAction):
+    """Calls the app-level hooks with the events recorded by the
+    LowLevelGcHooks.  It is a PeriodicAsyncAction because firing a
+    regular AsyncAction allocates, which the GC hooks must not do."""
+
+    def __init__(self, space):
+        "NOT_RPYTHON"
+        AsyncAction.__init__(self, space)
+        self.cache = space.fromcache(Cache)
+
+    def perform(self, executioncontext, frame):
+        cache = self.cache
+        if cache.in_recursion:
+            return     # the events are reported after the running hook
+        if cache.gc_minor.count > 0:
+            self.report_gc_minor()
+        if cache.gc_collect_step.count > 0:
+            self.report_gc_collect_step()
+
+    def report_gc_minor(self):
+        events = self.cache.gc_minor
+        w_stats = W_GcMinorStats(self.space, events)
+        events.reset()
+        self.call_hook(events.w_hook, w_stats)
+
+    def report_gc_collect_step(self):
+        events = self.cache.gc_collect_step
+        w_stats = W_GcCollectStepStats(self.space, events)
+        events.reset()
+        self.call_hook(events.w_hook, w_stats)
+
+    def call_hook(self, w_hook, w_stats):
+        space = self.space
+        if space.is_w(w_hook, space.w_None):
+            return
+        cache = self.cache
+        cache.in_recursion = True
+        try:
+            try:
+                space.call_function(w_hook, w_stats)
+            except OperationError, e:
+                e.write_unraisable(space, "GC hook ", w_hook)
+        finally:
+            cache.in_recursion = False
+
+
+class W_GcStats(W_Root):
+    def __init__(self, space, events):
+        seconds_per_tick = space.fromcache(GcTimer).seconds_per_tick()
+        self.count = events.count
+        self.duration = events.duration * seconds_per_tick
+        self.duration_min = events.duration_min * seconds_per_tick
+        self.duration_max = events.duration_max * seconds_per_tick
+
+
+class W_GcMinorStats(W_GcStats):
+    def __init__(self, space, events):
+        W_GcStats.__init__(self, space, events)
+        self.total_memory_used = events.total_memory_used
+        self.pinned_objects = events.pinned_objects
+
+
+class W_GcCollectStepStats(W_GcStats):
+    def __init__(self, space, events):
+        W_GcStats.__init__(self, space, events)
+        self.oldstate = events.oldstate
+        self.newstate = events.newstate
+
+    def descr_get_gc_states(self, space):
+        return space.newtuple([space.wrap(name)
+                               for name in incminimark.GC_STATES])
+
+
+W_GcMinorStats.typedef = TypeDef(
+    "GcMinorStats",
+    __doc__ = """The minor collections that occurred since the hook was
+last called: 'count' collections taking 'duration' seconds in total,
+between 'duration_min' and 'duration_max' seconds each.  The other
+attributes describe the state after the last of them.""",
+    count = interp_attrproperty("count", cls=W_GcMinorStats),
+    duration = interp_attrproperty("duration", cls=W_GcMinorStats),
+    duration_min = interp_attrproperty("duration_min", cls=W_GcMinorStats),
+    duration_max = interp_attrproperty("duration_max", cls=W_GcMinorStats),
+    total_memory_used = interp_attrproperty("total_memory_used",
+                                            cls=W_GcMinorStats),
+    pinned_objects = interp_attrproperty("pinned_objects",
+                                         cls=W_GcMinorStats),
+    )
+W_GcMinorStats.typedef.acceptable_as_base_class = False
+
+W_GcCollectStepStats.typedef = TypeDef(
+    "GcCollectStepStats",
+    __doc__ = """The steps of major collection that occurred since the
+hook was last called: 'count' steps taking 'duration' seconds in total,
+between 'duration_min' and 'duration_max' seconds each.  'oldstate' and
+'newstate' are the states before and after the last of them, as indexes
+in 'GC_STATES'.""",
+    count = interp_attrproperty("count", cls=W_GcCollectStepStats),
+    duration = interp_attrproperty("duration", cls=W_GcCollectStepStats),
+    duration_min = interp_attrproperty("duration_min",
+                                       cls=W_GcCollectStepStats),
+    duration_max = interp_attrproperty("duration_max",
+                                       cls=W_GcCollectStepStats),
+    oldstate = interp_attrproperty("oldstate", cls=W_GcCollectStepStats),
+    newstate = interp_attrproperty("newstate", cls=W_GcCollectStepStats),
+    GC_STATES = GetSetProperty(W_GcCollectStepStats.descr_get_gc_states),
+    )
+W_GcCollectStepStats.typedef.acceptable_as_base_class = False
+
+
+def _set_hook(space, events, w_hook):
+    events.w_hook = w_hook
+    events.enabled = not space.is_w(w_hook, space.w_None)
+    events.reset()
+    events.fix_annotation()
+    space.fromcache(Cache).in_recursion = NonConstant(False)
+
+def set_gc_minor_hook(space, w_hook):
+    """ set_gc_minor_hook(hook)
+
+    Set a hook that will be called after minor collections, with a
+    gc.GcMinorStats object.  To keep the collections fast, the hook is
+    not called by the GC itself but before the next bytecode, and it
+    gets all the collections that occurred since it was last called.
+    Use None to remove the hook.
+    """
+    _set_hook(space, space.fromcache(Cache).gc_minor, w_hook)
+
+def set_gc_collect_step_hook(space, w_hook):
+    """ set_gc_collect_step_hook(hook)
+
+    Set a hook that will be called after the steps of incremental major
+    collections, with a gc.GcCollectStepStats object.  Like the hook of
+    set_gc_minor_hook(), it gets all the steps that occurred since it
+    was last called.  Use None to remove the hook.
+    """
+    _set_hook(space, space.fromcache(Cache).gc_collect_step, w_hook)
@@ -1,6 +1,10 @@
+import time
+
 from pypy.interpreter.gateway import unwrap_spec
 from pypy.interpreter.error import OperationError
 from rpython.rlib import rgc
+from rpython.rlib.rtimer import read_timestamp
+from rpython.rlib.unroll import unrolling_iterable
 
 
 @unwrap_spec(generation=int)
@@ -50,6 +54,85 @@ def disable_finalizers(space):
 
 # ____________________________________________________________
 
+class GcTimer(object):
+    """Converts the durations measured by the GC, in ticks of
+    read_timestamp(), to seconds.  Like _lsprof, we find the length of
+    a tick by comparing with time.time(), here over all the time since
+    the gc module was started."""
+
+    def __init__(self, space):
+        self.startup()
+
+    def startup(self):
+        self.start_time = time.time()
+        self.start_timestamp = read_timestamp()
+
+    def seconds_per_tick(self):
+        elapsed = read_timestamp() - self.start_timestamp
+        if elapsed <= 0:
+            return 0.0
+        return (time.time() - self.start_time) / float(elapsed)
+
+_STATS = unrolling_iterable([
+    # (key, rgc stats number, is a duration)
+    ('minor_collections',      rgc.NUM_MINOR_COLLECTS,         False),
+    ('major_collections',      rgc.NUM_MAJOR_COLLECTS,         False),
+    ('major_collection_steps', rgc.NUM_MAJOR_COLLECTION_STEPS, False),
+    ('total_minor_time',       rgc.TOTAL_MINOR_TIME,           True),
+    ('max_minor_time',         rgc.MAX_MINOR_TIME,             True),
+    ('total_major_time',       rgc.TOTAL_MAJOR_TIME,           True),
+    ('max_major_step_time',    rgc.MAX_MAJOR_STEP_TIME,        True),
+    ('nursery_size',           rgc.NURSERY_SIZE,               False),
+    ('arenas_count',           rgc.ARENAS_COUNT,               False),
+    ('arenas_bytes',           rgc.ARENAS_BYTES,               False),
+    ('rawmalloced_bytes',      rgc.RAWMALLOC_BYTES,            False),
+    ('total_memory_used',      rgc.TOTAL_MEMORY_USED,          False),
+    ('max_pause',              rgc.MAX_PAUSE,                  False),
+    ('mark_bytes_per_microsecond',  rgc.MARK_BYTES_PER_MICROSECOND,  False),
+    ('sweep_bytes_per_microsecond', rgc.SWEEP_BYTES_PER_MICROSECOND, False),
+    ])
+
+def get_stats(space):
+    """Return a dict with the statistics of the garbage collector: the
+    number of collections done so far, the time spent in them in seconds,
+    and the sizes in bytes of the memory it manages.  The major
+    collections are incremental: their time is spent in several steps."""
+    if rgc.get_stats(rgc.NUM_MINOR_COLLECTS) < 0:
+        raise OperationError(space.w_RuntimeError,
+                             space.wrap("Wrong GC"))
+    seconds_per_tick = space.fromcache(GcTimer).seconds_per_tick()
+    w_stats = space.newdict()
+    for key, stats_no, is_duration in _STATS:
+        value = rgc.get_stats(stats_no)
+        if is_duration:
+            w_value = space.wrap(value * seconds_per_tick)
+        else:
+            w_value = space.wrap(value)
+        space.setitem_str(w_stats, key, w_value)
+    return w_stats
+
+@unwrap_spec(microseconds=int)
+def set_max_pause(space, microseconds):
+    """Size the steps of the major collections so that each one takes
+    at most about the given number of microseconds, based on the speed
+    of marking and sweeping measured so far.  0 means to use steps of a
+    fixed size, as by default.  The current value is in get_stats()."""
+    if microseconds < 0:
+        raise OperationError(space.w_ValueError,
+                             space.wrap("max pause must be >= 0"))
+    if rgc.get_stats(rgc.MAX_PAUSE) < 0:
+        raise OperationError(space.w_RuntimeError,
+                             space.wrap("Wrong GC"))
+    rgc.set_max_pause(microseconds)
+
+def release_memory(space):
+    """Return to the OS the memory that the GC keeps for reuse, i.e. the
+    arenas that are entirely free, and return the number of bytes
+    released.  Call it after gc.collect() to release as much as possible.
+    Note that gc.collect() itself already releases the free arenas
+    beyond the amount given by the env var PYPY_GC_KEEP_FREE."""
+    return space.wrap(rgc.release_memory())
+
 @unwrap_spec(filename='str0')
 def dump_heap_stats(space, filename):
     tb = rgc._heap_stats()
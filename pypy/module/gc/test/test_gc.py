@@ -148,3 +148,107 @@ class AppTestGcMapDictIndexCache(AppTestGcMethodCache):
         gc.collect()    # the classes C should all go away here
         for r in rlist:
             assert r() is None
+
+
+class AppTestGcStats(object):
+    def test_get_stats(self):
+        import gc
+        stats = gc.get_stats()
+        assert sorted(stats) == [
+            'arenas_bytes', 'arenas_count', 'major_collection_steps',
+            'major_collections', 'mark_bytes_per_microsecond',
+            'max_major_step_time', 'max_minor_time', 'max_pause',
+            'minor_collections', 'nursery_size', 'rawmalloced_bytes',
+            'sweep_bytes_per_microsecond', 'total_major_time',
+            'total_memory_used', 'total_minor_time']
+        assert stats['minor_collections'] >= 0
+        assert stats['total_minor_time'] >= 0.0
+
+    def test_set_max_pause(self):
+        import gc
+        gc.set_max_pause(500)
+        gc.set_max_pause(0)
+        raises(ValueError, gc.set_max_pause, -1)
+
+    def test_release_memory(self):
+        import gc
+        gc.collect()
+        assert gc.release_memory() >= 0
+
+
+class AppTestGcHooks(object):
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("Can't run this test with -A")
+        from pypy.interpreter.gateway import interp2app, unwrap_spec
+        from pypy.module.gc.hook import LowLevelGcHooks
+        space = cls.space
+        gchooks = space.fromcache(LowLevelGcHooks)
+
+        @unwrap_spec(duration=int, total_memory_used=int,
+                     pinned_objects=int, repeat=int)
+        def fire_gc_minor(space, duration, total_memory_used,
+                          pinned_objects, repeat=1):
+            for i in range(repeat):
+                gchooks.fire_gc_minor(duration, total_memory_used + i,
+                                      pinned_objects + i)
+
+        @unwrap_spec(duration=int, oldstate=int, newstate=int, repeat=int)
+        def fire_gc_collect_step(space, duration, oldstate, newstate,
+                                 repeat=1):
+            for i in range(repeat):
+                gchooks.fire_gc_collect_step(duration, oldstate, newstate)
+
+        cls.w_fire_gc_minor = space.wrap(interp2app(fire_gc_minor))
+        cls.w_fire_gc_collect_step = space.wrap(
+            interp2app(fire_gc_collect_step))
+
+    def test_gc_minor_hook(self):
+        import gc
+        lst = []
+        gc.set_gc_minor_hook(lst.append)
+        try:
+            # the events are reported together, before the next bytecode
+            self.fire_gc_minor(10, 20, 30, 3)
+            [stats] = lst
+            assert isinstance(stats, gc.GcMinorStats)
+            assert stats.count == 3
+            assert stats.duration >= stats.duration_max >= stats.duration_min
+            assert stats.total_memory_used == 22
+            assert stats.pinned_objects == 32
+            self.fire_gc_minor(10, 20, 30)
+            assert len(lst) == 2
+            assert lst[1].count == 1
+        finally:
+            gc.set_gc_minor_hook(None)
+        self.fire_gc_minor(10, 20, 30)
+        assert len(lst) == 2
+
+    def test_gc_collect_step_hook(self):
+        import gc
+        lst = []
+        gc.set_gc_collect_step_hook(lst.append)
+        try:
+            self.fire_gc_collect_step(10, 1, 2, 2)
+            [stats] = lst
+            assert isinstance(stats, gc.GcCollectStepStats)
+            assert stats.count == 2
+            assert stats.oldstate == 1
+            assert stats.newstate == 2
+            assert stats.GC_STATES[stats.newstate] == 'SWEEPING'
+        finally:
+            gc.set_gc_collect_step_hook(None)
+
+    def test_hook_raises(self):
+        import gc
+        lst = []
+        def hook(stats):
+            lst.append(stats)
+            raise ValueError
+        gc.set_gc_minor_hook(hook)
+        try:
+            self.fire_gc_minor(10, 20, 30)
+            # the exception is printed and ignored
+            assert len(lst) == 1
+        finally:
+            gc.set_gc_minor_hook(None)
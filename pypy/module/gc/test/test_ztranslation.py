@@ -1,4 +1,11 @@
 from pypy.objspace.fake.checkmodule import checkmodule
 
 def test_checkmodule():
-    checkmodule('gc')
+    from pypy.module.gc.hook import LowLevelGcHooks, GcHooksAction
+    def fire_hooks(space):
+        # normally called by the GC and by the action dispatcher
+        gchooks = space.fromcache(LowLevelGcHooks)
+        gchooks.fire_gc_minor(1, 2, 3)
+        gchooks.fire_gc_collect_step(1, 2, 3)
+        space.fromcache(GcHooksAction).perform(None, None)
+    checkmodule('gc', extra_func=fire_hooks)
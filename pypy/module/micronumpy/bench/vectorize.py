@@ -0,0 +1,46 @@
+"""Element-wise operations on large float64 and int64 arrays, which the
+JIT can turn into vector instructions.  Compare the times of
+
+    pypy bench/vectorize.py
+    pypy --jit enable_opts=all:vec bench/vectorize.py
+"""
+import sys
+import time
+
+try:
+    import numpypy as numpy
+except ImportError:
+    import numpy
+
+def main(n, r):
+    x = numpy.arange(n, dtype=numpy.float64)
+    y = numpy.ones(n, dtype=numpy.float64)
+    i = numpy.arange(n, dtype=numpy.int64)
+    j = numpy.ones(n, dtype=numpy.int64)
+    benchmarks = [
+        ('float64 add', lambda: x + y),
+        ('float64 mul', lambda: x * y),
+        ('float64 div', lambda: x / y),
+        ('float64 neg', lambda: -x),
+        ('float64 abs', lambda: abs(x)),
+        ('float64 mul by scalar', lambda: x * 2.5),
+        ('int64 add', lambda: i + j),
+        ('int64 xor', lambda: i ^ j),
+    ]
+    for name, f in benchmarks:
+        f()     # warm up the JIT
+        a = time.time()
+        for _ in xrange(r):
+            f()
+        b = time.time()
+        print '%-25s %d runs, %.2f seconds' % (name, r, b - a)
+
+try:
+    n = int(sys.argv[1])
+except IndexError:
+    n = 1000000
+try:
+    r = int(sys.argv[2])
+except IndexError:
+    r = 100
+main(n, r)
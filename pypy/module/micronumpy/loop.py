@@ -41,17 +41,31 @@ def call2(space, shape, func, calc_dtype, w_lhs, w_rhs, out):
     while not out_iter.done(out_state):
         call2_driver.jit_merge_point(shapelen=shapelen, func=func,
                                      calc_dtype=calc_dtype, res_dtype=res_dtype)
-        if left_iter:
-            w_left = left_iter.getitem(left_state).convert_to(space, calc_dtype)
-            left_state = left_iter.next(left_state)
-        if right_iter:
-            w_right = right_iter.getitem(right_state).convert_to(space, calc_dtype)
-            right_state = right_iter.next(right_state)
-        out_iter.setitem(out_state, func(calc_dtype, w_left, w_right).convert_to(
-            space, res_dtype))
-        out_state = out_iter.next(out_state)
+        # do two items per iteration if possible, which the JIT can turn
+        # into vector operations (see optimizeopt/vectorize.py)
+        if out_state.index + 1 < out_iter.size:
+            left_state, right_state, out_state = call2_item(space, func,
+                calc_dtype, res_dtype, w_left, left_iter, left_state,
+                w_right, right_iter, right_state, out_iter, out_state)
+        left_state, right_state, out_state = call2_item(space, func,
+            calc_dtype, res_dtype, w_left, left_iter, left_state,
+            w_right, right_iter, right_state, out_iter, out_state)
     return out
 
+def call2_item(space, func, calc_dtype, res_dtype, w_left, left_iter,
+               left_state, w_right, right_iter, right_state, out_iter,
+               out_state):
+    if left_iter:
+        w_left = left_iter.getitem(left_state).convert_to(space, calc_dtype)
+        left_state = left_iter.next(left_state)
+    if right_iter:
+        w_right = right_iter.getitem(right_state).convert_to(space, calc_dtype)
+        right_state = right_iter.next(right_state)
+    out_iter.setitem(out_state, func(calc_dtype, w_left, w_right).convert_to(
+        space, res_dtype))
+    out_state = out_iter.next(out_state)
+    return left_state, right_state, out_state
+
 call1_driver = jit.JitDriver(
     name='numpy_call1',
     greens=['shapelen', 'func', 'calc_dtype', 'res_dtype'],
@@ -66,12 +80,23 @@ def call1(space, shape, func, calc_dtype, w_obj, w_ret):
     while not out_iter.done(out_state):
         call1_driver.jit_merge_point(shapelen=shapelen, func=func,
                                      calc_dtype=calc_dtype, res_dtype=res_dtype)
-        elem = obj_iter.getitem(obj_state).convert_to(space, calc_dtype)
-        out_iter.setitem(out_state, func(calc_dtype, elem).convert_to(space, res_dtype))
-        out_state = out_iter.next(out_state)
-        obj_state = obj_iter.next(obj_state)
+        # two items per iteration if possible, like call2()
+        if out_state.index + 1 < out_iter.size:
+            obj_state, out_state = call1_item(space, func, calc_dtype,
+                res_dtype, obj_iter, obj_state, out_iter, out_state)
+        obj_state, out_state = call1_item(space, func, calc_dtype, res_dtype,
+                                          obj_iter, obj_state, out_iter,
+                                          out_state)
     return w_ret
 
+def call1_item(space, func, calc_dtype, res_dtype, obj_iter, obj_state,
+               out_iter, out_state):
+    elem = obj_iter.getitem(obj_state).convert_to(space, calc_dtype)
+    out_iter.setitem(out_state, func(calc_dtype, elem).convert_to(space, res_dtype))
+    out_state = out_iter.next(out_state)
+    obj_state = obj_iter.next(obj_state)
+    return obj_state, out_state
+
 call_many_to_one_driver = jit.JitDriver(
     name='numpy_call_many_to_one',
     greens=['shapelen', 'nin', 'func', 'res_dtype'],
@@ -20,7 +20,7 @@ class Module(MixedModule):
                  'countOf', 'delslice', 'getslice', 'indexOf',
                  'isMappingType', 'isNumberType', 'isSequenceType',
                  'repeat', 'setslice',
-                 'attrgetter', 'itemgetter', 'methodcaller',
+                 'attrgetter', 'methodcaller',
     ]
 
     for name in app_names:
@@ -40,6 +40,7 @@ class Module(MixedModule):
 
     interpleveldefs = {
         '_compare_digest': 'tscmp.compare_digest',
+        'itemgetter': 'interp_operator.W_ItemGetter',
     }
 
     for name in interp_names:
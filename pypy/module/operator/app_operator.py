@@ -1,4 +1,4 @@
-'''NOT_RPYTHON: because of attrgetter and itemgetter
+'''NOT_RPYTHON: because of attrgetter
 Operator interface.
 
 This module exports a set of operators as functions. E.g. operator.add(x,y) is
@@ -127,21 +127,6 @@ def attrgetter(attr, *attrs):
         return _single_attrgetter(attr.split("."))
 
 
-class itemgetter(object):
-    def __init__(self, item, *items):
-        self._single = not bool(items)
-        if self._single:
-            self._idx = item
-        else:
-            self._idx = [item] + list(items)
-
-    def __call__(self, obj):
-        if self._single:
-            return obj[self._idx]
-        else:
-            return tuple([obj[i] for i in self._idx])
-
-
 class methodcaller(object):
     def __init__(self, method_name, *args, **kwargs):
         self._method_name = method_name
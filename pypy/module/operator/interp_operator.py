@@ -1,5 +1,7 @@
+from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError
-from pypy.interpreter.gateway import unwrap_spec
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.typedef import TypeDef
 
 
 def index(space, w_a):
@@ -247,3 +249,33 @@ def irepeat(space, w_obj1, w_obj2):
 @unwrap_spec(default=int)
 def _length_hint(space, w_iterable, default):
     return space.wrap(space.length_hint(w_iterable, default))
+
+# itemgetter is implemented at interp-level so that list.sort() can recognize
+# it and sort lists of records directly on their unboxed columns
+
+class W_ItemGetter(W_Root):
+    def __init__(self, items_w):
+        self.items_w = items_w
+
+    def descr_call(self, space, w_obj):
+        items_w = self.items_w
+        if len(items_w) == 1:
+            return space.getitem(w_obj, items_w[0])
+        return space.newtuple([space.getitem(w_obj, w_item)
+                               for w_item in items_w])
+
+def W_ItemGetter___new__(space, w_subtype, w_item, args_w):
+    r = space.allocate_instance(W_ItemGetter, w_subtype)
+    r.__init__([w_item] + args_w)
+    return space.wrap(r)
+
+W_ItemGetter.typedef = TypeDef(
+        'operator.itemgetter',
+        __new__ = interp2app(W_ItemGetter___new__),
+        __call__ = interp2app(W_ItemGetter.descr_call),
+        __doc__ = """itemgetter(item, ...) --> itemgetter object
+
+Return a callable object that fetches the given item(s) from its operand.
+After, f=itemgetter(2), the call f(r) returns r[2].
+After, g=itemgetter(2,5,3), the call g(r) returns (r[2], r[5], r[3])""")
+W_ItemGetter.typedef.acceptable_as_base_class = False
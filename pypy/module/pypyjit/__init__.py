@@ -2,10 +2,15 @@ from pypy.interpreter.mixedmodule import MixedModule
 
 class Module(MixedModule):
     appleveldefs = {
+        'dump_warmup': 'app_warmup.dump_warmup',
+        'load_warmup': 'app_warmup.load_warmup',
+        'warmup_cache': 'app_warmup.warmup_cache',
     }
 
     interpleveldefs = {
         'set_param':    'interp_jit.set_param',
+        'set_code_param': 'interp_jit.set_code_param',
+        'get_code_params': 'interp_jit.get_code_params',
         'residual_call': 'interp_jit.residual_call',
         'not_from_assembler': 'interp_jit.W_NotFromAssembler',
         'set_compile_hook': 'interp_resop.set_compile_hook',
@@ -14,6 +19,16 @@ class Module(MixedModule):
         'get_stats_snapshot': 'interp_resop.get_stats_snapshot',
         'enable_debug': 'interp_resop.enable_debug',
         'disable_debug': 'interp_resop.disable_debug',
+        'get_loop_eviction_stats': 'interp_resop.get_loop_eviction_stats',
+        'get_jit_counter_stats': 'interp_resop.get_jit_counter_stats',
+        'compile_pending_bridges': 'interp_resop.compile_pending_bridges',
+        'get_pending_bridge_count': 'interp_resop.get_pending_bridge_count',
+        'get_hot_locations': 'interp_warmup.get_hot_locations',
+        'add_warmup_locations': 'interp_warmup.add_warmup_locations',
+        'enable_guard_stats': 'interp_guardstats.enable_guard_stats',
+        'disable_guard_stats': 'interp_guardstats.disable_guard_stats',
+        'reset_guard_stats': 'interp_guardstats.reset_guard_stats',
+        'get_guard_stats': 'interp_guardstats.get_guard_stats',
         'ResOperation': 'interp_resop.WrappedOp',
         'DebugMergePoint': 'interp_resop.DebugMergePoint',
         'JitLoopInfo': 'interp_resop.W_JitLoopInfo',
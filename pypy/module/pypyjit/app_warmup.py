@@ -0,0 +1,72 @@
+# NOT_RPYTHON
+
+HEADER = 'pypyjit warmup 1\n'
+
+def dump_warmup(filename):
+    """Write to the given file the positions where the JIT compiled loops
+    so far, so that load_warmup() can make another process trace them
+    again as soon as they are reached.
+    Format: a header line, followed by one line per position:
+
+        bytecode_offset is_being_profiled co_firstlineno co_name co_filename
+    """
+    import os
+    import pypyjit
+    lines = [HEADER]
+    for (co_filename, co_firstlineno, co_name, next_instr,
+         is_being_profiled) in pypyjit.get_hot_locations():
+        if ' ' in co_name or '\n' in co_name or '\n' in co_filename:
+            continue
+        lines.append('%d %d %d %s %s\n' % (next_instr, is_being_profiled,
+                                           co_firstlineno, co_name,
+                                           co_filename))
+    # write to a temporary file first, in case several processes are
+    # dumping to the same file at the same time
+    tmpname = '%s.%d.tmp' % (filename, os.getpid())
+    f = open(tmpname, 'w')
+    try:
+        f.writelines(lines)
+    finally:
+        f.close()
+    os.rename(tmpname, filename)
+
+def load_warmup(filename):
+    """Read a file written by dump_warmup(), and make the JIT start
+    tracing from the positions it contains as soon as they are reached.
+    This works for the code objects that already exist and for the ones
+    created later, so it can be called early, before importing the
+    modules of the application.  Lines that cannot be parsed are ignored.
+    """
+    import pypyjit
+    f = open(filename, 'r')
+    try:
+        if f.readline() != HEADER:
+            raise ValueError("%r is not a pypyjit warmup file" % (filename,))
+        lines = f.readlines()
+    finally:
+        f.close()
+    locations = []
+    for line in lines:
+        parts = line.rstrip('\n').split(' ', 4)
+        if len(parts) != 5:
+            continue
+        try:
+            next_instr = int(parts[0])
+            is_being_profiled = bool(int(parts[1]))
+            co_firstlineno = int(parts[2])
+        except ValueError:
+            continue
+        locations.append((parts[4], co_firstlineno, parts[3], next_instr,
+                          is_being_profiled))
+    pypyjit.add_warmup_locations(locations)
+
+def warmup_cache(filename):
+    """Use the given file as a persistent warm-up cache: load it now with
+    load_warmup() if it exists, and write it with dump_warmup() when the
+    process exits.
+    """
+    import atexit
+    import os
+    if os.path.exists(filename):
+        load_warmup(filename)
+    atexit.register(dump_warmup, filename)
@@ -3,8 +3,11 @@ from rpython.rlib import jit_hooks
 from rpython.rlib.jit import JitHookInterface, Counters
 
 from pypy.interpreter.error import OperationError
+from pypy.module.pypyjit.interp_jit import pypyjitdriver
 from pypy.module.pypyjit.interp_resop import (Cache, wrap_greenkey,
     WrappedOp, W_JitLoopInfo, wrap_oplist)
+from pypy.module.pypyjit.interp_warmup import WarmupCache
+from pypy.module.pypyjit.interp_guardstats import GuardStatsCache
 
 class PyPyJitIface(JitHookInterface):
     def on_abort(self, reason, jitdriver, greenkey, greenkey_repr, logops, operations):
@@ -29,9 +32,18 @@ class PyPyJitIface(JitHookInterface):
                 cache.in_recursion = False
 
     def after_compile(self, debug_info):
+        if debug_info.get_jitdriver() is pypyjitdriver:
+            self.space.fromcache(WarmupCache).record(debug_info.greenkey)
+        guardstats = self.space.fromcache(GuardStatsCache)
+        if guardstats.enabled:
+            guardstats.record_trace(debug_info)
         self._compile_hook(debug_info, is_bridge=False)
 
     def after_compile_bridge(self, debug_info):
+        guardstats = self.space.fromcache(GuardStatsCache)
+        if guardstats.enabled:
+            guardstats.record_bridge(debug_info.fail_descr)
+            guardstats.record_trace(debug_info)
         self._compile_hook(debug_info, is_bridge=True)
 
     def before_compile(self, debug_info):
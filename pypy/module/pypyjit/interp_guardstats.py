@@ -0,0 +1,158 @@
+"""Per-guard failure statistics, to find the places in the Python code
+whose guards keep failing, e.g. polymorphic call sites or attributes
+whose type is not stable.  The failure counts are kept by the JIT itself
+(see GuardFailureCounts in rpython/jit/metainterp/jitprof.py); this
+module records, for every guard compiled while the statistics are
+enabled, its kind and the Python source position it comes from.  Both
+are attached to the descr of the guard, and go away when the memory
+manager frees its loop.
+"""
+
+from rpython.jit.metainterp.history import AbstractFailDescr
+from rpython.jit.metainterp.resoperation import rop
+from rpython.rlib import jit_hooks
+from rpython.rlib.listsort import make_timsort_class
+from rpython.rlib.rweakref import RWeakKeyDictionary
+from rpython.rtyper.annlowlevel import cast_gcref_to_instance
+
+from pypy.module.pypyjit.interp_resop import wrap_greenkey
+
+
+GUARD_KINDS = {
+    rop.GUARD_TRUE: 'condition',
+    rop.GUARD_FALSE: 'condition',
+    rop.GUARD_VALUE: 'value',
+    rop.GUARD_CLASS: 'class',
+    rop.GUARD_NONNULL_CLASS: 'class',
+    rop.GUARD_NONNULL: 'null',
+    rop.GUARD_ISNULL: 'null',
+    rop.GUARD_NO_EXCEPTION: 'exception',
+    rop.GUARD_EXCEPTION: 'exception',
+    rop.GUARD_NO_OVERFLOW: 'overflow',
+    rop.GUARD_OVERFLOW: 'overflow',
+    rop.GUARD_NOT_FORCED: 'forced',
+    rop.GUARD_NOT_FORCED_2: 'forced',
+    rop.GUARD_NOT_INVALIDATED: 'invalidated',
+}
+
+def guard_kind(opnum):
+    return GUARD_KINDS.get(opnum, 'other')
+
+
+class GuardInfo(object):
+    kind = 'other'
+    w_greenkey = None
+    has_bridge = False
+
+    def __init__(self, kind, w_greenkey):
+        self.kind = kind
+        self.w_greenkey = w_greenkey
+
+
+class GuardStatsCache(object):
+    def __init__(self, space):
+        self.space = space
+        self.enabled = False
+        self.guards = RWeakKeyDictionary(AbstractFailDescr, GuardInfo)
+
+    def reset(self):
+        self.guards = RWeakKeyDictionary(AbstractFailDescr, GuardInfo)
+
+    def record_trace(self, debug_info):
+        space = self.space
+        jitdrivers_sd = debug_info.logger.metainterp_sd.jitdrivers_sd
+        w_greenkey = space.w_None
+        for op in debug_info.operations:
+            if op.getopnum() == rop.DEBUG_MERGE_POINT:
+                jd_sd = jitdrivers_sd[op.getarg(0).getint()]
+                greenkey = op.getarglist()[3:]
+                repr = jd_sd.warmstate.compute_location_str(greenkey)
+                w_greenkey = wrap_greenkey(space, jd_sd.jitdriver, greenkey,
+                                           repr)
+            elif op.is_guard():
+                descr = op.getdescr()
+                assert isinstance(descr, AbstractFailDescr)
+                info = GuardInfo(guard_kind(op.getopnum()), w_greenkey)
+                self.guards.set(descr, info)
+
+    def record_bridge(self, fail_descr):
+        info = self.guards.get(fail_descr)
+        if info is not None:
+            info.has_bridge = True
+
+
+class GuardStat(object):
+    def __init__(self, number, failures, info):
+        self.number = number
+        self.failures = failures
+        self.info = info
+
+def _more_failures(a, b):
+    return a.failures > b.failures
+GuardStatSort = make_timsort_class(lt=_more_failures)
+
+# ____________________________________________________________
+#
+# Public interface
+
+def enable_guard_stats(space):
+    """ Start counting the failures of every guard, and recording where
+    the guards of newly compiled loops and bridges come from.  This makes
+    compiling and failing guards slightly slower; the code produced by the
+    JIT is not affected.
+    """
+    space.fromcache(GuardStatsCache).enabled = True
+    jit_hooks.stats_set_guard_failure_counting(None, True)
+
+def disable_guard_stats(space):
+    """ Stop collecting guard statistics.  The statistics collected so far
+    are kept; see reset_guard_stats().
+    """
+    space.fromcache(GuardStatsCache).enabled = False
+    jit_hooks.stats_set_guard_failure_counting(None, False)
+
+def reset_guard_stats(space):
+    """ Forget the guard statistics collected so far.
+    """
+    space.fromcache(GuardStatsCache).reset()
+    jit_hooks.stats_reset_guard_failures(None)
+
+def get_guard_stats(space):
+    """ Return the guards that failed since enable_guard_stats() was
+    called, most failing first, as a list of tuples (failures, guard
+    number, kind, greenkey, has_bridge).  'kind' is one of 'condition',
+    'value', 'class', 'null', 'exception', 'overflow', 'forced',
+    'invalidated' or 'other'.  'greenkey' is where the guard comes from,
+    in the same format as JitLoopInfo.greenkey: (code, bytecode offset,
+    is_profiled) for Python code.  'guard number' is the same as
+    JitLoopInfo.bridge_no.  Once a guard has a bridge, its failures
+    jump directly to the bridge and are not counted any more.  For the
+    guards compiled before enable_guard_stats() was called, kind is
+    'unknown' and greenkey is None.
+    """
+    cache = space.fromcache(GuardStatsCache)
+    ll_failures = jit_hooks.stats_get_guard_failures(None)
+    stats = []
+    for i in range(len(ll_failures)):
+        descr = cast_gcref_to_instance(AbstractFailDescr,
+                                       ll_failures[i].descr)
+        stats.append(GuardStat(ll_failures[i].number, ll_failures[i].counter,
+                               cache.guards.get(descr)))
+    GuardStatSort(stats).sort()
+    stats_w = []
+    for stat in stats:
+        info = stat.info
+        if info is None:
+            kind = 'unknown'
+            w_greenkey = space.w_None
+            has_bridge = False
+        else:
+            kind = info.kind
+            w_greenkey = info.w_greenkey
+            has_bridge = info.has_bridge
+        stats_w.append(space.newtuple([space.wrap(stat.failures),
+                                       space.wrap(stat.number),
+                                       space.wrap(kind),
+                                       w_greenkey,
+                                       space.newbool(has_bridge)]))
+    return space.newlist(stats_w)
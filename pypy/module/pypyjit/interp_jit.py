@@ -7,9 +7,10 @@ from rpython.rlib.rarithmetic import r_uint, intmask
 from rpython.rlib.jit import JitDriver, hint, we_are_jitted, dont_look_inside
 from rpython.rlib import jit
 from rpython.rlib.jit import current_trace_length, unroll_parameters
+from rpython.rlib.rweakref import RWeakKeyDictionary
 import pypy.interpreter.pyopcode   # for side-effects
 from pypy.interpreter.error import OperationError, oefmt
-from pypy.interpreter.pycode import CO_GENERATOR
+from pypy.interpreter.pycode import PyCode, CO_GENERATOR
 from pypy.interpreter.pyframe import PyFrame
 from pypy.interpreter.pyopcode import ExitFrame, Yield
 from pypy.interpreter.baseobjspace import W_Root
@@ -41,6 +42,71 @@ def get_unique_id(next_instr, is_being_profiled, bytecode):
 def should_unroll_one_iteration(next_instr, is_being_profiled, bytecode):
     return (bytecode.co_flags & CO_GENERATOR) != 0
 
+
+class JitCodeParams(object):
+    """The JIT parameters of one code object, set by set_code_param().
+    A threshold or trace_limit of 0 means that the global parameter
+    applies."""
+
+    def __init__(self):
+        self.threshold = 0
+        self.trace_limit = 0
+        self.inlining = True
+        self.never_trace = False
+
+
+class JitCodeParamsTable(object):
+    """Maps the code objects to their JitCodeParams, without keeping them
+    alive.  Most programs never call set_code_param(), so the hooks below
+    only look up the table if it was used."""
+
+    def __init__(self):
+        self.params = RWeakKeyDictionary(PyCode, JitCodeParams)
+        self.used = False
+
+    def _cleanup_(self):
+        # the tests may have filled the table before translation
+        self.__init__()
+
+    def get(self, pycode):
+        if not self.used:
+            return None
+        return self.params.get(pycode)
+
+    def getorcreate(self, pycode):
+        params = self.params.get(pycode)
+        if params is None:
+            params = JitCodeParams()
+            self.params.set(pycode, params)
+            self.used = True
+        return params
+
+code_params = JitCodeParamsTable()
+
+def get_threshold(next_instr, is_being_profiled, bytecode):
+    params = code_params.get(bytecode)
+    if params is None:
+        return 0
+    return params.threshold
+
+def get_trace_limit(next_instr, is_being_profiled, bytecode):
+    params = code_params.get(bytecode)
+    if params is None:
+        return 0
+    return params.trace_limit
+
+def can_never_inline(next_instr, is_being_profiled, bytecode):
+    params = code_params.get(bytecode)
+    if params is None:
+        return False
+    return params.never_trace or not params.inlining
+
+def confirm_enter_jit(next_instr, is_being_profiled, bytecode, frame, ec):
+    params = code_params.get(bytecode)
+    if params is None:
+        return True
+    return not params.never_trace
+
 class PyPyJitDriver(JitDriver):
     reds = ['frame', 'ec']
     greens = ['next_instr', 'is_being_profiled', 'pycode']
@@ -50,6 +116,10 @@ pypyjitdriver = PyPyJitDriver(get_printable_location = get_printable_location,
                               get_unique_id = get_unique_id,
                               should_unroll_one_iteration =
                               should_unroll_one_iteration,
+                              get_threshold = get_threshold,
+                              get_trace_limit = get_trace_limit,
+                              can_never_inline = can_never_inline,
+                              confirm_enter_jit = confirm_enter_jit,
                               name='pypyjit')
 
 class __extend__(PyFrame):
@@ -145,6 +215,59 @@ def set_param(space, __args__):
             else:
                 raise oefmt(space.w_TypeError, "no JIT parameter '%s'", key)
 
+def _get_pycode(space, w_code):
+    if not isinstance(w_code, PyCode):
+        # a function: use its code object
+        w_code = space.findattr(w_code, space.wrap('__code__'))
+    if not isinstance(w_code, PyCode):
+        raise oefmt(space.w_TypeError, "expected a function or a code object")
+    return w_code
+
+def set_code_param(space, w_code, __args__):
+    '''Configure the JIT parameters of a single code object, given
+    directly or as the function that runs it.
+        * set_code_param(code, threshold=N)    # trace after N iterations
+        * set_code_param(code, trace_limit=N)  # longest trace starting here
+        * set_code_param(code, inlining=False) # never inline into callers
+        * set_code_param(code, never_trace=True)
+    A threshold or trace_limit of 0 restores the global parameter.
+    '''
+    args_w, kwds_w = __args__.unpack()
+    if len(args_w) > 0:
+        raise oefmt(space.w_TypeError,
+                    "set_code_param() takes exactly 1 non-keyword argument, "
+                    "%d given", len(args_w) + 1)
+    params = code_params.getorcreate(_get_pycode(space, w_code))
+    for key, w_value in kwds_w.items():
+        if key == 'threshold' or key == 'trace_limit':
+            intval = space.int_w(w_value)
+            if intval < 0:
+                raise oefmt(space.w_ValueError, "%s must be >= 0", key)
+            if key == 'threshold':
+                params.threshold = intval
+            else:
+                params.trace_limit = intval
+        elif key == 'inlining':
+            params.inlining = space.is_true(w_value)
+        elif key == 'never_trace':
+            params.never_trace = space.is_true(w_value)
+        else:
+            raise oefmt(space.w_TypeError, "no JIT code parameter '%s'", key)
+
+def get_code_params(space, w_code):
+    '''Return the JIT parameters of a code object or function, as a dict
+    with the keys of set_code_param().'''
+    params = code_params.get(_get_pycode(space, w_code))
+    if params is None:
+        params = JitCodeParams()
+    w_result = space.newdict()
+    space.setitem_str(w_result, 'threshold', space.wrap(params.threshold))
+    space.setitem_str(w_result, 'trace_limit', space.wrap(params.trace_limit))
+    space.setitem_str(w_result, 'inlining', space.newbool(params.inlining))
+    space.setitem_str(w_result, 'never_trace',
+                      space.newbool(params.never_trace))
+    return w_result
+
 @dont_look_inside
 def residual_call(space, w_callable, __args__):
     '''For testing.  Invokes callable(...), but without letting
@@ -28,16 +28,23 @@ class Cache(object):
         self.no += 1
         return self.no - 1
 
+def unwrap_pypyjit_greenkey(greenkey):
+    """Return (next_instr, is_being_profiled, pycode) from the greenkey
+    of a loop of the 'pypyjit' jitdriver."""
+    next_instr = greenkey[0].getint()
+    is_being_profiled = greenkey[1].getint()
+    ll_code = lltype.cast_opaque_ptr(lltype.Ptr(OBJECT),
+                                     greenkey[2].getref_base())
+    pycode = cast_base_ptr_to_instance(PyCode, ll_code)
+    return next_instr, is_being_profiled, pycode
+
 def wrap_greenkey(space, jitdriver, greenkey, greenkey_repr):
     if greenkey is None:
         return space.w_None
     jitdriver_name = jitdriver.name
     if jitdriver_name == 'pypyjit':
-        next_instr = greenkey[0].getint()
-        is_being_profiled = greenkey[1].getint()
-        ll_code = lltype.cast_opaque_ptr(lltype.Ptr(OBJECT),
-                                         greenkey[2].getref_base())
-        pycode = cast_base_ptr_to_instance(PyCode, ll_code)
+        next_instr, is_being_profiled, pycode = unwrap_pypyjit_greenkey(
+            greenkey)
         return space.newtuple([space.wrap(pycode), space.wrap(next_instr),
                                space.newbool(bool(is_being_profiled))])
     else:
@@ -416,3 +423,59 @@ def disable_debug(space):
     marginally faster and the counters will stop working.
     """
     jit_hooks.stats_set_debug(None, False)
+
+def get_loop_eviction_stats(space):
+    """ Return a dict describing the memory used by the machine code of
+    the loops, and how many loops were freed to stay within the
+    'loop_code_budget' parameter or because they were not used for
+    'loop_longevity' generations.  'retraced_loops' is the number of
+    loops that were compiled again after being freed.  The sizes are in
+    bytes.
+    """
+    ll_stats = jit_hooks.stats_get_memmgr_stats(None)
+    w_stats = space.newdict()
+    space.setitem_str(w_stats, 'code_budget', space.wrap(ll_stats.code_budget))
+    space.setitem_str(w_stats, 'code_size', space.wrap(ll_stats.code_size))
+    space.setitem_str(w_stats, 'loops', space.wrap(ll_stats.loops))
+    space.setitem_str(w_stats, 'evicted_loops',
+                      space.wrap(ll_stats.evicted_loops))
+    space.setitem_str(w_stats, 'evicted_code_size',
+                      space.wrap(ll_stats.evicted_code_size))
+    space.setitem_str(w_stats, 'retraced_loops',
+                      space.wrap(ll_stats.retraced_loops))
+    return w_stats
+
+def get_jit_counter_stats(space):
+    """ Return a dict describing the table of the counters that decide when
+    loops and bridges are traced: 'size' is its number of entries,
+    'fixed_size' tells if it was set with the 'counter_table_size'
+    parameter, 'new_counters' and 'evicted_counters' count the counters
+    added to the table and those of them that replaced another counter
+    still in use, and 'resizes' is the number of times it grew.
+    """
+    ll_stats = jit_hooks.stats_get_jitcounter_stats(None)
+    w_stats = space.newdict()
+    space.setitem_str(w_stats, 'size', space.wrap(ll_stats.size))
+    space.setitem_str(w_stats, 'fixed_size',
+                      space.newbool(ll_stats.fixed_size))
+    space.setitem_str(w_stats, 'new_counters',
+                      space.wrap(ll_stats.new_counters))
+    space.setitem_str(w_stats, 'evicted_counters',
+                      space.wrap(ll_stats.evicted_counters))
+    space.setitem_str(w_stats, 'resizes', space.wrap(ll_stats.resizes))
+    return w_stats
+
+@unwrap_spec(max_count=int)
+def compile_pending_bridges(space, max_count=-1):
+    """ With the 'deferred_bridges' JIT parameter, generate the machine code
+    of the oldest 'max_count' bridges that were traced but not compiled yet,
+    or all of them if max_count is negative.  Call this when the program
+    has time to spare, e.g. between two requests.  Return the number of
+    bridges that were compiled.
+    """
+    return space.wrap(jit_hooks.compile_pending_bridges(None, max_count))
+
+def get_pending_bridge_count(space):
+    """ Return the number of bridges waiting for compile_pending_bridges().
+    """
+    return space.wrap(jit_hooks.get_pending_bridge_count(None))
@@ -0,0 +1,112 @@
+"""Remembering the positions where the JIT compiled loops, so that a new
+process can start tracing them as soon as they are reached, instead of
+waiting for the counters to reach the threshold again.  The positions
+are identified by the co_filename, co_firstlineno and co_name of the code
+object, together with the bytecode offset.  The file format is handled in
+app_warmup.py.
+"""
+
+from rpython.rlib import jit, rgc
+from rpython.rlib.objectmodel import we_are_translated
+from rpython.rlib.rarithmetic import r_uint
+
+from pypy.interpreter.pycode import PyCode
+from pypy.module.pypyjit.interp_jit import pypyjitdriver
+from pypy.module.pypyjit.interp_resop import unwrap_pypyjit_greenkey
+
+
+class WarmupCache(object):
+    def __init__(self, space):
+        # the positions where loops have been compiled, in order, as tuples
+        # (co_filename, co_firstlineno, co_name, next_instr, is_being_profiled)
+        self.hot_locations = []
+        self.seen = {}
+        # the positions given to add_warmup_locations() for code objects
+        # that were not created yet, as a dict
+        # {(co_filename, co_firstlineno, co_name): [(next_instr,
+        #                                            is_being_profiled)]}
+        self.pending = {}
+
+    def record(self, greenkey):
+        next_instr, is_being_profiled, pycode = unwrap_pypyjit_greenkey(
+            greenkey)
+        key = (pycode.co_filename, pycode.co_firstlineno, pycode.co_name,
+               next_instr, bool(is_being_profiled))
+        if key not in self.seen:
+            self.seen[key] = None
+            self.hot_locations.append(key)
+
+    def add_pending(self, filename, firstlineno, name, next_instr,
+                    is_being_profiled):
+        key = (filename, firstlineno, name)
+        positions = self.pending.get(key, None)
+        if positions is None:
+            positions = []
+            self.pending[key] = positions
+        positions.append((next_instr, is_being_profiled))
+
+    @jit.dont_look_inside
+    def warm_up_code(self, space, pycode):
+        key = (pycode.co_filename, pycode.co_firstlineno, pycode.co_name)
+        positions = self.pending.get(key, None)
+        if positions is None:
+            return
+        del self.pending[key]
+        if not self.pending:
+            space.register_warmup_callback(None)
+        for next_instr, is_being_profiled in positions:
+            if 0 <= next_instr < len(pycode.co_code):
+                jit.trace_next_iteration(pypyjitdriver, r_uint(next_instr),
+                                         is_being_profiled, pycode)
+
+
+def warmup_code_callback(space, pycode):
+    space.fromcache(WarmupCache).warm_up_code(space, pycode)
+
+def try_cast_to_pycode(gcref):
+    return rgc.try_cast_gcref_to_instance(PyCode, gcref)
+
+# ____________________________________________________________
+#
+# Public interface
+
+def get_hot_locations(space):
+    """Return the positions where the JIT compiled loops so far, as a list
+    of tuples (co_filename, co_firstlineno, co_name, bytecode offset,
+    is_being_profiled).
+    """
+    cache = space.fromcache(WarmupCache)
+    locations_w = []
+    for (filename, firstlineno, name, next_instr,
+         is_being_profiled) in cache.hot_locations:
+        locations_w.append(space.newtuple([space.wrap(filename),
+                                           space.wrap(firstlineno),
+                                           space.wrap(name),
+                                           space.wrap(next_instr),
+                                           space.newbool(is_being_profiled)]))
+    return space.newlist(locations_w)
+
+def add_warmup_locations(space, w_locations):
+    """Make the JIT start tracing from the given positions as soon as they
+    are reached, without waiting for their counters.  'locations' is a
+    list of tuples like the ones returned by get_hot_locations().  The
+    code objects are matched by co_filename, co_firstlineno and co_name,
+    both for the code objects that already exist and for the ones created
+    later, e.g. when importing modules.
+    """
+    cache = space.fromcache(WarmupCache)
+    for w_location in space.listview(w_locations):
+        w_filename, w_firstlineno, w_name, w_next_instr, w_profiled = (
+            space.fixedview(w_location, 5))
+        cache.add_pending(space.str_w(w_filename),
+                          space.int_w(w_firstlineno),
+                          space.str_w(w_name),
+                          space.int_w(w_next_instr),
+                          space.is_true(w_profiled))
+    if not cache.pending:
+        return
+    space.register_warmup_callback(warmup_code_callback)
+    # walking the whole heap is only reasonable after translation
+    if we_are_translated():
+        for pycode in rgc.do_get_objects(try_cast_to_pycode):
+            cache.warm_up_code(space, pycode)
@@ -0,0 +1,170 @@
+import py
+from pypy.interpreter.gateway import interp2app
+from rpython.jit.metainterp.history import JitCellToken, ConstInt, ConstPtr
+from rpython.jit.metainterp.jitlog import guard_number
+from rpython.jit.metainterp.logger import Logger
+from rpython.jit.tool.oparser import parse
+from rpython.rtyper.annlowlevel import (cast_instance_to_base_ptr,
+    cast_instance_to_gcref)
+from rpython.rtyper.lltypesystem import lltype, llmemory
+from rpython.rlib import jit_hooks
+from rpython.rlib.jit import JitDebugInfo
+from pypy.module.pypyjit import interp_guardstats
+from pypy.module.pypyjit.hooks import pypy_hooks
+from pypy.module.pypyjit.interp_guardstats import GuardStatsCache
+from pypy.module.pypyjit.test.test_jit_hook import MockJitDriverSD, MockSD
+
+
+class FakeJitHooks(object):
+    # the real helpers need the JIT, which only exists after translation
+    def __init__(self):
+        self.enabled = False
+        self.counts = {}      # {descr: failures}
+
+    def stats_set_guard_failure_counting(self, ignored, flag):
+        self.enabled = flag
+
+    def stats_reset_guard_failures(self, ignored):
+        self.counts.clear()
+
+    def stats_get_guard_failures(self, ignored):
+        result = lltype.malloc(jit_hooks.GUARD_FAILURES_CONTAINER,
+                               len(self.counts))
+        for i, (descr, counter) in enumerate(self.counts.items()):
+            result[i].number = guard_number(descr)
+            result[i].counter = counter
+            result[i].descr = cast_instance_to_gcref(descr)
+        return result
+
+
+class AppTestGuardStats(object):
+    spaceconfig = dict(usemodules=('pypyjit',))
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("Can't run this test with -A")
+        space = cls.space
+        w_f = space.appexec([], """():
+        def function():
+            pass
+        return function
+        """)
+        cls.w_f = w_f
+        ll_code = cast_instance_to_base_ptr(w_f.code)
+        code_gcref = lltype.cast_opaque_ptr(llmemory.GCREF, ll_code)
+        logger = Logger(MockSD())
+        oplist = parse("""
+        [i1, i2, p2]
+        guard_true(i1) []
+        debug_merge_point(0, 0, 0, 0, 0, ConstPtr(ptr0))
+        guard_class(p2, 12345) []
+        debug_merge_point(0, 0, 0, 7, 0, ConstPtr(ptr0))
+        guard_no_overflow() []
+        """, namespace={'ptr0': code_gcref}).operations
+        guards = [op for op in oplist if op.is_guard()]
+        greenkey = [ConstInt(0), ConstInt(0), ConstPtr(code_gcref)]
+        di_loop = JitDebugInfo(MockJitDriverSD, logger, JitCellToken(),
+                               oplist, 'loop', greenkey)
+        bridge_ops = parse("""
+        [i1]
+        guard_false(i1) []
+        """).operations
+        di_bridge = JitDebugInfo(MockJitDriverSD, logger, JitCellToken(),
+                                 bridge_ops, 'bridge',
+                                 fail_descr=guards[1].getdescr())
+        fake = FakeJitHooks()
+        cls.fake_jit_hooks = fake
+
+        def interp_on_compile():
+            pypy_hooks.after_compile(di_loop)
+
+        def interp_on_compile_bridge():
+            pypy_hooks.after_compile_bridge(di_bridge)
+
+        def interp_fail(i, count):
+            if i < 0:
+                descr = bridge_ops[0].getdescr()
+            else:
+                descr = guards[i].getdescr()
+            if fake.enabled:
+                fake.counts[descr] = fake.counts.get(descr, 0) + count
+
+        def interp_guard_number(i):
+            return space.wrap(guard_number(guards[i].getdescr()))
+
+        cls.w_on_compile = space.wrap(interp2app(interp_on_compile))
+        cls.w_on_compile_bridge = space.wrap(
+            interp2app(interp_on_compile_bridge))
+        cls.w_fail = space.wrap(interp2app(interp_fail,
+                                           unwrap_spec=[int, int]))
+        cls.w_guard_number = space.wrap(interp2app(interp_guard_number,
+                                                   unwrap_spec=[int]))
+
+    def setup_method(self, meth):
+        self.orig_jit_hooks = interp_guardstats.jit_hooks
+        interp_guardstats.jit_hooks = self.fake_jit_hooks
+
+    def teardown_method(self, meth):
+        space = self.space
+        space.call_method(space.getbuiltinmodule('pypyjit'),
+                          'disable_guard_stats')
+        space.call_method(space.getbuiltinmodule('pypyjit'),
+                          'reset_guard_stats')
+        interp_guardstats.jit_hooks = self.orig_jit_hooks
+
+    def test_disabled(self):
+        import pypyjit
+        self.on_compile()
+        self.fail(0, 5)
+        assert pypyjit.get_guard_stats() == []
+
+    def test_get_guard_stats(self):
+        import pypyjit
+        pypyjit.enable_guard_stats()
+        self.on_compile()
+        self.fail(0, 3)
+        self.fail(1, 50)
+        self.fail(2, 7)
+        self.on_compile_bridge()
+        self.fail(-1, 2)
+        stats = pypyjit.get_guard_stats()
+        code = self.f.func_code
+        assert stats == [
+            (50, self.guard_number(1), 'class', (code, 0, False), True),
+            (7, self.guard_number(2), 'overflow', (code, 7, False), False),
+            (3, self.guard_number(0), 'condition', None, False),
+            (2, stats[3][1], 'condition', None, False)]
+        pypyjit.disable_guard_stats()
+        self.fail(1, 1000)
+        assert pypyjit.get_guard_stats()[0][0] == 50
+        pypyjit.reset_guard_stats()
+        assert pypyjit.get_guard_stats() == []
+
+    def test_compiled_before_enabling(self):
+        import pypyjit
+        self.on_compile()
+        pypyjit.enable_guard_stats()
+        self.fail(1, 4)
+        assert pypyjit.get_guard_stats() == [
+            (4, self.guard_number(1), 'unknown', None, False)]
+
+
+def test_guard_info_freed_with_the_guard():
+    import gc
+    class FakeSpace(object):
+        w_None = None
+    cache = GuardStatsCache(FakeSpace())
+    ops = parse("""
+    [i1]
+    guard_true(i1) []
+    """).operations
+    debug_info = JitDebugInfo(MockJitDriverSD, Logger(MockSD()),
+                              JitCellToken(), ops, 'loop', [])
+    cache.record_trace(debug_info)
+    descr = ops[0].getdescr()
+    assert cache.guards.get(descr).kind == 'condition'
+    cache.record_bridge(descr)
+    assert cache.guards.get(descr).has_bridge
+    del ops, debug_info, descr
+    gc.collect()
+    assert cache.guards.length() == 0
@@ -25,6 +25,7 @@ class MockJitDriverSD(object):
                                              boxes[2].getref_base())
             pycode = cast_base_ptr_to_instance(PyCode, ll_code)
             return pycode.co_name
+        compute_location_str = get_location_str
 
     jitdriver = pypyjitdriver
 
@@ -275,3 +276,88 @@ class AppTestJitHook(object):
         assert isinstance(stats.w_counters, dict)
         assert sorted(stats.w_counters.keys()) == self.sorted_keys
 
+
+
+class FakeJitHooks(object):
+    # the real helpers need the JIT, which only exists after translation
+    def __init__(self):
+        self.pending = 3
+
+    def stats_get_memmgr_stats(self, ignored):
+        from rpython.rlib.jit_hooks import MEMMGR_STATS
+        result = lltype.malloc(MEMMGR_STATS)
+        result.code_budget = 1000000
+        result.code_size = 200000
+        result.loops = 12
+        result.evicted_loops = 30
+        result.evicted_code_size = 900000
+        result.retraced_loops = 4
+        return result
+
+    def compile_pending_bridges(self, ignored, max_count):
+        count = self.pending
+        if 0 <= max_count < count:
+            count = max_count
+        self.pending -= count
+        return count
+
+    def get_pending_bridge_count(self, ignored):
+        return self.pending
+
+    def stats_get_jitcounter_stats(self, ignored):
+        from rpython.rlib.jit_hooks import JITCOUNTER_STATS
+        result = lltype.malloc(JITCOUNTER_STATS)
+        result.size = 4096
+        result.fixed_size = False
+        result.new_counters = 5000
+        result.evicted_counters = 1200
+        result.resizes = 1
+        return result
+
+
+class FakeJitHooksMixin(object):
+    spaceconfig = dict(usemodules=('pypyjit',))
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("Can't run this test with -A")
+
+    def setup_method(self, meth):
+        from pypy.module.pypyjit import interp_resop
+        self.orig_jit_hooks = interp_resop.jit_hooks
+        interp_resop.jit_hooks = FakeJitHooks()
+
+    def teardown_method(self, meth):
+        from pypy.module.pypyjit import interp_resop
+        interp_resop.jit_hooks = self.orig_jit_hooks
+
+
+class AppTestLoopEvictionStats(FakeJitHooksMixin):
+
+    def test_get_loop_eviction_stats(self):
+        import pypyjit
+        assert pypyjit.get_loop_eviction_stats() == {
+            'code_budget': 1000000, 'code_size': 200000, 'loops': 12,
+            'evicted_loops': 30, 'evicted_code_size': 900000,
+            'retraced_loops': 4}
+        assert 'loop_code_budget' in pypyjit.defaults
+
+
+class AppTestPendingBridges(FakeJitHooksMixin):
+    def test_compile_pending_bridges(self):
+        import pypyjit
+        assert pypyjit.get_pending_bridge_count() == 3
+        assert pypyjit.compile_pending_bridges(2) == 2
+        assert pypyjit.get_pending_bridge_count() == 1
+        assert pypyjit.compile_pending_bridges() == 1
+        assert pypyjit.compile_pending_bridges() == 0
+        assert pypyjit.defaults['deferred_bridges'] == 0
+
+
+class AppTestJitCounterStats(FakeJitHooksMixin):
+    def test_get_jit_counter_stats(self):
+        import pypyjit
+        assert pypyjit.get_jit_counter_stats() == {
+            'size': 4096, 'fixed_size': False, 'new_counters': 5000,
+            'evicted_counters': 1200, 'resizes': 1}
+        assert pypyjit.defaults['counter_table_size'] == 0
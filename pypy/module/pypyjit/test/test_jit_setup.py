@@ -53,3 +53,51 @@ class AppTestPyPyJIT:
             return (args, kwds)
         res = pypyjit.residual_call(f, 4, x=6)
         assert res == ((4,), {'x': 6})
+
+    def test_code_params(self):
+        import pypyjit
+        def f(x):
+            return x + 1
+        assert pypyjit.get_code_params(f) == {'threshold': 0,
+                                              'trace_limit': 0,
+                                              'inlining': True,
+                                              'never_trace': False}
+        pypyjit.set_code_param(f, threshold=1, inlining=False)
+        pypyjit.set_code_param(f.__code__, trace_limit=500)
+        assert pypyjit.get_code_params(f.__code__) == {'threshold': 1,
+                                                       'trace_limit': 500,
+                                                       'inlining': False,
+                                                       'never_trace': False}
+        pypyjit.set_code_param(f, threshold=0, never_trace=True)
+        params = pypyjit.get_code_params(f)
+        assert params['threshold'] == 0
+        assert params['never_trace'] is True
+        assert f(5) == 6
+        raises(TypeError, pypyjit.set_code_param, f, foo=3)
+        raises(TypeError, pypyjit.set_code_param, f, 3)
+        raises(TypeError, pypyjit.set_code_param, len, threshold=3)
+        raises(ValueError, pypyjit.set_code_param, f, threshold=-1)
+
+
+def test_code_params_hooks(space):
+    from pypy.module.pypyjit import interp_jit
+    w_code = space.appexec([], """():
+        def f():
+            pass
+        return f.__code__
+    """)
+    assert interp_jit.get_threshold(0, False, w_code) == 0
+    assert interp_jit.confirm_enter_jit(0, False, w_code, None, None)
+    params = interp_jit.code_params.getorcreate(w_code)
+    params.threshold = 3
+    params.trace_limit = 100
+    assert interp_jit.get_threshold(0, False, w_code) == 3
+    assert interp_jit.get_trace_limit(0, False, w_code) == 100
+    assert not interp_jit.can_never_inline(0, False, w_code)
+    params.inlining = False
+    assert interp_jit.can_never_inline(0, False, w_code)
+    assert interp_jit.confirm_enter_jit(0, False, w_code, None, None)
+    params.inlining = True
+    params.never_trace = True
+    assert interp_jit.can_never_inline(0, False, w_code)
+    assert not interp_jit.confirm_enter_jit(0, False, w_code, None, None)
@@ -0,0 +1,94 @@
+import py
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.pycode import PyCode
+from rpython.jit.metainterp.history import JitCellToken, ConstInt, ConstPtr
+from rpython.rtyper.annlowlevel import cast_instance_to_base_ptr
+from rpython.rtyper.lltypesystem import lltype, llmemory
+from rpython.rlib.jit import JitDebugInfo
+from pypy.module.pypyjit.hooks import pypy_hooks
+from pypy.module.pypyjit.interp_warmup import WarmupCache
+from pypy.module.pypyjit.test.test_jit_hook import MockJitDriverSD
+
+
+class AppTestWarmup(object):
+    spaceconfig = dict(usemodules=('pypyjit',))
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("Can't run this test with -A")
+        space = cls.space
+
+        @unwrap_spec(next_instr=int)
+        def interp_on_compile(w_code, next_instr):
+            code = space.interp_w(PyCode, w_code)
+            ll_code = cast_instance_to_base_ptr(code)
+            code_gcref = lltype.cast_opaque_ptr(llmemory.GCREF, ll_code)
+            greenkey = [ConstInt(next_instr), ConstInt(0),
+                        ConstPtr(code_gcref)]
+            di_loop = JitDebugInfo(MockJitDriverSD, None, JitCellToken(), [],
+                                   'loop', greenkey)
+            pypy_hooks.after_compile(di_loop)
+
+        def interp_pending():
+            cache = space.fromcache(WarmupCache)
+            return space.wrap(len(cache.pending))
+
+        cls.w_on_compile = space.wrap(interp2app(interp_on_compile))
+        cls.w_pending = space.wrap(interp2app(interp_pending))
+        cls.w_tmpfile = space.wrap(str(py.test.ensuretemp('pypyjit')
+                                       .join('warmup')))
+
+    def setup_method(self, meth):
+        cache = self.space.fromcache(WarmupCache)
+        cache.hot_locations = []
+        cache.seen = {}
+        cache.pending = {}
+        self.space.register_warmup_callback(None)
+
+    def test_get_hot_locations(self):
+        import pypyjit
+        def f():
+            pass
+        assert pypyjit.get_hot_locations() == []
+        self.on_compile(f.func_code, 6)
+        self.on_compile(f.func_code, 6)
+        self.on_compile(f.func_code, 0)
+        code = f.func_code
+        assert pypyjit.get_hot_locations() == [
+            (code.co_filename, code.co_firstlineno, 'f', 6, False),
+            (code.co_filename, code.co_firstlineno, 'f', 0, False)]
+
+    def test_dump_and_load(self):
+        import pypyjit
+        def f():
+            pass
+        code = f.func_code
+        self.on_compile(code, 12)
+        pypyjit.dump_warmup(self.tmpfile)
+        with open(self.tmpfile) as f:
+            data = f.read()
+        assert data == 'pypyjit warmup 1\n12 0 %d f %s\n' % (
+            code.co_firstlineno, code.co_filename)
+        #
+        with open(self.tmpfile, 'a') as f:
+            f.write('garbage\n')
+            f.write('1 0 5 g file with spaces.py\n')
+        pypyjit.load_warmup(self.tmpfile)
+        assert self.pending() == 2
+        #
+        with open(self.tmpfile, 'w') as f:
+            f.write('something else\n')
+        raises(ValueError, pypyjit.load_warmup, self.tmpfile)
+
+    def test_add_warmup_locations(self):
+        import pypyjit
+        pypyjit.add_warmup_locations([('<warmup>', 2, 'g', 0, False),
+                                      ('<warmup>', 2, 'g', 9, False),
+                                      ('<warmup>', 7, 'h', 0, False)])
+        assert self.pending() == 2
+        d = {}
+        exec compile('\ndef g():\n    pass\n', '<warmup>', 'exec') in d
+        assert self.pending() == 1
+        exec compile('def h():\n    pass\n', '<warmup>', 'exec') in d
+        assert self.pending() == 1
+        raises(ValueError, pypyjit.add_warmup_locations, [('<warmup>', 2)])
@@ -61,3 +61,22 @@ class TestGenerators(BaseTestPyPyC):
             i2 = int_sub_ovf(i1, 42)
             guard_no_overflow(descr=...)
             """)
+
+    def test_genexpr_in_for(self):
+        def main(n):
+            def f(lst):
+                total = 0
+                for y in (x * 2 for x in lst if x > 0):  # ID: genexpr
+                    total += y
+                return total
+            return f(range(n))
+
+        log = self.run(main, [3000])
+        assert log.result == 3000 * 2999
+        loop, = log.loops_by_filename(self.filepath)
+        # the generator expression is compiled into the loop itself: no
+        # generator frame is resumed, and nothing is allocated
+        opnames = log.opnames(loop.allops())
+        assert 'new_with_vtable' not in opnames
+        assert 'force_token' not in opnames
+        assert 'call_assembler' not in opnames
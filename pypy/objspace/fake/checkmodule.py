@@ -4,6 +4,7 @@ from pypy.config.pypyoption import get_pypy_config
 
 def checkmodule(*modnames, **kwds):
     translate_startup = kwds.pop('translate_startup', True)
+    extra_func = kwds.pop('extra_func', None)
     assert not kwds
     config = get_pypy_config(translating=True)
     space = FakeObjSpace(config)
@@ -29,5 +30,12 @@ def checkmodule(*modnames, **kwds):
     if not translate_startup:
         func()   # call it now
         func = None
+    if extra_func is not None:
+        # for interp-level code that the module's functions don't reach
+        startup_func = func
+        def func():
+            if startup_func is not None:
+                startup_func()
+            extra_func(space)
     space.translates(func, seeobj_w=seeobj_w,
                      **{'translation.list_comprehension_operations': True})
@@ -0,0 +1,72 @@
+
+""" benchmarks for dicts with int keys and int/float values (counters,
+histograms), which use IntIntDictStrategy/IntFloatDictStrategy
+"""
+
+import gc, random, time
+
+def count_operation(name, function):
+    print name
+    t0 = time.time()
+    retval = function()
+    tk = time.time()
+    print name, " takes: %f" % (tk - t0)
+    return retval
+
+def get_memory():
+    """resident set size in bytes (linux only)"""
+    gc.collect()
+    for line in open('/proc/self/status'):
+        if line.startswith('VmRSS:'):
+            return int(line.split()[1]) * 1024
+    raise IOError("VmRSS not found")
+
+def counter(keys):
+    d = {}
+    for key in keys:
+        d[key] = d.get(key, 0) + 1
+    return d
+
+def inplace_counter(keys):
+    d = dict.fromkeys(set(keys), 0)
+    for key in keys:
+        d[key] += 1
+    return d
+
+def histogram(keys, weights):
+    d = {}
+    for i in xrange(len(keys)):
+        key = keys[i]
+        d[key] = d.get(key, 0.0) + weights[i]
+    return d
+
+def bench_counters(SIZE=1000000, KEYS=100000):
+    keys = [random.randrange(KEYS) for i in xrange(SIZE)]
+    weights = [random.random() for i in xrange(SIZE)]
+
+    count_operation("Counter", lambda : counter(keys))
+    count_operation("Inplace counter", lambda : inplace_counter(keys))
+    count_operation("Float histogram", lambda : histogram(keys, weights))
+
+def bench_memory(KEYS=1000000):
+    dicts = []
+    def build():
+        d = {}
+        for i in xrange(KEYS):
+            d[i] = i * 7
+        dicts.append(d)
+    try:
+        before = get_memory()
+    except IOError:
+        before = None
+    count_operation("Creation", build)
+    if before is not None:
+        print "Memory: %d bytes per item" % (
+            (get_memory() - before) // KEYS)
+    return dicts[0]
+
+if __name__ == '__main__':
+    bench_counters()
+    test_d = bench_memory()
+    import __pypy__
+    print __pypy__.strategy(test_d)
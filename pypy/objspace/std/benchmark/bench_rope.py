@@ -0,0 +1,50 @@
+
+""" benchmarks for building big strings with repeated additions, like
+templating code does.  Without 'withrope' the time grows quadratically with
+the size of the result, with it the growth should be linear: the time per
+item printed below should stay roughly constant when the size doubles.
+"""
+
+import time
+
+def count_operation(name, function):
+    print name
+    t0 = time.time()
+    retval = function()
+    tk = time.time()
+    print name, " takes: %f" % (tk - t0)
+    return retval, tk - t0
+
+def render_rows(SIZE):
+    result = "<table>\n"
+    for i in xrange(SIZE):
+        result = result + "<tr><td>%d</td><td>%s</td></tr>\n" % (i, "x" * (i % 7))
+        if i % 10 == 0:
+            result = result + "".join(["<!-- ", str(i), " -->\n"])
+    result = result + "</table>\n"
+    return result
+
+def append_chunks(SIZE):
+    result = ""
+    chunk = "abcdefghij" * 4
+    for i in xrange(SIZE):
+        result += chunk
+    return result
+
+def bench_growth(function, sizes=(25000, 50000, 100000, 200000)):
+    for size in sizes:
+        result, t = count_operation("%s(%d)" % (function.__name__, size),
+                                    lambda : function(size))
+        # the result is flattened here
+        assert result[-1] == "\n" or result[-1] == "j"
+        print "%d bytes, %f usec per item" % (len(result), t * 1e6 / size)
+
+if __name__ == '__main__':
+    bench_growth(render_rows)
+    bench_growth(append_chunks)
+    try:
+        import __pypy__
+    except ImportError:
+        pass
+    else:
+        print __pypy__.internal_repr(render_rows(1000))
@@ -0,0 +1,83 @@
+
+""" memory and speed benchmarks for lists of record-like dicts with the same
+keys (csv.DictReader rows, json.loads() objects), which share their keys
+when 'withsharedkeysdict' is enabled
+"""
+
+import csv, gc, json, time
+
+def count_operation(name, function):
+    print name
+    t0 = time.time()
+    retval = function()
+    tk = time.time()
+    print name, " takes: %f" % (tk - t0)
+    return retval
+
+def get_memory():
+    """resident set size in bytes (linux only)"""
+    gc.collect()
+    for line in open('/proc/self/status'):
+        if line.startswith('VmRSS:'):
+            return int(line.split()[1]) * 1024
+    raise IOError("VmRSS not found")
+
+FIELDS = ["id", "name", "email", "city", "price", "quantity"]
+
+def csv_lines(SIZE):
+    yield ",".join(FIELDS)
+    for i in xrange(SIZE):
+        yield "%d,name%d,user%d@example.com,city%d,%d.5,%d" % (
+            i, i % 100, i, i % 10, i % 1000, i % 7)
+
+def read_csv(SIZE):
+    return list(csv.DictReader(csv_lines(SIZE)))
+
+def make_rows(SIZE):
+    return [dict(zip(FIELDS, (i, "n", "e", "c", 1.5, i))) for i in xrange(SIZE)]
+
+def load_json(SIZE):
+    text = "[%s]" % ",".join(['{"id": %d, "name": "n", "tags": [], '
+                              '"score": 1.5}' % i for i in xrange(SIZE)])
+    return json.loads(text)
+
+def bench_memory(SIZE=1000000):
+    for name, function in [("zipped rows", make_rows),
+                           ("csv.DictReader rows", read_csv),
+                           ("json objects", load_json)]:
+        try:
+            before = get_memory()
+        except IOError:
+            before = None
+        rows = count_operation("Creation of %d %s" % (SIZE, name),
+                               lambda : function(SIZE))
+        if before is not None:
+            print "Memory: %d bytes per dict" % (
+                (get_memory() - before) // SIZE)
+        del rows
+
+def bench_lookup(SIZE=1000000):
+    rows = make_rows(SIZE)
+
+    def lookup_all():
+        total = 0
+        for row in rows:
+            total += row["id"] + row["quantity"]
+        return total
+
+    def iterate_all():
+        total = 0
+        for row in rows:
+            for key, value in row.iteritems():
+                total += 1
+        return total
+
+    count_operation("Lookup", lookup_all)
+    count_operation("Iteration", iterate_all)
+    return rows[0]
+
+if __name__ == '__main__':
+    bench_memory()
+    test_d = bench_lookup()
+    import __pypy__
+    print __pypy__.strategy(test_d)
@@ -0,0 +1,84 @@
+
+""" benchmarks for small short-lived dicts with string keys (decoded JSON
+objects, keyword configuration), which use SmallBytesDictStrategy and
+SmallUnicodeDictStrategy when 'withsmalldicts' is enabled
+"""
+
+import gc, time
+
+def count_operation(name, function):
+    print name
+    t0 = time.time()
+    retval = function()
+    tk = time.time()
+    print name, " takes: %f" % (tk - t0)
+    return retval
+
+def get_memory():
+    """resident set size in bytes (linux only)"""
+    gc.collect()
+    for line in open('/proc/self/status'):
+        if line.startswith('VmRSS:'):
+            return int(line.split()[1]) * 1024
+    raise IOError("VmRSS not found")
+
+def make_records(SIZE):
+    result = []
+    for i in xrange(SIZE):
+        result.append({"id": i, "name": "x", "price": 1.5, "tags": None,
+                       "active": True})
+    return result
+
+def make_kwargs_records(SIZE):
+    result = []
+    for i in xrange(SIZE):
+        result.append(dict(id=i, name="x", price=1.5))
+    return result
+
+def make_unicode_records(SIZE):
+    result = []
+    for i in xrange(SIZE):
+        result.append({u"id": i, u"name": u"x", u"price": 1.5})
+    return result
+
+def lookup_all(records):
+    total = 0
+    for d in records:
+        total += d["id"]
+        if d.get("missing") is None and "name" in d:
+            total += 1
+    return total
+
+def iterate_all(records):
+    total = 0
+    for d in records:
+        for key, value in d.iteritems():
+            total += len(key)
+        for key in d:
+            total += 1
+    return total
+
+def bench_small_dicts(SIZE=1000000):
+    records = count_operation("Creation", lambda : make_records(SIZE))
+    count_operation("Creation with keywords",
+                    lambda : make_kwargs_records(SIZE))
+    count_operation("Creation with unicode keys",
+                    lambda : make_unicode_records(SIZE))
+    count_operation("Lookup", lambda : lookup_all(records))
+    count_operation("Iteration", lambda : iterate_all(records))
+    return records[0]
+
+def bench_memory(SIZE=1000000):
+    try:
+        before = get_memory()
+    except IOError:
+        return
+    records = make_records(SIZE)
+    print "Memory: %d bytes per dict" % ((get_memory() - before) // SIZE)
+    del records
+
+if __name__ == '__main__':
+    test_d = bench_small_dicts()
+    bench_memory()
+    import __pypy__
+    print __pypy__.strategy(test_d)
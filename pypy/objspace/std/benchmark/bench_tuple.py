@@ -0,0 +1,65 @@
+
+""" memory and hashing benchmarks for homogeneous int/float/str tuples,
+which are stored unboxed when 'withspecialisedtuple' is enabled
+"""
+
+import gc, random, time
+
+def count_operation(name, function):
+    print name
+    t0 = time.time()
+    retval = function()
+    tk = time.time()
+    print name, " takes: %f" % (tk - t0)
+    return retval
+
+def get_memory():
+    """resident set size in bytes (linux only)"""
+    gc.collect()
+    for line in open('/proc/self/status'):
+        if line.startswith('VmRSS:'):
+            return int(line.split()[1]) * 1024
+    raise IOError("VmRSS not found")
+
+def make_rows(SIZE, WIDTH, make_item):
+    return [tuple([make_item(i, j) for j in xrange(WIDTH)])
+            for i in xrange(SIZE)]
+
+def bench_memory(SIZE=1000000, WIDTH=6):
+    for name, make_item in [
+            ("int", lambda i, j: i * WIDTH + j),
+            ("float", lambda i, j: i * 0.5 + j),
+            ]:
+        try:
+            before = get_memory()
+        except IOError:
+            before = None
+        rows = count_operation("Creation of %s rows" % name,
+                               lambda : make_rows(SIZE, WIDTH, make_item))
+        if before is not None:
+            print "Memory: %d bytes per %s row" % (
+                (get_memory() - before) // SIZE, name)
+        del rows
+
+def bench_hashing(SIZE=200000, WIDTH=4):
+    rows = make_rows(SIZE, WIDTH, lambda i, j: random.randrange(SIZE))
+    lookup = random.sample(rows, 1000) * 100
+
+    def hash_all():
+        for row in rows:
+            hash(row)
+
+    def lookup_all(d):
+        for row in lookup:
+            d[row]
+
+    count_operation("Hashing", hash_all)
+    d = count_operation("Dict creation", lambda : dict.fromkeys(rows))
+    count_operation("Dict lookup", lambda : lookup_all(d))
+    return rows[0]
+
+if __name__ == '__main__':
+    bench_memory()
+    row = bench_hashing()
+    import __pypy__
+    print __pypy__.internal_repr(row)
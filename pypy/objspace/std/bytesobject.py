@@ -593,6 +593,10 @@ class W_BytesObject(W_AbstractBytesObject):
             from pypy.objspace.std.strbufobject import W_StringBufferObject
             if isinstance(w_other, W_StringBufferObject):
                 return space.newbool(self._value == w_other.force())
+        if space.config.objspace.std.withrope:
+            from pypy.objspace.std.ropeobject import W_StringRopeObject
+            if isinstance(w_other, W_StringRopeObject):
+                return space.newbool(self._value == w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value == w_other._value)
@@ -602,6 +606,10 @@ class W_BytesObject(W_AbstractBytesObject):
             from pypy.objspace.std.strbufobject import W_StringBufferObject
             if isinstance(w_other, W_StringBufferObject):
                 return space.newbool(self._value != w_other.force())
+        if space.config.objspace.std.withrope:
+            from pypy.objspace.std.ropeobject import W_StringRopeObject
+            if isinstance(w_other, W_StringRopeObject):
+                return space.newbool(self._value != w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value != w_other._value)
@@ -611,6 +619,10 @@ class W_BytesObject(W_AbstractBytesObject):
             from pypy.objspace.std.strbufobject import W_StringBufferObject
             if isinstance(w_other, W_StringBufferObject):
                 return space.newbool(self._value < w_other.force())
+        if space.config.objspace.std.withrope:
+            from pypy.objspace.std.ropeobject import W_StringRopeObject
+            if isinstance(w_other, W_StringRopeObject):
+                return space.newbool(self._value < w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value < w_other._value)
@@ -620,6 +632,10 @@ class W_BytesObject(W_AbstractBytesObject):
             from pypy.objspace.std.strbufobject import W_StringBufferObject
             if isinstance(w_other, W_StringBufferObject):
                 return space.newbool(self._value <= w_other.force())
+        if space.config.objspace.std.withrope:
+            from pypy.objspace.std.ropeobject import W_StringRopeObject
+            if isinstance(w_other, W_StringRopeObject):
+                return space.newbool(self._value <= w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value <= w_other._value)
@@ -629,6 +645,10 @@ class W_BytesObject(W_AbstractBytesObject):
             from pypy.objspace.std.strbufobject import W_StringBufferObject
             if isinstance(w_other, W_StringBufferObject):
                 return space.newbool(self._value > w_other.force())
+        if space.config.objspace.std.withrope:
+            from pypy.objspace.std.ropeobject import W_StringRopeObject
+            if isinstance(w_other, W_StringRopeObject):
+                return space.newbool(self._value > w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value > w_other._value)
@@ -638,6 +658,10 @@ class W_BytesObject(W_AbstractBytesObject):
             from pypy.objspace.std.strbufobject import W_StringBufferObject
             if isinstance(w_other, W_StringBufferObject):
                 return space.newbool(self._value >= w_other.force())
+        if space.config.objspace.std.withrope:
+            from pypy.objspace.std.ropeobject import W_StringRopeObject
+            if isinstance(w_other, W_StringRopeObject):
+                return space.newbool(self._value >= w_other.force())
         if not isinstance(w_other, W_BytesObject):
             return space.w_NotImplemented
         return space.newbool(self._value >= w_other._value)
@@ -667,6 +691,11 @@ class W_BytesObject(W_AbstractBytesObject):
             builder.append(self._value)
             builder.append(other)
             return W_StringBufferObject(builder)
+        if space.config.objspace.std.withrope:
+            from pypy.objspace.std.ropeobject import add_lazily
+            w_result = add_lazily(space, self, w_other)
+            if w_result is not None:
+                return w_result
         return self._StringMethods_descr_add(space, w_other)
 
     _StringMethods__startswith = _startswith
@@ -12,6 +12,8 @@ from pypy.interpreter.gateway import (
 from pypy.interpreter.mixedmodule import MixedModule
 from pypy.interpreter.signature import Signature
 from pypy.interpreter.typedef import TypeDef
+from pypy.objspace.std.floatobject import W_FloatObject
+from pypy.objspace.std.intobject import W_IntObject
 from pypy.objspace.std.util import negate
 
 
@@ -537,7 +539,7 @@ class EmptyDictStrategy(DictStrategy):
     def get_empty_storage(self):
         return self.erase(None)
 
-    def switch_to_correct_strategy(self, w_dict, w_key):
+    def switch_to_correct_strategy(self, w_dict, w_key, w_value=None):
         withidentitydict = self.space.config.objspace.std.withidentitydict
         if type(w_key) is self.space.StringObjectCls:
             self.switch_to_bytes_strategy(w_dict)
@@ -547,20 +549,41 @@ class EmptyDictStrategy(DictStrategy):
             return
         w_type = self.space.type(w_key)
         if self.space.is_w(w_type, self.space.w_int):
-            self.switch_to_int_strategy(w_dict)
+            if type(w_value) is W_IntObject:
+                self.switch_to_int_int_strategy(w_dict)
+            elif type(w_value) is W_FloatObject:
+                self.switch_to_int_float_strategy(w_dict)
+            else:
+                self.switch_to_int_strategy(w_dict)
         elif withidentitydict and w_type.compares_by_identity():
             self.switch_to_identity_strategy(w_dict)
         else:
             self.switch_to_object_strategy(w_dict)
 
     def switch_to_bytes_strategy(self, w_dict):
-        strategy = self.space.fromcache(BytesDictStrategy)
+        if self.space.config.objspace.std.withsharedkeysdict:
+            from pypy.objspace.std.sharedkeysdict import (
+                BytesSharedKeysDictStrategy)
+            strategy = self.space.fromcache(BytesSharedKeysDictStrategy)
+        elif self.space.config.objspace.std.withsmalldicts:
+            from pypy.objspace.std.smalldict import SmallBytesDictStrategy
+            strategy = self.space.fromcache(SmallBytesDictStrategy)
+        else:
+            strategy = self.space.fromcache(BytesDictStrategy)
         storage = strategy.get_empty_storage()
         w_dict.strategy = strategy
         w_dict.dstorage = storage
 
     def switch_to_unicode_strategy(self, w_dict):
-        strategy = self.space.fromcache(UnicodeDictStrategy)
+        if self.space.config.objspace.std.withsharedkeysdict:
+            from pypy.objspace.std.sharedkeysdict import (
+                UnicodeSharedKeysDictStrategy)
+            strategy = self.space.fromcache(UnicodeSharedKeysDictStrategy)
+        elif self.space.config.objspace.std.withsmalldicts:
+            from pypy.objspace.std.smalldict import SmallUnicodeDictStrategy
+            strategy = self.space.fromcache(SmallUnicodeDictStrategy)
+        else:
+            strategy = self.space.fromcache(UnicodeDictStrategy)
         storage = strategy.get_empty_storage()
         w_dict.strategy = strategy
         w_dict.dstorage = storage
@@ -571,6 +594,18 @@ class EmptyDictStrategy(DictStrategy):
         w_dict.strategy = strategy
         w_dict.dstorage = storage
 
+    def switch_to_int_int_strategy(self, w_dict):
+        strategy = self.space.fromcache(IntIntDictStrategy)
+        storage = strategy.get_empty_storage()
+        w_dict.strategy = strategy
+        w_dict.dstorage = storage
+
+    def switch_to_int_float_strategy(self, w_dict):
+        strategy = self.space.fromcache(IntFloatDictStrategy)
+        storage = strategy.get_empty_storage()
+        w_dict.strategy = strategy
+        w_dict.dstorage = storage
+
     def switch_to_identity_strategy(self, w_dict):
         from pypy.objspace.std.identitydict import IdentityDictStrategy
         strategy = self.space.fromcache(IdentityDictStrategy)
@@ -597,12 +632,12 @@ class EmptyDictStrategy(DictStrategy):
 
     def setdefault(self, w_dict, w_key, w_default):
         # here the dict is always empty
-        self.switch_to_correct_strategy(w_dict, w_key)
+        self.switch_to_correct_strategy(w_dict, w_key, w_default)
         w_dict.setitem(w_key, w_default)
         return w_default
 
     def setitem(self, w_dict, w_key, w_value):
-        self.switch_to_correct_strategy(w_dict, w_key)
+        self.switch_to_correct_strategy(w_dict, w_key, w_value)
         w_dict.setitem(w_key, w_value)
 
     def setitem_str(self, w_dict, key, w_value):
@@ -1179,6 +1214,178 @@ class IntDictStrategy(AbstractTypedStrategy, DictStrategy):
 create_iterator_classes(IntDictStrategy)
 
 
+class AbstractUnboxedValueStrategy(object):
+    """Mixin for strategies that store the values unwrapped too.  As soon
+    as a value of another type is stored, the dict switches to the
+    strategy returned by get_boxed_values_strategy(), which keeps the
+    same keys but stores wrapped values."""
+    _mixin_ = True
+
+    def wrap_value(self, unwrapped):
+        raise NotImplementedError("abstract base class")
+
+    def unwrap_value(self, wrapped):
+        raise NotImplementedError("abstract base class")
+
+    def is_correct_value_type(self, w_obj):
+        raise NotImplementedError("abstract base class")
+
+    def get_boxed_values_strategy(self):
+        raise NotImplementedError("abstract base class")
+
+    def setitem(self, w_dict, w_key, w_value):
+        if self.is_correct_type(w_key):
+            if self.is_correct_value_type(w_value):
+                d = self.unerase(w_dict.dstorage)
+                d[self.unwrap(w_key)] = self.unwrap_value(w_value)
+                return
+            self.switch_to_boxed_values_strategy(w_dict)
+        else:
+            self.switch_to_object_strategy(w_dict)
+        w_dict.setitem(w_key, w_value)
+
+    def setdefault(self, w_dict, w_key, w_default):
+        if self.is_correct_type(w_key):
+            d = self.unerase(w_dict.dstorage)
+            key = self.unwrap(w_key)
+            if key in d:
+                return self.wrap_value(d[key])
+            if self.is_correct_value_type(w_default):
+                d[key] = self.unwrap_value(w_default)
+                return w_default
+            self.switch_to_boxed_values_strategy(w_dict)
+        else:
+            self.switch_to_object_strategy(w_dict)
+        return w_dict.setdefault(w_key, w_default)
+
+    def getitem(self, w_dict, w_key):
+        space = self.space
+        if self.is_correct_type(w_key):
+            d = self.unerase(w_dict.dstorage)
+            try:
+                return self.wrap_value(d[self.unwrap(w_key)])
+            except KeyError:
+                return None
+        elif self._never_equal_to(space.type(w_key)):
+            return None
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.getitem(w_key)
+
+    def values(self, w_dict):
+        return [self.wrap_value(value)
+                for value in self.unerase(w_dict.dstorage).itervalues()]
+
+    def items(self, w_dict):
+        space = self.space
+        d = self.unerase(w_dict.dstorage)
+        return [space.newtuple([self.wrap(key), self.wrap_value(value)])
+                for (key, value) in d.iteritems()]
+
+    def popitem(self, w_dict):
+        key, value = self.unerase(w_dict.dstorage).popitem()
+        return (self.wrap(key), self.wrap_value(value))
+
+    def switch_to_boxed_values_strategy(self, w_dict):
+        d = self.unerase(w_dict.dstorage)
+        strategy = self.get_boxed_values_strategy()
+        d_new = strategy.unerase(strategy.get_empty_storage())
+        for key, value in d.iteritems():
+            d_new[key] = self.wrap_value(value)
+        w_dict.strategy = strategy
+        w_dict.dstorage = strategy.erase(d_new)
+
+    def switch_to_object_strategy(self, w_dict):
+        d = self.unerase(w_dict.dstorage)
+        strategy = self.space.fromcache(ObjectDictStrategy)
+        d_new = strategy.unerase(strategy.get_empty_storage())
+        for key, value in d.iteritems():
+            d_new[self.wrap(key)] = self.wrap_value(value)
+        w_dict.strategy = strategy
+        w_dict.dstorage = strategy.erase(d_new)
+
+
+class AbstractIntKeysUnboxedValueStrategy(AbstractUnboxedValueStrategy):
+    _mixin_ = True
+
+    def wrap(self, unwrapped):
+        return self.space.wrap(unwrapped)
+
+    def unwrap(self, wrapped):
+        return self.space.int_w(wrapped)
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def is_correct_type(self, w_obj):
+        space = self.space
+        return space.is_w(space.type(w_obj), space.w_int)
+
+    def _never_equal_to(self, w_lookup_type):
+        space = self.space
+        return (space.is_w(w_lookup_type, space.w_NoneType) or
+                space.is_w(w_lookup_type, space.w_str) or
+                space.is_w(w_lookup_type, space.w_unicode)
+                )
+
+    def get_boxed_values_strategy(self):
+        return self.space.fromcache(IntDictStrategy)
+
+    def listview_int(self, w_dict):
+        return self.unerase(w_dict.dstorage).keys()
+
+    def wrapkey(space, key):
+        return space.wrap(key)
+
+    def w_keys(self, w_dict):
+        return self.space.newlist_int(self.listview_int(w_dict))
+
+
+class IntIntDictStrategy(AbstractIntKeysUnboxedValueStrategy,
+                         AbstractTypedStrategy, DictStrategy):
+    """int keys and int values, both unboxed: used for counters and
+    histograms"""
+    erase, unerase = rerased.new_erasing_pair("intint")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap_value(self, unwrapped):
+        return self.space.wrap(unwrapped)
+
+    def unwrap_value(self, wrapped):
+        return self.space.int_w(wrapped)
+
+    def is_correct_value_type(self, w_obj):
+        return type(w_obj) is W_IntObject
+
+    def wrapvalue(space, value):
+        return space.wrap(value)
+
+create_iterator_classes(IntIntDictStrategy)
+
+
+class IntFloatDictStrategy(AbstractIntKeysUnboxedValueStrategy,
+                           AbstractTypedStrategy, DictStrategy):
+    """int keys and float values, both unboxed"""
+    erase, unerase = rerased.new_erasing_pair("intfloat")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap_value(self, unwrapped):
+        return self.space.wrap(unwrapped)
+
+    def unwrap_value(self, wrapped):
+        return self.space.float_w(wrapped)
+
+    def is_correct_value_type(self, w_obj):
+        return type(w_obj) is W_FloatObject
+
+    def wrapvalue(space, value):
+        return space.wrap(value)
+
+create_iterator_classes(IntFloatDictStrategy)
+
+
 def update1(space, w_dict, w_data):
     if isinstance(w_data, W_DictMultiObject):    # optimization case only
         update1_dict_dict(space, w_dict, w_data)
@@ -12,6 +12,7 @@ import sys
 
 from rpython.rlib import debug, jit, rerased
 from rpython.rlib.listsort import make_timsort_class
+from rpython.rlib.longlong2float import float2longlong
 from rpython.rlib.objectmodel import (
     import_from_mixin, instantiate, newlist_hint, resizelist_hint, specialize)
 from rpython.tool.sourcetools import func_with_new_name
@@ -101,6 +102,17 @@ def get_strategy_from_list_objects(space, list_w, sizehint):
     else:
         return space.fromcache(FloatListStrategy)
 
+    # check for tuples of the same shape
+    if space.config.objspace.std.withrecordlist:
+        shape = get_record_shape(space, list_w[0])
+        if shape is not None:
+            strategy = get_record_strategy(space, shape)
+            for w_obj in list_w:
+                if not strategy.is_correct_type(w_obj):
+                    break
+            else:
+                return strategy
+
     return space.fromcache(ObjectListStrategy)
 
 
@@ -650,6 +662,12 @@ class W_ListObject(W_Root):
         has_cmp = not space.is_none(w_cmp)
         has_key = not space.is_none(w_key)
 
+        if has_key and not has_cmp:
+            strategy = self.strategy
+            if (isinstance(strategy, RecordListStrategy) and
+                    strategy.sort_with_key(self, w_key, reverse)):
+                return
+
         # create and setup a TimSort instance
         if has_cmp:
             if has_key:
@@ -911,7 +929,13 @@ class EmptyListStrategy(ListStrategy):
         elif type(w_item) is W_FloatObject:
             strategy = self.space.fromcache(FloatListStrategy)
         else:
-            strategy = self.space.fromcache(ObjectListStrategy)
+            shape = None
+            if self.space.config.objspace.std.withrecordlist:
+                shape = get_record_shape(self.space, w_item)
+            if shape is not None:
+                strategy = get_record_strategy(self.space, shape)
+            else:
+                strategy = self.space.fromcache(ObjectListStrategy)
 
         storage = strategy.get_empty_storage(self.get_sizehint())
         w_list.strategy = strategy
@@ -1300,6 +1324,11 @@ class AbstractUnwrappedStrategy(object):
             return self.erase([])
         return self.erase(newlist_hint(sizehint))
 
+    def get_cow_strategy(self):
+        """Return the strategy of the lists that share their items with a
+        list of this strategy, or None if slices are always copied."""
+        return None
+
     def clone(self, w_list):
         l = self.unerase(w_list.lstorage)
         storage = self.erase(l[:])
@@ -1311,6 +1340,13 @@ class AbstractUnwrappedStrategy(object):
         resizelist_hint(self.unerase(w_list.lstorage), hint)
 
     def copy_into(self, w_list, w_other):
+        cow = self.get_cow_strategy()
+        if cow is not None:
+            length = self.length(w_list)
+            if length >= COW_MIN_LENGTH:
+                w_other.lstorage = cow.share_items(w_list, 0, length)
+                w_other.strategy = cow
+                return
         w_other.strategy = self
         items = self.unerase(w_list.lstorage)[:]
         w_other.lstorage = self.erase(items)
@@ -1322,6 +1358,9 @@ class AbstractUnwrappedStrategy(object):
 
     def _safe_find(self, w_list, obj, start, stop):
         l = self.unerase(w_list.lstorage)
+        return self._safe_find_items(l, obj, start, stop)
+
+    def _safe_find_items(self, l, obj, start, stop):
         for i in range(start, min(stop, len(l))):
             val = l[i]
             if val == obj:
@@ -1361,6 +1400,12 @@ class AbstractUnwrappedStrategy(object):
 
     def getslice(self, w_list, start, stop, step, length):
         if step == 1 and 0 <= start <= stop:
+            cow = self.get_cow_strategy()
+            if cow is not None and _share_slice(length,
+                                                self.length(w_list)):
+                storage = cow.share_items(w_list, start, stop)
+                return W_ListObject.from_storage_and_strategy(
+                        self.space, storage, cow)
             l = self.unerase(w_list.lstorage)
             assert start >= 0
             assert stop >= 0
@@ -1406,6 +1451,10 @@ class AbstractUnwrappedStrategy(object):
             return
         elif w_other.strategy.is_empty_strategy():
             return
+        cow = self.get_cow_strategy()
+        if cow is not None and w_other.strategy is cow:
+            l += cow.unshared_items(w_other)
+            return
 
         w_other = w_other._temporarily_as_objects()
         w_list.switch_to_object_strategy()
@@ -1426,6 +1475,13 @@ class AbstractUnwrappedStrategy(object):
     def setslice(self, w_list, start, step, slicelength, w_other):
         assert slicelength >= 0
 
+        cow = self.get_cow_strategy()
+        if cow is not None and w_other.strategy is cow:
+            # w_other may share its items with w_list
+            storage = self.erase(cow.unshared_items(w_other))
+            w_other = W_ListObject.from_storage_and_strategy(
+                    self.space, storage, self)
+
         if self is self.space.fromcache(ObjectListStrategy):
             w_other = w_other._temporarily_as_objects()
         elif not self.list_is_correct_type(w_other) and w_other.length() != 0:
@@ -1607,6 +1663,11 @@ class IntegerListStrategy(ListStrategy):
     def list_is_correct_type(self, w_list):
         return w_list.strategy is self.space.fromcache(IntegerListStrategy)
 
+    def get_cow_strategy(self):
+        if self.space.config.objspace.std.withcowslices:
+            return self.space.fromcache(IntegerCOWListStrategy)
+        return None
+
     def sort(self, w_list, reverse):
         l = self.unerase(w_list.lstorage)
         sorter = IntSort(l, len(l))
@@ -1660,6 +1721,11 @@ class FloatListStrategy(ListStrategy):
     def list_is_correct_type(self, w_list):
         return w_list.strategy is self.space.fromcache(FloatListStrategy)
 
+    def get_cow_strategy(self):
+        if self.space.config.objspace.std.withcowslices:
+            return self.space.fromcache(FloatCOWListStrategy)
+        return None
+
     def sort(self, w_list, reverse):
         l = self.unerase(w_list.lstorage)
         sorter = FloatSort(l, len(l))
@@ -1670,11 +1736,10 @@ class FloatListStrategy(ListStrategy):
     def getitems_float(self, w_list):
         return self.unerase(w_list.lstorage)
 
-    def _safe_find(self, w_list, obj, start, stop):
+    def _safe_find_items(self, l, obj, start, stop):
         from rpython.rlib.rfloat import isnan
         from rpython.rlib.longlong2float import float2longlong
         #
-        l = self.unerase(w_list.lstorage)
         stop = min(stop, len(l))
         if not isnan(obj):
             for i in range(start, stop):
@@ -1711,6 +1776,11 @@ class BytesListStrategy(ListStrategy):
     def list_is_correct_type(self, w_list):
         return w_list.strategy is self.space.fromcache(BytesListStrategy)
 
+    def get_cow_strategy(self):
+        if self.space.config.objspace.std.withcowslices:
+            return self.space.fromcache(BytesCOWListStrategy)
+        return None
+
     def sort(self, w_list, reverse):
         l = self.unerase(w_list.lstorage)
         sorter = StringSort(l, len(l))
@@ -1743,6 +1813,11 @@ class UnicodeListStrategy(ListStrategy):
     def list_is_correct_type(self, w_list):
         return w_list.strategy is self.space.fromcache(UnicodeListStrategy)
 
+    def get_cow_strategy(self):
+        if self.space.config.objspace.std.withcowslices:
+            return self.space.fromcache(UnicodeCOWListStrategy)
+        return None
+
     def sort(self, w_list, reverse):
         l = self.unerase(w_list.lstorage)
         sorter = UnicodeSort(l, len(l))
@@ -1753,6 +1828,780 @@ class UnicodeListStrategy(ListStrategy):
     def getitems_unicode(self, w_list):
         return self.unerase(w_list.lstorage)
 
+
+# copy-on-write slices
+
+# slices shorter than this are always copied
+COW_MIN_LENGTH = 16
+
+
+def _share_slice(length, total):
+    # Only share the items with slices that are not much smaller than the
+    # list: otherwise, the next write to the list copies all of it for the
+    # sake of a small slice, and the slice keeps all the items alive.
+    return length >= COW_MIN_LENGTH and length * 2 >= total
+
+
+class COWStats(object):
+    """Counters for __pypy__.list_cow_counters()."""
+
+    def __init__(self, space):
+        self.reset()
+
+    def reset(self):
+        self.shared = 0     # lists created sharing the items of another one
+        self.copied = 0     # shared lists that had to copy their items
+
+
+class SharedItems(object):
+    """The unwrapped items of a list, shared by several lists.  'nviews' is
+    the number of lists that may still be using them: it is only decremented
+    when a list stops using them, so it can be too large, but never too
+    small."""
+
+    def __init__(self, storage, nviews):
+        self.storage = storage      # erased with the base strategy
+        self.nviews = nviews
+
+
+class ListView(object):
+    _immutable_fields_ = ['shared', 'start', 'stop']
+
+    def __init__(self, shared, start, stop):
+        self.shared = shared
+        self.start = start
+        self.stop = stop
+
+
+class AbstractCOWStrategy(object):
+    """Strategy for lists that share their unwrapped items with other lists,
+    e.g. slices of a list using the strategy '_base_strategy_cls'.  The
+    storage is a ListView on the shared items.  The lists are read-only:
+    before being modified, a list copies its part of the items and switches
+    back to the base strategy."""
+
+    _base_strategy_cls = None
+
+    @staticmethod
+    def unerase(storage):
+        raise NotImplementedError("abstract base class")
+
+    @staticmethod
+    def erase(obj):
+        raise NotImplementedError("abstract base class")
+
+    def base_strategy(self):
+        return self.space.fromcache(self._base_strategy_cls)
+
+    def _items(self, view):
+        return self.base_strategy().unerase(view.shared.storage)
+
+    def _new_view(self, shared, start, stop):
+        self.space.fromcache(COWStats).shared += 1
+        return self.erase(ListView(shared, start, stop))
+
+    def share_items(self, w_list, start, stop):
+        """Make w_list, which uses the base strategy, share its items.
+        Return the storage of a new list sharing the items [start:stop]."""
+        base = self.base_strategy()
+        assert w_list.strategy is base
+        shared = SharedItems(w_list.lstorage, 2)
+        length = base.length(w_list)
+        w_list.strategy = self
+        w_list.lstorage = self.erase(ListView(shared, 0, length))
+        return self._new_view(shared, start, stop)
+
+    def _share_again(self, w_list):
+        view = self.unerase(w_list.lstorage)
+        view.shared.nviews += 1
+        return self._new_view(view.shared, view.start, view.stop)
+
+    def unshared_items(self, w_list):
+        """Return a copy of the unwrapped items of w_list."""
+        view = self.unerase(w_list.lstorage)
+        start = view.start
+        stop = view.stop
+        assert start >= 0
+        assert stop >= 0
+        return self._items(view)[start:stop]
+
+    def switch_to_base_strategy(self, w_list):
+        view = self.unerase(w_list.lstorage)
+        shared = view.shared
+        shared.nviews -= 1
+        items = self._items(view)
+        if not (shared.nviews == 0 and view.start == 0 and
+                view.stop == len(items)):
+            items = self.unshared_items(w_list)
+            self.space.fromcache(COWStats).copied += 1
+        # else: no other list uses the items any more, take them over
+        base = self.base_strategy()
+        w_list.strategy = base
+        w_list.lstorage = base.erase(items)
+
+    def init_from_list_w(self, w_list, list_w):
+        raise NotImplementedError
+
+    def clone(self, w_list):
+        return W_ListObject.from_storage_and_strategy(
+                self.space, self._share_again(w_list), self)
+
+    def copy_into(self, w_list, w_other):
+        w_other.strategy = self
+        w_other.lstorage = self._share_again(w_list)
+
+    def getstorage_copy(self, w_list):
+        return self._share_again(w_list)
+
+    def _resize_hint(self, w_list, hint):
+        assert hint >= 0
+
+    def find(self, w_list, w_obj, start, stop):
+        base = self.base_strategy()
+        if base.is_correct_type(w_obj):
+            view = self.unerase(w_list.lstorage)
+            stop = min(stop, view.stop - view.start)
+            i = base._safe_find_items(self._items(view), base.unwrap(w_obj),
+                                      view.start + start, view.start + stop)
+            return i - view.start
+        return ListStrategy.find(self, w_list, w_obj, start, stop)
+
+    def length(self, w_list):
+        view = self.unerase(w_list.lstorage)
+        return view.stop - view.start
+
+    def getitem(self, w_list, index):
+        view = self.unerase(w_list.lstorage)
+        length = view.stop - view.start
+        if index < 0:
+            index += length
+            if index < 0:
+                raise IndexError
+        elif index >= length:
+            raise IndexError
+        return self.base_strategy().wrap(self._items(view)[view.start + index])
+
+    @jit.look_inside_iff(lambda self, w_list:
+            jit.loop_unrolling_heuristic(w_list, w_list.length(),
+                                         UNROLL_CUTOFF))
+    def getitems_copy(self, w_list):
+        view = self.unerase(w_list.lstorage)
+        items = self._items(view)
+        base = self.base_strategy()
+        return [base.wrap(items[i]) for i in range(view.start, view.stop)]
+
+    @jit.unroll_safe
+    def getitems_unroll(self, w_list):
+        view = self.unerase(w_list.lstorage)
+        items = self._items(view)
+        base = self.base_strategy()
+        return [base.wrap(items[i]) for i in range(view.start, view.stop)]
+
+    @jit.look_inside_iff(lambda self, w_list:
+            jit.loop_unrolling_heuristic(w_list, w_list.length(),
+                                         UNROLL_CUTOFF))
+    def getitems_fixedsize(self, w_list):
+        return self.getitems_unroll(w_list)
+
+    def getslice(self, w_list, start, stop, step, length):
+        view = self.unerase(w_list.lstorage)
+        items = self._items(view)
+        if (step == 1 and 0 <= start <= stop and
+                _share_slice(length, len(items))):
+            view.shared.nviews += 1
+            storage = self._new_view(view.shared, view.start + start,
+                                     view.start + stop)
+            return W_ListObject.from_storage_and_strategy(
+                    self.space, storage, self)
+        sublist = newlist_hint(length)
+        start += view.start
+        for i in range(length):
+            sublist.append(items[start])
+            start += step
+        base = self.base_strategy()
+        return W_ListObject.from_storage_and_strategy(
+                self.space, base.erase(sublist), base)
+
+    def mul(self, w_list, times):
+        base = self.base_strategy()
+        storage = base.erase(self.unshared_items(w_list) * times)
+        return W_ListObject.from_storage_and_strategy(
+                self.space, storage, base)
+
+    def append(self, w_list, w_item):
+        self.switch_to_base_strategy(w_list)
+        w_list.append(w_item)
+
+    def inplace_mul(self, w_list, times):
+        self.switch_to_base_strategy(w_list)
+        w_list.inplace_mul(times)
+
+    def deleteslice(self, w_list, start, step, slicelength):
+        self.switch_to_base_strategy(w_list)
+        w_list.deleteslice(start, step, slicelength)
+
+    def pop(self, w_list, index):
+        self.switch_to_base_strategy(w_list)
+        return w_list.pop(index)
+
+    def setitem(self, w_list, index, w_item):
+        self.switch_to_base_strategy(w_list)
+        w_list.setitem(index, w_item)
+
+    def setslice(self, w_list, start, step, slicelength, sequence_w):
+        self.switch_to_base_strategy(w_list)
+        w_list.setslice(start, step, slicelength, sequence_w)
+
+    def insert(self, w_list, index, w_item):
+        self.switch_to_base_strategy(w_list)
+        w_list.insert(index, w_item)
+
+    def extend(self, w_list, w_any):
+        self.switch_to_base_strategy(w_list)
+        w_list.extend(w_any)
+
+    def reverse(self, w_list):
+        self.switch_to_base_strategy(w_list)
+        w_list.reverse()
+
+    def sort(self, w_list, reverse):
+        self.switch_to_base_strategy(w_list)
+        w_list.sort(reverse)
+
+
+class IntegerCOWListStrategy(ListStrategy):
+    import_from_mixin(AbstractCOWStrategy)
+
+    _base_strategy_cls = IntegerListStrategy
+
+    erase, unerase = rerased.new_erasing_pair("integer_cow")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def getitems_int(self, w_list):
+        self.switch_to_base_strategy(w_list)
+        return w_list.getitems_int()
+
+
+class FloatCOWListStrategy(ListStrategy):
+    import_from_mixin(AbstractCOWStrategy)
+
+    _base_strategy_cls = FloatListStrategy
+
+    erase, unerase = rerased.new_erasing_pair("float_cow")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def getitems_float(self, w_list):
+        self.switch_to_base_strategy(w_list)
+        return w_list.getitems_float()
+
+
+class BytesCOWListStrategy(ListStrategy):
+    import_from_mixin(AbstractCOWStrategy)
+
+    _base_strategy_cls = BytesListStrategy
+
+    erase, unerase = rerased.new_erasing_pair("bytes_cow")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def getitems_bytes(self, w_list):
+        self.switch_to_base_strategy(w_list)
+        return w_list.getitems_bytes()
+
+
+class UnicodeCOWListStrategy(ListStrategy):
+    import_from_mixin(AbstractCOWStrategy)
+
+    _base_strategy_cls = UnicodeListStrategy
+
+    erase, unerase = rerased.new_erasing_pair("unicode_cow")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def getitems_unicode(self, w_list):
+        self.switch_to_base_strategy(w_list)
+        return w_list.getitems_unicode()
+
+
+# lists of same-shaped tuples ("records")
+
+RECORD_MAX_WIDTH = 8
+
+
+def _record_kind(w_obj):
+    if type(w_obj) is W_IntObject:
+        return 'i'
+    elif type(w_obj) is W_FloatObject:
+        return 'f'
+    elif type(w_obj) is W_BytesObject:
+        return 's'
+    return '\x00'
+
+
+@jit.unroll_safe
+def get_record_shape(space, w_obj):
+    """Return the shape of w_obj if it is a tuple that RecordListStrategy can
+    store, as a string with one type code per item ('i' for int, 'f' for float
+    and 's' for str).  Return None otherwise."""
+    if (not isinstance(w_obj, W_AbstractTupleObject) or
+            w_obj.user_overridden_class):
+        return None
+    length = w_obj.length()
+    if not 2 <= length <= RECORD_MAX_WIDTH:
+        return None
+    kinds = ['\x00'] * length
+    for i in range(length):
+        kind = _record_kind(w_obj.getitem(space, i))
+        if kind == '\x00':
+            return None
+        kinds[i] = kind
+    return ''.join(kinds)
+
+
+def get_record_strategy(space, shape):
+    return space.fromcache(RecordListStrategyCache).get(shape)
+
+
+class RecordListStrategyCache(object):
+    def __init__(self, space):
+        self.space = space
+        self.strategies = {}
+
+    @jit.elidable
+    def get(self, shape):
+        try:
+            return self.strategies[shape]
+        except KeyError:
+            strategy = RecordListStrategy(self.space, shape)
+            self.strategies[shape] = strategy
+            return strategy
+
+
+class RecordColumns(object):
+    """The storage of RecordListStrategy: one unboxed list per tuple position,
+    grouped by the type of the items."""
+
+    def __init__(self, ints, floats, strs):
+        self.ints = ints
+        self.floats = floats
+        self.strs = strs
+
+
+@specialize.arg(1)
+def _map_columns(cols, func, *args):
+    return RecordColumns([func(column, *args) for column in cols.ints],
+                         [func(column, *args) for column in cols.floats],
+                         [func(column, *args) for column in cols.strs])
+
+@specialize.arg(1)
+def _each_column(cols, func, *args):
+    for column in cols.ints:
+        func(column, *args)
+    for column in cols.floats:
+        func(column, *args)
+    for column in cols.strs:
+        func(column, *args)
+
+@specialize.argtype(0)
+def _column_copy(column):
+    return column[:]
+
+@specialize.argtype(0)
+def _column_slice(column, start, stop):
+    assert start >= 0
+    assert stop >= 0
+    return column[start:stop]
+
+@specialize.argtype(0)
+def _column_extslice(column, start, step, length):
+    result = newlist_hint(length)
+    for i in range(length):
+        result.append(column[start])
+        start += step
+    return result
+
+@specialize.argtype(0)
+def _column_permute(column, order):
+    return [column[i] for i in order]
+
+@specialize.argtype(0)
+def _column_resize_hint(column, hint):
+    resizelist_hint(column, hint)
+
+@specialize.argtype(0)
+def _column_delitem(column, index):
+    del column[index]
+
+@specialize.argtype(0)
+def _column_delslice(column, start, stop):
+    assert start >= 0
+    assert stop >= 0
+    del column[start:stop]
+
+@specialize.argtype(0)
+def _column_inplace_mul(column, times):
+    column *= times
+
+@specialize.argtype(0)
+def _column_reverse(column):
+    column.reverse()
+
+@specialize.argtype(0)
+def _extend_columns(columns, other_columns):
+    for i in range(len(columns)):
+        columns[i] += other_columns[i]
+
+@specialize.argtype(0)
+def _splice_columns(columns, start, stop, other_columns):
+    assert start >= 0
+    assert stop >= 0
+    return [columns[i][:start] + other_columns[i] + columns[i][stop:]
+            for i in range(len(columns))]
+
+def _float_eq(x, y):
+    # like space.eq_w(), which considers identical NaNs as equal
+    return x == y or float2longlong(x) == float2longlong(y)
+
+
+class RecordListStrategy(ListStrategy):
+    """RecordListStrategy is used for lists of tuples that all have the same
+    shape, with items that are ints, floats or strings (e.g. rows read from a
+    CSV file or returned by a database). The storage is a RecordColumns
+    instance holding every tuple position as a column of unwrapped values; the
+    tuples themselves are only built when items are read from the list.
+    There is one strategy instance per shape, see get_record_strategy().
+    """
+
+    _immutable_fields_ = ['shape', 'indexes[*]']
+
+    erase, unerase = rerased.new_erasing_pair("record")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def __init__(self, space, shape):
+        ListStrategy.__init__(self, space)
+        self.shape = shape
+        self.num_ints = self.num_floats = self.num_strs = 0
+        # index of the column of each tuple position in RecordColumns.ints,
+        # .floats or .strs, depending on its type code in shape
+        indexes = [0] * len(shape)
+        for j in range(len(shape)):
+            kind = shape[j]
+            if kind == 'i':
+                indexes[j] = self.num_ints
+                self.num_ints += 1
+            elif kind == 'f':
+                indexes[j] = self.num_floats
+                self.num_floats += 1
+            else:
+                indexes[j] = self.num_strs
+                self.num_strs += 1
+        self.indexes = indexes
+
+    @jit.unroll_safe
+    def is_correct_type(self, w_obj):
+        if (not isinstance(w_obj, W_AbstractTupleObject) or
+                w_obj.user_overridden_class):
+            return False
+        shape = self.shape
+        if w_obj.length() != len(shape):
+            return False
+        for j in range(len(shape)):
+            if _record_kind(w_obj.getitem(self.space, j)) != shape[j]:
+                return False
+        return True
+
+    def _new_columns(self, sizehint):
+        if sizehint < 0:
+            sizehint = 0
+        return RecordColumns(
+            [newlist_hint(sizehint) for i in range(self.num_ints)],
+            [newlist_hint(sizehint) for i in range(self.num_floats)],
+            [newlist_hint(sizehint) for i in range(self.num_strs)])
+
+    def _length(self, cols):
+        # the first position always maps to the first column of its type
+        kind = self.shape[0]
+        if kind == 'i':
+            return len(cols.ints[0])
+        elif kind == 'f':
+            return len(cols.floats[0])
+        return len(cols.strs[0])
+
+    @jit.unroll_safe
+    def _box(self, cols, index):
+        space = self.space
+        shape = self.shape
+        items_w = [None] * len(shape)
+        for j in range(len(shape)):
+            kind = shape[j]
+            k = self.indexes[j]
+            if kind == 'i':
+                items_w[j] = space.wrap(cols.ints[k][index])
+            elif kind == 'f':
+                items_w[j] = space.wrap(cols.floats[k][index])
+            else:
+                items_w[j] = space.wrap(cols.strs[k][index])
+        return space.newtuple(items_w)
+
+    @jit.unroll_safe
+    def _append_unwrapped(self, cols, w_tuple):
+        assert isinstance(w_tuple, W_AbstractTupleObject)
+        space = self.space
+        shape = self.shape
+        for j in range(len(shape)):
+            w_item = w_tuple.getitem(space, j)
+            kind = shape[j]
+            k = self.indexes[j]
+            if kind == 'i':
+                cols.ints[k].append(space.int_w(w_item))
+            elif kind == 'f':
+                cols.floats[k].append(space.float_w(w_item))
+            else:
+                cols.strs[k].append(space.str_w(w_item))
+
+    @jit.unroll_safe
+    def _store_unwrapped(self, cols, index, w_tuple, insert):
+        assert isinstance(w_tuple, W_AbstractTupleObject)
+        space = self.space
+        shape = self.shape
+        for j in range(len(shape)):
+            w_item = w_tuple.getitem(space, j)
+            kind = shape[j]
+            k = self.indexes[j]
+            if kind == 'i':
+                if insert:
+                    cols.ints[k].insert(index, space.int_w(w_item))
+                else:
+                    cols.ints[k][index] = space.int_w(w_item)
+            elif kind == 'f':
+                if insert:
+                    cols.floats[k].insert(index, space.float_w(w_item))
+                else:
+                    cols.floats[k][index] = space.float_w(w_item)
+            else:
+                if insert:
+                    cols.strs[k].insert(index, space.str_w(w_item))
+                else:
+                    cols.strs[k][index] = space.str_w(w_item)
+
+    @jit.unroll_safe
+    def _row_lt(self, cols, keys, a, b):
+        """Compare rows a and b like the tuples they represent, looking only
+        at the positions listed in keys."""
+        for j in keys:
+            kind = self.shape[j]
+            k = self.indexes[j]
+            if kind == 'i':
+                x = cols.ints[k][a]
+                y = cols.ints[k][b]
+                if x != y:
+                    return x < y
+            elif kind == 'f':
+                fx = cols.floats[k][a]
+                fy = cols.floats[k][b]
+                if not _float_eq(fx, fy):
+                    return fx < fy
+            else:
+                sx = cols.strs[k][a]
+                sy = cols.strs[k][b]
+                if sx != sy:
+                    return sx < sy
+        return False
+
+    def init_from_list_w(self, w_list, list_w):
+        cols = self._new_columns(len(list_w))
+        for w_item in list_w:
+            self._append_unwrapped(cols, w_item)
+        w_list.lstorage = self.erase(cols)
+
+    def get_empty_storage(self, sizehint):
+        return self.erase(self._new_columns(sizehint))
+
+    def clone(self, w_list):
+        storage = self.getstorage_copy(w_list)
+        return W_ListObject.from_storage_and_strategy(self.space, storage,
+                                                      self)
+
+    def copy_into(self, w_list, w_other):
+        w_other.strategy = self
+        w_other.lstorage = self.getstorage_copy(w_list)
+
+    def getstorage_copy(self, w_list):
+        cols = self.unerase(w_list.lstorage)
+        return self.erase(_map_columns(cols, _column_copy))
+
+    def _resize_hint(self, w_list, hint):
+        _each_column(self.unerase(w_list.lstorage), _column_resize_hint, hint)
+
+    def length(self, w_list):
+        return self._length(self.unerase(w_list.lstorage))
+
+    def getitem(self, w_list, index):
+        cols = self.unerase(w_list.lstorage)
+        length = self._length(cols)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError
+        return self._box(cols, index)
+
+    def getitems_copy(self, w_list):
+        cols = self.unerase(w_list.lstorage)
+        length = self._length(cols)
+        items_w = [None] * length
+        for i in range(length):
+            items_w[i] = self._box(cols, i)
+        return items_w
+    getitems_fixedsize = func_with_new_name(getitems_copy,
+                                            "getitems_fixedsize")
+    getitems_unroll = getitems_fixedsize
+
+    def getslice(self, w_list, start, stop, step, length):
+        cols = self.unerase(w_list.lstorage)
+        if step == 1 and 0 <= start <= stop:
+            cols = _map_columns(cols, _column_slice, start, stop)
+        else:
+            cols = _map_columns(cols, _column_extslice, start, step, length)
+        return W_ListObject.from_storage_and_strategy(
+                self.space, self.erase(cols), self)
+
+    def append(self, w_list, w_item):
+        if self.is_correct_type(w_item):
+            self._append_unwrapped(self.unerase(w_list.lstorage), w_item)
+            return
+        w_list.switch_to_object_strategy()
+        w_list.append(w_item)
+
+    def insert(self, w_list, index, w_item):
+        if self.is_correct_type(w_item):
+            self._store_unwrapped(self.unerase(w_list.lstorage), index, w_item,
+                                  True)
+            return
+        w_list.switch_to_object_strategy()
+        w_list.insert(index, w_item)
+
+    def setitem(self, w_list, index, w_item):
+        if self.is_correct_type(w_item):
+            cols = self.unerase(w_list.lstorage)
+            length = self._length(cols)
+            if index < 0:
+                index += length
+            if not 0 <= index < length:
+                raise IndexError
+            self._store_unwrapped(cols, index, w_item, False)
+            return
+        w_list.switch_to_object_strategy()
+        w_list.setitem(index, w_item)
+
+    def pop(self, w_list, index):
+        cols = self.unerase(w_list.lstorage)
+        if not 0 <= index < self._length(cols):
+            raise IndexError
+        w_item = self._box(cols, index)
+        _each_column(cols, _column_delitem, index)
+        return w_item
+
+    def inplace_mul(self, w_list, times):
+        _each_column(self.unerase(w_list.lstorage), _column_inplace_mul, times)
+
+    def deleteslice(self, w_list, start, step, slicelength):
+        if slicelength == 0:
+            return
+        if step < 0:
+            start = start + step * (slicelength - 1)
+            step = -step
+        cols = self.unerase(w_list.lstorage)
+        if step == 1:
+            _each_column(cols, _column_delslice, start, start + slicelength)
+            return
+        length = self._length(cols)
+        keep = [True] * length
+        for i in range(slicelength):
+            keep[start + i * step] = False
+        order = [i for i in range(length) if keep[i]]
+        w_list.lstorage = self.erase(_map_columns(cols, _column_permute, order))
+
+    def setslice(self, w_list, start, step, slicelength, w_other):
+        assert slicelength >= 0
+        if step == 1 and (w_other.strategy is self or w_other.length() == 0):
+            if w_other.length() == 0:
+                other = self._new_columns(0)
+            else:
+                other = self.unerase(w_other.lstorage)
+            cols = self.unerase(w_list.lstorage)
+            stop = start + slicelength
+            w_list.lstorage = self.erase(RecordColumns(
+                _splice_columns(cols.ints, start, stop, other.ints),
+                _splice_columns(cols.floats, start, stop, other.floats),
+                _splice_columns(cols.strs, start, stop, other.strs)))
+            return
+        w_list.switch_to_object_strategy()
+        w_list.setslice(start, step, slicelength, w_other)
+
+    def _extend_from_list(self, w_list, w_other):
+        if w_other.strategy is self:
+            cols = self.unerase(w_list.lstorage)
+            other = self.unerase(w_other.lstorage)
+            _extend_columns(cols.ints, other.ints)
+            _extend_columns(cols.floats, other.floats)
+            _extend_columns(cols.strs, other.strs)
+            return
+        elif w_other.strategy.is_empty_strategy():
+            return
+        w_other = w_other._temporarily_as_objects()
+        w_list.switch_to_object_strategy()
+        w_list.extend(w_other)
+
+    def reverse(self, w_list):
+        _each_column(self.unerase(w_list.lstorage), _column_reverse)
+
+    def sort(self, w_list, reverse):
+        self._sort_rows(w_list, range(len(self.shape)), reverse)
+
+    def sort_with_key(self, w_list, w_key, reverse):
+        """Sort the list directly on its columns if w_key is an
+        operator.itemgetter() of tuple positions, which gives the same order
+        as sorting on the key tuples. Returns False if the general sorting
+        code must be used instead."""
+        from pypy.module.operator.interp_operator import W_ItemGetter
+        if not isinstance(w_key, W_ItemGetter):
+            return False
+        width = len(self.shape)
+        items_w = w_key.items_w
+        keys = [0] * len(items_w)
+        for i in range(len(items_w)):
+            w_index = items_w[i]
+            if type(w_index) is not W_IntObject:
+                return False
+            index = self.space.int_w(w_index)
+            if index < 0:
+                index += width
+            if not 0 <= index < width:
+                return False
+            keys[i] = index
+        self._sort_rows(w_list, keys, reverse)
+        return True
+
+    def _sort_rows(self, w_list, keys, reverse):
+        # sort the row numbers, then reorder every column accordingly
+        cols = self.unerase(w_list.lstorage)
+        length = self._length(cols)
+        order = range(length)
+        sorter = RecordSort(order, length)
+        sorter.strategy = self
+        sorter.cols = cols
+        sorter.keys = keys
+        # see W_ListObject.descr_sort() for the reverse trick
+        if reverse:
+            order.reverse()
+        sorter.sort()
+        if reverse:
+            order.reverse()
+        w_list.lstorage = self.erase(_map_columns(cols, _column_permute, order))
+
 # _______________________________________________________
 
 init_signature = Signature(['sequence'], None, None)
@@ -1787,6 +2636,7 @@ IntBaseTimSort = make_timsort_class()
 FloatBaseTimSort = make_timsort_class()
 StringBaseTimSort = make_timsort_class()
 UnicodeBaseTimSort = make_timsort_class()
+RecordBaseTimSort = make_timsort_class()
 
 
 class KeyContainer(W_Root):
@@ -1825,6 +2675,12 @@ class UnicodeSort(UnicodeBaseTimSort):
         return a < b
 
 
+class RecordSort(RecordBaseTimSort):
+    # sorts the row numbers of a list using RecordListStrategy
+    def lt(self, a, b):
+        return self.strategy._row_lt(self.cols, self.keys, a, b)
+
+
 class CustomCompareSort(SimpleSort):
     def lt(self, a, b):
         space = self.space
@@ -1,14 +1,17 @@
 import weakref
 
 from rpython.rlib import jit, objectmodel, debug, rerased
-from rpython.rlib.rarithmetic import intmask, r_uint
+from rpython.rlib.longlong2float import float2longlong, longlong2float
+from rpython.rlib.rarithmetic import intmask, r_longlong, r_uint
 
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.objspace.std.dictmultiobject import (
     W_DictMultiObject, DictStrategy, ObjectDictStrategy, BaseKeyIterator,
     BaseValueIterator, BaseItemIterator, _never_equal_to_string
 )
-from pypy.objspace.std.typeobject import MutableCell
+from pypy.objspace.std.floatobject import W_FloatObject
+from pypy.objspace.std.intobject import W_IntObject
+from pypy.objspace.std.typeobject import MutableCell, VersionTag
 
 
 # ____________________________________________________________
@@ -19,15 +22,33 @@ NUM_DIGITS_POW2 = 1 << NUM_DIGITS
 # note: we use "x * NUM_DIGITS_POW2" instead of "x << NUM_DIGITS" because
 # we want to propagate knowledge that the result cannot be negative
 
+# how the values of an attribute are stored, see UnboxedPlainAttribute
+BOXED = 0
+UNBOXED_INT = 1
+UNBOXED_FLOAT = 2
+
+def _unboxed_kind(space, w_value):
+    if not space.config.objspace.std.withunboxedattrs:
+        return BOXED
+    if type(w_value) is W_IntObject:
+        return UNBOXED_INT
+    if type(w_value) is W_FloatObject:
+        return UNBOXED_FLOAT
+    return BOXED
+
 class AbstractAttribute(object):
-    _immutable_fields_ = ['terminator']
+    _immutable_fields_ = ['terminator', 'cache_attrs_version?']
     cache_attrs = None
     _size_estimate = 0
+    _unboxed_length = 0
+    _unboxed_size_estimate = 0
 
     def __init__(self, space, terminator):
         self.space = space
         assert isinstance(terminator, Terminator)
         self.terminator = terminator
+        # changes whenever an entry of cache_attrs is replaced
+        self.cache_attrs_version = VersionTag()
 
     def read(self, obj, selector):
         attr = self.find_map_attr(selector)
@@ -38,7 +59,11 @@ class AbstractAttribute(object):
             jit.isconstant(obj) and
             not attr.ever_mutated
         ):
+            if isinstance(attr, UnboxedPlainAttribute):
+                return attr._pure_read_unboxed(obj)
             return self._pure_mapdict_read_storage(obj, attr.storageindex)
+        elif isinstance(attr, UnboxedPlainAttribute):
+            return attr._read_unboxed(obj)
         else:
             return obj._mapdict_read_storage(attr.storageindex)
 
@@ -52,7 +77,10 @@ class AbstractAttribute(object):
             return self.terminator._write_terminator(obj, selector, w_value)
         if not attr.ever_mutated:
             attr.ever_mutated = True
-        obj._mapdict_write_storage(attr.storageindex, w_value)
+        if isinstance(attr, UnboxedPlainAttribute):
+            attr._write_unboxed(obj, w_value)
+        else:
+            obj._mapdict_write_storage(attr.storageindex, w_value)
         return True
 
     def delete(self, obj, selector):
@@ -131,19 +159,60 @@ class AbstractAttribute(object):
     def size_estimate(self):
         return self._size_estimate >> NUM_DIGITS
 
+    @jit.elidable
+    def unboxed_size_estimate(self):
+        return self._unboxed_size_estimate >> NUM_DIGITS
+
     def search(self, attrtype):
         return None
 
+    def search_unboxed(self):
+        return None
+
+    def unboxed_length(self):
+        return self._unboxed_length
+
+    def _box_attr(self, obj, selector, w_value):
+        raise NotImplementedError("abstract base class")
+
+    def _get_new_attr(self, name, index, kind):
+        attr = self._lookup_new_attr(name, index, kind,
+                                     self.cache_attrs_version)
+        if attr is None:
+            attr = self._fill_new_attr(name, index, kind)
+        return attr
+
     @jit.elidable
-    def _get_new_attr(self, name, index):
+    def _lookup_new_attr(self, name, index, kind, version):
+        # 'version' is only passed to make the result depend on it
+        cache = self.cache_attrs
+        if cache is None:
+            return None
+        attr = cache.get((name, index), None)
+        if isinstance(attr, UnboxedPlainAttribute) and attr.kind != kind:
+            return None
+        return attr
+
+    @jit.dont_look_inside
+    def _fill_new_attr(self, name, index, kind):
         selector = name, index
         cache = self.cache_attrs
         if cache is None:
             cache = self.cache_attrs = {}
         attr = cache.get(selector, None)
         if attr is None:
+            if kind == BOXED:
+                attr = PlainAttribute(selector, self)
+            else:
+                attr = UnboxedPlainAttribute(selector, self, kind)
+            cache[selector] = attr
+        elif isinstance(attr, UnboxedPlainAttribute) and attr.kind != kind:
+            # values of different types are stored into this attribute: from
+            # now on, box them.  Objects using the old map switch lazily, when
+            # a value of the wrong type is written into them.
             attr = PlainAttribute(selector, self)
             cache[selector] = attr
+            self.cache_attrs_version = VersionTag()
         return attr
 
     @jit.look_inside_iff(lambda self, obj, selector, w_value:
@@ -152,13 +221,19 @@ class AbstractAttribute(object):
             jit.isconstant(selector[1]))
     def add_attr(self, obj, selector, w_value):
         # grumble, jit needs this
-        attr = self._get_new_attr(selector[0], selector[1])
+        kind = _unboxed_kind(self.space, w_value)
+        attr = self._get_new_attr(selector[0], selector[1], kind)
         oldattr = obj._get_mapdict_map()
         if not jit.we_are_jitted():
             size_est = (oldattr._size_estimate + attr.size_estimate()
                                                - oldattr.size_estimate())
             assert size_est >= (oldattr.length() * NUM_DIGITS_POW2)
             oldattr._size_estimate = size_est
+            unboxed_est = (oldattr._unboxed_size_estimate +
+                           attr.unboxed_size_estimate() -
+                           oldattr.unboxed_size_estimate())
+            assert unboxed_est >= (oldattr.unboxed_length() * NUM_DIGITS_POW2)
+            oldattr._unboxed_size_estimate = unboxed_est
         if attr.length() > obj._mapdict_storage_length():
             # note that attr.size_estimate() is always at least attr.length()
             new_storage = [None] * attr.size_estimate()
@@ -169,7 +244,10 @@ class AbstractAttribute(object):
         # the order is important here: first change the map, then the storage,
         # for the benefit of the special subclasses
         obj._set_mapdict_map(attr)
-        obj._mapdict_write_storage(attr.storageindex, w_value)
+        if isinstance(attr, UnboxedPlainAttribute):
+            attr._add_unboxed(obj, w_value)
+        else:
+            obj._mapdict_write_storage(attr.storageindex, w_value)
 
     def materialize_r_dict(self, space, obj, dict_w):
         raise NotImplementedError("abstract base class")
@@ -283,6 +361,8 @@ class PlainAttribute(AbstractAttribute):
         self.storageindex = back.length()
         self.back = back
         self._size_estimate = self.length() * NUM_DIGITS_POW2
+        self._unboxed_length = back.unboxed_length()
+        self._unboxed_size_estimate = self._unboxed_length * NUM_DIGITS_POW2
         self.ever_mutated = False
 
     def _copy_attr(self, obj, new_obj):
@@ -318,11 +398,25 @@ class PlainAttribute(AbstractAttribute):
             return self
         return self.back.search(attrtype)
 
+    def search_unboxed(self):
+        return self.back.search_unboxed()
+
+    def _box_attr(self, obj, selector, w_value):
+        # returns a copy of obj where the attribute 'selector' is set to
+        # w_value, which does not need to match the kind of the attribute
+        if selector == self.selector:
+            new_obj = self.back.copy(obj)
+            new_obj._get_mapdict_map().add_attr(new_obj, selector, w_value)
+            return new_obj
+        new_obj = self.back._box_attr(obj, selector, w_value)
+        self._copy_attr(obj, new_obj)
+        return new_obj
+
     def materialize_r_dict(self, space, obj, dict_w):
         new_obj = self.back.materialize_r_dict(space, obj, dict_w)
         if self.selector[1] == DICT:
             w_attr = space.wrap(self.selector[0])
-            dict_w[w_attr] = obj._mapdict_read_storage(self.storageindex)
+            dict_w[w_attr] = self.read(obj, self.selector)
         else:
             self._copy_attr(obj, new_obj)
         return new_obj
@@ -336,6 +430,102 @@ class PlainAttribute(AbstractAttribute):
     def __repr__(self):
         return "<PlainAttribute %s %s %r>" % (self.selector, self.storageindex, self.back)
 
+
+class UnboxedStorage(W_Root):
+    # the values of all the unboxed attributes of an object; ints are stored
+    # as the bits of a float
+    def __init__(self, values):
+        self.values = values
+
+
+class UnboxedPlainAttribute(PlainAttribute):
+    """An attribute whose values are all ints or all floats, depending on
+    'kind', which are stored without boxing them.  All the unboxed attributes
+    of an object share one storage slot, holding an UnboxedStorage; the first
+    of them in the map allocates it, with room for the number of unboxed
+    attributes that the objects with this map usually end up with."""
+    _immutable_fields_ = ['kind', 'listindex', 'firstunboxed', '_length']
+
+    def __init__(self, selector, back, kind):
+        AbstractAttribute.__init__(self, back.space, back.terminator)
+        self.selector = selector
+        self.back = back
+        self.kind = kind
+        previous = back.search_unboxed()
+        if previous is None:
+            self.firstunboxed = True
+            self.storageindex = back.length()
+            self.listindex = 0
+            self._length = self.storageindex + 1
+        else:
+            self.firstunboxed = False
+            self.storageindex = previous.storageindex
+            self.listindex = previous.listindex + 1
+            self._length = back.length()
+        self._size_estimate = self._length * NUM_DIGITS_POW2
+        self._unboxed_length = self.listindex + 1
+        self._unboxed_size_estimate = self._unboxed_length * NUM_DIGITS_POW2
+        self.ever_mutated = False
+
+    def length(self):
+        return self._length
+
+    def search_unboxed(self):
+        return self
+
+    def _unbox(self, w_value):
+        if self.kind == UNBOXED_INT:
+            assert isinstance(w_value, W_IntObject)
+            return longlong2float(r_longlong(w_value.intval))
+        assert isinstance(w_value, W_FloatObject)
+        return w_value.floatval
+
+    def _box(self, value):
+        if self.kind == UNBOXED_INT:
+            return self.space.wrap(intmask(float2longlong(value)))
+        return self.space.wrap(value)
+
+    def _get_unboxed_storage(self, obj):
+        w_storage = obj._mapdict_read_storage(self.storageindex)
+        assert isinstance(w_storage, UnboxedStorage)
+        return w_storage
+
+    def _read_unboxed(self, obj):
+        return self._box(self._get_unboxed_storage(obj).values[self.listindex])
+
+    @jit.elidable
+    def _pure_read_unboxed(self, obj):
+        return self._read_unboxed(obj)
+
+    def _add_unboxed(self, obj, w_value):
+        value = self._unbox(w_value)
+        if self.firstunboxed:
+            # note that unboxed_size_estimate() is always at least 1
+            values = [0.0] * self.unboxed_size_estimate()
+            values[0] = value
+            obj._mapdict_write_storage(self.storageindex,
+                                       UnboxedStorage(values))
+        else:
+            values = self._get_unboxed_storage(obj).values
+            if self.listindex < len(values):
+                values[self.listindex] = value
+            else:
+                assert len(values) == self.listindex
+                values.append(value)
+
+    def _write_unboxed(self, obj, w_value):
+        if _unboxed_kind(self.space, w_value) == self.kind:
+            values = self._get_unboxed_storage(obj).values
+            values[self.listindex] = self._unbox(w_value)
+            return
+        # switch obj to a map where this attribute is boxed
+        map = obj._get_mapdict_map()
+        _become(obj, map._box_attr(obj, self.selector, w_value))
+
+    def __repr__(self):
+        return "<UnboxedPlainAttribute %s %s %s %r>" % (
+            self.selector, self.kind, self.storageindex, self.back)
+
 def _become(w_obj, new_obj):
     # this is like the _become method, really, but we cannot use that due to
     # RPython reasons
@@ -807,6 +997,7 @@ class MapDictIteratorItems(BaseItemIterator):
 class CacheEntry(object):
     version_tag = None
     storageindex = 0
+    unboxed_attr = None
     w_method = None # for callmethod
     success_counter = 0
     failure_counter = 0
@@ -839,7 +1030,8 @@ def init_mapdict_cache(pycode):
     pycode._mapdict_caches = [INVALID_CACHE_ENTRY] * num_entries
 
 @jit.dont_look_inside
-def _fill_cache(pycode, nameindex, map, version_tag, storageindex, w_method=None):
+def _fill_cache(pycode, nameindex, map, version_tag, storageindex, w_method=None,
+                unboxed_attr=None):
     entry = pycode._mapdict_caches[nameindex]
     if entry is INVALID_CACHE_ENTRY:
         entry = CacheEntry()
@@ -847,6 +1039,7 @@ def _fill_cache(pycode, nameindex, map, version_tag, storageindex, w_method=None
     entry.map_wref = weakref.ref(map)
     entry.version_tag = version_tag
     entry.storageindex = storageindex
+    entry.unboxed_attr = unboxed_attr
     entry.w_method = w_method
     if pycode.space.config.objspace.std.withmethodcachecounter:
         entry.failure_counter += 1
@@ -858,6 +1051,8 @@ def LOAD_ATTR_caching(pycode, w_obj, nameindex):
     map = w_obj._get_mapdict_map()
     if entry.is_valid_for_map(map) and entry.w_method is None:
         # everything matches, it's incredibly fast
+        if entry.unboxed_attr is not None:
+            return entry.unboxed_attr._read_unboxed(w_obj)
         return w_obj._mapdict_read_storage(entry.storageindex)
     return LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map)
 LOAD_ATTR_caching._always_inline_ = True
@@ -902,6 +1097,10 @@ def LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map):
                 if attr is not None:
                     # Note that if map.terminator is a DevolvedDictTerminator,
                     # map.find_map_attr will always return None if selector[1]==DICT.
+                    if isinstance(attr, UnboxedPlainAttribute):
+                        _fill_cache(pycode, nameindex, map, version_tag,
+                                    attr.storageindex, unboxed_attr=attr)
+                        return attr._read_unboxed(w_obj)
                     _fill_cache(pycode, nameindex, map, version_tag, attr.storageindex)
                     return w_obj._mapdict_read_storage(attr.storageindex)
     if space.config.objspace.std.withmethodcachecounter:
@@ -80,7 +80,8 @@ class StdObjSpace(ObjSpace):
             W_TypeObject.typedef: W_TypeObject,
             W_UnicodeObject.typedef: W_UnicodeObject,
         }
-        if self.config.objspace.std.withstrbuf:
+        if (self.config.objspace.std.withstrbuf or
+                self.config.objspace.std.withrope):
             builtin_type_classes[W_BytesObject.typedef] = W_AbstractBytesObject
 
         self.builtin_types = {}
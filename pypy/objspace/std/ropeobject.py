@@ -0,0 +1,131 @@
+"""A str implementation that concatenates lazily, using the ropes of
+rpython.rlib.rope: adding strings just builds a tree of the parts, so that
+building a big string with repeated additions takes linear time instead of
+quadratic time.  The rope is flattened into a normal string the first time
+the string is used for anything else than len() and +.
+"""
+
+import inspect
+
+import py
+
+from pypy.objspace.std.bytesobject import (W_AbstractBytesObject,
+    W_BytesObject, StringBuffer)
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.error import oefmt
+from rpython.rlib import rope
+
+# results of additions that are shorter than this are built eagerly
+ROPE_MIN_LENGTH = 256
+
+
+class W_StringRopeObject(W_AbstractBytesObject):
+    w_str = None
+
+    def __init__(self, node):
+        self.node = node                   # rope.StringNode
+
+    def force(self):
+        if self.w_str is None:
+            s = self.node.flatten_string()
+            # further additions share the flattened string
+            self.node = rope.LiteralStringNode(s)
+            self.w_str = W_BytesObject(s)
+            return s
+        else:
+            return self.w_str._value
+
+    def __repr__(w_self):
+        """ representation for debugging purposes """
+        return "%s(length=%d, depth=%d)" % (
+            w_self.__class__.__name__, w_self.node.length(),
+            w_self.node.depth())
+
+    def unwrap(self, space):
+        return self.force()
+
+    def str_w(self, space):
+        return self.force()
+
+    charbuf_w = str_w
+
+    def buffer_w(self, space, flags):
+        space.check_buf_flags(flags, True)
+        return StringBuffer(self.force())
+
+    def readbuf_w(self, space):
+        return StringBuffer(self.force())
+
+    def ord(self, space):
+        self.force()
+        return self.w_str.ord(space)
+
+    def descr_len(self, space):
+        return space.wrap(self.node.length())
+
+    def descr_add(self, space, w_other):
+        if isinstance(w_other, W_StringRopeObject):
+            other = w_other.node
+        elif isinstance(w_other, W_BytesObject):
+            other = rope.LiteralStringNode(w_other._value)
+        else:
+            # unicode, bytearray, buffers...
+            self.force()
+            return self.w_str.descr_add(space, w_other)
+        return concatenate(space, self.node, other)
+
+    def descr_str(self, space):
+        # you cannot get subclasses of W_StringRopeObject here
+        assert type(self) is W_StringRopeObject
+        return self
+
+
+def concatenate(space, node1, node2):
+    try:
+        return W_StringRopeObject(rope.concatenate(node1, node2))
+    except OverflowError:
+        raise oefmt(space.w_OverflowError, "string is too large")
+
+def add_lazily(space, w_str, w_other):
+    """Return the sum of the str w_str and w_other as a W_StringRopeObject,
+    or None if it should be computed eagerly."""
+    if isinstance(w_other, W_StringRopeObject):
+        return concatenate(space, rope.LiteralStringNode(w_str._value),
+                           w_other.node)
+    if (isinstance(w_other, W_BytesObject) and
+            len(w_str._value) + len(w_other._value) >= ROPE_MIN_LENGTH):
+        return concatenate(space, rope.LiteralStringNode(w_str._value),
+                           rope.LiteralStringNode(w_other._value))
+    return None
+
+
+delegation_dict = {}
+for key, value in W_BytesObject.typedef.rawdict.iteritems():
+    if not isinstance(value, interp2app):
+        continue
+    if key in ('__len__', '__add__', '__str__'):
+        continue
+
+    func = value._code._bltin
+    args = inspect.getargs(func.func_code)
+    if args.varargs or args.keywords:
+        raise TypeError("Varargs and keywords not supported in unwrap_spec")
+    argspec = ', '.join([arg for arg in args.args[1:]])
+    func_code = py.code.Source("""
+    def f(self, %(args)s):
+        self.force()
+        return self.w_str.%(func_name)s(%(args)s)
+    """ % {'args': argspec, 'func_name': func.func_name})
+    d = {}
+    exec func_code.compile() in d
+    f = d['f']
+    f.func_defaults = func.func_defaults
+    f.__module__ = func.__module__
+    # necessary for unique identifiers for pickling
+    f.func_name = func.func_name
+    unwrap_spec_ = getattr(func, 'unwrap_spec', None)
+    if unwrap_spec_ is not None:
+        f = unwrap_spec(**unwrap_spec_)(f)
+    setattr(W_StringRopeObject, func.func_name, f)
+
+W_StringRopeObject.typedef = W_BytesObject.typedef
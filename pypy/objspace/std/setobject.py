@@ -8,12 +8,19 @@ from pypy.objspace.std.intobject import W_IntObject
 from pypy.objspace.std.unicodeobject import W_UnicodeObject
 
 from rpython.rlib.objectmodel import r_dict
-from rpython.rlib.rarithmetic import intmask, r_uint
+from rpython.rlib.rarithmetic import intmask, r_uint, LONG_BIT
 from rpython.rlib import rerased, jit
 
 
 UNROLL_CUTOFF = 5
 
+# sets of at least BITMAP_MIN_LENGTH non-negative ints use a bitmap
+# (BitmapSetStrategy) as long as the bitmap needs at most
+# BITMAP_MAX_BITS_PER_ITEM bits per element; they go back to
+# IntegerSetStrategy when they become twice as sparse as that
+BITMAP_MIN_LENGTH = 32
+BITMAP_MAX_BITS_PER_ITEM = 64
+
 
 class W_BaseSetObject(W_Root):
     typedef = None
@@ -100,40 +107,59 @@ class W_BaseSetObject(W_Root):
         """ Returns a list of all elements inside the set. Only used in __repr__. Use as less as possible."""
         return self.strategy.getkeys(self)
 
+    def _unbitmap_other(self, w_other):
+        """ IntegerSetStrategy only knows how to combine itself with sets of
+        its own strategy without wrapping the elements: give it an
+        integer-strategy copy of w_other if that one is a bitmap."""
+        space = self.space
+        if (self.strategy is space.fromcache(IntegerSetStrategy) and
+                w_other.strategy is space.fromcache(BitmapSetStrategy)):
+            return w_other.strategy.as_integer_set(w_other)
+        return w_other
+
     def difference(self, w_other):
         """ Returns a set with all items that are in this set, but not in w_other. W_other must be a set."""
+        w_other = self._unbitmap_other(w_other)
         return self.strategy.difference(self, w_other)
 
     def difference_update(self, w_other):
         """ As difference but overwrites the sets content with the result. W_other must be a set."""
+        w_other = self._unbitmap_other(w_other)
         self.strategy.difference_update(self, w_other)
 
     def symmetric_difference(self, w_other):
         """ Returns a set with all items that are either in this set or in w_other, but not in both. W_other must be a set. """
+        w_other = self._unbitmap_other(w_other)
         return self.strategy.symmetric_difference(self, w_other)
 
     def symmetric_difference_update(self, w_other):
         """ As symmetric_difference but overwrites the content of the set with the result. W_other must be a set."""
+        w_other = self._unbitmap_other(w_other)
         self.strategy.symmetric_difference_update(self, w_other)
 
     def intersect(self, w_other):
         """ Returns a set with all items that exists in both sets, this set and in w_other. W_other must be a set. """
+        w_other = self._unbitmap_other(w_other)
         return self.strategy.intersect(self, w_other)
 
     def intersect_update(self, w_other):
         """ Keeps only those elements found in both sets, removing all other elements. W_other must be a set."""
+        w_other = self._unbitmap_other(w_other)
         self.strategy.intersect_update(self, w_other)
 
     def issubset(self, w_other):
         """ Checks wether this set is a subset of w_other. W_other must be a set. """
+        w_other = self._unbitmap_other(w_other)
         return self.strategy.issubset(self, w_other)
 
     def isdisjoint(self, w_other):
         """ Checks wether this set and the w_other are completly different, i.e. have no equal elements. W_other must be a set."""
+        w_other = self._unbitmap_other(w_other)
         return self.strategy.isdisjoint(self, w_other)
 
     def update(self, w_other):
         """ Appends all elements from the given set to this set. W_other must be a set."""
+        w_other = self._unbitmap_other(w_other)
         self.strategy.update(self, w_other)
 
     def has_key(self, w_key):
@@ -142,6 +168,7 @@ class W_BaseSetObject(W_Root):
 
     def equals(self, w_other):
         """ Checks wether this set and the given set are equal, i.e. contain the same elements. W_other must be a set."""
+        w_other = self._unbitmap_other(w_other)
         return self.strategy.equals(self, w_other)
 
     def iter(self):
@@ -1223,6 +1250,8 @@ class BytesSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def may_contain_equal_elements(self, strategy):
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        elif strategy is self.space.fromcache(BitmapSetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1262,6 +1291,8 @@ class UnicodeSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def may_contain_equal_elements(self, strategy):
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        elif strategy is self.space.fromcache(BitmapSetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1318,6 +1349,23 @@ class IntegerSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def iter(self, w_set):
         return IntegerIteratorImplementation(self.space, self, w_set)
 
+    def add(self, w_set, w_key):
+        if self.is_correct_type(w_key):
+            d = self.unerase(w_set.sstorage)
+            d[self.unwrap(w_key)] = None
+            # check from time to time if the set became dense enough
+            # to be stored as a bitmap
+            length = len(d)
+            if length >= BITMAP_MIN_LENGTH and (length & (length - 1)) == 0:
+                data = bitmap_from_ints(d.keys())
+                if data is not None:
+                    strategy = self.space.fromcache(BitmapSetStrategy)
+                    w_set.strategy = strategy
+                    w_set.sstorage = strategy.erase(data)
+        else:
+            w_set.switch_to_object_strategy(self.space)
+            w_set.add(w_key)
+
 
 class ObjectSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     erase, unerase = rerased.new_erasing_pair("object")
@@ -1390,6 +1438,8 @@ class IdentitySetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
             return False
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        if strategy is self.space.fromcache(BitmapSetStrategy):
+            return False
         if strategy is self.space.fromcache(BytesSetStrategy):
             return False
         if strategy is self.space.fromcache(UnicodeSetStrategy):
@@ -1405,6 +1455,404 @@ class IdentitySetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def iter(self, w_set):
         return IdentityIteratorImplementation(self.space, self, w_set)
 
+# ____________________________________________________________
+# bitmap-based storage for dense sets of non-negative ints
+
+WORD_BITS = LONG_BIT
+_M1 = r_uint(-1) // 3       # 0x5555...
+_M2 = r_uint(-1) // 5       # 0x3333...
+_M4 = r_uint(-1) // 17      # 0x0f0f...
+_H01 = r_uint(-1) // 255    # 0x0101...
+
+def popcount(x):
+    """ Number of bits set in the r_uint x. """
+    x = x - ((x >> 1) & _M1)
+    x = (x & _M2) + ((x >> 2) & _M2)
+    x = (x + (x >> 4)) & _M4
+    return intmask((x * _H01) >> (WORD_BITS - 8))
+
+# compared in words rather than in bits: 'nwords * WORD_BITS' would
+# overflow for a bitmap containing a value close to sys.maxint
+def _bitmap_is_dense(count, nwords):
+    return nwords <= count * BITMAP_MAX_BITS_PER_ITEM // WORD_BITS
+
+def _bitmap_is_too_sparse(count, nwords):
+    return nwords > 2 * count * BITMAP_MAX_BITS_PER_ITEM // WORD_BITS
+
+
+class BitmapSetData(object):
+    """ The storage of BitmapSetStrategy: the int 'i' is in the set if the
+    bit 'i % WORD_BITS' of 'words[i // WORD_BITS]' is set.  The last word,
+    if any, is never zero. """
+
+    def __init__(self, words, count):
+        self.words = words
+        self.count = count
+
+    def copy(self):
+        return BitmapSetData(self.words[:], self.count)
+
+    def contains(self, value):
+        index = value // WORD_BITS
+        if value < 0 or index >= len(self.words):
+            return False
+        return bool(self.words[index] & (r_uint(1) << (value % WORD_BITS)))
+
+    def trim(self):
+        words = self.words
+        end = len(words)
+        while end > 0 and words[end - 1] == 0:
+            end -= 1
+        if end < len(words):
+            del words[end:]
+
+    def items(self):
+        result = [0] * self.count
+        pos = 0
+        for index in range(len(self.words)):
+            word = self.words[index]
+            value = index * WORD_BITS
+            while word:
+                if word & 1:
+                    result[pos] = value
+                    pos += 1
+                word >>= 1
+                value += 1
+        return result
+
+
+def bitmap_from_ints(items):
+    """ Returns a BitmapSetData for the given ints, or None if they are
+    negative or too sparse for a bitmap. """
+    if len(items) == 0:
+        return None
+    maxvalue = 0
+    for value in items:
+        if value < 0:
+            return None
+        if value > maxvalue:
+            maxvalue = value
+    nwords = maxvalue // WORD_BITS + 1
+    if not _bitmap_is_dense(len(items), nwords):
+        return None
+    words = [r_uint(0)] * nwords
+    count = 0
+    for value in items:
+        index = value // WORD_BITS
+        bit = r_uint(1) << (value % WORD_BITS)
+        if not words[index] & bit:
+            words[index] |= bit
+            count += 1
+    if not _bitmap_is_dense(count, nwords):
+        return None     # there were many duplicates
+    return BitmapSetData(words, count)
+
+
+class BitmapSetStrategy(SetStrategy):
+    """ Dense sets of non-negative ints.  Set operations between two sets
+    with this strategy are done word-wise on the bitmaps.  If the set
+    becomes too sparse, or gets a negative int, it switches to
+    IntegerSetStrategy. """
+    erase, unerase = rerased.new_erasing_pair("bitmap")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def get_empty_storage(self):
+        return self.erase(BitmapSetData([], 0))
+
+    def is_correct_type(self, w_key):
+        return type(w_key) is W_IntObject
+
+    def may_contain_equal_elements(self, strategy):
+        return self.space.fromcache(IntegerSetStrategy).\
+                    may_contain_equal_elements(strategy)
+
+    def listview_int(self, w_set):
+        return self.unerase(w_set.sstorage).items()
+
+    def _storage_from_words(self, words):
+        """ Returns (storage, strategy) for a new set containing the bits in
+        'words', which is not shared with any other set. """
+        data = BitmapSetData(words, 0)
+        data.trim()
+        count = 0
+        for word in data.words:
+            count += popcount(word)
+        data.count = count
+        if _bitmap_is_too_sparse(count, len(data.words)):
+            strategy = self.space.fromcache(IntegerSetStrategy)
+            return strategy.get_storage_from_unwrapped_list(data.items()), \
+                   strategy
+        return self.erase(data), self
+
+    def _set_words(self, w_set, words):
+        storage, strategy = self._storage_from_words(words)
+        w_set.strategy = strategy
+        w_set.sstorage = storage
+
+    def switch_to_integer_strategy(self, w_set):
+        data = self.unerase(w_set.sstorage)
+        strategy = self.space.fromcache(IntegerSetStrategy)
+        w_set.strategy = strategy
+        w_set.sstorage = strategy.get_storage_from_unwrapped_list(data.items())
+
+    def as_integer_set(self, w_set):
+        """ Returns a new set with IntegerSetStrategy and the same items. """
+        data = self.unerase(w_set.sstorage)
+        strategy = self.space.fromcache(IntegerSetStrategy)
+        storage = strategy.get_storage_from_unwrapped_list(data.items())
+        return w_set.from_storage_and_strategy(storage, strategy)
+
+    def _check_sparse(self, w_set):
+        data = self.unerase(w_set.sstorage)
+        if _bitmap_is_too_sparse(data.count, len(data.words)):
+            self.switch_to_integer_strategy(w_set)
+
+    # __________________ methods called on W_SetObject _________________
+
+    def length(self, w_set):
+        return self.unerase(w_set.sstorage).count
+
+    def clear(self, w_set):
+        w_set.switch_to_empty_strategy()
+
+    def copy_real(self, w_set):
+        storage = self.get_storage_copy(w_set)
+        return w_set.from_storage_and_strategy(storage, self)
+
+    def get_storage_copy(self, w_set):
+        return self.erase(self.unerase(w_set.sstorage).copy())
+
+    def add(self, w_set, w_key):
+        if not self.is_correct_type(w_key):
+            w_set.switch_to_object_strategy(self.space)
+            w_set.add(w_key)
+            return
+        value = self.space.int_w(w_key)
+        data = self.unerase(w_set.sstorage)
+        if value >= 0:
+            index = value // WORD_BITS
+            bit = r_uint(1) << (value % WORD_BITS)
+            if index < len(data.words):
+                if not data.words[index] & bit:
+                    data.words[index] |= bit
+                    data.count += 1
+                return
+            if _bitmap_is_dense(data.count + 1, index + 1):
+                data.words.extend([r_uint(0)] * (index + 1 - len(data.words)))
+                data.words[index] = bit
+                data.count += 1
+                return
+        self.switch_to_integer_strategy(w_set)
+        w_set.add(w_key)
+
+    def remove(self, w_set, w_item):
+        if not self.is_correct_type(w_item):
+            w_set.switch_to_object_strategy(self.space)
+            return w_set.remove(w_item)
+        value = self.space.int_w(w_item)
+        data = self.unerase(w_set.sstorage)
+        if not data.contains(value):
+            return False
+        index = value // WORD_BITS
+        data.words[index] &= ~(r_uint(1) << (value % WORD_BITS))
+        data.count -= 1
+        if index == len(data.words) - 1:
+            data.trim()
+        self._check_sparse(w_set)
+        return True
+
+    def getdict_w(self, w_set):
+        result = newset(self.space)
+        for value in self.unerase(w_set.sstorage).items():
+            result[self.space.wrap(value)] = None
+        return result
+
+    def getkeys(self, w_set):
+        return [self.space.wrap(value)
+                for value in self.unerase(w_set.sstorage).items()]
+
+    def has_key(self, w_set, w_key):
+        if not self.is_correct_type(w_key):
+            w_set.switch_to_object_strategy(self.space)
+            return w_set.has_key(w_key)
+        data = self.unerase(w_set.sstorage)
+        return data.contains(self.space.int_w(w_key))
+
+    def equals(self, w_set, w_other):
+        if w_set.length() != w_other.length():
+            return False
+        if w_other.strategy is self:
+            # both are trimmed, so they are equal iff the words are equal
+            words = self.unerase(w_set.sstorage).words
+            otherwords = self.unerase(w_other.sstorage).words
+            if len(words) != len(otherwords):
+                return False
+            for i in range(len(words)):
+                if words[i] != otherwords[i]:
+                    return False
+            return True
+        return self.as_integer_set(w_set).equals(w_other)
+
+    def _difference_words(self, w_set, w_other):
+        words = self.unerase(w_set.sstorage).words[:]
+        otherwords = self.unerase(w_other.sstorage).words
+        for i in range(min(len(words), len(otherwords))):
+            words[i] &= ~otherwords[i]
+        return words
+
+    def difference(self, w_set, w_other):
+        if w_other.strategy is self:
+            words = self._difference_words(w_set, w_other)
+            storage, strategy = self._storage_from_words(words)
+            return w_set.from_storage_and_strategy(storage, strategy)
+        if not self.may_contain_equal_elements(w_other.strategy):
+            return w_set.copy_real()
+        return self.as_integer_set(w_set).difference(w_other)
+
+    def difference_update(self, w_set, w_other):
+        if w_other.strategy is self:
+            self._set_words(w_set, self._difference_words(w_set, w_other))
+        elif w_other.strategy is self.space.fromcache(IntegerSetStrategy):
+            for value in w_other.listview_int():
+                self.remove(w_set, self.space.wrap(value))
+                if w_set.strategy is not self:
+                    w_set.difference_update(w_other)
+                    return
+        elif self.may_contain_equal_elements(w_other.strategy):
+            self.switch_to_integer_strategy(w_set)
+            w_set.difference_update(w_other)
+
+    def _symmetric_difference_words(self, w_set, w_other):
+        words = self.unerase(w_set.sstorage).words
+        otherwords = self.unerase(w_other.sstorage).words
+        if len(words) < len(otherwords):
+            words, otherwords = otherwords, words
+        words = words[:]
+        for i in range(len(otherwords)):
+            words[i] ^= otherwords[i]
+        return words
+
+    def symmetric_difference(self, w_set, w_other):
+        if w_other.strategy is self:
+            words = self._symmetric_difference_words(w_set, w_other)
+            storage, strategy = self._storage_from_words(words)
+            return w_set.from_storage_and_strategy(storage, strategy)
+        return self.as_integer_set(w_set).symmetric_difference(w_other)
+
+    def symmetric_difference_update(self, w_set, w_other):
+        if w_other.strategy is self:
+            words = self._symmetric_difference_words(w_set, w_other)
+            self._set_words(w_set, words)
+        else:
+            self.switch_to_integer_strategy(w_set)
+            w_set.symmetric_difference_update(w_other)
+
+    def _intersect_words(self, w_set, w_other):
+        words = self.unerase(w_set.sstorage).words
+        otherwords = self.unerase(w_other.sstorage).words
+        if len(words) > len(otherwords):
+            words, otherwords = otherwords, words
+        words = words[:]
+        for i in range(len(words)):
+            words[i] &= otherwords[i]
+        return words
+
+    def intersect(self, w_set, w_other):
+        if w_other.strategy is self:
+            words = self._intersect_words(w_set, w_other)
+            storage, strategy = self._storage_from_words(words)
+            return w_set.from_storage_and_strategy(storage, strategy)
+        return self.as_integer_set(w_set).intersect(w_other)
+
+    def _intersect_wrapped(self, w_set, w_other):
+        # called by the other strategies, see _intersect_base()
+        result = newset(self.space)
+        for value in self.unerase(w_set.sstorage).items():
+            w_key = self.space.wrap(value)
+            if w_other.has_key(w_key):
+                result[w_key] = None
+        strategy = self.space.fromcache(ObjectSetStrategy)
+        return strategy.erase(result)
+
+    def intersect_update(self, w_set, w_other):
+        if w_other.strategy is self:
+            self._set_words(w_set, self._intersect_words(w_set, w_other))
+        else:
+            self.switch_to_integer_strategy(w_set)
+            w_set.intersect_update(w_other)
+
+    def issubset(self, w_set, w_other):
+        if w_set.length() == 0:
+            return True
+        if w_other.strategy is self:
+            words = self.unerase(w_set.sstorage).words
+            otherwords = self.unerase(w_other.sstorage).words
+            if len(words) > len(otherwords):
+                return False
+            for i in range(len(words)):
+                if words[i] & ~otherwords[i]:
+                    return False
+            return True
+        return self.as_integer_set(w_set).issubset(w_other)
+
+    def isdisjoint(self, w_set, w_other):
+        if w_other.length() == 0:
+            return True
+        if w_other.strategy is self:
+            words = self.unerase(w_set.sstorage).words
+            otherwords = self.unerase(w_other.sstorage).words
+            for i in range(min(len(words), len(otherwords))):
+                if words[i] & otherwords[i]:
+                    return False
+            return True
+        return self.as_integer_set(w_set).isdisjoint(w_other)
+
+    def update(self, w_set, w_other):
+        if w_other.strategy is self:
+            data = self.unerase(w_set.sstorage)
+            otherwords = self.unerase(w_other.sstorage).words
+            words = data.words
+            if len(words) < len(otherwords):
+                words.extend([r_uint(0)] * (len(otherwords) - len(words)))
+            count = 0
+            for i in range(len(words)):
+                if i < len(otherwords):
+                    words[i] |= otherwords[i]
+                count += popcount(words[i])
+            data.count = count
+            return
+        if w_other.length() == 0:
+            return
+        if w_other.strategy is self.space.fromcache(IntegerSetStrategy):
+            for value in w_other.listview_int():
+                self.add(w_set, self.space.wrap(value))
+                if w_set.strategy is not self:
+                    w_set.update(w_other)
+                    return
+            return
+        w_set.switch_to_object_strategy(self.space)
+        w_set.update(w_other)
+
+    def iter(self, w_set):
+        return BitmapIteratorImplementation(self.space, self, w_set)
+
+    def popitem(self, w_set):
+        data = self.unerase(w_set.sstorage)
+        if data.count == 0:
+            raise OperationError(self.space.w_KeyError,
+                                 self.space.wrap('pop from an empty set'))
+        # pop the largest element: the last word is not zero
+        index = len(data.words) - 1
+        word = data.words[index]
+        bit = WORD_BITS - 1
+        while not (word >> bit):
+            bit -= 1
+        w_result = self.space.wrap(index * WORD_BITS + bit)
+        self.remove(w_set, w_result)
+        return w_result
+
+
 class IteratorImplementation(object):
     def __init__(self, space, strategy, implementation):
         self.space = space
@@ -1507,6 +1955,29 @@ class IdentityIteratorImplementation(IteratorImplementation):
         else:
             return None
 
+class BitmapIteratorImplementation(IteratorImplementation):
+    def __init__(self, space, strategy, w_set):
+        IteratorImplementation.__init__(self, space, strategy, w_set)
+        self.data = strategy.unerase(w_set.sstorage)
+        self.nextvalue = 0
+
+    def next_entry(self):
+        words = self.data.words
+        value = self.nextvalue
+        while True:
+            index = value // WORD_BITS
+            if index >= len(words):
+                return None
+            word = words[index] >> (value % WORD_BITS)
+            if not word:
+                value = (index + 1) * WORD_BITS
+                continue
+            while not (word & 1):
+                word >>= 1
+                value += 1
+            self.nextvalue = value + 1
+            return self.space.wrap(value)
+
 class RDictIteratorImplementation(IteratorImplementation):
     def __init__(self, space, strategy, w_set):
         IteratorImplementation.__init__(self, space, strategy, w_set)
@@ -1581,9 +2052,7 @@ def set_strategy_and_setdata(space, w_set, w_iterable):
 
     intlist = space.listview_int(w_iterable)
     if intlist is not None:
-        strategy = space.fromcache(IntegerSetStrategy)
-        w_set.strategy = strategy
-        w_set.sstorage = strategy.get_storage_from_unwrapped_list(intlist)
+        _set_int_strategy_and_setdata(space, w_set, intlist)
         return
 
     iterable_w = space.listview(w_iterable)
@@ -1595,6 +2064,18 @@ def set_strategy_and_setdata(space, w_set, w_iterable):
 
     _pick_correct_strategy(space, w_set, iterable_w)
 
+def _set_int_strategy_and_setdata(space, w_set, intlist):
+    if len(intlist) >= BITMAP_MIN_LENGTH:
+        data = bitmap_from_ints(intlist)
+        if data is not None:
+            strategy = space.fromcache(BitmapSetStrategy)
+            w_set.strategy = strategy
+            w_set.sstorage = strategy.erase(data)
+            return
+    strategy = space.fromcache(IntegerSetStrategy)
+    w_set.strategy = strategy
+    w_set.sstorage = strategy.get_storage_from_unwrapped_list(intlist)
+
 @jit.look_inside_iff(lambda space, w_set, iterable_w:
         jit.loop_unrolling_heuristic(iterable_w, len(iterable_w), UNROLL_CUTOFF))
 def _pick_correct_strategy(space, w_set, iterable_w):
@@ -1603,6 +2084,10 @@ def _pick_correct_strategy(space, w_set, iterable_w):
         if type(w_item) is not W_IntObject:
             break
     else:
+        if len(iterable_w) >= BITMAP_MIN_LENGTH:
+            intlist = [space.int_w(w_item) for w_item in iterable_w]
+            _set_int_strategy_and_setdata(space, w_set, intlist)
+            return
         w_set.strategy = space.fromcache(IntegerSetStrategy)
         w_set.sstorage = w_set.strategy.get_storage_from_list(iterable_w)
         return
@@ -0,0 +1,353 @@
+"""dict implementation for the many dicts of a program that have the same
+keys, added in the same order, like the rows of csv.DictReader or the objects
+decoded by json.loads().
+
+Like the maps of mapdict.py, the strategies form a tree: every strategy
+describes a sequence of string keys, and knows the strategies that describe
+its keys plus one.  A dict only stores the list of its values, the position
+of every key in that list is stored (and looked up) in its strategy, which is
+shared by all the dicts with the same keys.  Dicts that don't fit into the
+tree anymore switch to BytesDictStrategy or UnicodeDictStrategy.
+"""
+
+from rpython.rlib import jit, rerased
+from rpython.tool.sourcetools import func_with_new_name
+
+from pypy.objspace.std.dictmultiobject import (
+    BytesDictStrategy, DictStrategy, ObjectDictStrategy, UnicodeDictStrategy,
+    _never_equal_to_string, create_iterator_classes)
+
+
+# maximal number of keys of a dict using a shared-keys strategy
+SHARED_KEYS_MAX_LENGTH = 32
+# maximal number of different keys that can follow the keys of a strategy, so
+# that dicts with many different key sets don't use up memory for strategies
+# that are never shared.  The limit is per strategy, so that such dicts don't
+# stop the unrelated ones from sharing their keys.
+SHARED_KEYS_MAX_TRANSITIONS = 16
+
+
+class AbstractSharedKeysStrategy(object):
+    _mixin_ = True
+
+    _immutable_fields_ = ['root', 'parent', 'keys[*]', 'indexes']
+
+    @staticmethod
+    def erase(storage):
+        raise NotImplementedError("abstract base class")
+
+    @staticmethod
+    def unerase(obj):
+        raise NotImplementedError("abstract base class")
+
+    def wrap(self, unwrapped):
+        raise NotImplementedError
+
+    def unwrap(self, wrapped):
+        raise NotImplementedError
+
+    def is_correct_type(self, w_obj):
+        raise NotImplementedError("abstract base class")
+
+    def _big_strategy(self):
+        raise NotImplementedError("abstract base class")
+
+    def _init_strategy(self, space, parent, keys):
+        self.space = space
+        if parent is None:
+            self.root = self
+        else:
+            self.root = parent.root
+        self.parent = parent
+        self.keys = keys
+        self.indexes = {}
+        for i in range(len(keys)):
+            self.indexes[keys[i]] = i
+        self.transitions = {}
+
+    def __repr__(self):
+        return "<%s %r>" % (self.__class__.__name__, self.keys)
+
+    def get_empty_storage(self):
+        assert self.parent is None
+        return self.erase([])
+
+    @jit.elidable
+    def lookup(self, key):
+        return self.indexes.get(key, -1)
+
+    def _get_next_strategy(self, key):
+        """Return the strategy for our keys plus 'key', or None if the dicts
+        with these keys shouldn't use a shared-keys strategy."""
+        strategy = self._lookup_next_strategy(key)
+        if strategy is None:
+            strategy = self._fill_next_strategy(key)
+        return strategy
+
+    @jit.elidable
+    def _lookup_next_strategy(self, key):
+        return self.transitions.get(key, None)
+
+    @jit.dont_look_inside
+    def _fill_next_strategy(self, key):
+        strategy = self.transitions.get(key, None)
+        if strategy is not None:
+            return strategy
+        if (len(self.keys) >= SHARED_KEYS_MAX_LENGTH or
+                len(self.transitions) >= SHARED_KEYS_MAX_TRANSITIONS):
+            return None
+        strategy = self._new_strategy(self.keys + [key])
+        self.transitions[key] = strategy
+        return strategy
+
+    def _find(self, key):
+        return jit.promote(self).lookup(key)
+
+    def setitem(self, w_dict, w_key, w_value):
+        if self.is_correct_type(w_key):
+            self._setitem_unwrapped(w_dict, self.unwrap(w_key), w_value)
+        else:
+            self.switch_to_object_strategy(w_dict)
+            w_dict.setitem(w_key, w_value)
+
+    def _setitem_unwrapped(self, w_dict, key, w_value):
+        values_w = self.unerase(w_dict.dstorage)
+        i = self._find(key)
+        if i >= 0:
+            values_w[i] = w_value
+            return
+        strategy = jit.promote(self)._get_next_strategy(key)
+        if strategy is None:
+            self.switch_to_big_strategy(w_dict)
+            self._big_strategy().setitem_untyped(w_dict.dstorage, key,
+                                                 w_value)
+        else:
+            values_w.append(w_value)
+            w_dict.strategy = strategy
+
+    def setdefault(self, w_dict, w_key, w_default):
+        if self.is_correct_type(w_key):
+            key = self.unwrap(w_key)
+            i = self._find(key)
+            if i >= 0:
+                return self.unerase(w_dict.dstorage)[i]
+            self._setitem_unwrapped(w_dict, key, w_default)
+            return w_default
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.setdefault(w_key, w_default)
+
+    def delitem(self, w_dict, w_key):
+        if self.is_correct_type(w_key):
+            key = self.unwrap(w_key)
+            if self._find(key) < 0:
+                raise KeyError
+            # the dict doesn't have the same keys as the others any more
+            self.switch_to_big_strategy(w_dict)
+            w_dict.delitem(w_key)
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.delitem(w_key)
+
+    def length(self, w_dict):
+        return len(self.keys)
+
+    def getitem(self, w_dict, w_key):
+        space = self.space
+        if self.is_correct_type(w_key):
+            return self._getitem_unwrapped(w_dict, self.unwrap(w_key))
+        elif self._never_equal_to(space.type(w_key)):
+            return None
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.getitem(w_key)
+
+    def _getitem_unwrapped(self, w_dict, key):
+        i = self._find(key)
+        if i < 0:
+            return None
+        return self.unerase(w_dict.dstorage)[i]
+
+    def _never_equal_to(self, w_lookup_type):
+        return _never_equal_to_string(self.space, w_lookup_type)
+
+    def w_keys(self, w_dict):
+        return self.space.newlist([self.wrap(key) for key in self.keys])
+
+    def values(self, w_dict):
+        return self.unerase(w_dict.dstorage)[:] # to make non-resizable
+
+    def items(self, w_dict):
+        space = self.space
+        keys = self.keys
+        values_w = self.unerase(w_dict.dstorage)
+        return [space.newtuple([self.wrap(keys[i]), values_w[i]])
+                for i in range(len(keys))]
+
+    def popitem(self, w_dict):
+        if self.parent is None:
+            raise KeyError
+        w_value = self.unerase(w_dict.dstorage).pop()
+        w_dict.strategy = self.parent
+        return self.wrap(self.keys[-1]), w_value
+
+    def clear(self, w_dict):
+        root = self.root
+        w_dict.strategy = root
+        w_dict.dstorage = root.get_empty_storage()
+
+    def switch_to_object_strategy(self, w_dict):
+        strategy = self.space.fromcache(ObjectDictStrategy)
+        keys = self.keys
+        values_w = self.unerase(w_dict.dstorage)
+        d_new = strategy.unerase(strategy.get_empty_storage())
+        for i in range(len(keys)):
+            d_new[self.wrap(keys[i])] = values_w[i]
+        w_dict.strategy = strategy
+        w_dict.dstorage = strategy.erase(d_new)
+
+    def switch_to_big_strategy(self, w_dict):
+        strategy = self._big_strategy()
+        keys = self.keys
+        values_w = self.unerase(w_dict.dstorage)
+        storage = strategy.get_empty_storage()
+        for i in range(len(keys)):
+            strategy.setitem_untyped(storage, keys[i], values_w[i])
+        w_dict.strategy = strategy
+        w_dict.dstorage = storage
+
+    def prepare_update(self, w_dict, num_extra):
+        if len(self.keys) + num_extra > SHARED_KEYS_MAX_LENGTH:
+            self.switch_to_big_strategy(w_dict)
+
+    # --------------- iterator interface -----------------
+
+    def getiterkeys(self, w_dict):
+        return iter(self.keys)
+
+    def getitervalues(self, w_dict):
+        return iter(self.unerase(w_dict.dstorage))
+
+    def getiteritems(self, w_dict):
+        return iter(range(len(self.keys)))
+
+    def getiterreversed(self, w_dict):
+        keys = self.keys
+        return iter([keys[i] for i in range(len(keys) - 1, -1, -1)])
+
+
+class BytesSharedKeysDictStrategy(AbstractSharedKeysStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("sharedkeysbytes")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def __init__(self, space, parent=None, keys=[]):
+        self._init_strategy(space, parent, keys)
+
+    def _new_strategy(self, keys):
+        return BytesSharedKeysDictStrategy(self.space, self, keys)
+
+    def wrap(self, unwrapped):
+        return self.space.wrap(unwrapped)
+
+    def unwrap(self, wrapped):
+        return self.space.str_w(wrapped)
+
+    def is_correct_type(self, w_obj):
+        space = self.space
+        return space.is_w(space.type(w_obj), space.w_str)
+
+    def _big_strategy(self):
+        return self.space.fromcache(BytesDictStrategy)
+
+    def setitem_str(self, w_dict, key, w_value):
+        assert key is not None
+        self._setitem_unwrapped(w_dict, key, w_value)
+
+    def getitem(self, w_dict, w_key):
+        space = self.space
+        # -- This is called extremely often.  Hack for performance --
+        if type(w_key) is space.StringObjectCls:
+            return self.getitem_str(w_dict, w_key.unwrap(space))
+        # -- End of performance hack --
+        return AbstractSharedKeysStrategy.getitem(self, w_dict, w_key)
+
+    def getitem_str(self, w_dict, key):
+        assert key is not None
+        return self._getitem_unwrapped(w_dict, key)
+
+    def listview_bytes(self, w_dict):
+        return self.keys[:]
+
+    def w_keys(self, w_dict):
+        return self.space.newlist_bytes(self.listview_bytes(w_dict))
+
+    def view_as_kwargs(self, w_dict):
+        values_w = self.unerase(w_dict.dstorage)
+        return self.keys[:], values_w[:] # copy to make non-resizable
+
+    def wrapkey(space, key):
+        return space.wrap(key)
+
+
+class UnicodeSharedKeysDictStrategy(AbstractSharedKeysStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("sharedkeysunicode")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def __init__(self, space, parent=None, keys=[]):
+        self._init_strategy(space, parent, keys)
+
+    def _new_strategy(self, keys):
+        return UnicodeSharedKeysDictStrategy(self.space, self, keys)
+
+    def wrap(self, unwrapped):
+        return self.space.wrap(unwrapped)
+
+    def unwrap(self, wrapped):
+        return self.space.unicode_w(wrapped)
+
+    def is_correct_type(self, w_obj):
+        space = self.space
+        return space.is_w(space.type(w_obj), space.w_unicode)
+
+    def _big_strategy(self):
+        return self.space.fromcache(UnicodeDictStrategy)
+
+    def setitem_str(self, w_dict, key, w_value):
+        self.switch_to_object_strategy(w_dict)
+        w_dict.setitem(self.space.wrap(key), w_value)
+
+    def getitem_str(self, w_dict, key):
+        return self.getitem(w_dict, self.space.wrap(key))
+
+    def listview_unicode(self, w_dict):
+        return self.keys[:]
+
+    def wrapkey(space, key):
+        return space.wrap(key)
+
+
+def _make_next_item(strategycls):
+    def next_item(self):
+        strategy = self.strategy
+        assert isinstance(strategy, strategycls)
+        for i in self.iterator:
+            w_dict = self.dictimplementation
+            if w_dict.strategy is not strategy:
+                # obscure case: the keys of the dict changed, without
+                # changing its length
+                w_key, w_value = self.space.fixedview(w_dict.items()[i], 2)
+                return w_key, w_value
+            values_w = strategy.unerase(w_dict.dstorage)
+            return strategy.wrap(strategy.keys[i]), values_w[i]
+        else:
+            return None, None
+    return func_with_new_name(next_item, 'next_item_' + strategycls.__name__)
+
+create_iterator_classes(BytesSharedKeysDictStrategy,
+                        override_next_item=_make_next_item(
+                            BytesSharedKeysDictStrategy))
+create_iterator_classes(UnicodeSharedKeysDictStrategy,
+                        override_next_item=_make_next_item(
+                            UnicodeSharedKeysDictStrategy))
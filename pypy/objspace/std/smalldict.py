@@ -0,0 +1,288 @@
+"""dict implementation specialized for small dicts with string keys, like
+decoded JSON objects or short-lived configuration dicts.
+
+Based on two lists containing unwrapped key value pairs, searched linearly.
+When the dict grows beyond SMALL_DICT_MAX_LENGTH keys, it switches to
+BytesDictStrategy or UnicodeDictStrategy.
+"""
+
+from rpython.rlib import jit, rerased
+from rpython.tool.sourcetools import func_with_new_name
+
+from pypy.objspace.std.dictmultiobject import (
+    BytesDictStrategy, DictStrategy, ObjectDictStrategy, UnicodeDictStrategy,
+    _never_equal_to_string, create_iterator_classes)
+
+
+# limit the size so that the linear searches don't become too long
+SMALL_DICT_MAX_LENGTH = 8
+
+
+class AbstractSmallDictStrategy(object):
+    _mixin_ = True
+
+    @staticmethod
+    def erase(storage):
+        raise NotImplementedError("abstract base class")
+
+    @staticmethod
+    def unerase(obj):
+        raise NotImplementedError("abstract base class")
+
+    def wrap(self, unwrapped):
+        raise NotImplementedError
+
+    def unwrap(self, wrapped):
+        raise NotImplementedError
+
+    def is_correct_type(self, w_obj):
+        raise NotImplementedError("abstract base class")
+
+    def get_empty_storage(self):
+        return self.erase(([], []))
+
+    def _never_equal_to(self, w_lookup_type):
+        return _never_equal_to_string(self.space, w_lookup_type)
+
+    def _big_strategy(self):
+        raise NotImplementedError("abstract base class")
+
+    @jit.look_inside_iff(lambda self, w_dict, key:
+            jit.isconstant(self.length(w_dict)) and jit.isconstant(key))
+    def _find(self, w_dict, key):
+        keys = self.unerase(w_dict.dstorage)[0]
+        for i in range(len(keys)):
+            if keys[i] == key:
+                return i
+        return -1
+
+    def setitem(self, w_dict, w_key, w_value):
+        if self.is_correct_type(w_key):
+            self._setitem_unwrapped(w_dict, self.unwrap(w_key), w_value)
+        else:
+            self.switch_to_object_strategy(w_dict)
+            w_dict.setitem(w_key, w_value)
+
+    def _setitem_unwrapped(self, w_dict, key, w_value):
+        i = self._find(w_dict, key)
+        keys, values_w = self.unerase(w_dict.dstorage)
+        if i >= 0:
+            values_w[i] = w_value
+        elif len(keys) >= SMALL_DICT_MAX_LENGTH:
+            self.switch_to_big_strategy(w_dict)
+            self._big_strategy().setitem_untyped(w_dict.dstorage, key,
+                                                 w_value)
+        else:
+            keys.append(key)
+            values_w.append(w_value)
+
+    def setdefault(self, w_dict, w_key, w_default):
+        if self.is_correct_type(w_key):
+            key = self.unwrap(w_key)
+            i = self._find(w_dict, key)
+            if i >= 0:
+                return self.unerase(w_dict.dstorage)[1][i]
+            self._setitem_unwrapped(w_dict, key, w_default)
+            return w_default
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.setdefault(w_key, w_default)
+
+    def delitem(self, w_dict, w_key):
+        if self.is_correct_type(w_key):
+            i = self._find(w_dict, self.unwrap(w_key))
+            if i < 0:
+                raise KeyError
+            keys, values_w = self.unerase(w_dict.dstorage)
+            del keys[i]
+            del values_w[i]
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.delitem(w_key)
+
+    def length(self, w_dict):
+        return len(self.unerase(w_dict.dstorage)[0])
+
+    def getitem(self, w_dict, w_key):
+        space = self.space
+        if self.is_correct_type(w_key):
+            return self._getitem_unwrapped(w_dict, self.unwrap(w_key))
+        elif self._never_equal_to(space.type(w_key)):
+            return None
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.getitem(w_key)
+
+    def _getitem_unwrapped(self, w_dict, key):
+        i = self._find(w_dict, key)
+        if i < 0:
+            return None
+        return self.unerase(w_dict.dstorage)[1][i]
+
+    def w_keys(self, w_dict):
+        keys = self.unerase(w_dict.dstorage)[0]
+        return self.space.newlist([self.wrap(key) for key in keys])
+
+    def values(self, w_dict):
+        return self.unerase(w_dict.dstorage)[1][:] # to make non-resizable
+
+    def items(self, w_dict):
+        space = self.space
+        keys, values_w = self.unerase(w_dict.dstorage)
+        return [space.newtuple([self.wrap(keys[i]), values_w[i]])
+                for i in range(len(keys))]
+
+    def popitem(self, w_dict):
+        keys, values_w = self.unerase(w_dict.dstorage)
+        if not keys:
+            raise KeyError
+        key = keys.pop()
+        w_value = values_w.pop()
+        return self.wrap(key), w_value
+
+    def clear(self, w_dict):
+        w_dict.dstorage = self.get_empty_storage()
+
+    def switch_to_object_strategy(self, w_dict):
+        strategy = self.space.fromcache(ObjectDictStrategy)
+        keys, values_w = self.unerase(w_dict.dstorage)
+        d_new = strategy.unerase(strategy.get_empty_storage())
+        for i in range(len(keys)):
+            d_new[self.wrap(keys[i])] = values_w[i]
+        w_dict.strategy = strategy
+        w_dict.dstorage = strategy.erase(d_new)
+
+    def switch_to_big_strategy(self, w_dict):
+        strategy = self._big_strategy()
+        keys, values_w = self.unerase(w_dict.dstorage)
+        storage = strategy.get_empty_storage()
+        for i in range(len(keys)):
+            strategy.setitem_untyped(storage, keys[i], values_w[i])
+        w_dict.strategy = strategy
+        w_dict.dstorage = storage
+
+    def prepare_update(self, w_dict, num_extra):
+        if self.length(w_dict) + num_extra > SMALL_DICT_MAX_LENGTH:
+            self.switch_to_big_strategy(w_dict)
+
+    # --------------- iterator interface -----------------
+
+    def getiterkeys(self, w_dict):
+        return iter(self.unerase(w_dict.dstorage)[0])
+
+    def getitervalues(self, w_dict):
+        return iter(self.unerase(w_dict.dstorage)[1])
+
+    def getiteritems(self, w_dict):
+        keys = self.unerase(w_dict.dstorage)[0]
+        return iter(range(len(keys)))
+
+    def getiterreversed(self, w_dict):
+        keys = self.unerase(w_dict.dstorage)[0]
+        return iter([keys[i] for i in range(len(keys) - 1, -1, -1)])
+
+
+class SmallBytesDictStrategy(AbstractSmallDictStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("smallbytes")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap(self, unwrapped):
+        return self.space.wrap(unwrapped)
+
+    def unwrap(self, wrapped):
+        return self.space.str_w(wrapped)
+
+    def is_correct_type(self, w_obj):
+        space = self.space
+        return space.is_w(space.type(w_obj), space.w_str)
+
+    def _big_strategy(self):
+        return self.space.fromcache(BytesDictStrategy)
+
+    def setitem_str(self, w_dict, key, w_value):
+        assert key is not None
+        self._setitem_unwrapped(w_dict, key, w_value)
+
+    def getitem(self, w_dict, w_key):
+        space = self.space
+        # -- This is called extremely often.  Hack for performance --
+        if type(w_key) is space.StringObjectCls:
+            return self.getitem_str(w_dict, w_key.unwrap(space))
+        # -- End of performance hack --
+        return AbstractSmallDictStrategy.getitem(self, w_dict, w_key)
+
+    def getitem_str(self, w_dict, key):
+        assert key is not None
+        return self._getitem_unwrapped(w_dict, key)
+
+    def listview_bytes(self, w_dict):
+        return self.unerase(w_dict.dstorage)[0][:]
+
+    def w_keys(self, w_dict):
+        return self.space.newlist_bytes(self.listview_bytes(w_dict))
+
+    def view_as_kwargs(self, w_dict):
+        keys, values_w = self.unerase(w_dict.dstorage)
+        return keys[:], values_w[:] # copy to make non-resizable
+
+    def wrapkey(space, key):
+        return space.wrap(key)
+
+
+class SmallUnicodeDictStrategy(AbstractSmallDictStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("smallunicode")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap(self, unwrapped):
+        return self.space.wrap(unwrapped)
+
+    def unwrap(self, wrapped):
+        return self.space.unicode_w(wrapped)
+
+    def is_correct_type(self, w_obj):
+        space = self.space
+        return space.is_w(space.type(w_obj), space.w_unicode)
+
+    def _big_strategy(self):
+        return self.space.fromcache(UnicodeDictStrategy)
+
+    def setitem_str(self, w_dict, key, w_value):
+        self.switch_to_object_strategy(w_dict)
+        w_dict.setitem(self.space.wrap(key), w_value)
+
+    def getitem_str(self, w_dict, key):
+        return self.getitem(w_dict, self.space.wrap(key))
+
+    def listview_unicode(self, w_dict):
+        return self.unerase(w_dict.dstorage)[0][:]
+
+    def wrapkey(space, key):
+        return space.wrap(key)
+
+
+def _make_next_item(strategycls):
+    def next_item(self):
+        strategy = self.strategy
+        assert isinstance(strategy, strategycls)
+        for i in self.iterator:
+            w_dict = self.dictimplementation
+            if w_dict.strategy is not strategy:
+                # obscure case: the dict switched to another strategy,
+                # which keeps the order of the items, without changing
+                # its length
+                w_key, w_value = self.space.fixedview(w_dict.items()[i], 2)
+                return w_key, w_value
+            keys, values_w = strategy.unerase(w_dict.dstorage)
+            return strategy.wrap(keys[i]), values_w[i]
+        else:
+            return None, None
+    return func_with_new_name(next_item, 'next_item_' + strategycls.__name__)
+
+create_iterator_classes(SmallBytesDictStrategy,
+                        override_next_item=_make_next_item(
+                            SmallBytesDictStrategy))
+create_iterator_classes(SmallUnicodeDictStrategy,
+                        override_next_item=_make_next_item(
+                            SmallUnicodeDictStrategy))
@@ -1,6 +1,8 @@
 from pypy.interpreter.error import OperationError
-from pypy.objspace.std.tupleobject import W_AbstractTupleObject
+from pypy.objspace.std.tupleobject import W_AbstractTupleObject, UNROLL_CUTOFF
 from pypy.objspace.std.util import negate
+from rpython.rlib import jit
+from rpython.rlib.debug import make_sure_not_resized
 from rpython.rlib.objectmodel import compute_hash
 from rpython.rlib.rarithmetic import intmask
 from rpython.rlib.unroll import unrolling_iterable
@@ -8,6 +10,10 @@ from rpython.tool.sourcetools import func_with_new_name
 from rpython.rlib.longlong2float import float2longlong
 
 
+# tuples of length 2 use the classes built by make_specialised_class();
+# homogeneous tuples of at least this length use make_array_class()
+ARRAY_MIN_LENGTH = 3
+
 class NotSpecialised(Exception):
     pass
 
@@ -125,6 +131,126 @@ def make_specialised_class(typetuple):
     _specialisations.append(cls)
     return cls
 
+def make_array_class(val_type):
+    """Tuples of any length whose items are all of the same type val_type
+    (int, float or str) are stored as a flat list of unwrapped values.
+    Hashing and comparing two such tuples is done on the raw items."""
+
+    if val_type == int:
+        none_value = 0
+    elif val_type == float:
+        none_value = 0.0
+    else:
+        none_value = None
+
+    def unwrap_item(space, w_obj):
+        if val_type == int:
+            return w_obj.int_w(space)
+        elif val_type == float:
+            return w_obj.float_w(space)
+        elif val_type == str:
+            return w_obj.str_w(space)
+        else:
+            raise AssertionError
+
+    def _unroll_condition(self):
+        return jit.loop_unrolling_heuristic(self, len(self.items),
+                                            UNROLL_CUTOFF)
+
+    def _unroll_condition_eq(self, space, w_other):
+        return (_unroll_condition(self) or
+                jit.loop_unrolling_heuristic(w_other, w_other.length(),
+                                             UNROLL_CUTOFF))
+
+    class cls(W_AbstractTupleObject):
+        _immutable_fields_ = ['items[*]']
+
+        def __init__(self, space, items):
+            make_sure_not_resized(items)
+            self.space = space
+            self.items = items
+
+        @staticmethod
+        def from_list_w(space, list_w):
+            items = [none_value] * len(list_w)
+            for i in range(len(list_w)):
+                items[i] = unwrap_item(space, list_w[i])
+            return cls(space, items)
+
+        def length(self):
+            return len(self.items)
+
+        @jit.look_inside_iff(_unroll_condition)
+        def tolist(self):
+            space = self.space
+            items = self.items
+            list_w = [None] * len(items)
+            for i in range(len(items)):
+                list_w[i] = space.wrap(items[i])
+            return list_w
+
+        # same source code, but builds and returns a resizable list
+        getitems_copy = func_with_new_name(tolist, 'getitems_copy')
+
+        @jit.look_inside_iff(lambda self, space: _unroll_condition(self))
+        def descr_hash(self, space):
+            mult = 1000003
+            x = 0x345678
+            z = len(self.items)
+            for value in self.items:
+                if val_type == float:
+                    from pypy.objspace.std.floatobject import _hash_float
+                    y = _hash_float(space, value)
+                else:
+                    y = compute_hash(value)
+                x = (x ^ y) * mult
+                z -= 1
+                mult += 82520 + z + z
+            x += 97531
+            return space.wrap(intmask(x))
+
+        def descr_eq(self, space, w_other):
+            if not isinstance(w_other, W_AbstractTupleObject):
+                return space.w_NotImplemented
+            return self._descr_eq(space, w_other)
+
+        @jit.look_inside_iff(_unroll_condition_eq)
+        def _descr_eq(self, space, w_other):
+            items = self.items
+            if len(items) != w_other.length():
+                return space.w_False
+            if not isinstance(w_other, cls):
+                for i in range(len(items)):
+                    if not space.eq_w(space.wrap(items[i]),
+                                      w_other.getitem(space, i)):
+                        return space.w_False
+                return space.w_True
+
+            otheritems = w_other.items
+            for i in range(len(items)):
+                myval = items[i]
+                otherval = otheritems[i]
+                if myval != otherval:
+                    if val_type == float:
+                        # issue with NaNs, which should be equal here
+                        if float2longlong(myval) == float2longlong(otherval):
+                            continue
+                    return space.w_False
+            return space.w_True
+
+        descr_ne = negate(descr_eq)
+
+        def getitem(self, space, index):
+            try:
+                return space.wrap(self.items[index])
+            except IndexError:
+                raise OperationError(space.w_IndexError,
+                                     space.wrap("tuple index out of range"))
+
+    cls.__name__ = 'W_ArrayTupleObject_' + val_type.__name__[0]
+    _array_specialisations.append(cls)
+    return cls
+
 # ---------- current specialized versions ----------
 
 _specialisations = []
@@ -132,6 +258,11 @@ Cls_ii = make_specialised_class((int, int))
 Cls_oo = make_specialised_class((object, object))
 Cls_ff = make_specialised_class((float, float))
 
+_array_specialisations = []
+Cls_array_i = make_array_class(int)
+Cls_array_f = make_array_class(float)
+Cls_array_s = make_array_class(str)
+
 def makespecialisedtuple(space, list_w):
     from pypy.objspace.std.intobject import W_IntObject
     from pypy.objspace.std.floatobject import W_FloatObject
@@ -144,5 +275,27 @@ def makespecialisedtuple(space, list_w):
             if type(w_arg2) is W_FloatObject:
                 return Cls_ff(space, w_arg1, w_arg2)
         return Cls_oo(space, w_arg1, w_arg2)
+    elif len(list_w) >= ARRAY_MIN_LENGTH:
+        return makearraytuple(space, list_w)
     else:
         raise NotSpecialised
+
+@jit.look_inside_iff(lambda space, list_w:
+        jit.loop_unrolling_heuristic(list_w, len(list_w), UNROLL_CUTOFF))
+def makearraytuple(space, list_w):
+    from pypy.objspace.std.bytesobject import W_BytesObject
+    from pypy.objspace.std.intobject import W_IntObject
+    from pypy.objspace.std.floatobject import W_FloatObject
+    tp = type(list_w[0])
+    if tp is not W_IntObject and tp is not W_FloatObject and (
+            tp is not W_BytesObject):
+        raise NotSpecialised
+    for w_obj in list_w:
+        if type(w_obj) is not tp:
+            raise NotSpecialised
+    if tp is W_IntObject:
+        return Cls_array_i.from_list_w(space, list_w)
+    elif tp is W_FloatObject:
+        return Cls_array_f.from_list_w(space, list_w)
+    else:
+        return Cls_array_s.from_list_w(space, list_w)
@@ -986,6 +986,69 @@ class AppTestStrategies(object):
         assert "IntDictStrategy" in self.get_strategy(d)
         assert d[1L] == "hi"
 
+    def test_empty_to_int_int(self):
+        d = {}
+        d[1] = 2
+        assert "IntIntDictStrategy" in self.get_strategy(d)
+        d[3] = d.get(3, 0) + 1
+        d[1] += 1
+        assert "IntIntDictStrategy" in self.get_strategy(d)
+        assert d == {1: 3, 3: 1}
+        assert sorted(d.values()) == [1, 3]
+        assert sorted(d.items()) == [(1, 3), (3, 1)]
+        assert sorted(d.itervalues()) == [1, 3]
+        assert d.setdefault(3, 42) == 1
+        assert d.setdefault(5, 6) == 6
+        assert d.pop(5) == 6
+        assert d.popitem() in [(1, 3), (3, 1)]
+        assert "IntIntDictStrategy" in self.get_strategy(d)
+
+    def test_int_int_to_boxed_values(self):
+        d = {1: 2, 3: 4}
+        d[5] = True
+        assert "IntDictStrategy" in self.get_strategy(d)
+        assert "IntIntDictStrategy" not in self.get_strategy(d)
+        assert d == {1: 2, 3: 4, 5: True}
+        assert d[5] is True
+        d = {1: 2}
+        assert d.setdefault(3, "x") == "x"
+        assert "IntDictStrategy" in self.get_strategy(d)
+        assert d == {1: 2, 3: "x"}
+
+    def test_int_int_to_object(self):
+        d = {1: 2, 3: 4}
+        d["a"] = 5
+        assert "ObjectDictStrategy" in self.get_strategy(d)
+        assert d == {1: 2, 3: 4, "a": 5}
+        d = {1: 2}
+        assert d.get(None) is None
+        assert "IntIntDictStrategy" in self.get_strategy(d)
+        assert d[1L] == 2
+
+    def test_empty_to_int_float(self):
+        d = {}
+        d[1] = 1.5
+        assert "IntFloatDictStrategy" in self.get_strategy(d)
+        d[1] += 1.0
+        d[2] = float('nan')
+        assert "IntFloatDictStrategy" in self.get_strategy(d)
+        assert d[1] == 2.5
+        assert d[2] != d[2]
+        d[3] = 4
+        assert "IntDictStrategy" in self.get_strategy(d)
+        assert d[1] == 2.5
+        assert type(d[3]) is int
+
+    def test_int_int_update_copy(self):
+        d = {1: 2, 3: 4}
+        d2 = d.copy()
+        assert "IntIntDictStrategy" in self.get_strategy(d2)
+        assert d2 == d
+        d3 = {5: 6.5}
+        d3.update(d)
+        assert d3 == {1: 2, 3: 4, 5: 6.5}
+        assert type(d3[1]) is int
+
     def test_iter_dict_length_change(self):
         d = {1: 2, 3: 4, 5: 6}
         it = d.iteritems()
@@ -1114,10 +1177,12 @@ class Config:
     class objspace:
         class std:
             withsmalldicts = False
+            withsharedkeysdict = False
             withcelldict = False
             withmethodcache = False
             withidentitydict = False
             withmapdict = False
+            withunboxedattrs = False
 
 FakeSpace.config = Config()
 
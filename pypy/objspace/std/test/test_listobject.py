@@ -1585,6 +1585,215 @@ class AppTestListObjectWithRangeList(AppTestListObject):
     spaceconfig = {"objspace.std.withrangelist": True}
 
 
+class AppTestListObjectWithRecordList(AppTestListObject):
+    """Run the list object tests with record lists enabled."""
+    spaceconfig = {"objspace.std.withrecordlist": True}
+
+    def test_record_list(self):
+        import __pypy__
+        l = [(1, 2.5, "a"), (3, 4.5, "b")]
+        assert __pypy__.strategy(l) == "RecordListStrategy"
+        assert l[1] == (3, 4.5, "b")
+        assert l[-1] == (3, 4.5, "b")
+        assert l[::-1] == [(3, 4.5, "b"), (1, 2.5, "a")]
+        l.append((5, 6.5, "c"))
+        l.insert(0, (0, 0.5, ""))
+        assert __pypy__.strategy(l) == "RecordListStrategy"
+        assert l.pop(1) == (1, 2.5, "a")
+        assert l == [(0, 0.5, ""), (3, 4.5, "b"), (5, 6.5, "c")]
+        l[1] = (7, 8.5, "d")
+        assert (7, 8.5, "d") in l
+        del l[::2]
+        assert l == [(7, 8.5, "d")]
+        assert __pypy__.strategy(l) == "RecordListStrategy"
+        l.append((1, 2))
+        assert __pypy__.strategy(l) == "ObjectListStrategy"
+        assert l == [(7, 8.5, "d"), (1, 2)]
+
+    def test_record_list_rebuilds_tuples(self):
+        # only the columns are stored, see objspace.std.withrecordlist.txt
+        t = (1, 2)
+        l = [t, t]
+        assert l[0] == t
+        assert l[0] is not t
+        assert l[0] == l[1]
+
+    def test_record_list_from_empty(self):
+        import __pypy__
+        l = []
+        l.append((1, "x"))
+        assert __pypy__.strategy(l) == "RecordListStrategy"
+        l.extend([(2, "y"), (3, "z")])
+        l += l
+        assert __pypy__.strategy(l) == "RecordListStrategy"
+        assert len(l) == 6
+        l[1:5] = [(9, "w")]
+        assert l == [(1, "x"), (9, "w"), (3, "z")]
+        assert __pypy__.strategy(l) == "RecordListStrategy"
+        l.append((1.5, "x"))
+        assert __pypy__.strategy(l) == "ObjectListStrategy"
+
+    def test_record_list_not_used(self):
+        import __pypy__
+        class T(tuple):
+            pass
+        for l in [[(1, 2), (1, 2, 3)], [(1, 2), (1.5, 2)], [(1, None)],
+                  [T((1, 2))], [(1,)], [(1, 2L)]]:
+            assert __pypy__.strategy(l) == "ObjectListStrategy"
+
+    def test_record_list_sort(self):
+        import __pypy__
+        from operator import itemgetter
+        l = [(3, 1.5, "c"), (1, 2.5, "b"), (3, 0.5, "a"), (1, 2.5, "a")]
+        l.sort()
+        assert l == [(1, 2.5, "a"), (1, 2.5, "b"), (3, 0.5, "a"),
+                     (3, 1.5, "c")]
+        l.sort(reverse=True)
+        assert l == [(3, 1.5, "c"), (3, 0.5, "a"), (1, 2.5, "b"),
+                     (1, 2.5, "a")]
+        # sorting with an itemgetter key is stable
+        l.sort(key=itemgetter(2))
+        assert l == [(3, 0.5, "a"), (1, 2.5, "a"), (1, 2.5, "b"),
+                     (3, 1.5, "c")]
+        l.sort(key=itemgetter(-3), reverse=True)
+        assert l == [(3, 0.5, "a"), (3, 1.5, "c"), (1, 2.5, "a"),
+                     (1, 2.5, "b")]
+        l.sort(key=itemgetter(1, 0))
+        assert l == [(3, 0.5, "a"), (3, 1.5, "c"), (1, 2.5, "a"),
+                     (1, 2.5, "b")]
+        assert __pypy__.strategy(l) == "RecordListStrategy"
+        raises(IndexError, l.sort, key=itemgetter(3))
+        raises(TypeError, l.sort, key=itemgetter("x"))
+
+    def test_record_list_sort_nan(self):
+        from operator import itemgetter
+        nan = float("nan")
+        l = [(nan, 2), (nan, 1), (0.0, 3)]
+        expected = sorted(list(l), key=lambda t: t[0])
+        l.sort(key=itemgetter(0))
+        assert repr(l) == repr(expected)
+        l = [(nan, 2), (nan, 1), (1.0, 3)]
+        l.sort()
+        assert l[0][1] == 1 and l[1][1] == 2
+
+
+class AppTestListObjectWithCOWSlices(AppTestListObject):
+    """Run the list object tests with copy-on-write slices enabled."""
+    spaceconfig = {"objspace.std.withcowslices": True}
+
+    def test_cow_slice(self):
+        import __pypy__
+        __pypy__.reset_list_cow_counters()
+        l = range(100)
+        l.append(100)
+        assert __pypy__.strategy(l) == "IntegerListStrategy"
+        s = l[10:90]
+        assert __pypy__.strategy(s) == "IntegerCOWListStrategy"
+        assert __pypy__.strategy(l) == "IntegerCOWListStrategy"
+        assert __pypy__.list_cow_counters() == (1, 0)
+        assert len(s) == 80
+        assert s[0] == 10 and s[-1] == 89
+        raises(IndexError, "s[80]")
+        raises(IndexError, "s[-81]")
+        assert 50 in s and 5 not in s
+        assert s.index(12) == 2
+        raises(ValueError, s.index, 12, 3)
+        assert s[5:25:5] == [15, 20, 25, 30]
+        t = s[10:70]
+        assert t == range(20, 80)
+        assert __pypy__.list_cow_counters() == (2, 0)
+        s.append(-1)
+        assert __pypy__.strategy(s) == "IntegerListStrategy"
+        assert __pypy__.list_cow_counters() == (2, 1)
+        assert s == range(10, 90) + [-1]
+        assert l == range(101)
+        assert t == range(20, 80)
+        l[0] = -5
+        assert l[:3] == [-5, 1, 2]
+        assert t == range(20, 80)
+        assert __pypy__.list_cow_counters() == (2, 2)
+
+    def test_cow_copy(self):
+        import __pypy__
+        __pypy__.reset_list_cow_counters()
+        for l in [[1.5] * 20, ["a", "b"] * 10, [u"x"] * 20]:
+            strategy = __pypy__.strategy(l)
+            c = l[:]
+            d = list(l)
+            assert __pypy__.strategy(c) == strategy.replace("List", "COWList")
+            assert __pypy__.strategy(d) == strategy.replace("List", "COWList")
+            c.reverse()
+            d.sort()
+            assert c == l[::-1]
+            assert d == sorted(l)
+            assert __pypy__.strategy(c) == strategy
+        # sorted() copies its argument too
+        assert __pypy__.list_cow_counters() == (9, 9)
+
+    def test_cow_short_slices_are_copied(self):
+        import __pypy__
+        l = range(100)
+        l.append(100)
+        assert __pypy__.strategy(l[1:5]) == "IntegerListStrategy"
+        assert __pypy__.strategy(l) == "IntegerListStrategy"
+        l = [(1, 2)] * 50
+        assert __pypy__.strategy(l[:]) == "ObjectListStrategy"
+
+    def test_cow_small_slices_are_copied(self):
+        import __pypy__
+        __pypy__.reset_list_cow_counters()
+        a = range(1000)
+        a.append(1000)
+        for i in range(100):
+            w = a[i:i+20]
+            a[i] = sum(w)
+        assert __pypy__.strategy(a) == "IntegerListStrategy"
+        assert __pypy__.list_cow_counters() == (0, 0)
+        s = a[:600]
+        assert __pypy__.strategy(s) == "IntegerCOWListStrategy"
+        assert __pypy__.strategy(s[:100]) == "IntegerListStrategy"
+        # compared with all the shared items, not with the length of s
+        assert __pypy__.strategy(s[:300]) == "IntegerListStrategy"
+        assert __pypy__.strategy(s[:550]) == "IntegerCOWListStrategy"
+
+    def test_cow_last_owner_does_not_copy(self):
+        import __pypy__
+        __pypy__.reset_list_cow_counters()
+        l = ["x%d" % i for i in range(30)]
+        c = l[:]
+        c.append("y")
+        assert __pypy__.list_cow_counters() == (1, 1)
+        l.append("z")
+        # c does not use the items any more: l takes them over
+        assert __pypy__.list_cow_counters() == (1, 1)
+        assert l[-2:] == ["x29", "z"]
+        assert c[-2:] == ["x29", "y"]
+
+    def test_cow_mixed(self):
+        import __pypy__
+        l = range(20)
+        l.append(20)
+        s = l[:]
+        l.extend(s)
+        assert l == range(21) * 2
+        assert __pypy__.strategy(l) == "IntegerListStrategy"
+        s[2:4] = s[5:]
+        assert s == [0, 1] + range(5, 21) + range(4, 21)
+        m = l[:]
+        m[:] = m
+        assert m == l
+        n = l[:]
+        x = []
+        x[:] = n
+        assert __pypy__.strategy(x) == "IntegerCOWListStrategy"
+        x.append("a")
+        assert __pypy__.strategy(x) == "ObjectListStrategy"
+        assert x == l + ["a"]
+        assert n * 2 == l + l
+        assert set(n[:]) == set(range(21))
+        assert "".join(map(str, range(20))[:]) == "".join(map(str, range(20)))
+
+
 class AppTestRangeListForcing:
     """Tests for range lists that test forcing. Regular tests should go in
     AppTestListObject so they can be run -A against CPython as well. Separate
@@ -2,7 +2,9 @@ import sys
 from pypy.objspace.std.listobject import (
     W_ListObject, EmptyListStrategy, ObjectListStrategy, IntegerListStrategy,
     FloatListStrategy, BytesListStrategy, RangeListStrategy,
-    SimpleRangeListStrategy, make_range_list, UnicodeListStrategy)
+    SimpleRangeListStrategy, make_range_list, UnicodeListStrategy,
+    RecordListStrategy, get_record_shape, IntegerCOWListStrategy,
+    FloatCOWListStrategy)
 from pypy.objspace.std import listobject
 from pypy.objspace.std.test.test_listobject import TestW_ListObject
 
@@ -734,6 +736,146 @@ class TestW_ListStrategies(TestW_ListObject):
         assert list_orig == [1, 2, 3]
 
 
+class TestW_RecordListStrategy(object):
+    spaceconfig = {"objspace.std.withrecordlist": True}
+
+    def wrap_rows(self, rows):
+        space = self.space
+        return [space.newtuple([space.wrap(x) for x in row]) for row in rows]
+
+    def test_record_shape(self):
+        space = self.space
+        w = space.wrap
+        assert get_record_shape(space, w((1, 2.5, "a"))) == "ifs"
+        assert get_record_shape(space, w((1,))) is None
+        assert get_record_shape(space, w((1, None))) is None
+        assert get_record_shape(space, w((1, u"a"))) is None
+        assert get_record_shape(space, w(1)) is None
+
+    def test_one_strategy_per_shape(self):
+        space = self.space
+        l1 = W_ListObject(space, self.wrap_rows([(1, "a"), (2, "b")]))
+        l2 = W_ListObject(space, self.wrap_rows([(3, "c")]))
+        l3 = W_ListObject(space, self.wrap_rows([("c", 3)]))
+        assert isinstance(l1.strategy, RecordListStrategy)
+        assert l1.strategy is l2.strategy
+        assert l1.strategy is not l3.strategy
+        assert l3.strategy.shape == "si"
+
+    def test_columns_are_unboxed(self):
+        space = self.space
+        l = W_ListObject(space, self.wrap_rows([(1, 2.5, "a", 3),
+                                                (4, 5.5, "b", 6)]))
+        cols = l.strategy.unerase(l.lstorage)
+        assert cols.ints == [[1, 4], [3, 6]]
+        assert cols.floats == [[2.5, 5.5]]
+        assert cols.strs == [["a", "b"]]
+        assert space.eq_w(l.getitem(1), space.wrap((4, 5.5, "b", 6)))
+
+    def test_operations_keep_strategy(self):
+        space = self.space
+        l = W_ListObject(space, self.wrap_rows([(i, str(i)) for i in range(6)]))
+        strategy = l.strategy
+        l2 = l.mul(2)
+        assert l2.strategy is strategy
+        assert l2.length() == 12
+        l.deleteslice(0, 2, 3)
+        assert l.strategy is strategy
+        assert space.unwrap(l) == [(1, "1"), (3, "3"), (5, "5")]
+        l.reverse()
+        assert space.unwrap(l) == [(5, "5"), (3, "3"), (1, "1")]
+        l.extend(l2.getslice(0, 2, 1, 2))
+        assert l.strategy is strategy
+        assert space.unwrap(l) == [(5, "5"), (3, "3"), (1, "1"), (0, "0"),
+                                   (1, "1")]
+        l.sort(False)
+        assert space.unwrap(l) == [(0, "0"), (1, "1"), (1, "1"), (3, "3"),
+                                   (5, "5")]
+        l.setitem(0, space.wrap((0, 0)))
+        assert isinstance(l.strategy, ObjectListStrategy)
+
+    def test_sort_with_other_key(self):
+        space = self.space
+        l = W_ListObject(space, self.wrap_rows([(2, "a"), (1, "b")]))
+        w_key = space.appexec([], "(): return lambda t: t[0]")
+        assert not l.strategy.sort_with_key(l, w_key, False)
+        w_key = space.appexec([], """():
+            import operator
+            return operator.itemgetter(0)
+        """)
+        assert l.strategy.sort_with_key(l, w_key, False)
+        assert space.unwrap(l) == [(1, "b"), (2, "a")]
+
+
+class TestW_COWListStrategy(object):
+    spaceconfig = {"objspace.std.withcowslices": True}
+
+    def test_share_slice(self):
+        space = self.space
+        l = W_ListObject(space, [space.wrap(i) for i in range(40)])
+        assert isinstance(l.strategy, IntegerListStrategy)
+        storage = l.lstorage
+        s = l.getslice(5, 25, 1, 20)
+        assert isinstance(l.strategy, IntegerCOWListStrategy)
+        assert s.strategy is l.strategy
+        view = s.strategy.unerase(s.lstorage)
+        assert view.shared.storage is storage
+        assert view.shared.nviews == 2
+        assert (view.start, view.stop) == (5, 25)
+        assert s.getitems_int() == range(5, 25)
+        assert isinstance(s.strategy, IntegerListStrategy)
+        assert view.shared.nviews == 1
+        # l is the last user of the items, it takes them over
+        l.append(space.wrap(40))
+        assert isinstance(l.strategy, IntegerListStrategy)
+        assert l.strategy.unerase(l.lstorage) is l.strategy.unerase(storage)
+        assert space.unwrap(l) == range(41)
+
+    def test_nested_slices(self):
+        space = self.space
+        l = W_ListObject(space, [space.wrap(i + 0.5) for i in range(60)])
+        s1 = l.getslice(10, 50, 1, 40)
+        s2 = s1.getslice(5, 35, 1, 30)
+        assert isinstance(s2.strategy, FloatCOWListStrategy)
+        view = s2.strategy.unerase(s2.lstorage)
+        assert (view.start, view.stop) == (15, 45)
+        assert view.shared.nviews == 3
+        assert s2.find(space.wrap(20.5)) == 5
+        assert s2.getitem(-1) is not None
+        assert space.float_w(s2.getitem(-1)) == 44.5
+        # not shared: smaller than half of the shared items
+        s3 = s1.getslice(5, 25, 1, 20)
+        assert isinstance(s3.strategy, FloatListStrategy)
+        s4 = s1.getslice(0, 4, 1, 4)
+        assert isinstance(s4.strategy, FloatListStrategy)
+        assert space.unwrap(s4) == [10.5, 11.5, 12.5, 13.5]
+
+    def test_small_slice_is_copied(self):
+        space = self.space
+        l = W_ListObject(space, [space.wrap(i) for i in range(1001)])
+        items = l.strategy.unerase(l.lstorage)
+        s = l.getslice(10, 30, 1, 20)
+        assert isinstance(s.strategy, IntegerListStrategy)
+        # the list itself does not share its items, so writing to it does
+        # not copy them
+        assert isinstance(l.strategy, IntegerListStrategy)
+        l.setitem(10, space.wrap(-1))
+        assert l.strategy.unerase(l.lstorage) is items
+        assert space.int_w(s.getitem(0)) == 10
+
+    def test_extend_from_cow(self):
+        space = self.space
+        l = W_ListObject(space, [space.wrap(i) for i in range(30)])
+        s = l.getslice(0, 20, 1, 20)
+        other = W_ListObject(space, [space.wrap(-1)])
+        other.extend(s)
+        assert isinstance(other.strategy, IntegerListStrategy)
+        assert space.unwrap(other) == [-1] + range(20)
+        other.setslice(0, 1, 1, s)
+        assert isinstance(other.strategy, IntegerListStrategy)
+        assert space.unwrap(other) == range(20) + range(20)
+
+
 class TestW_ListStrategiesDisabled:
     spaceconfig = {"objspace.std.withliststrategies": False}
 
@@ -5,10 +5,12 @@ class Config:
     class objspace:
         class std:
             withsmalldicts = False
+            withsharedkeysdict = False
             withcelldict = False
             withmethodcache = False
             withidentitydict = False
             withmapdict = True
+            withunboxedattrs = False
 
 space = FakeSpace()
 space.config = Config
@@ -1125,6 +1127,179 @@ class TestDictSubclassShortcutBug(object):
                 """)
         assert w_dict.user_overridden_class
 
+class TestUnboxedAttributes(object):
+    spaceconfig = {"objspace.std.withmapdict": True,
+                   "objspace.std.withunboxedattrs": True}
+
+    def setup_method(self, meth):
+        self.w_cls = self.space.appexec([], """():
+            class A(object):
+                pass
+            return A
+        """)
+
+    def new_obj(self, **attrs):
+        space = self.space
+        w_obj = space.call_function(self.w_cls)
+        for name, value in sorted(attrs.items()):
+            space.setattr(w_obj, space.wrap(name), space.wrap(value))
+        return w_obj
+
+    def getattr(self, w_obj, name):
+        space = self.space
+        return space.unwrap(space.getattr(w_obj, space.wrap(name)))
+
+    def test_unboxed_storage(self):
+        w_obj = self.new_obj(a=1, b=2.5, c="x", d=-3)
+        map = w_obj._get_mapdict_map()
+        assert isinstance(map, PlainAttribute)
+        assert not isinstance(map.back, UnboxedPlainAttribute)    # c
+        assert map.kind == UNBOXED_INT                             # d
+        assert map.listindex == 2
+        assert map.back.back.kind == UNBOXED_FLOAT                 # b
+        assert map.back.back.back.firstunboxed                     # a
+        # a, b and d share one storage slot
+        assert map.length() == 2
+        w_storage = w_obj._mapdict_read_storage(0)
+        assert isinstance(w_storage, UnboxedStorage)
+        assert len(w_storage.values) == 3
+        assert w_storage.values[1] == 2.5
+        assert self.getattr(w_obj, "a") == 1
+        assert self.getattr(w_obj, "b") == 2.5
+        assert self.getattr(w_obj, "c") == "x"
+        assert self.getattr(w_obj, "d") == -3
+
+        self.space.setattr(w_obj, self.space.wrap("b"), self.space.wrap(4.5))
+        assert w_obj._get_mapdict_map() is map
+        assert w_storage.values[1] == 4.5
+        assert self.getattr(w_obj, "b") == 4.5
+
+    def test_unboxed_storage_allocation(self):
+        w_obj = self.new_obj(p="x", q=None)
+        assert w_obj._mapdict_storage_length() >= 2
+        for i in range(w_obj._mapdict_storage_length()):
+            w_value = w_obj._mapdict_read_storage(i)
+            assert not isinstance(w_value, UnboxedStorage)
+        #
+        for i in range(100):
+            self.new_obj(a=1, b=2.5, c="x", d=-3)
+        w_obj2 = self.new_obj(a=4)
+        # allocated with room for the unboxed attributes that the objects
+        # with the same map usually end up with
+        w_storage = w_obj2._mapdict_read_storage(0)
+        assert len(w_storage.values) == 3
+        self.space.setattr(w_obj2, self.space.wrap("b"), self.space.wrap(5.5))
+        assert w_obj2._mapdict_read_storage(0) is w_storage
+        assert len(w_storage.values) == 3
+        assert self.getattr(w_obj2, "a") == 4
+        assert self.getattr(w_obj2, "b") == 5.5
+
+    def test_new_attr_lookup_is_stable(self):
+        space = self.space
+        w_obj = self.new_obj(a=1)
+        map = w_obj._get_mapdict_map().back
+        version = map.cache_attrs_version
+        attr = map._lookup_new_attr("a", DICT, UNBOXED_INT, version)
+        assert isinstance(attr, UnboxedPlainAttribute)
+        assert map._lookup_new_attr("a", DICT, UNBOXED_FLOAT, version) is None
+        w_obj = self.new_obj(a=1.5)
+        # the cache entry was replaced, which changes the version
+        assert map.cache_attrs_version is not version
+        attr1 = map._lookup_new_attr("a", DICT, UNBOXED_INT,
+                                     map.cache_attrs_version)
+        assert not isinstance(attr1, UnboxedPlainAttribute)
+        assert w_obj._get_mapdict_map() is attr1
+
+    def test_switch_to_boxed(self):
+        space = self.space
+        w_obj1 = self.new_obj(a=1, b=2.5, c=3)
+        w_obj2 = self.new_obj(a=4, b=5.5, c=6)
+        map = w_obj1._get_mapdict_map()
+        assert w_obj2._get_mapdict_map() is map
+        space.setattr(w_obj1, space.wrap("b"), space.wrap("boxed"))
+        map1 = w_obj1._get_mapdict_map()
+        assert map1 is not map
+        assert not isinstance(map1.back, UnboxedPlainAttribute)
+        assert isinstance(map1, UnboxedPlainAttribute)
+        assert self.getattr(w_obj1, "a") == 1
+        assert self.getattr(w_obj1, "b") == "boxed"
+        assert self.getattr(w_obj1, "c") == 3
+        # w_obj2 still uses the old map until a value of another type is
+        # written, new objects get a boxed attribute right away
+        assert w_obj2._get_mapdict_map() is map
+        assert self.getattr(w_obj2, "b") == 5.5
+        w_obj3 = self.new_obj(a=7, b=8.5, c=9)
+        assert w_obj3._get_mapdict_map() is map1
+        space.setattr(w_obj2, space.wrap("b"), space.wrap(None))
+        assert w_obj2._get_mapdict_map() is map1
+        assert self.getattr(w_obj2, "c") == 6
+
+    def test_int_and_float_do_not_mix(self):
+        space = self.space
+        w_obj = self.new_obj(a=1)
+        space.setattr(w_obj, space.wrap("a"), space.wrap(1.5))
+        assert not isinstance(w_obj._get_mapdict_map(), UnboxedPlainAttribute)
+        assert self.getattr(w_obj, "a") == 1.5
+        w_obj = self.new_obj(a=1)
+        assert not isinstance(w_obj._get_mapdict_map(), UnboxedPlainAttribute)
+
+    def test_delete_and_dict(self):
+        space = self.space
+        w_obj = self.new_obj(a=1, b=2.5, c=3)
+        space.delattr(w_obj, space.wrap("a"))
+        assert isinstance(w_obj._get_mapdict_map().back, UnboxedPlainAttribute)
+        assert w_obj._get_mapdict_map().back.firstunboxed
+        assert self.getattr(w_obj, "b") == 2.5
+        assert self.getattr(w_obj, "c") == 3
+        w_dict = space.getattr(w_obj, space.wrap("__dict__"))
+        assert space.unwrap(w_dict) == {"b": 2.5, "c": 3}
+        space.setitem(w_dict, space.wrap(5), space.wrap(6))
+        assert self.getattr(w_obj, "b") == 2.5
+        assert space.unwrap(w_dict) == {"b": 2.5, "c": 3, 5: 6}
+
+
+class AppTestWithUnboxedAttrs(AppTestWithMapDict):
+    spaceconfig = {"objspace.std.withmapdict": True,
+                   "objspace.std.withunboxedattrs": True}
+
+    def test_unboxed_values(self):
+        import sys
+        class A(object):
+            pass
+        a = A()
+        a.x = 1
+        a.y = 2.0
+        a.z = sys.maxint
+        for i in range(10):
+            a.x += 1
+            a.y *= 2
+            a.z = -a.z
+        assert a.x == 11
+        assert type(a.x) is int
+        assert a.y == 2048.0
+        assert a.z == sys.maxint
+        a.y = float("nan")
+        assert a.y != a.y
+        a.x = 2 ** 100
+        assert a.x == 2 ** 100
+        a.z = 0.5
+        assert (a.x, a.y != a.y, a.z) == (2 ** 100, True, 0.5)
+        assert a.__dict__ == {"x": 2 ** 100, "y": a.y, "z": 0.5}
+
+    def test_unboxed_slots(self):
+        class A(object):
+            __slots__ = ("x", "y")
+        a = A()
+        a.x = 1.5
+        a.y = 2
+        assert (a.x, a.y) == (1.5, 2)
+        a.y = "y"
+        assert (a.x, a.y) == (1.5, "y")
+        del a.x
+        raises(AttributeError, "a.x")
+        assert a.y == "y"
+
+
 def test_newdict_instance():
     w_dict = space.newdict(instance=True)
     assert type(w_dict.strategy) is MapDictStrategy
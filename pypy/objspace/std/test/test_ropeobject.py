@@ -0,0 +1,83 @@
+import py
+
+from pypy.objspace.std.test import test_bytesobject
+
+class AppTestRopeObject(test_bytesobject.AppTestBytesObject):
+    spaceconfig = {"objspace.std.withrope": True}
+
+    def setup_class(cls):
+        from pypy.objspace.std.ropeobject import ROPE_MIN_LENGTH
+        cls.w_N = cls.space.wrap(ROPE_MIN_LENGTH)
+
+    def test_basic(self):
+        import __pypy__
+        s = "a" * self.N
+        t = s + "b"
+        assert type(t) is str
+        assert 'W_StringRopeObject' in __pypy__.internal_repr(t)
+        assert len(t) == self.N + 1
+        assert 'W_StringRopeObject' in __pypy__.internal_repr(t)
+        assert t == "a" * self.N + "b"
+
+    def test_short_strings_are_flat(self):
+        import __pypy__
+        s = "a".__add__("b")
+        assert 'W_BytesObject' in __pypy__.internal_repr(s)
+
+    def test_add_many(self):
+        import __pypy__
+        s = ""
+        parts = []
+        for i in range(5000):
+            part = "%d," % i
+            parts.append(part)
+            s += part
+        assert 'W_StringRopeObject' in __pypy__.internal_repr(s)
+        assert len(s) == len("".join(parts))
+        assert s[-5:] == "4999,"
+        assert s == "".join(parts)
+
+    def test_add_ropes(self):
+        s = "x" * self.N + "y"
+        t = "z" + s
+        u = s + t
+        v = s + s
+        assert u == s + "z" + s
+        assert v[self.N] == "y"
+        assert v.count("y") == 2
+        assert hash(u) == hash("x" * self.N + "yz" + "x" * self.N + "y")
+
+    def test_flatten_on_index(self):
+        s = "a" * self.N + "b" + "c"
+        assert s[self.N] == "b"
+        # adding to a flattened rope still works
+        t = s + "d"
+        assert t[-3:] == "bcd"
+        assert s[-2:] == "bc"
+
+    def test_compare(self):
+        s = "a" * self.N + "b"
+        t = "a" * self.N + "c"
+        flat = "a" * self.N + "b"
+        assert s == flat
+        assert flat == s
+        assert s != t
+        assert s < t
+        assert t > flat
+        assert flat <= s <= flat
+        assert s >= flat
+        assert {flat: 1}[s] == 1
+
+    def test_add_other_types(self):
+        s = "a" * self.N + "b"
+        u = s + u"c"
+        assert type(u) is unicode
+        assert u == u"a" * self.N + u"bc"
+        b = s + bytearray("c")
+        assert type(b) is bytearray
+        raises(TypeError, "s + 5")
+
+    def test_buffer(self):
+        s = "a" * self.N + "b"
+        assert buffer(s) == buffer("a" * self.N + "b")
+        assert memoryview(s) == "a" * self.N + "b"
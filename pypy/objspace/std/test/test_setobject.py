@@ -965,6 +965,31 @@ class AppTestAppSetTest:
         # operands when the first set is larger than the second
         assert type(frozenset([1, 2]) & set([2])) is frozenset
 
+    def test_bitmap_strategy(self):
+        from __pypy__ import strategy
+        s = set(range(1000))
+        assert strategy(s) == "BitmapSetStrategy"
+        assert len(s) == 1000
+        assert 999 in s and 1000 not in s and -1 not in s
+        assert 5.0 in s
+        s = set(range(1000))
+        assert s == set(range(1000))
+        assert s == frozenset(range(1000))
+        assert hash(frozenset(range(1000))) == hash(frozenset(list(s)))
+        t = set(range(500, 1500))
+        assert s & t == set(range(500, 1000))
+        assert s | t == set(range(1500))
+        assert s - t == set(range(500))
+        assert s ^ t == set(range(500) + range(1000, 1500))
+        assert type(frozenset(range(100)) & set(range(50))) is frozenset
+        assert s.pop() == 999
+        assert len(s) == 999
+        s.discard(998)
+        assert max(s) == 997
+        s.add(-5)
+        assert strategy(s) == "IntegerSetStrategy"
+        assert -5 in s
+
     def test_update_bug_strategy(self):
         from __pypy__ import strategy
         s = set([1, 2, 3])
@@ -1,8 +1,9 @@
 from pypy.objspace.std.setobject import W_SetObject
 from pypy.objspace.std.setobject import (
-    BytesIteratorImplementation, BytesSetStrategy, EmptySetStrategy,
-    IntegerIteratorImplementation, IntegerSetStrategy, ObjectSetStrategy,
-    UnicodeIteratorImplementation, UnicodeSetStrategy)
+    BitmapIteratorImplementation, BitmapSetStrategy, BytesIteratorImplementation,
+    BytesSetStrategy, EmptySetStrategy, IntegerIteratorImplementation,
+    IntegerSetStrategy, ObjectSetStrategy, UnicodeIteratorImplementation,
+    UnicodeSetStrategy, WORD_BITS, _bitmap_is_dense, popcount)
 from pypy.objspace.std.listobject import W_ListObject
 
 class TestW_SetStrategies:
@@ -144,3 +145,156 @@ class TestW_SetStrategies:
         #
         s = W_SetObject(space, self.wrapped([u"a", u"b"]))
         assert sorted(space.listview_unicode(s)) == [u"a", u"b"]
+
+    def test_bitmap_from_list(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped(range(100)))
+        assert s.strategy is space.fromcache(BitmapSetStrategy)
+        assert s.length() == 100
+        assert sorted(space.listview_int(s)) == range(100)
+        #
+        s = W_SetObject(space, self.wrapped(range(0, 100000, 1000)))
+        assert s.strategy is space.fromcache(IntegerSetStrategy)
+        s = W_SetObject(space, self.wrapped(range(-50, 50)))
+        assert s.strategy is space.fromcache(IntegerSetStrategy)
+        s = W_SetObject(space, self.wrapped(range(10)))
+        assert s.strategy is space.fromcache(IntegerSetStrategy)
+        s = W_SetObject(space, self.wrapped(range(99) + ['x']))
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+
+    def test_bitmap_add_remove(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped(range(100)))
+        s.add(space.wrap(150))
+        assert s.strategy is space.fromcache(BitmapSetStrategy)
+        assert s.has_key(space.wrap(150))
+        assert not s.has_key(space.wrap(149))
+        assert s.length() == 101
+        s.add(space.wrap(10**9))
+        assert s.strategy is space.fromcache(IntegerSetStrategy)
+        assert s.length() == 102
+        #
+        s = W_SetObject(space, self.wrapped(range(100)))
+        s.add(space.wrap(-1))
+        assert s.strategy is space.fromcache(IntegerSetStrategy)
+        assert s.length() == 101
+        #
+        s = W_SetObject(space, self.wrapped(range(100)))
+        s.add(space.wrap("x"))
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+        assert s.length() == 101
+
+    def test_bitmap_huge_values(self):
+        import sys
+        space = self.space
+        assert not _bitmap_is_dense(100, sys.maxint // WORD_BITS + 1)
+        #
+        s = W_SetObject(space, self.wrapped(range(99) + [sys.maxint]))
+        assert s.strategy is space.fromcache(IntegerSetStrategy)
+        assert s.length() == 100
+        #
+        s = W_SetObject(space, self.wrapped(range(100)))
+        s.add(space.wrap(sys.maxint))
+        assert s.strategy is space.fromcache(IntegerSetStrategy)
+        assert s.has_key(space.wrap(sys.maxint))
+        s.add(space.wrap(-sys.maxint-1))
+        assert s.has_key(space.wrap(-sys.maxint-1))
+        assert s.length() == 102
+        #
+        s = W_SetObject(space, self.wrapped(range(100)))
+        w_other = W_SetObject(space, self.wrapped([sys.maxint,
+                                                   -sys.maxint-1, 5]))
+        w_res = s.intersect(w_other)
+        assert space.listview_int(w_res) == [5]
+        s.update(w_other)
+        assert s.length() == 102
+
+    def test_bitmap_becomes_sparse(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped(range(1000)))
+        assert s.strategy is space.fromcache(BitmapSetStrategy)
+        for i in range(0, 900):
+            assert s.remove(space.wrap(i))
+        # still dense enough
+        assert s.strategy is space.fromcache(BitmapSetStrategy)
+        for i in range(900, 995):
+            assert s.remove(space.wrap(i))
+        assert s.strategy is space.fromcache(IntegerSetStrategy)
+        assert sorted(space.listview_int(s)) == range(995, 1000)
+
+    def test_integer_becomes_bitmap(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped([]))
+        for i in range(200):
+            s.add(space.wrap(i))
+        assert s.strategy is space.fromcache(BitmapSetStrategy)
+        assert sorted(space.listview_int(s)) == range(200)
+
+    def test_bitmap_operations(self):
+        space = self.space
+        a = range(0, 300, 2)
+        b = range(0, 300, 3)
+        def new(l):
+            w_set = W_SetObject(space, self.wrapped(l))
+            assert w_set.strategy is space.fromcache(BitmapSetStrategy)
+            return w_set
+        def check(w_set, expected):
+            assert w_set.length() == len(expected)
+            assert sorted(space.listview_int(w_set)) == sorted(expected)
+        check(new(a).intersect(new(b)), set(a) & set(b))
+        check(new(a).difference(new(b)), set(a) - set(b))
+        check(new(a).symmetric_difference(new(b)), set(a) ^ set(b))
+        w_set = new(a)
+        w_set.update(new(b))
+        check(w_set, set(a) | set(b))
+        w_set = new(a)
+        w_set.intersect_update(new(b))
+        check(w_set, set(a) & set(b))
+        w_set = new(a)
+        w_set.difference_update(new(b))
+        check(w_set, set(a) - set(b))
+        w_set = new(a)
+        w_set.symmetric_difference_update(new(b))
+        check(w_set, set(a) ^ set(b))
+        assert new(range(0, 300, 6)).issubset(new(a))
+        assert not new(a).issubset(new(b))
+        assert not new(a).isdisjoint(new(b))
+        assert new(range(0, 300, 2)).isdisjoint(new(range(1, 300, 2)))
+        assert new(a).equals(new(a))
+        assert not new(a).equals(new(b))
+
+    def test_bitmap_operations_with_integer_strategy(self):
+        space = self.space
+        w_bitmap = W_SetObject(space, self.wrapped(range(100)))
+        w_ints = W_SetObject(space, self.wrapped([5, 50, 500]))
+        assert w_ints.strategy is space.fromcache(IntegerSetStrategy)
+        w_res = w_bitmap.intersect(w_ints)
+        assert sorted(space.listview_int(w_res)) == [5, 50]
+        w_res = w_ints.intersect(w_bitmap)
+        assert w_res.strategy is space.fromcache(IntegerSetStrategy)
+        assert sorted(space.listview_int(w_res)) == [5, 50]
+        w_res = w_ints.difference(w_bitmap)
+        assert space.listview_int(w_res) == [500]
+        w_bitmap.update(w_ints)
+        assert w_bitmap.length() == 101
+        w_bitmap.difference_update(w_ints)
+        assert w_bitmap.length() == 98
+        assert w_bitmap.strategy is space.fromcache(BitmapSetStrategy)
+
+    def test_bitmap_iter(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped(range(0, 500, 7)))
+        it = s.iter()
+        assert isinstance(it, BitmapIteratorImplementation)
+        result = []
+        while True:
+            w_item = it.next()
+            if w_item is None:
+                break
+            result.append(space.int_w(w_item))
+        assert result == range(0, 500, 7)
+
+    def test_popcount(self):
+        from rpython.rlib.rarithmetic import r_uint
+        for x in [0, 1, 2, 3, 255, 256, 12345678, -1, -2, 2**31]:
+            assert popcount(r_uint(x)) == bin(r_uint(x)).count('1')
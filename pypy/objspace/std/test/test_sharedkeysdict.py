@@ -0,0 +1,170 @@
+import py
+from pypy.objspace.std.test.test_dictmultiobject import FakeSpace, W_DictMultiObject
+from pypy.objspace.std.sharedkeysdict import *
+from pypy.objspace.std.sharedkeysdict import (
+    SHARED_KEYS_MAX_LENGTH, SHARED_KEYS_MAX_TRANSITIONS)
+
+
+def test_shared_strategies():
+    space = FakeSpace()
+    root = BytesSharedKeysDictStrategy(space)
+    d1 = W_DictMultiObject(space, root, root.get_empty_storage())
+    d2 = W_DictMultiObject(space, root, root.get_empty_storage())
+    for d in [d1, d2]:
+        d.setitem_str("a", 1)
+        d.setitem_str("b", 2)
+    assert d1.strategy is d2.strategy
+    assert d1.strategy.keys == ["a", "b"]
+    assert d1.strategy.parent.keys == ["a"]
+    assert d1.strategy.parent.parent is root
+    assert root.transitions.keys() == ["a"]
+    assert d1.strategy.unerase(d1.dstorage) == [1, 2]
+    d2.setitem_str("a", 3)
+    assert d2.strategy is d1.strategy
+    assert d2.getitem_str("a") == 3
+    assert d2.getitem_str("c") is None
+    d3 = W_DictMultiObject(space, root, root.get_empty_storage())
+    d3.setitem_str("b", 1)
+    assert d3.strategy is not d1.strategy.parent
+
+def test_popitem_goes_back():
+    space = FakeSpace()
+    root = BytesSharedKeysDictStrategy(space)
+    d = W_DictMultiObject(space, root, root.get_empty_storage())
+    d.setitem_str("a", 1)
+    strategy_a = d.strategy
+    d.setitem_str("b", 2)
+    assert d.popitem() == ("b", 2)
+    assert d.strategy is strategy_a
+    assert d.popitem() == ("a", 1)
+    assert d.strategy is root
+    py.test.raises(KeyError, d.popitem)
+
+def test_limit_length():
+    space = FakeSpace()
+    root = BytesSharedKeysDictStrategy(space)
+    d = W_DictMultiObject(space, root, root.get_empty_storage())
+    for i in range(SHARED_KEYS_MAX_LENGTH):
+        d.setitem_str("k%d" % i, i)
+    assert isinstance(d.strategy, BytesSharedKeysDictStrategy)
+    d.setitem_str("x", -1)
+    assert d.strategy.__class__.__name__ == "BytesDictStrategy"
+    assert d.length() == SHARED_KEYS_MAX_LENGTH + 1
+    assert d.getitem_str("k5") == 5
+    assert d.getitem_str("x") == -1
+
+def test_limit_transitions():
+    space = FakeSpace()
+    root = BytesSharedKeysDictStrategy(space)
+    d = W_DictMultiObject(space, root, root.get_empty_storage())
+    d.setitem_str("a", 0)
+    strategy_a = d.strategy
+    for i in range(SHARED_KEYS_MAX_TRANSITIONS + 10):
+        d = W_DictMultiObject(space, root, root.get_empty_storage())
+        d.setitem_str("a", 0)
+        d.setitem_str("k%d" % i, i)
+    assert len(strategy_a.transitions) == SHARED_KEYS_MAX_TRANSITIONS
+    assert d.strategy.__class__.__name__ == "BytesDictStrategy"
+    assert d.getitem_str("k%d" % i) == i
+    # the other strategies of the tree can still get new keys
+    d = W_DictMultiObject(space, root, root.get_empty_storage())
+    d.setitem_str("b", 1)
+    d.setitem_str("c", 2)
+    assert isinstance(d.strategy, BytesSharedKeysDictStrategy)
+    assert d.strategy.keys == ["b", "c"]
+
+def test_delitem_devolves():
+    space = FakeSpace()
+    root = BytesSharedKeysDictStrategy(space)
+    d = W_DictMultiObject(space, root, root.get_empty_storage())
+    d.setitem_str("a", 1)
+    d.setitem_str("b", 2)
+    py.test.raises(KeyError, d.delitem, "c")
+    assert isinstance(d.strategy, BytesSharedKeysDictStrategy)
+    d.delitem("a")
+    assert d.strategy.__class__.__name__ == "BytesDictStrategy"
+    assert d.getitem_str("b") == 2
+
+
+from pypy.objspace.std.test.test_dictmultiobject import BaseTestRDictImplementation, BaseTestDevolvedDictImplementation
+class TestBytesSharedKeysDictImplementation(BaseTestRDictImplementation):
+    StrategyClass = BytesSharedKeysDictStrategy
+
+    def test_delitem(self):
+        pass # delitem devolves
+
+class TestDevolvedBytesSharedKeysDictImplementation(BaseTestDevolvedDictImplementation):
+    StrategyClass = BytesSharedKeysDictStrategy
+
+
+from pypy.objspace.std.test.test_dictmultiobject import AppTest_DictMultiObject
+class AppTest_DictMultiObjectWithSharedKeys(AppTest_DictMultiObject):
+    spaceconfig = {"objspace.std.withsharedkeysdict": True}
+
+
+class AppTestSharedKeysDictStrategy(object):
+    spaceconfig = {"objspace.std.withsharedkeysdict": True,
+                   "usemodules": ["_pypyjson"]}
+
+    def w_get_strategy(self, obj):
+        import __pypy__
+        r = __pypy__.internal_repr(obj)
+        return r[r.find("(") + 1: r.find(")")]
+
+    def test_rows_share_keys(self):
+        import __pypy__
+        rows = [dict(zip(["id", "name", "price"], [i, "x%d" % i, i * 0.5]))
+                for i in range(10)]
+        assert __pypy__.strategy(rows[0]) == "BytesSharedKeysDictStrategy"
+        assert self.get_strategy(rows[0]) == self.get_strategy(rows[9])
+        assert rows[3] == {"id": 3, "name": "x3", "price": 1.5}
+        assert rows[3].keys() == ["id", "name", "price"]
+        assert rows[3].items() == [("id", 3), ("name", "x3"), ("price", 1.5)]
+        assert list(rows[3].itervalues()) == [3, "x3", 1.5]
+        rows[3]["name"] = "y"
+        assert rows[3]["name"] == "y"
+        assert self.get_strategy(rows[0]) == self.get_strategy(rows[3])
+
+    def test_json(self):
+        import __pypy__
+        import _pypyjson
+        l = _pypyjson.loads('[{"a": 1, "b": [2]}, {"a": 3, "b": []}]')
+        assert __pypy__.strategy(l[0]) == "UnicodeSharedKeysDictStrategy"
+        assert self.get_strategy(l[0]) == self.get_strategy(l[1])
+        assert l[1] == {u"a": 3, u"b": []}
+        assert l[0]["a"] == 1
+
+    def test_devolve(self):
+        import __pypy__
+        d = {"a": 1, "b": 2}
+        del d["a"]
+        assert __pypy__.strategy(d) == "BytesDictStrategy"
+        assert d == {"b": 2}
+        d = {"a": 1}
+        d[2] = 3
+        assert __pypy__.strategy(d) == "ObjectDictStrategy"
+        assert d == {"a": 1, 2: 3}
+        d = {u"a": 1}
+        d["b"] = 2
+        assert d == {u"a": 1, u"b": 2}
+
+    def test_iterate_while_changing_keys(self):
+        d = {"a": 1, "b": 2, "c": 3}
+        result = []
+        for key, value in d.iteritems():
+            result.append((key, value))
+            if key == "a":
+                d.popitem()
+                d["d"] = 4
+        assert result == [("a", 1), ("b", 2), ("d", 4)]
+
+    def test_update_and_copy(self):
+        import __pypy__
+        d = {"a": 1, "b": 2}
+        e = d.copy()
+        assert self.get_strategy(e) == self.get_strategy(d)
+        e.update({"c": 3})
+        assert e == {"a": 1, "b": 2, "c": 3}
+        e.update(dict.fromkeys(["k%d" % i for i in range(40)]))
+        assert __pypy__.strategy(e) == "BytesDictStrategy"
+        assert len(e) == 43
@@ -0,0 +1,177 @@
+import py
+from pypy.objspace.std.test.test_dictmultiobject import FakeSpace, W_DictMultiObject
+from pypy.objspace.std.smalldict import *
+from pypy.objspace.std.smalldict import SMALL_DICT_MAX_LENGTH
+
+space = FakeSpace()
+strategy = SmallBytesDictStrategy(space)
+
+def test_create():
+    keys = ["a", "b", "c"]
+    values = [1, 2, 3]
+    storage = strategy.erase((keys, values))
+    d = W_DictMultiObject(space, strategy, storage)
+    assert d.getitem_str("a") == 1
+    assert d.getitem_str("c") == 3
+    assert d.getitem_str("d") is None
+    assert d.getitem(space.wrap("b")) == 2
+    assert d.w_keys() == keys
+    assert d.values() == values
+
+def test_set_existing_and_new():
+    keys = ["a", "b"]
+    values = [1, 2]
+    storage = strategy.erase((keys, values))
+    d = W_DictMultiObject(space, strategy, storage)
+    d.setitem_str("a", 4)
+    d.setitem(space.wrap("c"), 5)
+    assert keys == ["a", "b", "c"]
+    assert values == [4, 2, 5]
+
+def test_delitem_keeps_order():
+    keys = ["a", "b", "c"]
+    values = [1, 2, 3]
+    storage = strategy.erase((keys, values))
+    d = W_DictMultiObject(space, strategy, storage)
+    d.delitem(space.wrap("b"))
+    assert keys == ["a", "c"]
+    assert values == [1, 3]
+    py.test.raises(KeyError, d.delitem, space.wrap("b"))
+    assert d.strategy is strategy
+
+def test_limit_size():
+    storage = strategy.get_empty_storage()
+    d = W_DictMultiObject(space, strategy, storage)
+    for i in range(SMALL_DICT_MAX_LENGTH):
+        d.setitem_str("d%s" % i, i)
+    assert d.strategy is strategy
+    d.setitem_str("x", 100)
+    assert "BytesDictStrategy" == d.strategy.__class__.__name__
+    assert d.length() == SMALL_DICT_MAX_LENGTH + 1
+    assert d.getitem_str("d3") == 3
+    assert d.getitem_str("x") == 100
+
+def test_view_as_kwargs():
+    keys = ["a", "b", "c"]
+    values = [1, 2, 3]
+    storage = strategy.erase((keys, values))
+    d = W_DictMultiObject(space, strategy, storage)
+    assert space.view_as_kwargs(d) == (keys, values)
+
+def test_from_empty_to_small():
+    from pypy.objspace.std.dictmultiobject import EmptyDictStrategy
+    space = FakeSpace()
+    space.config.objspace.std.withsmalldicts = True
+    try:
+        strategy = EmptyDictStrategy(space)
+        storage = strategy.get_empty_storage()
+        d = W_DictMultiObject(space, strategy, storage)
+        d.setitem_str("a", 3)
+        assert isinstance(d.strategy, SmallBytesDictStrategy)
+    finally:
+        space.config.objspace.std.withsmalldicts = False
+
+
+from pypy.objspace.std.test.test_dictmultiobject import BaseTestRDictImplementation, BaseTestDevolvedDictImplementation
+def get_impl(self):
+    storage = strategy.erase(([], []))
+    return W_DictMultiObject(space, strategy, storage)
+class TestSmallBytesDictImplementation(BaseTestRDictImplementation):
+    StrategyClass = SmallBytesDictStrategy
+    get_impl = get_impl
+
+class TestDevolvedSmallBytesDictImplementation(BaseTestDevolvedDictImplementation):
+    get_impl = get_impl
+    StrategyClass = SmallBytesDictStrategy
+
+
+from pypy.objspace.std.test.test_dictmultiobject import AppTest_DictMultiObject
+class AppTest_DictMultiObjectWithSmallDicts(AppTest_DictMultiObject):
+    spaceconfig = {"objspace.std.withsmalldicts": True}
+
+
+class AppTestSmallDictStrategy(object):
+    spaceconfig = {"objspace.std.withsmalldicts": True}
+
+    def test_create(self):
+        import __pypy__
+        d = {"a": 1, "b": 2}
+        assert __pypy__.strategy(d) == "SmallBytesDictStrategy"
+        d = dict(a=1, b=2)
+        assert __pypy__.strategy(d) == "SmallBytesDictStrategy"
+        d = {u"a": 1}
+        assert __pypy__.strategy(d) == "SmallUnicodeDictStrategy"
+        assert d[u"a"] == 1
+        assert d["a"] == 1
+
+    def test_order_and_iteration(self):
+        d = {}
+        for c in "hello world":
+            d[c] = d.get(c, 0) + 1
+        assert d.keys() == ["h", "e", "l", "o", " ", "w", "r", "d"]
+        assert d.values() == [1, 1, 3, 2, 1, 1, 1, 1]
+        assert list(d.iteritems()) == zip(d.keys(), d.values())
+        del d["o"]
+        d["o"] = 5
+        assert list(d)[-1] == "o"
+        assert d.popitem() == ("o", 5)
+
+    def test_grow(self):
+        import __pypy__
+        d = {}
+        for i in range(20):
+            d["k%d" % i] = i
+            if i < 8:
+                assert __pypy__.strategy(d) == "SmallBytesDictStrategy"
+        assert __pypy__.strategy(d) == "BytesDictStrategy"
+        assert d == dict([("k%d" % i, i) for i in range(20)])
+        u = {}
+        for i in range(20):
+            u[u"k%d" % i] = i
+        assert __pypy__.strategy(u) == "UnicodeDictStrategy"
+        assert sorted(u.values()) == range(20)
+
+    def test_update(self):
+        import __pypy__
+        d = {"a": 1}
+        d.update({"b": 2, "c": 3})
+        assert __pypy__.strategy(d) == "SmallBytesDictStrategy"
+        assert d == {"a": 1, "b": 2, "c": 3}
+        d.update(dict.fromkeys("defghijkl"))
+        assert __pypy__.strategy(d) == "BytesDictStrategy"
+        assert len(d) == 12
+
+    def test_devolve(self):
+        import __pypy__
+        d = {"a": 1, "b": 2}
+        assert d.get(1) is None
+        assert __pypy__.strategy(d) == "SmallBytesDictStrategy"
+        d[1] = 3
+        assert __pypy__.strategy(d) == "ObjectDictStrategy"
+        assert d == {"a": 1, "b": 2, 1: 3}
+        d = {u"a": 1}
+        d["b"] = 2
+        assert d == {u"a": 1, u"b": 2}
+
+    def test_iterate_while_devolving(self):
+        d = {"a": 1, "b": 2, "c": 3}
+        result = []
+        for key, value in d.iteritems():
+            result.append((key, value))
+            d.get(())
+        assert sorted(result) == [("a", 1), ("b", 2), ("c", 3)]
+
+    def test_setdefault_and_errors(self):
+        d = {"a": 1}
+        assert d.setdefault("a", 0) == 1
+        assert d.setdefault("b", 5) == 5
+        assert d == {"a": 1, "b": 5}
+        raises(KeyError, "d['x']")
+        raises(KeyError, "del d['x']")
+        d.clear()
+        raises(KeyError, d.popitem)
+
+    def test_reversed_dict(self):
+        import __pypy__
+        d = {"a": 1, "b": 2, "c": 3}
+        assert list(__pypy__.reversed_dict(d)) == ["c", "b", "a"]
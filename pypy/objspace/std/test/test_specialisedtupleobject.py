@@ -1,10 +1,11 @@
-from pypy.objspace.std.specialisedtupleobject import _specialisations
+from pypy.objspace.std.specialisedtupleobject import (_specialisations,
+    _array_specialisations)
 from pypy.objspace.std.test import test_tupleobject
 from pypy.objspace.std.tupleobject import W_TupleObject
 from pypy.tool.pytest.objspace import gettestobjspace
 
 
-for cls in _specialisations:
+for cls in _specialisations + _array_specialisations:
     globals()[cls.__name__] = cls
 
 
@@ -47,6 +48,36 @@ class TestW_SpecialisedTupleObject():
         hash_test([1, ()])
         hash_test([1, 2, 3], must_be_specialized=False)
 
+    def test_hash_against_normal_tuple_array(self):
+        def hash_test(values, expected_cls):
+            N_values_w = [self.space.wrap(value) for value in values]
+            S_values_w = [self.space.wrap(value) for value in values]
+            N_w_tuple = W_TupleObject(N_values_w)
+            S_w_tuple = self.space.newtuple(S_values_w)
+
+            assert type(S_w_tuple) is expected_cls
+            assert self.space.is_true(self.space.eq(N_w_tuple, S_w_tuple))
+            assert self.space.is_true(self.space.eq(S_w_tuple, N_w_tuple))
+            assert self.space.is_true(
+                    self.space.eq(self.space.hash(N_w_tuple),
+                                  self.space.hash(S_w_tuple)))
+
+        hash_test([1, 2, 3], W_ArrayTupleObject_i)
+        hash_test(range(100), W_ArrayTupleObject_i)
+        hash_test([1.5, 2.8, -0.0, 1e300], W_ArrayTupleObject_f)
+        hash_test(['a', 'b', 'arbitrary', 'strings'], W_ArrayTupleObject_s)
+
+    def test_array_not_for_mixed_items(self):
+        for values in [[1, 2, 3.5], [1, 'a', 2], [1.5, 2.5, None]]:
+            values_w = [self.space.wrap(value) for value in values]
+            w_tuple = self.space.newtuple(values_w)
+            assert type(w_tuple) is W_TupleObject
+
+    def test_array_items_are_unwrapped(self):
+        w_tuple = self.space.newtuple([self.space.wrap(i) for i in range(5)])
+        assert w_tuple.items == [0, 1, 2, 3, 4]
+        assert self.space.int_w(w_tuple.getitem(self.space, -1)) == 4
+
 
 class AppTestW_SpecialisedTupleObject:
     spaceconfig = {"objspace.std.withspecialisedtuple": True}
@@ -230,5 +261,67 @@ class AppTestW_SpecialisedTupleObject:
         assert (0.0, 0.0) == (-0.0, -0.0)
 
 
+class AppTestW_ArrayTupleObject:
+    spaceconfig = {"objspace.std.withspecialisedtuple": True}
+
+    def w_isarray(self, obj, expected=''):
+        import __pypy__
+        r = __pypy__.internal_repr(obj)
+        return ("ArrayTupleObject" + expected) in r
+
+    def test_createarraytuple(self):
+        assert self.isarray((1, 2, 3), '_i')
+        assert self.isarray(tuple(range(100)), '_i')
+        assert self.isarray((1.5, 2.5, 3.5, 4.5), '_f')
+        assert self.isarray(('a', 'b', 'c'), '_s')
+        assert not self.isarray((1, 2.5, 3))
+        assert not self.isarray((1, 2, True))
+        assert not self.isarray((u'a', u'b', u'c'))
+        assert not self.isarray((1, 2))
+
+    def test_operations(self):
+        t = tuple(range(10))
+        assert len(t) == 10
+        assert t[3] == 3
+        assert t[-1] == 9
+        raises(IndexError, "t[10]")
+        assert t[2:5] == (2, 3, 4)
+        assert list(t) == range(10)
+        assert 5 in t
+        assert 5.0 in t
+        assert 'a' not in t
+        assert t.index(7) == 7
+        assert t.count(1) == 1
+        assert t + (10,) == tuple(range(11))
+        assert t < (0, 1, 3)
+
+    def test_eq_hash(self):
+        a = (1, 2, 3)
+        b = (1,)
+        b += (2, 3)
+        assert a == b
+        assert hash(a) == hash(b)
+        assert a == (1.0, 2L, 3)
+        assert hash(a) == hash((1.0, 2L, 3))
+        assert a != (1, 2, 4)
+        assert a != (1, 2, 3, 4)
+        assert ('a', 'b', 'c') == ('a', 'b') + ('c',)
+        assert hash(('a', 'b', 'c')) == hash(('a', 'b') + ('c',))
+
+    def test_dict_keys(self):
+        d = {}
+        for i in range(100):
+            d[(i, i + 1, i + 2)] = i
+        for i in range(100):
+            assert d[(i, i + 1) + (i + 2,)] == i
+
+    def test_nans(self):
+        N = float('nan')
+        T = (N, N, N)
+        assert N in T
+        assert T == (N, N, N)
+        assert (0.0, 0.0, 0.0) == (-0.0, -0.0, -0.0)
+
+
 class AppTestAll(test_tupleobject.AppTestW_TupleObject):
     spaceconfig = {"objspace.std.withspecialisedtuple": True}
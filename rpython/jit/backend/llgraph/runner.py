@@ -232,6 +232,7 @@ class LLGraphCPU(model.AbstractCPU):
     supports_floats = True
     supports_longlong = r_uint is not r_ulonglong
     supports_singlefloats = True
+    supports_vectors = True
     translate_support_code = False
     is_llgraph = True
 
@@ -1047,6 +1048,33 @@ class LLFrame(object):
     def execute_keepalive(self, descr, x):
         pass
 
+    def execute_vec_raw_op(self, descr, *args):
+        # the two lanes are computed one after the other, which is what
+        # the backends must be equivalent to
+        from rpython.jit.metainterp.blackhole import BlackholeInterpreter
+        from rpython.jit.metainterp.resoperation import opname
+        arraydescr = descr.arraydescr
+        if descr.opnum == rop.SAME_AS:
+            func = lambda x: x
+        else:
+            name = 'bhimpl_' + opname[descr.opnum].lower()
+            func = BlackholeInterpreter.__dict__[name]
+        for lane in range(2):
+            base, index, step = args[:3]
+            values = []
+            i = 3
+            for kind in descr.kinds:
+                if kind == 'm':
+                    src, srcindex, srcstep = args[i:i + 3]
+                    values.append(self.cpu.bh_raw_load(
+                        src, srcindex + lane * srcstep, arraydescr))
+                    i += 3
+                else:
+                    values.append(args[i])
+                    i += 1
+            self.cpu.bh_raw_store(base, index + lane * step, func(*values),
+                                  arraydescr)
+
 
 def _getdescr(op):
     d = op.getdescr()
@@ -19,6 +19,9 @@ class AbstractCPU(object):
     # longlongs are supported by the JIT, but stored as doubles.
     # Boxes and Consts are BoxFloats and ConstFloats.
     supports_singlefloats = False
+    supports_vectors = False
+    # ^^^ True if the backend implements VEC_RAW_OP, see
+    # metainterp/optimizeopt/vectorize.py
 
     propagate_exception_descr = None
 
@@ -29,6 +29,8 @@ from rpython.rlib.objectmodel import we_are_translated
 from rpython.jit.backend.x86 import rx86, codebuf, callbuilder
 from rpython.jit.backend.x86.callbuilder import follow_jump
 from rpython.jit.metainterp.resoperation import rop
+from rpython.jit.metainterp.optimizeopt.vectorize import (VectorOpDescr,
+    VECTOR_ITEMSIZE)
 from rpython.jit.backend.x86 import support
 from rpython.rlib.debug import debug_print, debug_start, debug_stop
 from rpython.rlib import rgc
@@ -95,12 +97,13 @@ class Assembler386(BaseAssembler):
         float_constants = datablockwrapper.malloc_aligned(32, alignment=16)
         datablockwrapper.done()
         addr = rffi.cast(rffi.CArrayPtr(lltype.Char), float_constants)
-        qword_padding = '\x00\x00\x00\x00\x00\x00\x00\x00'
         # 0x8000000000000000
         neg_const = '\x00\x00\x00\x00\x00\x00\x00\x80'
         # 0x7FFFFFFFFFFFFFFF
         abs_const = '\xFF\xFF\xFF\xFF\xFF\xFF\xFF\x7F'
-        data = neg_const + qword_padding + abs_const + qword_padding
+        # both constants are repeated, for the vector version of the
+        # operations (see genop_discard_vec_raw_op())
+        data = neg_const + neg_const + abs_const + abs_const
         for i in range(len(data)):
             addr[i] = data[i]
         self.float_const_neg_addr = float_constants
@@ -1554,6 +1557,134 @@ class Assembler386(BaseAssembler):
         dest_addr = AddressLoc(base_loc, ofs_loc, 0, baseofs.value)
         self.save_into_mem(dest_addr, value_loc, size_loc)
 
+    def genop_discard_vec_raw_op(self, op, arglocs):
+        descr = op.getdescr()
+        assert isinstance(descr, VectorOpDescr)
+        ofs_loc, tmp_loc, xloc1, xloc2 = arglocs[:4]
+        assert isinstance(ofs_loc, ImmedLoc)
+        ofs = ofs_loc.value
+        locs = arglocs[4:]
+        # the destination and the items of arrays are lists [base, index,
+        # step], the scalar operands are lists [loc]
+        dst = locs[0:3]
+        operands = []
+        steps = [dst[2]]
+        i = 3
+        for kind in descr.kinds:
+            if kind == 'm':
+                operands.append(locs[i:i + 3])
+                steps.append(locs[i + 2])
+                i += 3
+            else:
+                operands.append(locs[i:i + 1])
+                i += 1
+        #
+        # The vector instructions can be used if all the steps are the
+        # size of the items, and if the first lane doesn't overwrite an
+        # item that the second lane reads, i.e. if we don't have
+        # 0 < dst - src < 16.  Otherwise, compute the two lanes one after
+        # the other.
+        slowpath_jumps = []
+        packed = True
+        for step_loc in steps:
+            if isinstance(step_loc, ImmedLoc):
+                if step_loc.value != VECTOR_ITEMSIZE:
+                    packed = False
+            else:
+                self.mc.CMP(step_loc, imm(VECTOR_ITEMSIZE))
+                self.mc.J_il(rx86.Conditions['NE'], 0)
+                slowpath_jumps.append(self.mc.get_relative_pos())
+        end_jump = -1
+        if packed:
+            for src in operands:
+                if len(src) == 3:
+                    self._vec_load_address(tmp_loc, dst, 0)
+                    self.mc.SUB(tmp_loc, src[0])
+                    self.mc.SUB(tmp_loc, src[1])
+                    self.mc.SUB(tmp_loc, imm1)
+                    self.mc.CMP(tmp_loc, imm(2 * VECTOR_ITEMSIZE - 1))
+                    self.mc.J_il(rx86.Conditions['B'], 0)
+                    slowpath_jumps.append(self.mc.get_relative_pos())
+            self._emit_vec_lanes(descr, ofs, tmp_loc, xloc1, xloc2, dst,
+                                 operands, -1)
+            self.mc.JMP_l(0)
+            self.mc.force_frame_size(DEFAULT_FRAME_BYTES)
+            end_jump = self.mc.get_relative_pos()
+        for pos in slowpath_jumps:
+            self.mc.overwrite32(pos - 4, self.mc.get_relative_pos() - pos)
+        for lane in range(2):
+            self._emit_vec_lanes(descr, ofs, tmp_loc, xloc1, xloc2, dst,
+                                 operands, lane)
+        if end_jump >= 0:
+            self.mc.overwrite32(end_jump - 4,
+                                self.mc.get_relative_pos() - end_jump)
+
+    def _vec_load_address(self, tmp_loc, mem, lane):
+        self.mc.MOV(tmp_loc, mem[0])
+        self.mc.ADD(tmp_loc, mem[1])
+        if lane == 1:
+            self.mc.ADD(tmp_loc, mem[2])
+
+    def _emit_vec_lanes(self, descr, ofs, tmp_loc, xloc1, xloc2, dst,
+                        operands, lane):
+        # lane == -1 means both lanes at once, with the vector instructions
+        is_float = descr.arraydescr.is_array_of_floats()
+        for i in range(len(operands)):
+            src = operands[i]
+            if i == 0:
+                xloc = xloc1
+            else:
+                xloc = xloc2
+            if len(src) == 3:
+                self._vec_load_address(tmp_loc, src, lane)
+                src_addr = AddressLoc(tmp_loc, imm0, 0, ofs)
+                if lane < 0:
+                    self.mc.MOVUPD(xloc, src_addr)
+                else:
+                    self.mc.MOVSD(xloc, src_addr)
+            elif is_float:
+                self.mc.MOVSD(xloc, src[0])
+                if lane < 0:
+                    self.mc.UNPCKLPD(xloc, xloc)
+            else:
+                self.mc.MOV(tmp_loc, src[0])
+                self.mc.MOVDQ(xloc, tmp_loc)
+                if lane < 0:
+                    self.mc.PUNPCKLQDQ(xloc, xloc)
+        #
+        opnum = descr.opnum
+        if opnum == rop.FLOAT_ADD:
+            self.mc.ADDPD(xloc1, xloc2)
+        elif opnum == rop.FLOAT_SUB:
+            self.mc.SUBPD(xloc1, xloc2)
+        elif opnum == rop.FLOAT_MUL:
+            self.mc.MULPD(xloc1, xloc2)
+        elif opnum == rop.FLOAT_TRUEDIV:
+            self.mc.DIVPD(xloc1, xloc2)
+        elif opnum == rop.FLOAT_NEG:
+            self.mc.XORPD(xloc1, heap(self.float_const_neg_addr))
+        elif opnum == rop.FLOAT_ABS:
+            self.mc.ANDPD(xloc1, heap(self.float_const_abs_addr))
+        elif opnum == rop.INT_ADD:
+            self.mc.PADDQ(xloc1, xloc2)
+        elif opnum == rop.INT_SUB:
+            self.mc.PSUBQ(xloc1, xloc2)
+        elif opnum == rop.INT_AND:
+            self.mc.PAND(xloc1, xloc2)
+        elif opnum == rop.INT_OR:
+            self.mc.POR(xloc1, xloc2)
+        elif opnum == rop.INT_XOR:
+            self.mc.PXOR(xloc1, xloc2)
+        else:
+            assert opnum == rop.SAME_AS
+        #
+        self._vec_load_address(tmp_loc, dst, lane)
+        dest_addr = AddressLoc(tmp_loc, imm0, 0, ofs)
+        if lane < 0:
+            self.mc.MOVUPD(dest_addr, xloc1)
+        else:
+            self.mc.MOVSD(dest_addr, xloc1)
+
     def genop_discard_strsetitem(self, op, arglocs):
         base_loc, ofs_loc, val_loc = arglocs
         basesize, itemsize, ofs_length = symbolic.get_array_token(rstr.STR,
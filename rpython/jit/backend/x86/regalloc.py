@@ -23,6 +23,7 @@ from rpython.jit.codewriter import longlong
 from rpython.jit.codewriter.effectinfo import EffectInfo
 from rpython.jit.metainterp.history import (Box, Const, ConstInt, ConstPtr,
     ConstFloat, BoxInt, BoxFloat, INT, REF, FLOAT, TargetToken)
+from rpython.jit.metainterp.optimizeopt.vectorize import VectorOpDescr
 from rpython.jit.metainterp.resoperation import rop, ResOperation
 from rpython.rlib import rgc
 from rpython.rlib.objectmodel import we_are_translated
@@ -1043,6 +1044,26 @@ class RegAlloc(BaseRegalloc):
     consider_setarrayitem_raw = consider_setarrayitem_gc
     consider_raw_store = consider_setarrayitem_gc
 
+    def consider_vec_raw_op(self, op):
+        descr = op.getdescr()
+        assert isinstance(descr, VectorOpDescr)
+        _, ofs, _ = unpack_arraydescr(descr.arraydescr)
+        tmpbox = TempBox()
+        xtmpbox1 = TempBox()
+        xtmpbox2 = TempBox()
+        tmp_loc = self.rm.force_allocate_reg(tmpbox)
+        xtmp_loc1 = self.xrm.force_allocate_reg(xtmpbox1)
+        xtmp_loc2 = self.xrm.force_allocate_reg(xtmpbox2, [xtmpbox1])
+        # there can be many arguments: take them from wherever they are,
+        # after the allocations above, which might have spilled some of them
+        arglocs = [imm(ofs), tmp_loc, xtmp_loc1, xtmp_loc2]
+        for arg in op.getarglist():
+            arglocs.append(self.loc(arg))
+        self.rm.possibly_free_var(tmpbox)
+        self.xrm.possibly_free_var(xtmpbox1)
+        self.xrm.possibly_free_var(xtmpbox2)
+        self.perform_discard(op, arglocs)
+
     def consider_getfield_gc(self, op):
         ofs, size, sign = unpack_fielddescr(op.getdescr())
         ofs_loc = imm(ofs)
@@ -19,6 +19,7 @@ class AbstractX86CPU(AbstractLLCPU):
     debug = True
     supports_floats = True
     supports_singlefloats = True
+    supports_vectors = True
 
     dont_keepalive_stuff = False # for tests
     with_threads = False
@@ -152,6 +153,7 @@ class CPU386(AbstractX86CPU):
 class CPU386_NO_SSE2(CPU386):
     supports_floats = False
     supports_longlong = False
+    supports_vectors = False
 
 class CPU_X86_64(AbstractX86CPU):
     backend_name = 'x86_64'
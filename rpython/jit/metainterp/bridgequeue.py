@@ -0,0 +1,114 @@
+import weakref
+from rpython.rlib.debug import debug_start, debug_print, debug_stop
+from rpython.jit.metainterp.history import JitCellToken, TargetToken
+from rpython.jit.metainterp.resoperation import rop
+
+#
+# Deferred generation of the machine code of bridges.
+#
+# When the 'deferred_bridges' parameter is set, a bridge is traced and
+# optimized as usual when its guard fails often enough, but its machine
+# code is not generated immediately.  Instead, it is put in the queue
+# below, and the guard keeps failing into the blackhole interpreter.
+# The queue is emptied by compile_pending() when the program has time
+# to spare, e.g. between two requests; see the jit_hooks helper
+# compile_pending_bridges().  A bridge whose guard keeps failing
+# 'trace_eagerness' more times before that is generated immediately,
+# like it would be without this parameter, and so is the oldest bridge
+# of the queue when it is full.
+#
+# The optimized bridge depends on the loops it jumps to and on the
+# quasi-immutable fields it reads: we record them immediately.  If the
+# loop that contains the guard is freed or invalidated before the bridge
+# is generated, the bridge is thrown away.
+#
+
+MAX_PENDING_BRIDGES = 100
+
+
+class PendingBridge(object):
+    def __init__(self, jitdriver_sd, faildescr, inputargs, loop,
+                 original_loop_token):
+        self.jitdriver_sd = jitdriver_sd
+        self.faildescr = faildescr
+        self.inputargs = inputargs
+        self.loop = loop
+        self.wref_loop_token = weakref.ref(original_loop_token)
+
+
+class BridgeQueue(object):
+
+    def __init__(self):
+        self.enabled = False
+        self.pending = []
+        self.assembled = 0
+        self.dropped = 0
+
+    def can_defer(self, loop):
+        if not self.enabled:
+            return False
+        # a bridge made by retracing contains a LABEL that other traces
+        # may start jumping to as soon as they are optimized
+        for op in loop.operations:
+            if op.getopnum() == rop.LABEL:
+                return False
+        return True
+
+    def add(self, metainterp_sd, jitdriver_sd, faildescr, inputargs, loop):
+        original_loop_token = loop.original_jitcell_token
+        for op in loop.operations:
+            descr = op.getdescr()
+            if isinstance(descr, TargetToken):
+                descr = descr.original_jitcell_token
+            if (isinstance(descr, JitCellToken) and
+                    descr is not original_loop_token):
+                original_loop_token.record_jump_to(descr)
+        if loop.quasi_immutable_deps is not None:
+            wref = weakref.ref(original_loop_token)
+            for qmut in loop.quasi_immutable_deps:
+                qmut.register_loop_token(wref)
+            loop.quasi_immutable_deps = None
+        # only the weakref keeps the loop alive until the bridge is ready
+        loop.original_jitcell_token = None
+        if len(self.pending) >= MAX_PENDING_BRIDGES:
+            self._assemble(metainterp_sd, self.pending.pop(0))
+        self.pending.append(PendingBridge(jitdriver_sd, faildescr, inputargs,
+                                          loop, original_loop_token))
+
+    def assemble_now(self, metainterp_sd, faildescr):
+        """Called when 'faildescr' failed often enough to be traced.
+        If it already has a bridge in the queue, generate it now and
+        return True."""
+        for i in range(len(self.pending)):
+            if self.pending[i].faildescr is faildescr:
+                return self._assemble(metainterp_sd, self.pending.pop(i))
+        return False
+
+    def compile_pending(self, metainterp_sd, max_count):
+        """Generate the machine code of the oldest 'max_count' bridges of
+        the queue, or all of them if max_count < 0.  Returns the number
+        of bridges that were generated."""
+        count = 0
+        while self.pending and count != max_count:
+            if self._assemble(metainterp_sd, self.pending.pop(0)):
+                count += 1
+        return count
+
+    def _assemble(self, metainterp_sd, pending):
+        from rpython.jit.metainterp.compile import (send_bridge_to_backend,
+                                                    record_loop_or_bridge)
+        original_loop_token = pending.wref_loop_token()
+        if original_loop_token is None or original_loop_token.invalidated:
+            debug_start("jit-bridge-dropped")
+            debug_print("dropped a pending bridge")
+            debug_stop("jit-bridge-dropped")
+            self.dropped += 1
+            return False
+        loop = pending.loop
+        loop.original_jitcell_token = original_loop_token
+        send_bridge_to_backend(pending.jitdriver_sd, metainterp_sd,
+                               pending.faildescr, pending.inputargs,
+                               loop.operations, original_loop_token)
+        record_loop_or_bridge(metainterp_sd, loop)
+        self.assembled += 1
+        return True
@@ -15,6 +15,7 @@ from rpython.jit.metainterp.history import (TreeLoop, Box, JitCellToken,
 from rpython.jit.metainterp import history, jitexc
 from rpython.jit.metainterp.optimize import InvalidLoop
 from rpython.jit.metainterp.inliner import Inliner
+from rpython.jit.metainterp.jitlog import guard_number
 from rpython.jit.metainterp.resume import NUMBERING, PENDINGFIELDSP, ResumeDataDirectReader
 from rpython.jit.codewriter import heaptracker, longlong
 
@@ -253,12 +254,9 @@ def compile_retrace(metainterp, greenkey, start,
     for box in loop.inputargs:
         assert isinstance(box, Box)
 
-    target_token = loop.operations[-1].getdescr()
-    resumekey.compile_and_attach(metainterp, loop)
-
     target_token = label.getdescr()
     assert isinstance(target_token, TargetToken)
-    record_loop_or_bridge(metainterp_sd, loop)
+    resumekey.compile_and_attach(metainterp, loop)
     return target_token
 
 def patch_new_loop_to_load_virtualizable_fields(loop, jitdriver_sd):
@@ -372,9 +370,17 @@ def send_loop_to_backend(greenkey, jitdriver_sd, metainterp_sd, loop, type):
     metainterp_sd.logger_ops.log_loop(loop.inputargs, loop.operations, n,
                                       type, ops_offset,
                                       name=loopname)
+    if metainterp_sd.jitlog.is_enabled():
+        metainterp_sd.jitlog.log_trace(type, n,
+            jitdriver_sd.warmstate.compute_location_str(greenkey),
+            asminfo, loop.inputargs, loop.operations)
     #
     if metainterp_sd.warmrunnerdesc is not None:    # for tests
-        metainterp_sd.warmrunnerdesc.memory_manager.keep_loop_alive(original_jitcell_token)
+        memmgr = metainterp_sd.warmrunnerdesc.memory_manager
+        memmgr.keep_loop_alive(original_jitcell_token)
+        memmgr.record_new_loop(original_jitcell_token,
+                    jitdriver_sd.warmstate.get_greenkey_hash(greenkey),
+                    get_code_size(asminfo, operations))
 
 def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
                            operations, original_loop_token):
@@ -414,10 +420,20 @@ def send_bridge_to_backend(jitdriver_sd, metainterp_sd, faildescr, inputargs,
         ops_offset = None
     metainterp_sd.logger_ops.log_bridge(inputargs, operations, None, faildescr,
                                         ops_offset)
+    if metainterp_sd.jitlog.is_enabled():
+        metainterp_sd.jitlog.log_trace('bridge', guard_number(faildescr), '',
+                                       asminfo, inputargs, operations)
     #
-    #if metainterp_sd.warmrunnerdesc is not None:    # for tests
-    #    metainterp_sd.warmrunnerdesc.memory_manager.keep_loop_alive(
-    #        original_loop_token)
+    if metainterp_sd.warmrunnerdesc is not None:    # for tests
+        metainterp_sd.warmrunnerdesc.memory_manager.add_code_size(
+            original_loop_token, get_code_size(asminfo, operations))
+
+def get_code_size(asminfo, operations):
+    if asminfo is not None:
+        return asminfo.asmlen
+    # the backend doesn't report it (e.g. llgraph): use the number of
+    # operations, which is good enough for the tests
+    return len(operations)
 
 # ____________________________________________________________
 
@@ -493,7 +509,8 @@ class ResumeDescr(AbstractFailDescr):
 
 class ResumeGuardDescr(ResumeDescr):
     _attrs_ = ('rd_numb', 'rd_count', 'rd_consts', 'rd_virtuals',
-               'rd_frame_info_list', 'rd_pendingfields', 'status')
+               'rd_frame_info_list', 'rd_pendingfields', 'status',
+               'guard_failures')
     
     rd_numb = lltype.nullptr(NUMBERING)
     rd_count = 0
@@ -503,6 +520,7 @@ class ResumeGuardDescr(ResumeDescr):
     rd_pendingfields = lltype.nullptr(PENDINGFIELDSP.TO)
 
     status = r_uint(0)
+    guard_failures = 0     # see jitprof.GuardFailureCounts
 
     def copy_all_attributes_from(self, other):
         assert isinstance(other, ResumeGuardDescr)
@@ -535,7 +553,13 @@ class ResumeGuardDescr(ResumeDescr):
             self.status = hash & self.ST_SHIFT_MASK
 
     def handle_fail(self, deadframe, metainterp_sd, jitdriver_sd):
-        if self.must_compile(deadframe, metainterp_sd, jitdriver_sd):
+        if metainterp_sd.jitlog.is_enabled():
+            metainterp_sd.jitlog.log_guard_failure(self)
+        if metainterp_sd.guard_failures.enabled:
+            metainterp_sd.guard_failures.count(self)
+        if (self.must_compile(deadframe, metainterp_sd, jitdriver_sd) and
+                not metainterp_sd.bridge_queue.assemble_now(metainterp_sd,
+                                                            self)):
             self.start_compiling()
             try:
                 self._trace_and_compile_from_bridge(deadframe, metainterp_sd,
@@ -628,9 +652,17 @@ class ResumeGuardDescr(ResumeDescr):
         if not we_are_translated():
             self._debug_suboperations = new_loop.operations
         propagate_original_jitcell_token(new_loop)
-        send_bridge_to_backend(metainterp.jitdriver_sd, metainterp.staticdata,
+        metainterp_sd = metainterp.staticdata
+        if metainterp_sd.bridge_queue.can_defer(new_loop):
+            # generate the machine code later, see bridgequeue.py
+            metainterp_sd.bridge_queue.add(metainterp_sd,
+                                           metainterp.jitdriver_sd, self,
+                                           inputargs, new_loop)
+            return
+        send_bridge_to_backend(metainterp.jitdriver_sd, metainterp_sd,
                                self, inputargs, new_loop.operations,
                                new_loop.original_jitcell_token)
+        record_loop_or_bridge(metainterp_sd, new_loop)
 
     def make_a_counter_per_value(self, guard_value_op):
         assert guard_value_op.getopnum() == rop.GUARD_VALUE
@@ -821,6 +853,7 @@ class ResumeFromInterpDescr(ResumeDescr):
         jitdriver_sd.warmstate.attach_procedure_to_interp(
             self.original_greenkey, jitcell_token)
         metainterp_sd.stats.add_jitcell_token(jitcell_token)
+        record_loop_or_bridge(metainterp_sd, new_loop)
 
 
 def compile_trace(metainterp, resumekey):
@@ -861,7 +894,6 @@ def compile_trace(metainterp, resumekey):
         # know exactly what we must do (ResumeGuardDescr/ResumeFromInterpDescr)
         target_token = new_trace.operations[-1].getdescr()
         resumekey.compile_and_attach(metainterp, new_trace)
-        record_loop_or_bridge(metainterp_sd, new_trace)
         return target_token
     else:
         metainterp.retrace_needed(new_trace, state)
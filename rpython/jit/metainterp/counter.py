@@ -19,7 +19,7 @@ class JitCounter:
 
     * It maps greenkey hashes to counters, to know when we have seen this
       greenkey enough to reach the 'threshold' or 'function_threshold'
-      parameters.  This is done in a lossy way by a fixed-size 'timetable'.
+      parameters.  This is done in a lossy way by the 'timetable'.
 
     * It handles the counters on the failing guards, for 'trace_eagerness'.
       This is done in the same 'timetable'.
@@ -28,7 +28,7 @@ class JitCounter:
       a loop, in a non-lossy dictionary-like strurcture.  This is done
       in the 'celltable'.
 
-    The 'timetable' is a table of DEFAULT_SIZE entries, each of which
+    The 'timetable' is a table of 'size' entries, each of which
     containing 5 entries.  From a hash value, we use the index number
     '_get_index(hash)', and then we look in all five entries for a
     matching '_get_subhash(hash)'.  The five entries are roughly kept
@@ -78,8 +78,19 @@ class JitCounter:
     'cleanup_chain(hash)' resets the timetable's 'hash' entry and
     cleans up the celltable at 'hash'.  It removes those JitCells
     for which 'cell.should_remove_jitcell()' returns True.
+
+    The size of both tables can grow while the program runs, up to
+    MAX_SIZE.  'maybe_grow()' is called before we start tracing; it
+    doubles the size if too many of the recent new counters had to
+    evict another counter of their 5-ways entry.  'set_fixed_size(size)'
+    (the 'counter_table_size' parameter) instead grows the tables to
+    the given size once and disables the automatic growth.  Growing
+    loses nothing: each entry of the timetable is copied to all the
+    new entries that its hashes can now be found at, and each JitCell
+    is moved to the chain of its new index.
     """
     DEFAULT_SIZE = 2048
+    MAX_SIZE = 65536     # the index must not use the bits of the subhash
 
     def __init__(self, size=DEFAULT_SIZE, translator=None):
         "NOT_RPYTHON"
@@ -89,6 +100,19 @@ class JitCounter:
             self.shift += 1
             assert self.shift < 999, "size is not a power of two <= 2**16"
         #
+        # Statistics about the timetable, and the automatic growth.
+        # 'new_counters' is the number of counters added to an entry,
+        # and 'evicted_counters' how many of them replaced a counter
+        # that was not zero.
+        self.new_counters = 0
+        self.evicted_counters = 0
+        self.resizes = 0
+        self.fixed_size = False
+        self._new_counters_seen = 0
+        self._evicted_counters_seen = 0
+        # the initial timetable is prebuilt, and must not be freed
+        self._timetable_is_prebuilt = True
+        #
         # The table of timings.  This is a 5-ways associative cache.
         # We index into it using a number between 0 and (size - 1),
         # and we're getting a 32-bytes-long entry; then this entry
@@ -178,6 +202,9 @@ class JitCounter:
             n = 4
             while n > 0 and float(p_entry.times[n - 1]) == 0.0:
                 n -= 1
+            self.new_counters += 1
+            if float(p_entry.times[n]) != 0.0:
+                self.evicted_counters += 1
             p_entry.subhashes[n] = rffi.cast(rffi.USHORT, subhash)
             p_entry.times[n] = r_singlefloat(0.0)
         return n
@@ -255,6 +282,81 @@ class JitCounter:
             cell = nextcell
         self.celltable[index] = keep
 
+    def maybe_grow(self):
+        """Called before we start tracing.  Looks at the counters added
+        to the timetable since the previous check; if more than a
+        quarter of them evicted another counter, double the size."""
+        new = self.new_counters - self._new_counters_seen
+        if new < self.size // 2:
+            return     # not enough new counters since the previous check
+        evicted = self.evicted_counters - self._evicted_counters_seen
+        self._new_counters_seen = self.new_counters
+        self._evicted_counters_seen = self.evicted_counters
+        if self.fixed_size or self.size >= self.MAX_SIZE:
+            return
+        if evicted * 4 > new:
+            self.resize(self.size * 2)
+
+    def set_fixed_size(self, size):
+        """Grow the tables to 'size' entries, rounded up to a power of two,
+        and stop growing them automatically.  A size <= 0 enables the
+        automatic growth again.  The tables never shrink."""
+        if size <= 0:
+            self.fixed_size = False
+            return
+        self.fixed_size = True
+        newsize = 1
+        while newsize < size and newsize < self.MAX_SIZE:
+            newsize *= 2
+        self.resize(newsize)
+
+    def resize(self, newsize):
+        """Grow the timetable and the celltable to 'newsize' entries,
+        which must be a power of two."""
+        oldsize = self.size
+        if newsize <= oldsize:
+            return
+        factor = newsize // oldsize
+        oldtable = self.timetable
+        newtable = lltype.malloc(rffi.CArray(ENTRY), newsize,
+                                 flavor='raw', zero=True,
+                                 track_allocation=False)
+        # the hashes found at the old index i are now found at one of the
+        # indexes i * factor + j; copy the entry to all of them.  The
+        # copies that no hash maps to any more are eventually evicted.
+        for i in range(oldsize):
+            p_src = oldtable[i]
+            for j in range(factor):
+                p_dst = newtable[i * factor + j]
+                for k in range(5):
+                    p_dst.times[k] = p_src.times[k]
+                    p_dst.subhashes[k] = p_src.subhashes[k]
+        # switch to the new timetable before any GC allocation, because
+        # a minor collection calls decay_all_counters()
+        shift = self.shift
+        size = oldsize
+        while size < newsize:
+            size *= 2
+            shift -= 1
+        self.timetable = newtable
+        self.size = newsize
+        self.shift = shift
+        if self._timetable_is_prebuilt:
+            self._timetable_is_prebuilt = False
+        else:
+            lltype.free(oldtable, flavor='raw', track_allocation=False)
+        #
+        oldcells = self.celltable
+        self.celltable = [None] * newsize
+        for cell in oldcells:
+            while cell is not None:
+                nextcell = cell.next
+                index = self._get_index(cell.get_cell_uhash())
+                cell.next = self.celltable[index]
+                self.celltable[index] = cell
+                cell = nextcell
+        self.resizes += 1
+
     def set_decay(self, decay):
         """Set the decay, from 0 (none) to 1000 (max)."""
         if decay < 0:
@@ -319,6 +421,11 @@ class DeterministicJitCounter(JitCounter):
         "NOT_RPYTHON"
         return hash
 
+    def resize(self, newsize):
+        "NOT_RPYTHON"
+        # nothing to do: the tables are dicts indexed by the full hash
+        pass
+
     def decay_all_counters(self):
         "NOT_RPYTHON"
         pass
@@ -333,6 +333,7 @@ def _make_execute_list():
                          rop.LEAVE_PORTAL_FRAME,
                          rop.SETARRAYITEM_RAW,
                          rop.SETINTERIORFIELD_RAW,
+                         rop.VEC_RAW_OP,
                          rop.CALL_RELEASE_GIL,
                          rop.QUASIIMMUT_FIELD,
                          rop.CALL_MALLOC_GC,
@@ -2,7 +2,7 @@ from rpython.rtyper.extregistry import ExtRegistryEntry
 from rpython.rtyper.lltypesystem import lltype, llmemory, rffi
 from rpython.rlib.objectmodel import we_are_translated, Symbolic
 from rpython.rlib.objectmodel import compute_unique_id
-from rpython.rlib.rarithmetic import r_int64, is_valid_int
+from rpython.rlib.rarithmetic import r_int64, r_uint, is_valid_int
 
 from rpython.conftest import option
 
@@ -572,6 +572,12 @@ class JitCellToken(AbstractDescr):
     # and more data specified by the backend when the loop is compiled
     number = -1
     generation = r_int64(0)
+    # for the MemoryManager's code budget: the number of generations in
+    # which the loop ran, the size of its code and bridges, and the hash
+    # of its greenkey (0 if unknown)
+    use_count = 0
+    code_size = 0
+    greenkey_hash = r_uint(0)
     # one purpose of LoopToken is to keep alive the CompiledLoopToken
     # returned by the backend.  When the LoopToken goes away, the
     # CompiledLoopToken has its __del__ called, which frees the assembler
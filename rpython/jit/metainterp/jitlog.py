@@ -0,0 +1,236 @@
+"""A compact binary log of what the JIT does, written to the file given
+by the environment variable JITLOG.  Unlike the text logs of PYPYLOG, it
+is cheap enough to be left enabled in long-running processes: it is only
+written to when compiling, aborting, or leaving the assembler through a
+guard, and it goes through a buffer.  See
+rpython/tool/jitlogparser/jitlog.py for a reader.
+
+The file starts with JITLOG_HEADER, followed by records.  Each record
+starts with one of the MARK_xxx characters.  Integers are written as
+zigzag-encoded varints, and strings as the index of an entry in a table
+of strings, which is filled by MARK_STRING records:
+
+    MARK_STRING      index, length, bytes
+    MARK_RESET       (the table of strings is cleared)
+    MARK_TRACE       type, number, name, asm address, asm size,
+                     number of inputargs, inputargs,
+                     number of operations, operations
+    MARK_ABORT       reason, name
+    MARK_GUARD_FAILURES
+                     number of guards, (guard number, count) for each
+
+'type' is 'loop', 'entry bridge' or 'bridge'.  'number' is the number
+of the loop, or the number of the guard that a bridge comes from.
+'name' is the location given by get_printable_location(), or an empty
+string for bridges.  Every operation is written as:
+
+    flags, opname, result (or -1), number of args, args,
+    [descr if FLAG_DESCR], [guard number, number of failargs, failargs
+    if FLAG_GUARD], [offset in the assembler if FLAG_OFFSET]
+
+with the boxes and constants written as strings, like 'i5' or '42'.
+The args of a debug_merge_point are its call depth, its call id and its
+location.  The guard failure counts are the number of times each guard
+failed since the previous MARK_GUARD_FAILURES.
+"""
+
+import os
+
+from rpython.jit.metainterp.resoperation import rop
+from rpython.rlib.objectmodel import compute_unique_id
+from rpython.rlib.rarithmetic import r_uint, intmask, LONG_BIT
+from rpython.rlib.rstring import StringBuilder
+
+JITLOG_VERSION = 1
+JITLOG_HEADER = 'JITLOG%c' % JITLOG_VERSION
+
+MARK_STRING = 's'
+MARK_RESET = 'r'
+MARK_TRACE = 't'
+MARK_ABORT = 'a'
+MARK_GUARD_FAILURES = 'g'
+
+FLAG_DESCR = 0x01
+FLAG_GUARD = 0x02
+FLAG_OFFSET = 0x04
+
+BUFFER_SIZE = 65536        # write to the file when the buffer is that big
+MAX_STRINGS = 65536        # clear the table of strings when that big
+GUARD_FAILURES_BATCH = 10000   # write the counts after that many failures
+
+
+def encode_varint(builder, value):
+    # zigzag encoding, so that small negative numbers are small too
+    u = (r_uint(value) << 1) ^ r_uint(value >> (LONG_BIT - 1))
+    while u >= 0x80:
+        builder.append(chr(intmask(u & 0x7f) | 0x80))
+        u >>= 7
+    builder.append(chr(intmask(u)))
+
+def guard_number(descr):
+    return compute_unique_id(descr)
+
+
+class JitLog(object):
+    fd = -1
+
+    def __init__(self, metainterp_sd):
+        self.metainterp_sd = metainterp_sd
+        self.buffer = StringBuilder()
+        self.strings = {}
+        self.guard_failures = {}
+        self.pending_guard_failures = 0
+
+    def setup_once(self):
+        filename = os.environ.get('JITLOG')
+        if filename:
+            self.open(filename)
+
+    def open(self, filename):
+        fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0666)
+        self.enable(fd)
+
+    def enable(self, fd):
+        self.fd = fd
+        self.buffer.append(JITLOG_HEADER)
+
+    def is_enabled(self):
+        return self.fd >= 0
+
+    def finish(self):
+        if not self.is_enabled():
+            return
+        self._write_guard_failures()
+        self.flush()
+
+    def flush(self):
+        data = self.buffer.build()
+        self.buffer = StringBuilder()
+        while data:
+            n = os.write(self.fd, data)
+            data = data[n:]
+
+    # ----------
+
+    def _intern(self, s):
+        try:
+            return self.strings[s]
+        except KeyError:
+            index = len(self.strings)
+            self.strings[s] = index
+            self.buffer.append(MARK_STRING)
+            encode_varint(self.buffer, index)
+            encode_varint(self.buffer, len(s))
+            self.buffer.append(s)
+            return index
+
+    def _start_record(self):
+        if len(self.strings) >= MAX_STRINGS:
+            self.strings.clear()
+            self.buffer.append(MARK_RESET)
+        return StringBuilder()
+
+    def _end_record(self, record):
+        self.buffer.append(record.build())
+        if self.buffer.getlength() >= BUFFER_SIZE:
+            self.flush()
+
+    def _write_string(self, record, s):
+        encode_varint(record, self._intern(s))
+
+    # ----------
+
+    def log_trace(self, type, number, name, asminfo, inputargs, operations):
+        record = self._start_record()
+        record.append(MARK_TRACE)
+        self._write_string(record, type)
+        encode_varint(record, number)
+        self._write_string(record, name)
+        if asminfo is not None:
+            encode_varint(record, asminfo.asmaddr)
+            encode_varint(record, asminfo.asmlen)
+            ops_offset = asminfo.ops_offset
+        else:
+            encode_varint(record, 0)
+            encode_varint(record, 0)
+            ops_offset = None
+        logops = self.metainterp_sd.logger_ops._make_log_operations()
+        encode_varint(record, len(inputargs))
+        for arg in inputargs:
+            self._write_string(record, logops.repr_of_arg(arg))
+        encode_varint(record, len(operations))
+        for op in operations:
+            self._write_operation(record, logops, op, ops_offset)
+        self._end_record(record)
+
+    def _write_operation(self, record, logops, op, ops_offset):
+        descr = op.getdescr()
+        is_guard = op.is_guard()
+        offset = -1
+        if ops_offset is not None:
+            offset = ops_offset.get(op, -1)
+        flags = 0
+        if descr is not None and not is_guard:
+            flags |= FLAG_DESCR
+        if is_guard:
+            flags |= FLAG_GUARD
+        if offset != -1:
+            flags |= FLAG_OFFSET
+        record.append(chr(flags))
+        self._write_string(record, op.getopname())
+        if op.result is not None:
+            self._write_string(record, logops.repr_of_arg(op.result))
+        else:
+            encode_varint(record, -1)
+        if op.getopnum() == rop.DEBUG_MERGE_POINT:
+            jd_sd = self.metainterp_sd.jitdrivers_sd[op.getarg(0).getint()]
+            location = jd_sd.warmstate.compute_location_str(
+                op.getarglist()[3:])
+            encode_varint(record, 3)
+            self._write_string(record, str(op.getarg(1).getint()))
+            self._write_string(record, str(op.getarg(2).getint()))
+            self._write_string(record, location)
+        else:
+            encode_varint(record, op.numargs())
+            for i in range(op.numargs()):
+                self._write_string(record, logops.repr_of_arg(op.getarg(i)))
+        if flags & FLAG_DESCR:
+            self._write_string(record, logops.repr_of_descr(descr))
+        if flags & FLAG_GUARD:
+            encode_varint(record, guard_number(descr))
+            failargs = op.getfailargs()
+            if failargs is None:
+                encode_varint(record, 0)
+            else:
+                encode_varint(record, len(failargs))
+                for arg in failargs:
+                    self._write_string(record, logops.repr_of_arg(arg))
+        if flags & FLAG_OFFSET:
+            encode_varint(record, offset)
+
+    def log_abort(self, reason_name, name):
+        record = self._start_record()
+        record.append(MARK_ABORT)
+        self._write_string(record, reason_name)
+        self._write_string(record, name)
+        self._end_record(record)
+
+    def log_guard_failure(self, descr):
+        number = guard_number(descr)
+        self.guard_failures[number] = self.guard_failures.get(number, 0) + 1
+        self.pending_guard_failures += 1
+        if self.pending_guard_failures >= GUARD_FAILURES_BATCH:
+            self._write_guard_failures()
+
+    def _write_guard_failures(self):
+        if not self.guard_failures:
+            return
+        record = self._start_record()
+        record.append(MARK_GUARD_FAILURES)
+        encode_varint(record, len(self.guard_failures))
+        for number, count in self.guard_failures.items():
+            encode_varint(record, number)
+            encode_varint(record, count)
+        self.guard_failures.clear()
+        self.pending_guard_failures = 0
+        self._end_record(record)
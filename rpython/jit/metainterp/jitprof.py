@@ -3,6 +3,7 @@
 """
 
 import time
+import weakref
 from rpython.rlib.debug import debug_print, debug_start, debug_stop
 from rpython.rlib.debug import have_debug_prints
 from rpython.jit.metainterp.jitexc import JitException
@@ -154,6 +155,10 @@ class Profiler(BaseProfiler):
         self._print_intline("nvirtuals", cnt[Counters.NVIRTUALS])
         self._print_intline("nvholes", cnt[Counters.NVHOLES])
         self._print_intline("nvreused", cnt[Counters.NVREUSED])
+        self._print_intline("numberings", cnt[Counters.NUMBERINGS])
+        self._print_intline("numberings shared",
+                            cnt[Counters.NUMBERINGS_SHARED])
+        self._print_intline("numbering bytes", cnt[Counters.NUMBERING_BYTES])
         cpu = self.cpu
         if cpu is not None:   # for some tests
             self._print_intline("Total # of loops",
@@ -175,5 +180,58 @@ class Profiler(BaseProfiler):
         debug_print(final)
 
 
+# the number of weakrefs above which GuardFailureCounts drops the dead ones
+GUARD_FAILURES_PRUNE_MIN = 64
+
+class GuardFailureCounts(object):
+    """The exact number of times each guard failed.  Unlike the counters
+    that decide when to compile a bridge, these are not hashed and do not
+    decay.  Only counted while enabled.  The count is stored on the descr
+    of the guard (ResumeGuardDescr.guard_failures), and only weakrefs to
+    the descrs that failed are kept here: the counts go away with the
+    loops freed by the memory manager.
+    """
+    enabled = False
+
+    def __init__(self):
+        self.descr_wrefs = []
+        self.prune_limit = GUARD_FAILURES_PRUNE_MIN
+
+    def set_enabled(self, flag):
+        self.enabled = flag
+
+    def count(self, descr):
+        if descr.guard_failures == 0:
+            if len(self.descr_wrefs) >= self.prune_limit:
+                self._prune()
+            self.descr_wrefs.append(weakref.ref(descr))
+        descr.guard_failures += 1
+
+    def _prune(self):
+        self.descr_wrefs = [wref for wref in self.descr_wrefs
+                                 if wref() is not None]
+        self.prune_limit = max(len(self.descr_wrefs) * 2,
+                               GUARD_FAILURES_PRUNE_MIN)
+
+    def get_descrs(self):
+        """Return the descrs of the guards that failed and are still
+        alive."""
+        self._prune()
+        result = []
+        for wref in self.descr_wrefs:
+            descr = wref()
+            if descr is not None:
+                result.append(descr)
+        return result
+
+    def reset(self):
+        for wref in self.descr_wrefs:
+            descr = wref()
+            if descr is not None:
+                descr.guard_failures = 0
+        self.descr_wrefs = []
+        self.prune_limit = GUARD_FAILURES_PRUNE_MIN
+
+
 class BrokenProfilerData(JitException):
     pass
@@ -1,6 +1,7 @@
 import math
-from rpython.rlib.rarithmetic import r_int64
+from rpython.rlib.rarithmetic import r_int64, r_uint
 from rpython.rlib.debug import debug_start, debug_print, debug_stop
+from rpython.rlib.listsort import make_timsort_class
 from rpython.rlib.objectmodel import we_are_translated
 
 #
@@ -19,6 +20,30 @@ from rpython.rlib.objectmodel import we_are_translated
 # 'generation' field is much smaller than the current generation, and
 # removed from the set.
 #
+# Independently, a budget can be given for the total size of the machine
+# code of the loops in 'alive_loops' (the 'loop_code_budget' parameter).
+# When it is exceeded, loops are removed until the total falls below
+# 3/4 of the budget, starting with the ones that cost the most for the
+# least use: the score of a loop is its age in generations, times its
+# code size (bridges included), divided by the number of generations in
+# which it ran.  This number of uses is halved after each eviction, so
+# that loops that were hot in an earlier phase of the program do not
+# stay forever.  Loops that ran in the current generation are never
+# evicted.
+#
+
+# stop remembering evicted greenkeys after that many, to bound memory
+MAX_EVICTED_KEYS = 4096
+
+class EvictionCandidate(object):
+    def __init__(self, score, looptoken):
+        self.score = score
+        self.looptoken = looptoken
+
+def _more_idle(a, b):
+    return a.score > b.score
+EvictionSort = make_timsort_class(lt=_more_idle)
+
 
 class MemoryManager(object):
 
@@ -38,6 +63,13 @@ class MemoryManager(object):
         self.current_generation = r_int64(1)
         self.next_check = r_int64(-1)
         self.alive_loops = {}
+        self.code_budget = 0
+        self.total_code_size = 0     # of the loops in 'alive_loops'
+        self.evicted_loops = 0
+        self.evicted_code_size = 0
+        self.retraced_loops = 0
+        # greenkey hashes of the loops freed so far, to count retraces
+        self.evicted_keys = {}
 
     def set_max_age(self, max_age, check_frequency=0):
         if max_age <= 0:
@@ -55,10 +87,81 @@ class MemoryManager(object):
             self._kill_old_loops_now()
             self.next_check = self.current_generation + self.check_frequency
 
+    def set_code_budget(self, budget):
+        self.code_budget = budget
+        if self._over_budget():
+            self._evict_loops_now()
+
+    def _over_budget(self):
+        return 0 < self.code_budget < self.total_code_size
+
     def keep_loop_alive(self, looptoken):
         if looptoken.generation != self.current_generation:
             looptoken.generation = self.current_generation
-            self.alive_loops[looptoken] = None
+            looptoken.use_count += 1
+            if looptoken not in self.alive_loops:
+                self.alive_loops[looptoken] = None
+                self.total_code_size += looptoken.code_size
+
+    def record_new_loop(self, looptoken, greenkey_hash, code_size):
+        """Called when a new loop or entry bridge was compiled."""
+        if greenkey_hash in self.evicted_keys:
+            del self.evicted_keys[greenkey_hash]
+            self.retraced_loops += 1
+        looptoken.greenkey_hash = greenkey_hash
+        self.add_code_size(looptoken, code_size)
+
+    def add_code_size(self, looptoken, code_size):
+        """Called when a loop or a bridge attached to it was compiled."""
+        looptoken.code_size += code_size
+        if looptoken in self.alive_loops:
+            self.total_code_size += code_size
+            if self._over_budget():
+                self._evict_loops_now()
+
+    def _forget_loop(self, looptoken):
+        del self.alive_loops[looptoken]
+        self.total_code_size -= looptoken.code_size
+        if looptoken.invalidated:
+            return
+        self.evicted_loops += 1
+        self.evicted_code_size += looptoken.code_size
+        if looptoken.greenkey_hash != r_uint(0):
+            if len(self.evicted_keys) >= MAX_EVICTED_KEYS:
+                self.evicted_keys.clear()
+            self.evicted_keys[looptoken.greenkey_hash] = None
+
+    def _evict_loops_now(self):
+        debug_start("jit-mem-evict")
+        oldtotal = self.total_code_size
+        debug_print("Code budget:     ", self.code_budget)
+        debug_print("Code size before:", oldtotal)
+        candidates = []
+        for looptoken in self.alive_loops.keys():
+            if looptoken.invalidated:
+                self._forget_loop(looptoken)
+            elif looptoken.generation != self.current_generation:
+                age = self.current_generation - looptoken.generation
+                score = (float(age) * looptoken.code_size /
+                         (looptoken.use_count + 1))
+                candidates.append(EvictionCandidate(score, looptoken))
+        EvictionSort(candidates).sort()
+        low_water_mark = self.code_budget - self.code_budget // 4
+        freed = 0
+        for candidate in candidates:
+            if self.total_code_size <= low_water_mark:
+                break
+            self._forget_loop(candidate.looptoken)
+            freed += 1
+        for looptoken in self.alive_loops.keys():
+            looptoken.use_count >>= 1
+        debug_print("Loop tokens freed:", freed)
+        debug_print("Code size after: ", self.total_code_size)
+        if not we_are_translated() and oldtotal != self.total_code_size:
+            candidates = candidate = looptoken = None
+            from rpython.rlib import rgc
+            rgc.collect(); rgc.collect(); rgc.collect()
+        debug_stop("jit-mem-evict")
 
     def _kill_old_loops_now(self):
         debug_start("jit-mem-collect")
@@ -70,7 +173,7 @@ class MemoryManager(object):
         for looptoken in self.alive_loops.keys():
             if (0 <= looptoken.generation < max_generation or
                 looptoken.invalidated):
-                del self.alive_loops[looptoken]
+                self._forget_loop(looptoken)
         newtotal = len(self.alive_loops)
         debug_print("Loop tokens freed: ", oldtotal - newtotal)
         debug_print("Loop tokens left:  ", newtotal)
@@ -8,6 +8,7 @@ from rpython.jit.metainterp.optimizeopt.unroll import optimize_unroll
 from rpython.jit.metainterp.optimizeopt.simplify import OptSimplify
 from rpython.jit.metainterp.optimizeopt.pure import OptPure
 from rpython.jit.metainterp.optimizeopt.earlyforce import OptEarlyForce
+from rpython.jit.metainterp.optimizeopt.vectorize import optimize_vector
 from rpython.rlib.jit import PARAMETERS, ENABLE_ALL_OPTS
 from rpython.rlib.unroll import unrolling_iterable
 from rpython.rlib.debug import debug_start, debug_stop, debug_print
@@ -28,6 +29,10 @@ ALL_OPTS_DICT = dict.fromkeys([name for name, _ in ALL_OPTS])
 ALL_OPTS_LIST = [name for name, _ in ALL_OPTS]
 ALL_OPTS_NAMES = ':'.join([name for name, _ in ALL_OPTS])
 
+# optimizations that are not part of 'all', and must be enabled explicitly
+OPTIONAL_OPTS_LIST = ['vec']
+OPTIONAL_OPTS_DICT = dict.fromkeys(OPTIONAL_OPTS_LIST)
+
 assert ENABLE_ALL_OPTS == ALL_OPTS_NAMES, (
     'please fix rlib/jit.py to say ENABLE_ALL_OPTS = %r' % (ALL_OPTS_NAMES,))
 
@@ -59,14 +64,20 @@ def optimize_trace(metainterp_sd, jitdriver_sd, loop, enable_opts,
                                                           loop.operations)
         optimizations, unroll = build_opt_chain(metainterp_sd, enable_opts)
         if unroll:
-            return optimize_unroll(metainterp_sd, jitdriver_sd, loop,
-                                   optimizations,
-                                   inline_short_preamble, start_state,
-                                   export_state)
+            state = optimize_unroll(metainterp_sd, jitdriver_sd, loop,
+                                    optimizations,
+                                    inline_short_preamble, start_state,
+                                    export_state)
         else:
             optimizer = Optimizer(metainterp_sd, jitdriver_sd, loop,
                                   optimizations)
             optimizer.propagate_all_forward()
+            state = None
+        # when unrolling, only the loop body is vectorized: the preamble
+        # is only run once, and its exported state must stay valid
+        if 'vec' in enable_opts and (start_state is not None or not unroll):
+            optimize_vector(metainterp_sd, loop)
+        return state
     finally:
         debug_stop("jit-optimize")
 
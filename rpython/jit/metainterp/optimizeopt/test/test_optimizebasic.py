@@ -13,7 +13,7 @@ from rpython.rlib.rarithmetic import LONG_BIT
 
 def test_store_final_boxes_in_guard():
     from rpython.jit.metainterp.compile import ResumeGuardDescr
-    from rpython.jit.metainterp.resume import tag, TAGBOX
+    from rpython.jit.metainterp.resume import tag, TAGBOX, decode_numbering
     b0 = BoxInt()
     b1 = BoxInt()
     opt = optimizeopt.Optimizer(FakeMetaInterpStaticData(LLtypeMixin.cpu),
@@ -28,12 +28,12 @@ def test_store_final_boxes_in_guard():
     opt.store_final_boxes_in_guard(op, [])
     fdescr = op.getdescr()
     if op.getfailargs() == [b0, b1]:
-        assert list(fdescr.rd_numb.nums)      == [tag(1, TAGBOX)]
-        assert list(fdescr.rd_numb.prev.nums) == [tag(0, TAGBOX)]
+        assert decode_numbering(fdescr.rd_numb)      == [tag(1, TAGBOX)]
+        assert decode_numbering(fdescr.rd_numb.prev) == [tag(0, TAGBOX)]
     else:
         assert op.getfailargs() == [b1, b0]
-        assert list(fdescr.rd_numb.nums)      == [tag(0, TAGBOX)]
-        assert list(fdescr.rd_numb.prev.nums) == [tag(1, TAGBOX)]
+        assert decode_numbering(fdescr.rd_numb)      == [tag(0, TAGBOX)]
+        assert decode_numbering(fdescr.rd_numb.prev) == [tag(1, TAGBOX)]
     assert fdescr.rd_virtuals is None
     assert fdescr.rd_consts == []
 
@@ -0,0 +1,263 @@
+"""Pack isomorphic operations on consecutive items of raw arrays into
+VEC_RAW_OP operations, which the backend turns into SSE2 instructions.
+
+This runs on a loop body after all the other optimizations.  It looks for
+groups of operations of the form
+
+    raw_store(dstbase, dstindex, OP(raw_load(srcbase, srcindex), ...))
+
+and packs two such groups together if the second one accesses the items
+that follow the ones of the first one, i.e. if all its indexes are
+'int_add(index, step)' of the indexes of the first group.  Only the
+operations in a single trace are considered: the loops of the interpreter
+need to process two items per iteration for this to find anything.
+
+A VEC_RAW_OP computes its two lanes one after the other, so it is always
+equivalent to the two groups it replaces, as long as nothing between them
+can see that the operations of the first group were moved down.  It is
+the job of the backend to check at runtime that the items are really
+next to each other, and that the two lanes don't overlap, before it uses
+vector instructions.
+"""
+
+from rpython.jit.metainterp.history import AbstractDescr, Box, Const
+from rpython.jit.metainterp.resoperation import rop, opname, ResOperation
+from rpython.rlib.rarithmetic import LONG_BIT
+
+
+# the operations that can be vectorized, with their number of arguments
+VECTOR_FLOAT_OPS = {
+    rop.FLOAT_ADD: 2,
+    rop.FLOAT_SUB: 2,
+    rop.FLOAT_MUL: 2,
+    rop.FLOAT_TRUEDIV: 2,
+    rop.FLOAT_NEG: 1,
+    rop.FLOAT_ABS: 1,
+}
+VECTOR_INT_OPS = {
+    rop.INT_ADD: 2,
+    rop.INT_SUB: 2,
+    rop.INT_AND: 2,
+    rop.INT_OR: 2,
+    rop.INT_XOR: 2,
+}
+
+# the two lanes of a vector are items of 8 bytes (doubles, or Signed on
+# 64-bit platforms)
+VECTOR_ITEMSIZE = 8
+
+
+class VectorOpDescr(AbstractDescr):
+    """The descr of a VEC_RAW_OP.  'opnum' is the operation done on every
+    lane (SAME_AS for a plain copy).  'kinds' contains one character per
+    operand: 'm' for an item of an array, which takes three arguments
+    (base, index, step) like the destination; or 's' for a scalar that is
+    the same in both lanes, which takes one argument.
+    """
+    def __init__(self, opnum, kinds, arraydescr):
+        self.opnum = opnum
+        self.kinds = kinds
+        self.arraydescr = arraydescr
+
+    def repr_of_descr(self):
+        return '<VectorOpDescr %s %s %s>' % (opname[self.opnum].lower(),
+                                             self.kinds,
+                                             self.arraydescr.repr_of_descr())
+
+
+class Group(object):
+    """The operations that compute and store one item: a RAW_STORE, the
+    operation that computes the stored value, and the RAW_LOADs of its
+    operands.  For every operand, either 'loads[i]' or 'scalars[i]' is
+    not None."""
+
+    def __init__(self, storepos, opnum, arraydescr):
+        self.storepos = storepos
+        self.firstpos = storepos
+        self.positions = [storepos]
+        self.opnum = opnum
+        self.arraydescr = arraydescr
+        self.loads = []
+        self.scalars = []
+        self.kinds = ''
+
+    def add_position(self, pos):
+        self.positions.append(pos)
+        if pos < self.firstpos:
+            self.firstpos = pos
+
+    def add_load(self, pos, load):
+        self.add_position(pos)
+        self.loads.append(load)
+        self.scalars.append(None)
+        self.kinds += 'm'
+
+    def add_scalar(self, box):
+        self.loads.append(None)
+        self.scalars.append(box)
+        self.kinds += 's'
+
+
+def optimize_vector(metainterp_sd, loop):
+    cpu = metainterp_sd.cpu
+    if not cpu.supports_vectors:
+        return
+    operations = loop.operations
+    producers = {}
+    uses = {}
+    for i in range(len(operations)):
+        op = operations[i]
+        for arg in op.getarglist():
+            _count_use(uses, arg)
+        failargs = op.getfailargs()
+        if failargs is not None:
+            for arg in failargs:
+                _count_use(uses, arg)
+        if op.result is not None:
+            producers[op.result] = i
+    #
+    groups = []
+    for i in range(len(operations)):
+        if operations[i].getopnum() == rop.RAW_STORE:
+            group = _find_group(cpu, operations, i, producers, uses)
+            if group is not None:
+                groups.append(group)
+    #
+    replaced = {}
+    i = 0
+    while i < len(groups) - 1:
+        group1 = groups[i]
+        group2 = groups[i + 1]
+        vecop = _pack(operations, group1, group2, producers)
+        if vecop is None:
+            i += 1
+            continue
+        for pos in group1.positions:
+            replaced[pos] = None
+        for pos in group2.positions:
+            replaced[pos] = None
+        replaced[group2.storepos] = vecop
+        i += 2
+    if not replaced:
+        return
+    #
+    newoperations = []
+    for i in range(len(operations)):
+        if i in replaced:
+            vecop = replaced[i]
+            if vecop is not None:
+                newoperations.append(vecop)
+        else:
+            newoperations.append(operations[i])
+    loop.operations = newoperations
+
+def _count_use(uses, box):
+    if isinstance(box, Box):
+        uses[box] = uses.get(box, 0) + 1
+
+def _is_vector_array(cpu, arraydescr):
+    _, itemsize, _ = cpu.unpack_arraydescr_size(arraydescr)
+    return itemsize == VECTOR_ITEMSIZE
+
+def _find_group(cpu, operations, storepos, producers, uses):
+    store = operations[storepos]
+    arraydescr = store.getdescr()
+    if not _is_vector_array(cpu, arraydescr):
+        return None
+    value = store.getarg(2)
+    if uses.get(value, 0) != 1 or value not in producers:
+        return None
+    valuepos = producers[value]
+    op = operations[valuepos]
+    opnum = op.getopnum()
+    if opnum == rop.RAW_LOAD:
+        if op.getdescr() is not arraydescr:
+            return None
+        group = Group(storepos, rop.SAME_AS, arraydescr)
+        group.add_load(valuepos, op)
+        return group
+    if arraydescr.is_array_of_floats():
+        if opnum not in VECTOR_FLOAT_OPS:
+            return None
+    else:
+        if opnum not in VECTOR_INT_OPS or LONG_BIT != VECTOR_ITEMSIZE * 8:
+            return None
+    group = Group(storepos, opnum, arraydescr)
+    group.add_position(valuepos)
+    for arg in op.getarglist():
+        loadpos = producers.get(arg, -1)
+        if (loadpos >= 0 and uses.get(arg, 0) == 1 and
+                operations[loadpos].getopnum() == rop.RAW_LOAD and
+                operations[loadpos].getdescr() is arraydescr):
+            group.add_load(loadpos, operations[loadpos])
+        else:
+            group.add_scalar(arg)
+    return group
+
+def _same_box(box1, box2):
+    if box1 is box2:
+        return True
+    if isinstance(box1, Const) and isinstance(box2, Const):
+        return box1.same_constant(box2)
+    return False
+
+def _get_step(index1, index2, producers, operations):
+    """Return the box 'step' if 'index2 = int_add(index1, step)'."""
+    pos = producers.get(index2, -1)
+    if pos < 0:
+        return None
+    op = operations[pos]
+    if op.getopnum() != rop.INT_ADD:
+        return None
+    if op.getarg(0) is index1:
+        return op.getarg(1)
+    if op.getarg(1) is index1:
+        return op.getarg(0)
+    return None
+
+def _add_memory_operand(args, op1, op2, producers, operations):
+    if not _same_box(op1.getarg(0), op2.getarg(0)):
+        return False
+    step = _get_step(op1.getarg(1), op2.getarg(1), producers, operations)
+    if step is None:
+        return False
+    args.append(op1.getarg(0))
+    args.append(op1.getarg(1))
+    args.append(step)
+    return True
+
+def _pack(operations, group1, group2, producers):
+    if (group1.opnum != group2.opnum or group1.kinds != group2.kinds or
+            group1.arraydescr is not group2.arraydescr):
+        return None
+    # all the operations of the first group are moved down to the store of
+    # the second group; this is only fine if the operations in-between
+    # don't read or write memory and cannot fail
+    if group1.storepos >= group2.firstpos:
+        return None
+    for i in range(group1.firstpos, group2.storepos):
+        if i in group1.positions or i in group2.positions:
+            continue
+        op = operations[i]
+        if not op.is_always_pure() and op.getopnum() != rop.DEBUG_MERGE_POINT:
+            return None
+    #
+    args = []
+    if not _add_memory_operand(args, operations[group1.storepos],
+                               operations[group2.storepos], producers,
+                               operations):
+        return None
+    for i in range(len(group1.loads)):
+        load1 = group1.loads[i]
+        if load1 is not None:
+            load2 = group2.loads[i]
+            if not _add_memory_operand(args, load1, load2, producers,
+                                       operations):
+                return None
+        else:
+            scalar = group1.scalars[i]
+            if not _same_box(scalar, group2.scalars[i]):
+                return None
+            args.append(scalar)
+    descr = VectorOpDescr(group1.opnum, group1.kinds, group1.arraydescr)
+    return ResOperation(rop.VEC_RAW_OP, args, None, descr=descr)
@@ -9,8 +9,10 @@ from rpython.jit.metainterp import history, compile, resume, executor, jitexc
 from rpython.jit.metainterp.heapcache import HeapCache
 from rpython.jit.metainterp.history import (Const, ConstInt, ConstPtr,
     ConstFloat, Box, TargetToken, MissingValue)
-from rpython.jit.metainterp.jitprof import EmptyProfiler
+from rpython.jit.metainterp.jitprof import EmptyProfiler, GuardFailureCounts
+from rpython.jit.metainterp.bridgequeue import BridgeQueue
 from rpython.jit.metainterp.logger import Logger
+from rpython.jit.metainterp.jitlog import JitLog
 from rpython.jit.metainterp.optimizeopt.util import args_dict
 from rpython.jit.metainterp.resoperation import rop, GuardResOp
 from rpython.rlib import nonconst, rstack
@@ -1551,6 +1553,9 @@ class MetaInterpStaticData(object):
         self.options = options
         self.logger_noopt = Logger(self)
         self.logger_ops = Logger(self, guard_number=True)
+        self.jitlog = JitLog(self)
+        self.guard_failures = GuardFailureCounts()
+        self.bridge_queue = BridgeQueue()
 
         self.profiler = ProfilerClass()
         self.profiler.cpu = cpu
@@ -1635,6 +1640,7 @@ class MetaInterpStaticData(object):
         if not self.globaldata.initialized:
             debug_print(self.jit_starting_line)
             self.cpu.setup_once()
+            self.jitlog.setup_once()
             if not self.profiler.initialized:
                 self.profiler.start()
                 self.profiler.initialized = True
@@ -1724,6 +1730,7 @@ class MetaInterp(object):
     portal_call_depth = 0
     cancel_count = 0
     exported_state = None
+    trace_limit = -1      # -1: use the 'trace_limit' parameter
 
     def __init__(self, staticdata, jitdriver_sd):
         self.staticdata = staticdata
@@ -2068,11 +2075,21 @@ class MetaInterp(object):
                                                           jd_sd.warmstate.get_location_str(greenkey),
                                                           self.staticdata.logger_ops._make_log_operations(),
                                                           self.history.operations)
+        jitlog = self.staticdata.jitlog
+        if jitlog.is_enabled():
+            if greenkey is None:
+                name = ''
+            else:
+                name = jd_sd.warmstate.compute_location_str(greenkey)
+            jitlog.log_abort(Counters.counter_names[reason], name)
         self.staticdata.stats.aborted()
 
     def blackhole_if_trace_too_long(self):
         warmrunnerstate = self.jitdriver_sd.warmstate
-        if len(self.history.operations) > warmrunnerstate.trace_limit:
+        trace_limit = self.trace_limit
+        if trace_limit < 0:
+            trace_limit = warmrunnerstate.trace_limit
+        if len(self.history.operations) > trace_limit:
             greenkey_of_huge_function = self.find_biggest_function()
             self.staticdata.stats.record_aborted(greenkey_of_huge_function)
             self.portal_trace_positions = None
@@ -2130,6 +2147,8 @@ class MetaInterp(object):
         self.current_merge_points = [(original_boxes, 0)]
         num_green_args = self.jitdriver_sd.num_green_args
         original_greenkey = original_boxes[:num_green_args]
+        self.trace_limit = self.jitdriver_sd.warmstate.get_trace_limit(
+            original_greenkey)
         self.resumekey = compile.ResumeFromInterpDescr(original_greenkey)
         self.history.inputargs = original_boxes[num_green_args:]
         self.seen_loop_header_for_jdindex = -1
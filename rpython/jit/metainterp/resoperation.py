@@ -511,6 +511,9 @@ _oplist = [
     'SETINTERIORFIELD_GC/3d',
     'SETINTERIORFIELD_RAW/3d',    # right now, only used by tests
     'RAW_STORE/3d',
+    'VEC_RAW_OP/*d',    # only emitted by optimizeopt/vectorize.py:
+                        # [dstbase, dstindex, dststep, operands...], computes
+                        # and stores two items of a raw array, descr=VectorOpDescr
     'SETFIELD_GC/2d',
     'ZERO_PTR_FIELD/2', # only emitted by the rewrite, clears a pointer field
                         # at a given constant offset, no descr
@@ -78,16 +78,55 @@ def capture_resumedata(framestack, virtualizable_boxes, virtualref_boxes,
 #     class Numbering: __slots__ = ['prev', 'nums']
 #
 # except that it is more compact in translated programs, because the
-# array 'nums' is inlined in the single NUMBERING object.  This is
-# important because this is often the biggest single consumer of memory
-# in a pypy-c-jit.
+# list 'nums' is inlined in the single NUMBERING object, as a string of
+# bytes 'code' in which every tagged value is written as a zigzag
+# varint.  Most tagged values fit in a single byte.  This is important
+# because this is often the biggest single consumer of memory in a
+# pypy-c-jit.  Use encode_numbering() and decode_numbering() to convert
+# from and to the list of tagged values.
 #
 NUMBERINGP = lltype.Ptr(lltype.GcForwardReference())
 NUMBERING = lltype.GcStruct('Numbering',
                             ('prev', NUMBERINGP),
-                            ('nums', lltype.Array(rffi.SHORT)))
+                            ('code', lltype.Array(lltype.Char)))
 NUMBERINGP.TO.become(NUMBERING)
 
+def encode_tagged_list(nums):
+    result = []
+    for tagged in nums:
+        value = rarithmetic.widen(tagged)
+        value = (value << 1) ^ (value >> 15)   # 0 <= value < 2**16
+        while value >= 0x80:
+            result.append(chr((value & 0x7f) | 0x80))
+            value >>= 7
+        result.append(chr(value))
+    return ''.join(result)
+
+def encode_numbering(prev, nums):
+    code = encode_tagged_list(nums)
+    numb = lltype.malloc(NUMBERING, len(code))
+    for i in range(len(code)):
+        numb.code[i] = code[i]
+    numb.prev = prev
+    return numb
+
+def decode_numbering(numb):
+    nums = []
+    code = numb.code
+    i = 0
+    while i < len(code):
+        value = 0
+        shift = 0
+        while True:
+            byte = ord(code[i])
+            i += 1
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        nums.append(rffi.cast(rffi.SHORT, (value >> 1) ^ -(value & 1)))
+    return nums
+
 PENDINGFIELDSTRUCT = lltype.Struct('PendingField',
                                    ('lldescr', OBJECTPTR),
                                    ('num', rffi.SHORT),
@@ -144,12 +183,16 @@ class ResumeDataLoopMemo(object):
         self.large_ints = {}
         self.refs = self.cpu.ts.new_ref_dict_2()
         self.numberings = {}
+        self.shared_numberings = {}
         self.cached_boxes = {}
         self.cached_virtuals = {}
 
         self.nvirtuals = 0
         self.nvholes = 0
         self.nvreused = 0
+        self.nnumberings = 0
+        self.nnumberings_shared = 0
+        self.numbering_bytes = 0
 
     def getconst(self, const):
         if const.type == INT:
@@ -187,17 +230,21 @@ class ResumeDataLoopMemo(object):
     # env numbering
 
     def number(self, optimizer, snapshot):
+        numb, liveboxes, v, _ = self._number(optimizer, snapshot)
+        return numb, liveboxes.copy(), v
+
+    def _number(self, optimizer, snapshot):
         if snapshot is None:
-            return lltype.nullptr(NUMBERING), {}, 0
+            return lltype.nullptr(NUMBERING), {}, 0, -1
         if snapshot in self.numberings:
-            numb, liveboxes, v = self.numberings[snapshot]
-            return numb, liveboxes.copy(), v
+            return self.numberings[snapshot]
 
-        numb1, liveboxes, v = self.number(optimizer, snapshot.prev)
+        numb1, liveboxes, v, index1 = self._number(optimizer, snapshot.prev)
+        liveboxes = liveboxes.copy()
         n = len(liveboxes) - v
         boxes = snapshot.boxes
         length = len(boxes)
-        numb = lltype.malloc(NUMBERING, length)
+        nums = [UNASSIGNED] * length
         for i in range(length):
             box = boxes[i]
             value = optimizer.getvalue(box)
@@ -215,11 +262,31 @@ class ResumeDataLoopMemo(object):
                     tagged = tag(n, TAGBOX)
                     n += 1
                 liveboxes[box] = tagged
-            numb.nums[i] = tagged
+            nums[i] = tagged
         #
-        numb.prev = numb1
-        self.numberings[snapshot] = numb, liveboxes, v
-        return numb, liveboxes.copy(), v
+        numb, index = self._share_numbering(numb1, index1, nums)
+        result = numb, liveboxes, v, index
+        self.numberings[snapshot] = result
+        return result
+
+    def _share_numbering(self, prev, prev_index, nums):
+        # Numberings with the same content and the same 'prev' are shared
+        # between all the guards of the trace, even if they come from
+        # different snapshots, or after forget_numberings().  They are
+        # identified by the index of their 'prev' and their content.
+        code = encode_tagged_list(nums)
+        key = '%d:%s' % (prev_index, code)
+        try:
+            numb, index = self.shared_numberings[key]
+        except KeyError:
+            numb = encode_numbering(prev, nums)
+            index = len(self.shared_numberings)
+            self.shared_numberings[key] = numb, index
+            self.nnumberings += 1
+            self.numbering_bytes += len(code)
+        else:
+            self.nnumberings_shared += 1
+        return numb, index
 
     def forget_numberings(self, virtualbox):
         # XXX ideally clear only the affected numberings
@@ -261,6 +328,10 @@ class ResumeDataLoopMemo(object):
         profiler.count(jitprof.Counters.NVIRTUALS, self.nvirtuals)
         profiler.count(jitprof.Counters.NVHOLES, self.nvholes)
         profiler.count(jitprof.Counters.NVREUSED, self.nvreused)
+        profiler.count(jitprof.Counters.NUMBERINGS, self.nnumberings)
+        profiler.count(jitprof.Counters.NUMBERINGS_SHARED,
+                       self.nnumberings_shared)
+        profiler.count(jitprof.Counters.NUMBERING_BYTES, self.numbering_bytes)
 
 _frame_info_placeholder = (None, 0, 0)
 
@@ -817,6 +888,7 @@ class AbstractResumeDataReader(object):
     def _init(self, cpu, storage):
         self.cpu = cpu
         self.cur_numb = storage.rd_numb
+        self.cur_nums = None
         self.count = storage.rd_count
         self.consts = storage.rd_consts
 
@@ -899,6 +971,7 @@ class AbstractResumeDataReader(object):
     def _prepare_next_section(self, info):
         # Use info.enumerate_vars(), normally dispatching to
         # rpython.jit.codewriter.jitcode.  Some tests give a different 'info'.
+        self.cur_nums = decode_numbering(self.cur_numb)
         info.enumerate_vars(self._callback_i,
                             self._callback_r,
                             self._callback_f,
@@ -906,15 +979,15 @@ class AbstractResumeDataReader(object):
         self.cur_numb = self.cur_numb.prev
 
     def _callback_i(self, index, register_index):
-        value = self.decode_int(self.cur_numb.nums[index])
+        value = self.decode_int(self.cur_nums[index])
         self.write_an_int(register_index, value)
 
     def _callback_r(self, index, register_index):
-        value = self.decode_ref(self.cur_numb.nums[index])
+        value = self.decode_ref(self.cur_nums[index])
         self.write_a_ref(register_index, value)
 
     def _callback_f(self, index, register_index):
-        value = self.decode_float(self.cur_numb.nums[index])
+        value = self.decode_float(self.cur_nums[index])
         self.write_a_float(register_index, value)
 
 # ---------- when resuming for pyjitpl.py, make boxes ----------
@@ -955,36 +1028,36 @@ class ResumeDataBoxReader(AbstractResumeDataReader):
         self.boxes_f = boxes_f
         self._prepare_next_section(info)
 
-    def consume_virtualizable_boxes(self, vinfo, numb):
+    def consume_virtualizable_boxes(self, vinfo, nums):
         # we have to ignore the initial part of 'nums' (containing vrefs),
         # find the virtualizable from nums[-1], and use it to know how many
         # boxes of which type we have to return.  This does not write
         # anything into the virtualizable.
-        index = len(numb.nums) - 1
-        virtualizablebox = self.decode_ref(numb.nums[index])
+        index = len(nums) - 1
+        virtualizablebox = self.decode_ref(nums[index])
         virtualizable = vinfo.unwrap_virtualizable_box(virtualizablebox)
-        return vinfo.load_list_of_boxes(virtualizable, self, numb)
+        return vinfo.load_list_of_boxes(virtualizable, self, nums)
 
-    def consume_virtualref_boxes(self, numb, end):
+    def consume_virtualref_boxes(self, nums, end):
         # Returns a list of boxes, assumed to be all BoxPtrs.
         # We leave up to the caller to call vrefinfo.continue_tracing().
         assert (end & 1) == 0
-        return [self.decode_ref(numb.nums[i]) for i in range(end)]
+        return [self.decode_ref(nums[i]) for i in range(end)]
 
     def consume_vref_and_vable_boxes(self, vinfo, ginfo):
-        numb = self.cur_numb
-        self.cur_numb = numb.prev
+        nums = decode_numbering(self.cur_numb)
+        self.cur_numb = self.cur_numb.prev
         if vinfo is not None:
-            virtualizable_boxes = self.consume_virtualizable_boxes(vinfo, numb)
-            end = len(numb.nums) - len(virtualizable_boxes)
+            virtualizable_boxes = self.consume_virtualizable_boxes(vinfo, nums)
+            end = len(nums) - len(virtualizable_boxes)
         elif ginfo is not None:
-            index = len(numb.nums) - 1
-            virtualizable_boxes = [self.decode_ref(numb.nums[index])]
-            end = len(numb.nums) - 1
+            index = len(nums) - 1
+            virtualizable_boxes = [self.decode_ref(nums[index])]
+            end = len(nums) - 1
         else:
             virtualizable_boxes = None
-            end = len(numb.nums)
-        virtualref_boxes = self.consume_virtualref_boxes(numb, end)
+            end = len(nums)
+        virtualref_boxes = self.consume_virtualref_boxes(nums, end)
         return virtualizable_boxes, virtualref_boxes
 
     def allocate_with_vtable(self, known_class):
@@ -1264,7 +1337,7 @@ class ResumeDataDirectReader(AbstractResumeDataReader):
         info = blackholeinterp.get_current_position_info()
         self._prepare_next_section(info)
 
-    def consume_virtualref_info(self, vrefinfo, numb, end):
+    def consume_virtualref_info(self, vrefinfo, nums, end):
         # we have to decode a list of references containing pairs
         # [..., virtual, vref, ...]  stopping at 'end'
         if vrefinfo is None:
@@ -1272,22 +1345,22 @@ class ResumeDataDirectReader(AbstractResumeDataReader):
             return
         assert (end & 1) == 0
         for i in range(0, end, 2):
-            virtual = self.decode_ref(numb.nums[i])
-            vref = self.decode_ref(numb.nums[i + 1])
+            virtual = self.decode_ref(nums[i])
+            vref = self.decode_ref(nums[i + 1])
             # For each pair, we store the virtual inside the vref.
             vrefinfo.continue_tracing(vref, virtual)
 
-    def consume_vable_info(self, vinfo, numb):
+    def consume_vable_info(self, vinfo, nums):
         # we have to ignore the initial part of 'nums' (containing vrefs),
         # find the virtualizable from nums[-1], load all other values
         # from the CPU stack, and copy them into the virtualizable
         if vinfo is None:
-            return len(numb.nums)
-        index = len(numb.nums) - 1
-        virtualizable = self.decode_ref(numb.nums[index])
+            return len(nums)
+        index = len(nums) - 1
+        virtualizable = self.decode_ref(nums[index])
         # just reset the token, we'll force it later
         vinfo.reset_token_gcref(virtualizable)
-        return vinfo.write_from_resume_data_partial(virtualizable, self, numb)
+        return vinfo.write_from_resume_data_partial(virtualizable, self, nums)
 
     def load_value_of_type(self, TYPE, tagged):
         from rpython.jit.metainterp.warmstate import specialize_value
@@ -1307,10 +1380,11 @@ class ResumeDataDirectReader(AbstractResumeDataReader):
         numb = self.cur_numb
         self.cur_numb = numb.prev
         if self.resume_after_guard_not_forced != 2:
-            end_vref = self.consume_vable_info(vinfo, numb)
+            nums = decode_numbering(numb)
+            end_vref = self.consume_vable_info(vinfo, nums)
             if ginfo is not None:
                 end_vref -= 1
-            self.consume_virtualref_info(vrefinfo, numb, end_vref)
+            self.consume_virtualref_info(vrefinfo, nums, end_vref)
 
     def allocate_with_vtable(self, known_class):
         from rpython.jit.metainterp.executor import exec_new_with_vtable
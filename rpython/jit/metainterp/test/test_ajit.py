@@ -655,6 +655,54 @@ class BasicTests:
         assert res == 84 - 61 - 62
         self.check_history(call=1)   # because the trace starts immediately
 
+    def test_get_threshold(self):
+        def get_threshold(x):
+            if x == 2:
+                return 1000
+            return 0
+        myjitdriver = JitDriver(greens = ['x'], reds = ['y'],
+                                get_threshold = get_threshold)
+        def f(x, y):
+            while y > 0:
+                myjitdriver.can_enter_jit(x=x, y=y)
+                myjitdriver.jit_merge_point(x=x, y=y)
+                y -= x
+            return y
+        #
+        res = self.meta_interp(f, [1, 20])
+        assert res == 0
+        self.check_trace_count(1)
+        #
+        res = self.meta_interp(f, [2, 20])
+        assert res == 0
+        self.check_trace_count(0)
+
+    def test_get_trace_limit(self):
+        def get_trace_limit(x):
+            if x == 1:
+                return 2
+            return 0
+        myjitdriver = JitDriver(greens = ['x'], reds = ['y', 'z'],
+                                get_trace_limit = get_trace_limit)
+        def g(x, y, z):
+            return (z + y * x) ^ y
+        def f(x, y):
+            z = 0
+            while y > 0:
+                myjitdriver.can_enter_jit(x=x, y=y, z=z)
+                myjitdriver.jit_merge_point(x=x, y=y, z=z)
+                z = g(x, y, z)
+                y -= 1
+            return z
+        #
+        res = self.meta_interp(f, [1, 100])
+        assert res == f(1, 100)
+        self.check_trace_count(0)
+        #
+        res = self.meta_interp(f, [2, 100])
+        assert res == f(2, 100)
+        self.check_trace_count(1)
+
     def test_unroll_one_loop_iteration(self):
         def unroll(code):
             return code == 0
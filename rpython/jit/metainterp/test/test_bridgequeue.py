@@ -0,0 +1,130 @@
+from rpython.rlib.jit import JitDriver, Counters
+from rpython.rlib import jit_hooks
+from rpython.jit.metainterp.test.support import LLJitMixin
+from rpython.jit.metainterp.jitprof import Profiler
+
+
+def compiled_bridges():
+    return jit_hooks.stats_get_counter_value(None,
+                                             Counters.TOTAL_COMPILED_BRIDGES)
+
+
+class BridgeQueueTests(object):
+
+    def test_deferred_bridge(self):
+        driver = JitDriver(greens = [], reds = ['i', 's'])
+
+        def loop(i):
+            s = 0
+            while i > 0:
+                driver.jit_merge_point(i=i, s=s)
+                if i % 10 == 0:
+                    s += 3
+                else:
+                    s += 1
+                i -= 1
+            return s
+
+        def main(n):
+            res = loop(n)
+            assert jit_hooks.get_pending_bridge_count(None) == 1
+            assert compiled_bridges() == 0
+            assert jit_hooks.compile_pending_bridges(None, -1) == 1
+            assert jit_hooks.get_pending_bridge_count(None) == 0
+            assert compiled_bridges() == 1
+            assert loop(n) == res
+            assert compiled_bridges() == 1     # the bridge is used
+            return res
+        res = self.meta_interp(main, [50], deferred_bridges=True,
+                               ProfilerClass=Profiler)
+        assert res == 60
+
+    def test_hot_guard(self):
+        driver = JitDriver(greens = [], reds = ['i', 's'])
+
+        def loop(i):
+            s = 0
+            while i > 0:
+                driver.jit_merge_point(i=i, s=s)
+                if i % 10 == 0:
+                    s += 3
+                else:
+                    s += 1
+                i -= 1
+            return s
+
+        def main(n):
+            res = loop(n)
+            # the guard kept failing after its bridge was traced, so
+            # the bridge was generated without waiting
+            assert jit_hooks.get_pending_bridge_count(None) == 0
+            assert compiled_bridges() == 1
+            return res
+        res = self.meta_interp(main, [200], deferred_bridges=True,
+                               ProfilerClass=Profiler)
+        assert res == 240
+
+    def test_compile_some(self):
+        driver = JitDriver(greens = ['k'], reds = ['i', 's'])
+
+        def loop(k, i):
+            s = 0
+            while i > 0:
+                driver.jit_merge_point(k=k, i=i, s=s)
+                if i % 10 == 0:
+                    s += k
+                else:
+                    s += 1
+                i -= 1
+            return s
+
+        def main(n):
+            res = loop(2, n) + loop(3, n) + loop(4, n)
+            assert jit_hooks.get_pending_bridge_count(None) == 3
+            assert jit_hooks.compile_pending_bridges(None, 2) == 2
+            assert jit_hooks.get_pending_bridge_count(None) == 1
+            assert jit_hooks.compile_pending_bridges(None, 2) == 1
+            assert compiled_bridges() == 3
+            return res
+        res = self.meta_interp(main, [50], deferred_bridges=True,
+                               ProfilerClass=Profiler)
+        assert res == 45 * 3 + 5 * (2 + 3 + 4)
+
+    def test_invalidated_loop(self):
+        driver = JitDriver(greens = [], reds = ['i', 's'])
+
+        class Foo:
+            _immutable_fields_ = ['a?']
+            def __init__(self, a):
+                self.a = a
+        foo = Foo(3)
+
+        def loop(i):
+            s = 0
+            while i > 0:
+                driver.jit_merge_point(i=i, s=s)
+                if i % 10 == 0:
+                    s += foo.a
+                else:
+                    s += 1
+                i -= 1
+            return s
+
+        def main(n):
+            foo.a = 3
+            res = loop(n)
+            assert jit_hooks.get_pending_bridge_count(None) == 1
+            foo.a = 5
+            # the bridge depends on 'foo.a', so the loop was invalidated,
+            # and the bridge is thrown away
+            assert jit_hooks.compile_pending_bridges(None, -1) == 0
+            assert jit_hooks.get_pending_bridge_count(None) == 0
+            assert compiled_bridges() == 0
+            return res + loop(n)
+        res = self.meta_interp(main, [50], deferred_bridges=True,
+                               ProfilerClass=Profiler)
+        assert res == 60 + 70
+
+
+class TestLLtype(BridgeQueueTests, LLJitMixin):
+    pass
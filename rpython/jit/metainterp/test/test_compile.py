@@ -5,6 +5,8 @@ from rpython.jit.metainterp.compile import compile_loop
 from rpython.jit.metainterp.compile import compile_tmp_callback
 from rpython.jit.metainterp import jitexc
 from rpython.jit.metainterp import jitprof, typesystem, compile
+from rpython.jit.metainterp.bridgequeue import BridgeQueue
+from rpython.jit.metainterp.jitlog import JitLog
 from rpython.jit.metainterp.optimizeopt.test.test_util import LLtypeMixin
 from rpython.jit.tool.oparser import parse
 from rpython.jit.metainterp.optimizeopt import ALL_OPTS_DICT
@@ -56,6 +58,9 @@ class FakeMetaInterpStaticData(object):
 
     stats = Stats()
     profiler = jitprof.EmptyProfiler()
+    jitlog = JitLog(None)
+    guard_failures = jitprof.GuardFailureCounts()
+    bridge_queue = BridgeQueue()
     warmrunnerdesc = None
     def log(self, msg, event_kind=None):
         pass
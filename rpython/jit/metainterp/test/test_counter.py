@@ -128,3 +128,73 @@ def test_change_current_fraction():
     assert r is False
     r = jc.tick(index2hash(jc, 104), incr)
     assert r is True
+
+
+class Cell:
+    next = None
+    def __init__(self, hash):
+        self.hash = hash
+    def get_cell_uhash(self):
+        return self.hash
+    def should_remove_jitcell(self):
+        return False
+
+def test_resize():
+    jc = JitCounter(size=4)
+    incr = jc.compute_threshold(4)
+    hashes = [index2hash(jc, 3, subhash=100),
+              index2hash(jc, 3, subhash=101) | (1 << (jc.shift - 1)),
+              index2hash(jc, 1, subhash=102)]
+    for hash in hashes:
+        for i in range(3):
+            assert not jc.tick(hash, incr)
+    cells = [Cell(hash) for hash in hashes]
+    for cell in cells:
+        jc.install_new_cell(cell.hash, cell)
+    #
+    jc.resize(16)
+    assert jc.size == 16
+    assert jc.shift == 28
+    assert jc.resizes == 1
+    # nothing was lost: the counters and the cells are still found
+    for hash, cell in zip(hashes, cells):
+        assert jc.tick(hash, incr)
+        chain = jc.lookup_chain(hash)
+        while chain is not cell:
+            chain = chain.next
+    assert jc.lookup_chain(hashes[0]) is not jc.lookup_chain(hashes[1])
+    assert jc.lookup_chain(hashes[0]) is cells[0]
+    assert cells[0].next is None
+    #
+    jc.resize(8)     # never shrinks
+    assert jc.size == 16
+
+def test_evictions_and_maybe_grow():
+    jc = JitCounter(size=4)
+    incr = jc.compute_threshold(100)
+    for sk in range(100, 105):
+        jc.tick(index2hash(jc, 2, subhash=sk), incr)
+    assert jc.new_counters == 5
+    assert jc.evicted_counters == 0
+    for sk in range(105, 110):
+        jc.tick(index2hash(jc, 2, subhash=sk), incr)
+    assert jc.new_counters == 10
+    assert jc.evicted_counters == 5
+    jc.maybe_grow()
+    assert jc.size == 8
+    jc.maybe_grow()      # no new counter since the previous check
+    assert jc.size == 8
+    #
+    jc.set_fixed_size(30)
+    assert jc.size == 32
+    for sk in range(200, 220):
+        jc.tick(index2hash(jc, 5, subhash=sk), incr)
+    jc.maybe_grow()
+    assert jc.size == 32
+    jc.set_fixed_size(0)
+    jc.maybe_grow()      # the previous check saw these evictions
+    assert jc.size == 32
+    for sk in range(300, 320):
+        jc.tick(index2hash(jc, 5, subhash=sk), incr)
+    jc.maybe_grow()
+    assert jc.size == 64
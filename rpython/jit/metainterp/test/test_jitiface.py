@@ -191,6 +191,38 @@ class JitHookInterfaceTests(object):
             assert jit_hooks.stats_get_times_value(None, Counters.TRACING) == 0
         self.meta_interp(main, [], ProfilerClass=EmptyProfiler)
 
+    def test_get_memmgr_stats(self):
+        driver = JitDriver(greens = [], reds = ['i'])
+        def loop(i):
+            while i > 0:
+                driver.jit_merge_point(i=i)
+                i -= 1
+        def main():
+            loop(30)
+            stats = jit_hooks.stats_get_memmgr_stats(None)
+            assert stats.loops == 1
+            assert stats.code_size > 0
+            assert stats.code_budget == 12345
+            assert stats.evicted_loops == 0
+            assert stats.evicted_code_size == 0
+            assert stats.retraced_loops == 0
+        self.meta_interp(main, [], loop_code_budget=12345)
+
+    def test_get_jitcounter_stats(self):
+        driver = JitDriver(greens = [], reds = ['i'])
+        def loop(i):
+            while i > 0:
+                driver.jit_merge_point(i=i)
+                i -= 1
+        def main():
+            loop(30)
+            stats = jit_hooks.stats_get_jitcounter_stats(None)
+            assert stats.size > 0
+            assert not stats.fixed_size
+            assert stats.evicted_counters == 0
+            assert stats.resizes == 0
+        self.meta_interp(main, [])
+
 
 class LLJitHookInterfaceTests(JitHookInterfaceTests):
     # use this for any backend, instead of the super class
@@ -233,6 +265,41 @@ class LLJitHookInterfaceTests(JitHookInterfaceTests):
         # this so far does not work because of the way setup_once is done,
         # but fine, it's only about untranslated version anyway
         #self.meta_interp(main, [False], ProfilerClass=Profiler)
+
+    def test_get_guard_failures(self):
+        driver = JitDriver(greens = [], reds = ['i', 's'])
+
+        def loop(i):
+            s = 0
+            while i > 0:
+                driver.jit_merge_point(i=i, s=s)
+                if i % 3 == 0:
+                    s += 1
+                i -= 1
+            return s
+
+        def main(i):
+            loop(i)
+            assert len(jit_hooks.stats_get_guard_failures(None)) == 0
+            jit_hooks.stats_set_guard_failure_counting(None, True)
+            loop(i)
+            l = jit_hooks.stats_get_guard_failures(None)
+            assert len(l) >= 1
+            total = 0
+            for j in range(len(l)):
+                assert l[j].counter > 0
+                total += l[j].counter
+            jit_hooks.stats_set_guard_failure_counting(None, False)
+            loop(i)
+            l2 = jit_hooks.stats_get_guard_failures(None)
+            assert len(l2) == len(l)
+            total2 = 0
+            for j in range(len(l2)):
+                total2 += l2[j].counter
+            assert total2 == total
+            jit_hooks.stats_reset_guard_failures(None)
+            assert len(jit_hooks.stats_get_guard_failures(None)) == 0
+        self.meta_interp(main, [30])
         
 
 class TestJitHookInterface(JitHookInterfaceTests, LLJitMixin):
@@ -0,0 +1,111 @@
+import py
+from rpython.rlib.jit import JitDriver
+from rpython.jit.metainterp.test.support import LLJitMixin
+from rpython.jit.metainterp.jitlog import encode_varint
+from rpython.rlib.rstring import StringBuilder
+from rpython.tool.jitlogparser.jitlog import (JitLogReader, JitLogError,
+    Trace, Abort, GuardFailures, read_jitlog)
+from StringIO import StringIO
+
+
+def test_varint():
+    for value in [0, 1, -1, 63, -64, 64, 127, 128, 300, -300, 2**40, -2**40,
+                  2**62, -2**62]:
+        builder = StringBuilder()
+        encode_varint(builder, value)
+        reader = JitLogReader(StringIO('JITLOG\x01' + builder.build()),
+                              chunk_size=1)
+        assert reader._read_varint() == value
+    builder = StringBuilder()
+    encode_varint(builder, -1)
+    assert builder.build() == '\x01'
+
+def test_bad_header():
+    py.test.raises(JitLogError, JitLogReader, StringIO('PYPYLOG'))
+
+
+class JitLogTests(object):
+
+    def run_with_jitlog(self, monkeypatch, f, args, **kwds):
+        logfile = str(py.test.ensuretemp('jitlog').join('jitlog'))
+        monkeypatch.setenv('JITLOG', logfile)
+        self.meta_interp(f, args, **kwds)
+        return list(read_jitlog(logfile))
+
+    def test_loop(self, monkeypatch):
+        myjitdriver = JitDriver(greens=['code'], reds=['n', 'total'],
+                                get_printable_location=lambda code:
+                                    'location %d' % code)
+        def f(n, code):
+            total = 0
+            while n > 0:
+                myjitdriver.jit_merge_point(code=code, n=n, total=total)
+                total += n
+                n -= 1
+            return total
+        events = self.run_with_jitlog(monkeypatch, f, [30, 5])
+        traces = [event for event in events if isinstance(event, Trace)]
+        assert len(traces) == 1
+        trace = traces[0]
+        assert trace.type == 'loop'
+        assert trace.name == 'location 5'
+        names = [op.name for op in trace.operations]
+        assert names[0] == 'label'
+        assert 'int_add' in names
+        assert 'guard_true' in names
+        dmp = trace.operations[names.index('debug_merge_point')]
+        assert dmp.args[2] == 'location 5'
+        guard = trace.operations[names.index('guard_true')]
+        assert guard.guard_no != 0
+        assert guard.failargs
+
+    def test_guard_failures_and_bridge(self, monkeypatch):
+        myjitdriver = JitDriver(greens=[], reds=['n', 'total'])
+        def f(n):
+            total = 0
+            while n > 0:
+                myjitdriver.jit_merge_point(n=n, total=total)
+                if n % 3 == 0:
+                    total += 1
+                else:
+                    total += 2
+                n -= 1
+            return total
+        events = self.run_with_jitlog(monkeypatch, f, [200])
+        traces = [event for event in events if isinstance(event, Trace)]
+        bridges = [trace for trace in traces if trace.is_bridge()]
+        assert bridges
+        guard_nos = set()
+        for trace in traces:
+            for op in trace.operations:
+                if op.is_guard():
+                    guard_nos.add(op.guard_no)
+        for bridge in bridges:
+            assert bridge.number in guard_nos
+        failures = [event for event in events
+                    if isinstance(event, GuardFailures)]
+        assert failures
+        counts = failures[-1].counts
+        assert counts
+        for number in counts:
+            assert number in guard_nos
+
+    def test_abort(self, monkeypatch):
+        myjitdriver = JitDriver(greens=[], reds=['n', 'total'])
+        def g(n):
+            return n * 3 + (n ^ 5) - (n >> 1)
+        def f(n):
+            total = 0
+            while n > 0:
+                myjitdriver.jit_merge_point(n=n, total=total)
+                total += g(n)
+                n -= 1
+            return total
+        events = self.run_with_jitlog(monkeypatch, f, [50], trace_limit=4)
+        aborts = [event for event in events if isinstance(event, Abort)]
+        assert aborts
+        assert aborts[0].reason == 'ABORT_TOO_LONG'
+
+
+class TestLLtype(JitLogTests, LLJitMixin):
+    pass
@@ -54,7 +54,7 @@ class TestProfile(ProfilerMixin):
         assert profiler.events == expected
         assert profiler.times == [2, 1]
         assert profiler.counters == [1, 1, 3, 3, 2, 15, 2, 0, 0, 0, 0,
-                                     0, 0, 0, 0, 0]
+                                     0, 0, 0, 0, 0, 4, 0, 6]
 
     def test_simple_loop_with_call(self):
         @dont_look_inside
@@ -95,3 +95,31 @@ class TestProfile(ProfilerMixin):
         assert res == f(6, 7, 2)
         profiler = pyjitpl._warmrunnerdesc.metainterp_sd.profiler
         assert profiler.calls == 1
+
+
+def test_guard_failure_counts():
+    import gc
+    from rpython.jit.metainterp.compile import ResumeGuardDescr
+    from rpython.jit.metainterp.jitprof import (GuardFailureCounts,
+                                                GUARD_FAILURES_PRUNE_MIN)
+    counts = GuardFailureCounts()
+    d1 = ResumeGuardDescr()
+    d2 = ResumeGuardDescr()
+    counts.count(d1)
+    counts.count(d2)
+    counts.count(d1)
+    assert counts.get_descrs() == [d1, d2]
+    assert d1.guard_failures == 2
+    assert d2.guard_failures == 1
+    # the counts of the freed guards go away with them
+    del d2
+    gc.collect()
+    assert counts.get_descrs() == [d1]
+    # the dead weakrefs are dropped as more guards fail
+    for i in range(GUARD_FAILURES_PRUNE_MIN):
+        counts.count(ResumeGuardDescr())
+        gc.collect()
+    assert len(counts.descr_wrefs) == 2
+    counts.reset()
+    assert counts.get_descrs() == []
+    assert d1.guard_failures == 0
@@ -14,13 +14,18 @@ import py
 from rpython.jit.metainterp.memmgr import MemoryManager
 from rpython.jit.metainterp.test.support import LLJitMixin
 from rpython.rlib.jit import JitDriver, dont_look_inside
+from rpython.jit.metainterp import pyjitpl
 from rpython.jit.metainterp.warmspot import get_stats
 from rpython.jit.metainterp.warmstate import BaseJitCell
 from rpython.rlib import rgc
+from rpython.rlib.rarithmetic import r_uint
 
 class FakeLoopToken:
     generation = 0
     invalidated = False
+    use_count = 0
+    code_size = 0
+    greenkey_hash = r_uint(0)
 
 
 class _TestMemoryManager:
@@ -79,6 +84,108 @@ class _TestMemoryManager:
                 assert tokens[i] in memmgr.alive_loops
 
 
+    def test_code_budget(self):
+        memmgr = MemoryManager()
+        memmgr.set_code_budget(1000)
+        tokens = [FakeLoopToken() for i in range(10)]
+        for token in tokens:
+            memmgr.keep_loop_alive(token)
+            memmgr.record_new_loop(token, r_uint(0), 150)
+            memmgr.next_generation()
+        # each time the budget is exceeded, the oldest loops are freed
+        # until at most 750 bytes are left
+        assert memmgr.total_code_size <= 1000
+        assert memmgr.total_code_size == 150 * len(memmgr.alive_loops)
+        assert tokens[-1] in memmgr.alive_loops
+        assert tokens[0] not in memmgr.alive_loops
+        assert memmgr.evicted_loops == 10 - len(memmgr.alive_loops)
+        assert memmgr.evicted_code_size == 150 * memmgr.evicted_loops
+
+    def test_code_budget_keeps_used_loops(self):
+        memmgr = MemoryManager()
+        memmgr.set_code_budget(1000)
+        hot = FakeLoopToken()
+        memmgr.keep_loop_alive(hot)
+        memmgr.record_new_loop(hot, r_uint(0), 300)
+        for i in range(20):
+            memmgr.next_generation()
+            memmgr.keep_loop_alive(hot)
+        # 'hot' is now older than the loops below, but it ran a lot
+        cold = [FakeLoopToken() for i in range(6)]
+        for token in cold:
+            memmgr.next_generation()
+            memmgr.keep_loop_alive(token)
+            memmgr.record_new_loop(token, r_uint(0), 150)
+        assert hot in memmgr.alive_loops
+        assert cold[0] not in memmgr.alive_loops
+        assert cold[-1] in memmgr.alive_loops
+
+    def test_code_budget_prefers_big_loops(self):
+        memmgr = MemoryManager()
+        small = FakeLoopToken()
+        big = FakeLoopToken()
+        for token, size in [(small, 100), (big, 600)]:
+            memmgr.keep_loop_alive(token)
+            memmgr.record_new_loop(token, r_uint(0), size)
+        memmgr.next_generation()
+        memmgr.set_code_budget(800)
+        new = FakeLoopToken()
+        memmgr.keep_loop_alive(new)
+        memmgr.record_new_loop(new, r_uint(0), 200)
+        assert memmgr.alive_loops == {small: None, new: None}
+        assert memmgr.total_code_size == 300
+
+    def test_code_budget_bridges(self):
+        memmgr = MemoryManager()
+        memmgr.set_code_budget(1000)
+        token = FakeLoopToken()
+        memmgr.keep_loop_alive(token)
+        memmgr.record_new_loop(token, r_uint(0), 400)
+        memmgr.add_code_size(token, 100)
+        assert token.code_size == 500
+        assert memmgr.total_code_size == 500
+        memmgr.next_generation()
+        other = FakeLoopToken()
+        memmgr.keep_loop_alive(other)
+        memmgr.record_new_loop(other, r_uint(0), 600)
+        assert memmgr.alive_loops == {other: None}
+        assert memmgr.total_code_size == 600
+        # if a freed loop is still used, it is counted again
+        memmgr.next_generation()
+        memmgr.keep_loop_alive(token)
+        assert memmgr.total_code_size == 1100
+
+    def test_retraced_loops(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_age(2, 1)
+        token = FakeLoopToken()
+        memmgr.keep_loop_alive(token)
+        memmgr.record_new_loop(token, r_uint(42), 10)
+        for i in range(3):
+            memmgr.next_generation()
+        assert memmgr.alive_loops == {}
+        assert memmgr.evicted_loops == 1
+        assert memmgr.retraced_loops == 0
+        memmgr.record_new_loop(FakeLoopToken(), r_uint(43), 10)
+        assert memmgr.retraced_loops == 0
+        memmgr.record_new_loop(FakeLoopToken(), r_uint(42), 10)
+        assert memmgr.retraced_loops == 1
+
+    def test_invalidated_loops_are_not_evicted(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_age(2, 1)
+        token = FakeLoopToken()
+        memmgr.keep_loop_alive(token)
+        memmgr.record_new_loop(token, r_uint(42), 10)
+        token.invalidated = True
+        memmgr.next_generation()
+        assert memmgr.alive_loops == {}
+        assert memmgr.total_code_size == 0
+        assert memmgr.evicted_loops == 0
+        memmgr.record_new_loop(FakeLoopToken(), r_uint(42), 10)
+        assert memmgr.retraced_loops == 0
+
+
 class _TestIntegration(LLJitMixin):
     # See comments in TestMemoryManager.  To get temporarily the normal
     # behavior just rename this class to TestIntegration.
@@ -224,6 +331,36 @@ class _TestIntegration(LLJitMixin):
         # Loop with number 0, h(), has not been freed
         assert 0 in [t.number for t in tokens if t]
 
+    def test_code_budget(self):
+        myjitdriver = JitDriver(greens=['m'], reds=['n'])
+        def g(m):
+            n = 10
+            while n > 0:
+                myjitdriver.can_enter_jit(n=n, m=m)
+                myjitdriver.jit_merge_point(n=n, m=m)
+                n = n - 1
+            return 21
+        def f():
+            for i in range(10):
+                g(1)      # g(1) is used all the time
+                g(2)      # the others are thrown away
+                g(1)
+                g(3)
+                g(1)
+                g(4)
+            return 42
+
+        # with the llgraph backend, the code size is the number of
+        # operations: around 15 per loop and bridge
+        res = self.meta_interp(f, [], loop_code_budget=50)
+        assert res == 42
+        memmgr = pyjitpl._warmrunnerdesc.memory_manager
+        assert memmgr.evicted_loops > 0
+        assert memmgr.retraced_loops > 0
+        assert memmgr.total_code_size <= 50
+        # the loop of g(1) is compiled only once
+        assert memmgr.retraced_loops < memmgr.evicted_loops
+
 # ____________________________________________________________
 
 def test_all():
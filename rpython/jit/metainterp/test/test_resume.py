@@ -52,8 +52,8 @@ def dump_storage(storage, liveboxes):
             frameinfo = frameinfo.prev
         numb = storage.rd_numb
         while numb:
-            debug_print('\tnumb', str([untag(numb.nums[i])
-                                       for i in range(len(numb.nums))]),
+            debug_print('\tnumb', str([untag(tagged)
+                                       for tagged in decode_numbering(numb)]),
                         'at', compute_unique_id(numb))
             numb = numb.prev
         for const in storage.rd_consts:
@@ -256,11 +256,7 @@ def _next_section(reader, *expected):
 
 
 def Numbering(prev, nums):
-    numb = lltype.malloc(NUMBERING, len(nums))
-    numb.prev = prev or lltype.nullptr(NUMBERING)
-    for i in range(len(nums)):
-        numb.nums[i] = nums[i]
-    return numb
+    return encode_numbering(prev or lltype.nullptr(NUMBERING), nums)
 
 def test_simple_read():
     #b1, b2, b3 = [BoxInt(), BoxPtr(), BoxInt()]
@@ -529,12 +525,24 @@ def test_Numbering_create():
     l = [rffi.r_short(1), rffi.r_short(2)]
     numb = Numbering(None, l)
     assert not numb.prev
-    assert list(numb.nums) == l
+    assert decode_numbering(numb) == l
 
     l1 = [rffi.r_short(3)]
     numb1 = Numbering(numb, l1)
     assert numb1.prev == numb
-    assert list(numb1.nums) == l1
+    assert decode_numbering(numb1) == l1
+
+def test_numbering_encoding():
+    l = [tag(0, TAGBOX), tag(15, TAGBOX), tag(16, TAGBOX), NULLREF,
+         UNINITIALIZED, tag(-4096, TAGINT), tag(4095, TAGINT),
+         UNASSIGNED, UNASSIGNEDVIRTUAL, tag(8191, TAGCONST)]
+    numb = Numbering(None, l)
+    assert decode_numbering(numb) == l
+    # small values take one byte
+    assert len(Numbering(None, [tag(15, TAGBOX), NULLREF]).code) == 2
+    assert len(Numbering(None, [tag(16, TAGBOX)]).code) == 2
+    assert len(Numbering(None, [UNASSIGNED]).code) == 3
+    assert len(Numbering(None, []).code) == 0
 
 def test_capture_resumedata():
     b1, b2, b3 = [BoxInt(), BoxPtr(), BoxInt()]
@@ -900,9 +908,9 @@ def test_ResumeDataLoopMemo_number():
 
     assert liveboxes == {b1: tag(0, TAGBOX), b2: tag(1, TAGBOX),
                          b3: tag(2, TAGBOX)}
-    assert list(numb.nums) == [tag(3, TAGINT), tag(2, TAGBOX), tag(0, TAGBOX),
+    assert decode_numbering(numb) == [tag(3, TAGINT), tag(2, TAGBOX), tag(0, TAGBOX),
                                tag(1, TAGINT)]
-    assert list(numb.prev.nums) == [tag(0, TAGBOX), tag(1, TAGINT),
+    assert decode_numbering(numb.prev) == [tag(0, TAGBOX), tag(1, TAGINT),
                                     tag(1, TAGBOX),
                                     tag(0, TAGBOX), tag(2, TAGINT)]
     assert not numb.prev.prev
@@ -913,7 +921,7 @@ def test_ResumeDataLoopMemo_number():
     assert liveboxes2 == {b1: tag(0, TAGBOX), b2: tag(1, TAGBOX),
                          b3: tag(2, TAGBOX)}
     assert liveboxes2 is not liveboxes
-    assert list(numb2.nums) == [tag(3, TAGINT), tag(2, TAGBOX), tag(0, TAGBOX),
+    assert decode_numbering(numb2) == [tag(3, TAGINT), tag(2, TAGBOX), tag(0, TAGBOX),
                                 tag(3, TAGINT)]
     assert numb2.prev == numb.prev
 
@@ -937,7 +945,7 @@ def test_ResumeDataLoopMemo_number():
     assert v == 0
     
     assert liveboxes3 == {b1: tag(0, TAGBOX), b2: tag(1, TAGBOX)}
-    assert list(numb3.nums) == [tag(3, TAGINT), tag(4, TAGINT), tag(0, TAGBOX),
+    assert decode_numbering(numb3) == [tag(3, TAGINT), tag(4, TAGINT), tag(0, TAGBOX),
                                 tag(3, TAGINT)]
     assert numb3.prev == numb.prev
 
@@ -951,7 +959,7 @@ def test_ResumeDataLoopMemo_number():
     
     assert liveboxes4 == {b1: tag(0, TAGBOX), b2: tag(1, TAGBOX),
                           b4: tag(0, TAGVIRTUAL)}
-    assert list(numb4.nums) == [tag(3, TAGINT), tag(0, TAGVIRTUAL),
+    assert decode_numbering(numb4) == [tag(3, TAGINT), tag(0, TAGVIRTUAL),
                                 tag(0, TAGBOX), tag(3, TAGINT)]
     assert numb4.prev == numb.prev
 
@@ -965,10 +973,48 @@ def test_ResumeDataLoopMemo_number():
     
     assert liveboxes5 == {b1: tag(0, TAGBOX), b2: tag(1, TAGBOX),
                           b4: tag(0, TAGVIRTUAL), b5: tag(1, TAGVIRTUAL)}
-    assert list(numb5.nums) == [tag(0, TAGBOX), tag(0, TAGVIRTUAL),
+    assert decode_numbering(numb5) == [tag(0, TAGBOX), tag(0, TAGVIRTUAL),
                                                 tag(1, TAGVIRTUAL)]
     assert numb5.prev == numb4
 
+def test_ResumeDataLoopMemo_number_shared():
+    b1, b2, b3 = [BoxInt(), BoxInt(), BoxInt()]
+    c1 = ConstInt(1)
+    memo = ResumeDataLoopMemo(FakeMetaInterpStaticData())
+    optimizer = FakeOptimizer({})
+    snap = Snapshot(None, [b1, c1])
+    snap1 = Snapshot(Snapshot(snap, [b2]), [b3])
+    numb1, liveboxes1, v = memo.number(optimizer, snap1)
+    assert memo.nnumberings == 3
+    assert memo.nnumberings_shared == 0
+    # equal content in different snapshots
+    snap2 = Snapshot(Snapshot(Snapshot(None, [b1, c1]), [b2]), [b3])
+    numb2, liveboxes2, v = memo.number(optimizer, snap2)
+    assert numb2 == numb1
+    assert liveboxes2 == liveboxes1
+    assert memo.nnumberings == 3
+    assert memo.nnumberings_shared == 3
+    # after forget_numberings()
+    memo.forget_numberings(None)
+    snap3 = Snapshot(Snapshot(snap, [b2]), [b2])
+    numb3, liveboxes3, v = memo.number(optimizer, snap3)
+    assert numb3 != numb1
+    assert numb3.prev == numb1.prev
+    assert decode_numbering(numb3) == [tag(1, TAGBOX)]
+    assert memo.nnumberings == 4
+    assert memo.numbering_bytes == 5
+    # the numbering only depends on the tagged values, not on the boxes
+    snap4 = Snapshot(Snapshot(None, [b2, c1]), [b2])
+    numb4, liveboxes4, v = memo.number(optimizer, snap4)
+    assert numb4.prev == numb1.prev.prev
+    assert memo.nnumberings == 5
+    # the same content with a different 'prev' is not shared
+    snap5 = Snapshot(Snapshot(None, [c1]), [b2])
+    numb5, liveboxes5, v = memo.number(optimizer, snap5)
+    assert decode_numbering(numb5) == decode_numbering(numb4)
+    assert numb5 != numb4
+    assert memo.nnumberings == 7
+
 def test_ResumeDataLoopMemo_number_boxes():
     memo = ResumeDataLoopMemo(FakeMetaInterpStaticData())
     b1, b2 = [BoxInt(), BoxInt()]
@@ -1104,7 +1150,7 @@ class ResumeDataFakeReader(ResumeDataBoxReader):
         class MyInfo:
             @staticmethod
             def enumerate_vars(callback_i, callback_r, callback_f, _):
-                for index, tagged in enumerate(self.cur_numb.nums):
+                for index, tagged in enumerate(decode_numbering(self.cur_numb)):
                     _, tag = untag(tagged)
                     if tag == TAGVIRTUAL:
                         kind = REF
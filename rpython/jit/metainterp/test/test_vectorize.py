@@ -0,0 +1,165 @@
+from rpython.jit.metainterp.test.support import LLJitMixin
+from rpython.rlib.jit import JitDriver
+from rpython.rlib.rawstorage import (alloc_raw_storage, raw_storage_setitem,
+                                     free_raw_storage, raw_storage_getitem)
+from rpython.rtyper.lltypesystem import lltype
+
+
+class VectorizeTests(object):
+    def run_binary(self, TP, make, op, step=1, shift=0, enable_opts='all:vec'):
+        # c[i] = op(a[i], b[i]), processing two items per iteration, like
+        # the loops of micronumpy do
+        driver = JitDriver(greens=[], reds='auto')
+        size = 8 * step
+        def f(n):
+            a = alloc_raw_storage((n + shift) * size)
+            b = alloc_raw_storage(n * size)
+            for i in range(n + shift):
+                raw_storage_setitem(a, i * size, make(i))
+                if i < n:
+                    raw_storage_setitem(b, i * size, make(3 * i + 1))
+            c = a
+            if not shift:
+                c = alloc_raw_storage(n * size)
+            i = 0
+            while i + 1 < n:
+                driver.jit_merge_point()
+                ofs = i * size
+                x = op(raw_storage_getitem(TP, a, ofs),
+                       raw_storage_getitem(TP, b, ofs))
+                raw_storage_setitem(c, ofs + shift * size, x)
+                ofs2 = ofs + size
+                x = op(raw_storage_getitem(TP, a, ofs2),
+                       raw_storage_getitem(TP, b, ofs2))
+                raw_storage_setitem(c, ofs2 + shift * size, x)
+                i += 2
+            res = make(0)
+            for i in range(n):
+                x = raw_storage_getitem(TP, c, (i + shift) * size)
+                res += x * make(i + 1)
+            free_raw_storage(a)
+            free_raw_storage(b)
+            if not shift:
+                free_raw_storage(c)
+            return res
+        res = self.meta_interp(f, [40], enable_opts=enable_opts)
+        assert res == f(40)
+
+    def test_float_add(self):
+        self.run_binary(lltype.Float, float, lambda x, y: x + y)
+        self.check_simple_loop(vec_raw_op=1, raw_store=0, float_add=0)
+
+    def test_float_sub_mul_div(self):
+        self.run_binary(lltype.Float, float, lambda x, y: x - y)
+        self.check_simple_loop(vec_raw_op=1, float_sub=0)
+        self.run_binary(lltype.Float, float, lambda x, y: x * y)
+        self.check_simple_loop(vec_raw_op=1, float_mul=0)
+        self.run_binary(lltype.Float, float, lambda x, y: x / y)
+        self.check_simple_loop(vec_raw_op=1, float_truediv=0)
+
+    def test_nested_ops_not_packed(self):
+        self.run_binary(lltype.Float, float, lambda x, y: x * y + 1.5)
+        self.check_simple_loop(vec_raw_op=0, raw_store=2)
+
+    def test_int_ops(self):
+        self.run_binary(lltype.Signed, int, lambda x, y: x + y)
+        self.check_simple_loop(vec_raw_op=1, raw_store=0)
+        self.run_binary(lltype.Signed, int, lambda x, y: x ^ y)
+        self.check_simple_loop(vec_raw_op=1, raw_store=0)
+
+    def test_overlapping(self):
+        # c[i + 1] = a[i] + b[i] with 'c is a': the second lane reads
+        # what the first lane wrote
+        self.run_binary(lltype.Float, float, lambda x, y: x + y, shift=1)
+        self.check_simple_loop(vec_raw_op=1)
+
+    def test_step(self):
+        # every other item of the arrays
+        self.run_binary(lltype.Float, float, lambda x, y: x * y, step=2)
+        self.check_simple_loop(vec_raw_op=1)
+
+    def test_unary_and_scalar(self):
+        driver1 = JitDriver(greens=[], reds='auto')
+        driver2 = JitDriver(greens=[], reds='auto')
+        def neg(a, c, n):
+            i = 0
+            while i + 1 < n:
+                driver1.jit_merge_point()
+                ofs = i * 8
+                raw_storage_setitem(c, ofs,
+                                    -raw_storage_getitem(lltype.Float, a, ofs))
+                ofs += 8
+                raw_storage_setitem(c, ofs,
+                                    -raw_storage_getitem(lltype.Float, a, ofs))
+                i += 2
+        def scale(a, c, n, x):
+            i = 0
+            while i + 1 < n:
+                driver2.jit_merge_point()
+                ofs = i * 8
+                raw_storage_setitem(a, ofs,
+                                    x * raw_storage_getitem(lltype.Float, c, ofs))
+                ofs += 8
+                raw_storage_setitem(a, ofs,
+                                    x * raw_storage_getitem(lltype.Float, c, ofs))
+                i += 2
+        def f(n, k):
+            a = alloc_raw_storage(n * 8)
+            c = alloc_raw_storage(n * 8)
+            for i in range(n):
+                raw_storage_setitem(a, i * 8, i * 1.25 - 7.0)
+            neg(a, c, n)
+            scale(a, c, n, float(k))
+            res = 0.0
+            for i in range(n):
+                res = res * 0.5 + raw_storage_getitem(lltype.Float, a, i * 8)
+            free_raw_storage(a)
+            free_raw_storage(c)
+            return res
+        res = self.meta_interp(f, [30, 3], enable_opts='all:vec')
+        assert res == f(30, 3)
+        self.check_resops(vec_raw_op=2, float_neg=2, float_mul=2)
+
+    def test_copy(self):
+        driver = JitDriver(greens=[], reds='auto')
+        def f(n):
+            a = alloc_raw_storage(n * 8)
+            c = alloc_raw_storage(n * 8)
+            for i in range(n):
+                raw_storage_setitem(a, i * 8, i * 3 - 5)
+            i = 0
+            while i + 1 < n:
+                driver.jit_merge_point()
+                ofs = i * 8
+                raw_storage_setitem(c, ofs,
+                                    raw_storage_getitem(lltype.Signed, a, ofs))
+                ofs += 8
+                raw_storage_setitem(c, ofs,
+                                    raw_storage_getitem(lltype.Signed, a, ofs))
+                i += 2
+            res = 0
+            for i in range(n):
+                res = res * 3 + raw_storage_getitem(lltype.Signed, c, i * 8)
+            free_raw_storage(a)
+            free_raw_storage(c)
+            return res
+        res = self.meta_interp(f, [20], enable_opts='all:vec')
+        assert res == f(20)
+        self.check_simple_loop(vec_raw_op=1, raw_load=0)
+
+    def test_guard_in_between(self):
+        def op(x, y):
+            if x > 1e100:
+                return y
+            return x + y
+        self.run_binary(lltype.Float, float, op)
+        self.check_simple_loop(vec_raw_op=0)
+
+    def test_not_enabled(self):
+        self.run_binary(lltype.Float, float, lambda x, y: x + y,
+                        enable_opts='all')
+        self.check_simple_loop(vec_raw_op=0, raw_store=2)
+
+
+class TestLLtype(VectorizeTests, LLJitMixin):
+    pass
@@ -2,6 +2,7 @@ import py
 from rpython.jit.metainterp import jitexc
 from rpython.jit.metainterp.warmspot import get_stats
 from rpython.rlib.jit import JitDriver, set_param, unroll_safe, jit_callback
+from rpython.rlib.jit import trace_next_iteration
 from rpython.jit.backend.llgraph import runner
 
 from rpython.jit.metainterp.test.support import LLJitMixin
@@ -108,6 +109,34 @@ class WarmspotTests(object):
         assert res == 0
         self.check_resops(new_with_vtable=0)
 
+    def test_trace_next_iteration(self):
+        myjitdriver = JitDriver(greens = ['code'], reds = ['n', 'total'])
+
+        def loop(code, n):
+            total = 0
+            while n > 0:
+                myjitdriver.can_enter_jit(code=code, n=n, total=total)
+                myjitdriver.jit_merge_point(code=code, n=n, total=total)
+                total += code
+                n -= 1
+            return total
+        def f(code, n, warm):
+            set_param(myjitdriver, 'threshold', 1000)
+            if warm:
+                trace_next_iteration(myjitdriver, code)
+            return loop(code, n)
+
+        res = self.meta_interp(f, [5, 30, 0])
+        assert res == 150
+        self.check_jitcell_token_count(0)
+        res = self.meta_interp(f, [5, 30, 1])
+        assert res == 150
+        self.check_jitcell_token_count(1)
+        # the counter of another position is not changed
+        res = self.meta_interp(f, [7, 30, 0])
+        assert res == 210
+        self.check_jitcell_token_count(0)
+
     def test_unwanted_loops(self):
         mydriver = JitDriver(reds = ['n', 'total', 'm'], greens = [])
 
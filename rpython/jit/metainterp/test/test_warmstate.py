@@ -1,3 +1,4 @@
+import py
 from rpython.rtyper.test.test_llinterp import interpret
 from rpython.rtyper.lltypesystem import lltype, llmemory, rstr, rffi
 from rpython.rtyper.annlowlevel import llhelper
@@ -101,6 +102,8 @@ def test_make_jitdriver_callbacks_1():
         _get_unique_id_ptr = None
         _can_never_inline_ptr = None
         _should_unroll_one_iteration_ptr = None
+        _get_threshold_ptr = None
+        _get_trace_limit_ptr = None
         red_args_types = []
     class FakeCell:
         dont_trace_here = False
@@ -132,6 +135,8 @@ def test_make_jitdriver_callbacks_3():
         _can_never_inline_ptr = None
         _get_unique_id_ptr = None
         _should_unroll_one_iteration_ptr = None
+        _get_threshold_ptr = None
+        _get_trace_limit_ptr = None
         red_args_types = []
     state = WarmEnterState(FakeWarmRunnerDesc(), FakeJitDriverSD())
     state.make_jitdriver_callbacks()
@@ -159,6 +164,8 @@ def test_make_jitdriver_callbacks_4():
         _can_never_inline_ptr = None
         _get_unique_id_ptr = None
         _should_unroll_one_iteration_ptr = None
+        _get_threshold_ptr = None
+        _get_trace_limit_ptr = None
         red_args_types = []
 
     state = WarmEnterState(FakeWarmRunnerDesc(), FakeJitDriverSD())
@@ -186,9 +193,24 @@ def test_make_jitdriver_callbacks_5():
         _get_unique_id_ptr = None
         _can_never_inline_ptr = llhelper(CAN_NEVER_INLINE, can_never_inline)
         _should_unroll_one_iteration_ptr = None
+        _get_threshold_ptr = None
+        _get_trace_limit_ptr = None
         red_args_types = []
 
     state = WarmEnterState(FakeWarmRunnerDesc(), FakeJitDriverSD())
     state.make_jitdriver_callbacks()
     res = state.can_never_inline(5, 42.5)
     assert res is True
+
+def test_set_param_enable_opts():
+    from rpython.jit.metainterp.optimizeopt import ALL_OPTS_DICT
+    state = WarmEnterState(None, None)
+    state.set_param_enable_opts('all')
+    assert state.enable_opts == ALL_OPTS_DICT
+    assert 'vec' not in state.enable_opts
+    state.set_param_enable_opts('all:vec')
+    assert 'vec' in state.enable_opts
+    assert 'unroll' in state.enable_opts
+    state.set_param_enable_opts('intbounds:vec')
+    assert sorted(state.enable_opts) == ['intbounds', 'vec']
+    py.test.raises(ValueError, state.set_param_enable_opts, 'all:foo')
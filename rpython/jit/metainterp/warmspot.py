@@ -69,8 +69,8 @@ def ll_meta_interp(function, args, backendopt=False, type_system='lltype',
 
 def jittify_and_run(interp, graph, args, repeat=1, graph_and_interp_only=False,
                     backendopt=False, trace_limit=sys.maxint,
-                    inline=False, loop_longevity=0, retrace_limit=5,
-                    function_threshold=4,
+                    inline=False, loop_longevity=0, loop_code_budget=0,
+                    deferred_bridges=0, retrace_limit=5, function_threshold=4,
                     enable_opts=ALL_OPTS_NAMES, max_retrace_guards=15, 
                     max_unroll_recursion=7, **kwds):
     from rpython.config.config import ConfigError
@@ -91,6 +91,8 @@ def jittify_and_run(interp, graph, args, repeat=1, graph_and_interp_only=False,
         jd.warmstate.set_param_trace_limit(trace_limit)
         jd.warmstate.set_param_inlining(inline)
         jd.warmstate.set_param_loop_longevity(loop_longevity)
+        jd.warmstate.set_param_loop_code_budget(loop_code_budget)
+        jd.warmstate.set_param_deferred_bridges(deferred_bridges)
         jd.warmstate.set_param_retrace_limit(retrace_limit)
         jd.warmstate.set_param_max_retrace_guards(max_retrace_guards)
         jd.warmstate.set_param_enable_opts(enable_opts)
@@ -102,6 +104,7 @@ def jittify_and_run(interp, graph, args, repeat=1, graph_and_interp_only=False,
     if not kwds.get('translate_support_code', False):
         warmrunnerdesc.metainterp_sd.profiler.finish()
         warmrunnerdesc.metainterp_sd.cpu.finish_once()
+        warmrunnerdesc.metainterp_sd.jitlog.finish()
     print '~~~ return value:', repr(res)
     while repeat > 1:
         print '~' * 79
@@ -153,6 +156,9 @@ def locate_jit_merge_point(graph):
 def find_set_param(graphs):
     return _find_jit_marker(graphs, 'set_param')
 
+def find_trace_next_iteration(graphs):
+    return _find_jit_marker(graphs, 'trace_next_iteration')
+
 def find_force_quasi_immutable(graphs):
     results = []
     for graph in graphs:
@@ -234,6 +240,7 @@ class WarmRunnerDesc(object):
         self.codewriter.make_jitcodes(verbose=verbose)
         self.rewrite_can_enter_jits()
         self.rewrite_set_param_and_get_stats()
+        self.rewrite_trace_next_iteration()
         self.rewrite_force_virtual(vrefinfo)
         self.rewrite_force_quasi_immutable()
         self.add_finish()
@@ -543,6 +550,12 @@ class WarmRunnerDesc(object):
             jd._should_unroll_one_iteration_ptr = self._make_hook_graph(jd,
                 annhelper, jd.jitdriver.should_unroll_one_iteration,
                 annmodel.s_Bool)
+            jd._get_threshold_ptr = self._make_hook_graph(jd,
+                annhelper, jd.jitdriver.get_threshold,
+                annmodel.SomeInteger())
+            jd._get_trace_limit_ptr = self._make_hook_graph(jd,
+                annhelper, jd.jitdriver.get_trace_limit,
+                annmodel.SomeInteger())
         annhelper.finish()
 
     def _make_hook_graph(self, jitdriver_sd, annhelper, func,
@@ -690,9 +703,10 @@ class WarmRunnerDesc(object):
         # make sure we make a copy of function so it no longer belongs
         # to extregistry
         func = op.args[1].value
-        if func.func_name.startswith('stats_'):
-            # get special treatment since we rewrite it to a call that accepts
-            # jit driver
+        if func.func_code.co_varnames[:1] == ('warmrunnerdesc',):
+            # helpers taking a 'warmrunnerdesc' (the stats_xxx() ones and a
+            # few others) get special treatment since we rewrite it to a
+            # call that accepts jit driver
             func = func_with_new_name(func, func.func_name + '_compiled')
 
             def new_func(ignored, *args):
@@ -930,6 +944,7 @@ class WarmRunnerDesc(object):
             if self.metainterp_sd.profiler.initialized:
                 self.metainterp_sd.profiler.finish()
             self.metainterp_sd.cpu.finish_once()
+            self.metainterp_sd.jitlog.finish()
 
         if self.cpu.translate_support_code:
             call_final_function(self.translator, finish,
@@ -983,6 +998,30 @@ class WarmRunnerDesc(object):
             op.opname = 'direct_call'
             op.args[:3] = [closures[key]]
 
+    def rewrite_trace_next_iteration(self):
+        closures = {}
+        for graph, block, i in find_trace_next_iteration(
+                self.translator.graphs):
+            op = block.operations[i]
+            for jd in self.jitdrivers_sd:
+                if jd.jitdriver is op.args[1].value:
+                    break
+            else:
+                assert 0, "jitdriver of trace_next_iteration() not found"
+            greens_v = op.args[2:]
+            assert [v.concretetype for v in greens_v] == jd._green_args_spec, (
+                "trace_next_iteration() called with green args of the "
+                "wrong types")
+            if jd not in closures:
+                JitCell = jd.warmstate.make_jitcell_subclass()
+                FUNCPTR = lltype.Ptr(lltype.FuncType(jd._green_args_spec,
+                                                     lltype.Void))
+                funcptr = self.helper_func(FUNCPTR,
+                                           JitCell.trace_next_time)
+                closures[jd] = Constant(funcptr, FUNCPTR)
+            op.opname = 'direct_call'
+            op.args = [closures[jd]] + greens_v
+
     def rewrite_force_virtual(self, vrefinfo):
         all_graphs = self.translator.graphs
         vrefinfo.replace_force_virtual_with_call(all_graphs)
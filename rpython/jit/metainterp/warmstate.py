@@ -129,6 +129,7 @@ JC_TRACING         = 0x01
 JC_DONT_TRACE_HERE = 0x02
 JC_TEMPORARY       = 0x04
 JC_TRACING_OCCURRED= 0x08
+JC_TRACE_NEXT_TIME = 0x10
 
 class BaseJitCell(object):
     """Subclasses of BaseJitCell are used in tandem with the single
@@ -175,6 +176,12 @@ class BaseJitCell(object):
         this particular function.  (We only set this flag when aborting
         due to a trace too long, so we use the same flag as a hint to
         also mean "please trace from here as soon as possible".)
+
+        JC_TRACE_NEXT_TIME: start tracing from here the next time we
+        reach this greenkey, without waiting for the JitCounter.  Set
+        by rlib.jit.trace_next_iteration(), e.g. to warm up a new
+        process with the greenkeys that were hot in a previous run.
+        Unlike a counter in the JitCounter, this flag is not decayed.
     """
     flags = 0     # JC_xxx flags
     wref_procedure_token = None
@@ -201,11 +208,17 @@ class BaseJitCell(object):
         assert token is not None
         return weakref.ref(token)
 
+    def get_cell_uhash(self):
+        # the hash of the greenkey, used when the JitCounter grows
+        raise NotImplementedError
+
     def should_remove_jitcell(self):
         if self.get_procedure_token() is not None:
             return False    # don't remove JitCells with a procedure_token
         if self.flags & JC_TRACING:
             return False    # don't remove JitCells that are being traced
+        if self.flags & JC_TRACE_NEXT_TIME:
+            return False    # don't remove JitCells that we want to trace
         if self.flags & JC_DONT_TRACE_HERE:
             # if we have this flag, and we *had* a procedure_token but
             # we no longer have one, then remove me.  this prevents this
@@ -228,6 +241,10 @@ class WarmEnterState(object):
             self.profiler = warmrunnerdesc.metainterp_sd.profiler
         except AttributeError:       # for tests
             self.profiler = None
+        try:
+            self.bridge_queue = warmrunnerdesc.metainterp_sd.bridge_queue
+        except AttributeError:       # for tests
+            self.bridge_queue = None
         # initialize the state with the default values of the
         # parameters specified in rlib/jit.py
         if self.warmrunnerdesc is not None:
@@ -250,6 +267,9 @@ class WarmEnterState(object):
     def set_param_trace_limit(self, value):
         self.trace_limit = value
 
+    def set_param_counter_table_size(self, value):
+        self.warmrunnerdesc.jitcounter.set_fixed_size(value)
+
     def set_param_decay(self, decay):
         self.warmrunnerdesc.jitcounter.set_decay(decay)
 
@@ -257,7 +277,8 @@ class WarmEnterState(object):
         self.inlining = value
 
     def set_param_enable_opts(self, value):
-        from rpython.jit.metainterp.optimizeopt import ALL_OPTS_DICT, ALL_OPTS_NAMES
+        from rpython.jit.metainterp.optimizeopt import (ALL_OPTS_DICT,
+            ALL_OPTS_LIST, ALL_OPTS_NAMES, OPTIONAL_OPTS_DICT)
 
         d = {}
         if NonConstant(False):
@@ -265,8 +286,12 @@ class WarmEnterState(object):
         if value is None or value == 'all':
             value = ALL_OPTS_NAMES
         for name in value.split(":"):
-            if name:
-                if name not in ALL_OPTS_DICT:
+            if name == 'all':
+                # e.g. 'all:vec', to add an optional optimization
+                for name1 in ALL_OPTS_LIST:
+                    d[name1] = None
+            elif name:
+                if name not in ALL_OPTS_DICT and name not in OPTIONAL_OPTS_DICT:
                     raise ValueError('Unknown optimization ' + name)
                 d[name] = None
         self.enable_opts = d
@@ -277,6 +302,17 @@ class WarmEnterState(object):
             self.warmrunnerdesc.memory_manager is not None):   # all for tests
             self.warmrunnerdesc.memory_manager.set_max_age(value)
 
+    def set_param_loop_code_budget(self, value):
+        # note: it's a global parameter, not a per-jitdriver one
+        if (self.warmrunnerdesc is not None and
+            self.warmrunnerdesc.memory_manager is not None):   # all for tests
+            self.warmrunnerdesc.memory_manager.set_code_budget(value)
+
+    def set_param_deferred_bridges(self, value):
+        # note: it's a global parameter, not a per-jitdriver one
+        if self.bridge_queue is not None:      # for tests
+            self.bridge_queue.enabled = bool(value)
+
     def set_param_retrace_limit(self, value):
         if self.warmrunnerdesc:
             if self.warmrunnerdesc.memory_manager:
@@ -332,6 +368,7 @@ class WarmEnterState(object):
         JitCell = self.make_jitcell_subclass()
         self.make_jitdriver_callbacks()
         confirm_enter_jit = self.confirm_enter_jit
+        get_increment_threshold = self.get_increment_threshold
         range_red_args = unrolling_iterable(
             range(num_green_args, num_green_args + jitdriver_sd.num_red_args))
         # get a new specialized copy of the method
@@ -376,6 +413,7 @@ class WarmEnterState(object):
             if not confirm_enter_jit(*args):
                 return
             jitcounter.decay_all_counters()
+            jitcounter.maybe_grow()
             # start tracing
             from rpython.jit.metainterp.pyjitpl import MetaInterp
             metainterp = MetaInterp(metainterp_sd, jitdriver_sd)
@@ -407,6 +445,8 @@ class WarmEnterState(object):
                 cell = cell.next
             else:
                 # not found. increment the counter
+                increment_threshold = get_increment_threshold(
+                    increment_threshold, *greenargs)
                 if jitcounter.tick(hash, increment_threshold):
                     bound_reached(hash, None, *args)
                 return
@@ -419,18 +459,26 @@ class WarmEnterState(object):
                     # this function. don't trace a second time.
                     return
                 # attached by compile_tmp_callback().  count normally
+                increment_threshold = get_increment_threshold(
+                    increment_threshold, *greenargs)
                 if jitcounter.tick(hash, increment_threshold):
                     bound_reached(hash, cell, *args)
                 return
             # machine code was already compiled for these greenargs
             procedure_token = cell.get_procedure_token()
             if procedure_token is None:
+                if cell.flags & JC_TRACE_NEXT_TIME:
+                    cell.flags &= ~JC_TRACE_NEXT_TIME
+                    bound_reached(hash, cell, *args)
+                    return
                 if cell.flags & JC_DONT_TRACE_HERE:
                     if not cell.has_seen_a_procedure_token():
                         # A JC_DONT_TRACE_HERE, i.e. a non-inlinable function.
                         # If we never tried to trace it, try it now immediately.
                         # Otherwise, count normally.
                         if cell.flags & JC_TRACING_OCCURRED:
+                            increment_threshold = get_increment_threshold(
+                                increment_threshold, *greenargs)
                             tick = jitcounter.tick(hash, increment_threshold)
                         else:
                             tick = True
@@ -511,6 +559,12 @@ class WarmEnterState(object):
                     i = i + 1
                 return True
 
+            def get_cell_uhash(self):
+                greenargs = ()
+                for attrname, _ in green_args_name_spec:
+                    greenargs += (getattr(self, attrname),)
+                return JitCell.get_uhash(*greenargs)
+
             @staticmethod
             def get_uhash(*greenargs):
                 x = r_uint(-1888132534)
@@ -547,6 +601,10 @@ class WarmEnterState(object):
             @staticmethod
             def ensure_jit_cell_at_key(greenkey):
                 greenargs = unwrap_greenkey(greenkey)
+                return JitCell.ensure_jit_cell(*greenargs)
+
+            @staticmethod
+            def ensure_jit_cell(*greenargs):
                 hash = JitCell.get_uhash(*greenargs)
                 cell = jitcounter.lookup_chain(hash)
                 while cell is not None:
@@ -557,6 +615,11 @@ class WarmEnterState(object):
                 newcell = JitCell(*greenargs)
                 jitcounter.install_new_cell(hash, newcell)
                 return newcell
+
+            @staticmethod
+            def trace_next_time(*greenargs):
+                cell = JitCell.ensure_jit_cell(*greenargs)
+                cell.flags |= JC_TRACE_NEXT_TIME
         #
         self.JitCell = JitCell
         return JitCell
@@ -573,6 +636,7 @@ class WarmEnterState(object):
         jd = self.jitdriver_sd
         cpu = self.cpu
         rtyper = self.warmrunnerdesc.rtyper
+        jitcounter = self.warmrunnerdesc.jitcounter
 
         def can_inline_callable(greenkey):
             greenargs = unwrap_greenkey(greenkey)
@@ -594,6 +658,10 @@ class WarmEnterState(object):
             cell.flags |= JC_DONT_TRACE_HERE
         self.dont_trace_here = dont_trace_here
 
+        def get_greenkey_hash(greenkey):
+            return JitCell.get_uhash(*unwrap_greenkey(greenkey))
+        self.get_greenkey_hash = get_greenkey_hash
+
         if jd._should_unroll_one_iteration_ptr is None:
             def should_unroll_one_iteration(greenkey):
                 return False
@@ -628,6 +696,8 @@ class WarmEnterState(object):
         get_location_ptr = self.jitdriver_sd._get_printable_location_ptr
         if get_location_ptr is None:
             missing = '(%s: no get_printable_location)' % drivername
+            def compute_location_str(greenkey):
+                return missing
             def get_location_str(greenkey):
                 return missing
         else:
@@ -638,15 +708,19 @@ class WarmEnterState(object):
             missing = ('(%s: get_printable_location '
                        'disabled, no debug_print)' % drivername)
             #
-            def get_location_str(greenkey):
-                if not have_debug_prints_for("jit-"):
-                    return missing
+            def compute_location_str(greenkey):
                 greenargs = unwrap_greenkey(greenkey)
                 fn = support.maybe_on_top_of_llinterp(rtyper, get_location_ptr)
                 llres = fn(*greenargs)
                 if not we_are_translated() and isinstance(llres, str):
                     return llres
                 return hlstr(llres)
+            #
+            def get_location_str(greenkey):
+                if not have_debug_prints_for("jit-"):
+                    return missing
+                return compute_location_str(greenkey)
+        self.compute_location_str = compute_location_str
         self.get_location_str = get_location_str
         #
         confirm_enter_jit_ptr = self.jitdriver_sd._confirm_enter_jit_ptr
@@ -672,6 +746,37 @@ class WarmEnterState(object):
                                                       can_never_inline_ptr)
                 return fn(*greenargs)
         self.can_never_inline = can_never_inline
+        #
+        get_threshold_ptr = self.jitdriver_sd._get_threshold_ptr
+        if get_threshold_ptr is None:
+            def get_increment_threshold(increment_threshold, *greenargs):
+                return increment_threshold
+        else:
+            #
+            def get_increment_threshold(increment_threshold, *greenargs):
+                fn = support.maybe_on_top_of_llinterp(rtyper,
+                                                      get_threshold_ptr)
+                threshold = fn(*greenargs)
+                if threshold > 0:
+                    return jitcounter.compute_threshold(threshold)
+                return increment_threshold
+        self.get_increment_threshold = get_increment_threshold
+        #
+        get_trace_limit_ptr = self.jitdriver_sd._get_trace_limit_ptr
+        if get_trace_limit_ptr is None:
+            def get_trace_limit(greenkey):
+                return self.trace_limit
+        else:
+            #
+            def get_trace_limit(greenkey):
+                greenargs = unwrap_greenkey(greenkey)
+                fn = support.maybe_on_top_of_llinterp(rtyper,
+                                                      get_trace_limit_ptr)
+                trace_limit = fn(*greenargs)
+                if trace_limit > 0:
+                    return trace_limit
+                return self.trace_limit
+        self.get_trace_limit = get_trace_limit
         get_unique_id_ptr = self.jitdriver_sd._get_unique_id_ptr
         def get_unique_id(greenkey):
             greenargs = unwrap_greenkey(greenkey)
@@ -26,6 +26,9 @@ REGEXES = [
     (('nvirtuals',), '^nvirtuals:\s+(\d+)$'),
     (('nvholes',), '^nvholes:\s+(\d+)$'),
     (('nvreused',), '^nvreused:\s+(\d+)$'),
+    (('numberings',), '^numberings:\s+(\d+)$'),
+    (('numberings_shared',), '^numberings shared:\s+(\d+)$'),
+    (('numbering_bytes',), '^numbering bytes:\s+(\d+)$'),
     (('total_compiled_loops',),   '^Total # of loops:\s+(\d+)$'),
     (('total_compiled_bridges',), '^Total # of bridges:\s+(\d+)$'),
     (('total_freed_loops',),      '^Freed # of loops:\s+(\d+)$'),
@@ -57,6 +60,9 @@ class OutputInfo(object):
     nvirtuals = 0
     nvholes = 0
     nvreused = 0
+    numberings = 0
+    numberings_shared = 0
+    numbering_bytes = 0
 
     def __init__(self):
         self.ops = Ops()
@@ -61,6 +61,9 @@ abort: force quasi-immut: 3
 nvirtuals:              13
 nvholes:                14
 nvreused:               15
+numberings:             16
+numberings shared:      17
+numbering bytes:        18
 Total # of loops:       100
 Total # of bridges:     300
 Freed # of loops:       99
@@ -88,3 +91,6 @@ def test_parse():
     assert info.nvirtuals == 13
     assert info.nvholes == 14
     assert info.nvreused == 15
+    assert info.numberings == 16
+    assert info.numberings_shared == 17
+    assert info.numbering_bytes == 18
@@ -23,7 +23,7 @@ class GCBase(object):
     gcflag_extra = 0   # or a real GC flag that is always 0 when not collecting
 
     def __init__(self, config, chunk_size=DEFAULT_CHUNK_SIZE,
-                 translated_to_c=True):
+                 translated_to_c=True, hooks=None):
         self.gcheaderbuilder = GCHeaderBuilder(self.HDR)
         self.AddressStack = get_address_stack(chunk_size)
         self.AddressDeque = get_address_deque(chunk_size)
@@ -32,6 +32,10 @@ class GCBase(object):
         self.config = config
         assert isinstance(translated_to_c, bool)
         self.translated_to_c = translated_to_c
+        if hooks is None:
+            from rpython.memory.gc.hook import GcHooks
+            hooks = GcHooks()     # no-op hooks
+        self.hooks = hooks
 
     def setup(self):
         # all runtime mutable values' setup should happen here
@@ -0,0 +1,42 @@
+from rpython.rlib import rgc
+
+# Note: at the moment, the hooks are only called by incminimark.  Add
+# calls to the other GCs if you need them there too.
+
+
+class GcHooks(object):
+    """Base class for the hooks called by the GC.
+
+    Subclasses override the is_*_enabled() and on_*() methods.  The
+    on_*() methods are called in the middle of the GC: they can only do
+    simple things like updating some counters or setting a flag, and
+    must never do anything that could allocate GC memory.  The fire_*()
+    methods are called by the GC and should not be overridden.
+
+    The durations are expressed in ticks of rtimer.read_timestamp().
+    """
+
+    def is_gc_minor_enabled(self):
+        return False
+
+    def is_gc_collect_step_enabled(self):
+        return False
+
+    def on_gc_minor(self, duration, total_memory_used, pinned_objects):
+        """Called after each minor collection."""
+
+    def on_gc_collect_step(self, duration, oldstate, newstate):
+        """Called after each step of an incremental major collection.
+        'oldstate' and 'newstate' are the GC states before and after
+        the step; for incminimark, see incminimark.GC_STATES.
+        """
+
+    @rgc.no_collect
+    def fire_gc_minor(self, duration, total_memory_used, pinned_objects):
+        if self.is_gc_minor_enabled():
+            self.on_gc_minor(duration, total_memory_used, pinned_objects)
+
+    @rgc.no_collect
+    def fire_gc_collect_step(self, duration, oldstate, newstate):
+        if self.is_gc_collect_step_enabled():
+            self.on_gc_collect_step(duration, oldstate, newstate)
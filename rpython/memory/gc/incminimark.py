@@ -15,6 +15,15 @@ Environment variables can be used to fine-tune the following parameters:
                          to size that survives minor collection * 1.5 so we
                          reclaim anything all the time.
 
+ PYPY_GC_MAX_PAUSE       If set, the target for the maximal duration of
+                         the steps of major collections, in microseconds.
+                         The size of each step is then computed from the
+                         speed of marking and sweeping measured so far,
+                         instead of using PYPY_GC_INCREMENT_STEP.  Note
+                         that the target is exceeded if needed to mark
+                         or sweep more than the program allocates in the
+                         meantime.
+
  PYPY_GC_MAJOR_COLLECT   Major collection memory factor.  Default is '1.82',
                          which means trigger a major collection when the
                          memory consumed equals 1.82 times the memory
@@ -38,6 +47,11 @@ Environment variables can be used to fine-tune the following parameters:
                          total RAM size (which is constrained to be at most
                          2/3/4GB on 32-bit systems).  Try values like '200MB'.
 
+ PYPY_GC_KEEP_FREE       The amount of memory in arenas that are entirely
+                         free which is kept for reuse, instead of being
+                         returned to the OS.  Defaults to 4 times the
+                         nursery.  Try values like '20MB'.
+
  PYPY_GC_MIN             Don't collect while the memory size is below this
                          limit.  Useful to avoid spending all the time in
                          the GC in very small programs.  Defaults to 8
@@ -62,6 +76,7 @@ Environment variables can be used to fine-tune the following parameters:
 # XXX old_objects_pointing_to_young (IRC 2014-10-22, fijal and gregor_w)
 import sys
 import os
+import time
 from rpython.rtyper.lltypesystem import lltype, llmemory, llarena, llgroup
 from rpython.rtyper.lltypesystem.lloperation import llop
 from rpython.rtyper.lltypesystem.llmemory import raw_malloc_usage
@@ -72,6 +87,8 @@ from rpython.rlib.rarithmetic import ovfcheck, LONG_BIT, intmask, r_uint
 from rpython.rlib.rarithmetic import LONG_BIT_SHIFT
 from rpython.rlib.debug import ll_assert, debug_print, debug_start, debug_stop
 from rpython.rlib.objectmodel import specialize
+from rpython.rlib.rtimer import read_timestamp
+from rpython.rlib import rgc
 from rpython.memory.gc.minimarkpage import out_of_memory
 
 #
@@ -290,10 +307,31 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.major_collection_threshold = major_collection_threshold
         self.growth_rate_max = growth_rate_max
         self.num_major_collects = 0
+        #
+        # Statistics, returned by get_stats().  The times are in ticks
+        # of read_timestamp().
+        self.num_minor_collects = 0
+        self.num_major_collection_steps = 0
+        self.total_minor_time = 0
+        self.max_minor_time = 0
+        self.total_major_time = 0
+        self.max_major_step_time = 0
+        #
+        # Pacing of the major collection steps: if 'max_pause' is not
+        # zero, the steps are sized to take at most 'max_pause'
+        # microseconds, given the speeds measured so far.  The speeds
+        # are 0.0 until they are first measured.
+        self.max_pause = 0.0
+        self.mark_bytes_per_tick = 0.0
+        self.sweep_pages_per_tick = 0.0
+        self.sweep_rawmalloced_per_tick = 0.0
+        self.calibration_time = 0.0
+        self.calibration_ticks = 0.0
         self.min_heap_size = 0.0
         self.max_heap_size = 0.0
         self.max_heap_size_already_raised = False
         self.max_delta = float(r_uint(-1))
+        self.keep_free_size = 0
         self.max_number_of_pinned_objects = 0      # computed later
         #
         self.card_page_indices = card_page_indices
@@ -358,6 +396,10 @@ class IncrementalMiniMarkGC(MovingGCBase):
 
         self.gc_state = STATE_SCANNING
         #
+        # Used to find the length of the ticks of read_timestamp()
+        self.calibration_time = time.time()
+        self.calibration_ticks = float(read_timestamp())
+        #
         # A list of all objects with finalizers (these are never young).
         self.objects_with_finalizers = self.AddressDeque()
         self.young_objects_with_light_finalizers = self.AddressStack()
@@ -402,6 +444,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
         if not self.read_from_env:
             self.allocate_nursery()
             self.gc_increment_step = self.nursery_size * 4
+            self.keep_free_size = self.nursery_size * 4
             self.gc_nursery_debug = False
         else:
             #
@@ -459,6 +502,16 @@ class IncrementalMiniMarkGC(MovingGCBase):
             else:
                 self.gc_increment_step = newsize * 4
             #
+            keep_free_size = env.read_from_env('PYPY_GC_KEEP_FREE')
+            if keep_free_size > 0:
+                self.keep_free_size = keep_free_size
+            else:
+                self.keep_free_size = newsize * 4
+            #
+            max_pause = env.read_float_from_env('PYPY_GC_MAX_PAUSE')
+            if max_pause > 0.0:
+                self.max_pause = max_pause
+            #
             nursery_debug = env.read_uint_from_env('PYPY_GC_NURSERY_DEBUG')
             if nursery_debug > 0:
                 self.gc_nursery_debug = True
@@ -701,6 +754,22 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 self.major_collection_step()
         else:
             self.minor_and_major_collection()
+            self.release_free_arenas(sys.maxint)
+
+    def release_free_arenas(self, max_arenas):
+        """Return to the OS at most 'max_arenas' of the arenas that are
+        entirely free, but keep 'keep_free_size' bytes of them for reuse.
+        """
+        n = self.ac.num_free_arenas - self.keep_free_size // self.ac.arena_size
+        if n > max_arenas:
+            n = max_arenas
+        if n > 0:
+            self.ac.release_free_arenas(n)
+
+    def release_memory(self):
+        """Return to the OS all the arenas that are entirely free.
+        Returns the number of bytes released."""
+        return self.ac.release_free_arenas(sys.maxint) * self.ac.arena_size
 
 
     def collect_and_reserve(self, totalsize):
@@ -1112,6 +1181,43 @@ class IncrementalMiniMarkGC(MovingGCBase):
         """
         return self.ac.total_memory_used + self.rawmalloced_total_size
 
+    def get_stats(self, stats_no):
+        """Returns one of the statistics listed in rgc.get_stats(),
+        or -1 if 'stats_no' is unknown."""
+        if stats_no == rgc.NUM_MINOR_COLLECTS:
+            return self.num_minor_collects
+        elif stats_no == rgc.NUM_MAJOR_COLLECTS:
+            return self.num_major_collects
+        elif stats_no == rgc.NUM_MAJOR_COLLECTION_STEPS:
+            return self.num_major_collection_steps
+        elif stats_no == rgc.TOTAL_MINOR_TIME:
+            return self.total_minor_time
+        elif stats_no == rgc.MAX_MINOR_TIME:
+            return self.max_minor_time
+        elif stats_no == rgc.TOTAL_MAJOR_TIME:
+            return self.total_major_time
+        elif stats_no == rgc.MAX_MAJOR_STEP_TIME:
+            return self.max_major_step_time
+        elif stats_no == rgc.NURSERY_SIZE:
+            return self.nursery_size
+        elif stats_no == rgc.ARENAS_COUNT:
+            return self.ac.arenas_count
+        elif stats_no == rgc.ARENAS_BYTES:
+            return self.ac.arenas_count * self.ac.arena_size
+        elif stats_no == rgc.RAWMALLOC_BYTES:
+            return intmask(self.rawmalloced_total_size)
+        elif stats_no == rgc.TOTAL_MEMORY_USED:
+            return intmask(self.get_total_memory_used())
+        elif stats_no == rgc.MAX_PAUSE:
+            return int(self.max_pause)
+        elif stats_no == rgc.MARK_BYTES_PER_MICROSECOND:
+            return int(self.mark_bytes_per_tick *
+                       self.ticks_per_microsecond())
+        elif stats_no == rgc.SWEEP_BYTES_PER_MICROSECOND:
+            return int(self.sweep_pages_per_tick * self.ac.page_size *
+                       self.ticks_per_microsecond())
+        return -1
+
     def get_total_memory_free(self):
         return (self.next_major_collection_threshold -
                 float(self.get_total_memory_used()))
@@ -1528,6 +1634,7 @@ class IncrementalMiniMarkGC(MovingGCBase):
         """Perform a minor collection: find the objects from the nursery
         that remain alive and move them out."""
         #
+        start = read_timestamp()
         debug_start("gc-minor")
         #
         # All nursery barriers are invalid from this point on.  They
@@ -1697,6 +1804,15 @@ class IncrementalMiniMarkGC(MovingGCBase):
         self.root_walker.finished_minor_collection()
         #
         debug_stop("gc-minor")
+        duration = intmask(read_timestamp() - start)
+        self.num_minor_collects += 1
+        self.total_minor_time += duration
+        if duration > self.max_minor_time:
+            self.max_minor_time = duration
+        self.hooks.fire_gc_minor(
+            duration=duration,
+            total_memory_used=intmask(self.get_total_memory_used()),
+            pinned_objects=self.pinned_objects_in_nursery)
 
     def _reset_flag_old_objects_pointing_to_pinned(self, obj, ignore):
         assert self.header(obj).tid & GCFLAG_PINNED_OBJECT_PARENT_KNOWN
@@ -2061,6 +2177,8 @@ class IncrementalMiniMarkGC(MovingGCBase):
     # Note - minor collections seem fast enough so that one
     # is done before every major collection step
     def major_collection_step(self, reserving_size=0):
+        start = read_timestamp()
+        oldstate = self.gc_state
         debug_start("gc-collect-step")
         debug_print("starting gc state: ", GC_STATES[self.gc_state])
         # Debugging checks
@@ -2087,12 +2205,25 @@ class IncrementalMiniMarkGC(MovingGCBase):
                         self.objects_to_trace.length(),
                         "plus",
                         self.more_objects_to_trace.length())
-            estimate = self.gc_increment_step
+            # Return to the OS a few of the arenas that stayed entirely
+            # free since the end of the previous major collection, beyond
+            # 'keep_free_size'.  They are not released during the
+            # sweeping, to keep its last step short and to let the
+            # program reuse them meanwhile.
+            self.release_free_arenas(
+                3 * self.nursery_size // self.ac.arena_size + 1)
+            #
+            estimate = self.paced_step_size(self.mark_bytes_per_tick,
+                                            intmask(self.gc_increment_step))
             estimate_from_nursery = self.nursery_surviving_size * 2
             if estimate_from_nursery > estimate:
                 estimate = estimate_from_nursery
             estimate = intmask(estimate)
+            start_marking = read_timestamp()
             remaining = self.visit_all_objects_step(estimate)
+            self.mark_bytes_per_tick = self.updated_speed(
+                self.mark_bytes_per_tick, estimate - remaining,
+                read_timestamp() - start_marking)
             #
             if remaining >= estimate // 2:
                 if self.more_objects_to_trace.non_empty():
@@ -2156,18 +2287,38 @@ class IncrementalMiniMarkGC(MovingGCBase):
                 # have the GCFLAG_VISITED flag.  Visit at most 'limit' objects.
                 # This limit is conservatively high enough to guarantee that
                 # a total object size of at least '3 * nursery_size' bytes
-                # is processed.
-                limit = 3 * self.nursery_size // self.small_request_threshold
-                self.free_unvisited_rawmalloc_objects_step(limit)
+                # is processed (unless pacing with PYPY_GC_MAX_PAUSE, which
+                # still processes at least 'nursery_size' bytes: otherwise
+                # the sweeping would not keep up with the allocations).
+                limit = self.paced_step_size(
+                    self.sweep_rawmalloced_per_tick,
+                    3 * self.nursery_size // self.small_request_threshold)
+                limit = max(limit,
+                            self.nursery_size // self.small_request_threshold)
+                start_sweeping = read_timestamp()
+                remaining = self.free_unvisited_rawmalloc_objects_step(limit)
+                self.sweep_rawmalloced_per_tick = self.updated_speed(
+                    self.sweep_rawmalloced_per_tick, limit - remaining,
+                    read_timestamp() - start_sweeping)
                 done = False    # the 2nd half below must still be done
             else:
                 # Ask the ArenaCollection to visit a fraction of the objects.
                 # Free the ones that have not been visited above, and reset
                 # GCFLAG_VISITED on the others.  Visit at most '3 *
-                # nursery_size' bytes.
-                limit = 3 * self.nursery_size // self.ac.page_size
+                # nursery_size' bytes (unless pacing with PYPY_GC_MAX_PAUSE,
+                # which still visits at least 'nursery_size' bytes).
+                limit = self.paced_step_size(
+                    self.sweep_pages_per_tick,
+                    3 * self.nursery_size // self.ac.page_size)
+                limit = max(limit, self.nursery_size // self.ac.page_size)
+                start_sweeping = read_timestamp()
                 done = self.ac.mass_free_incremental(self._free_if_unvisited,
                                                      limit)
+                if not done:
+                    # we don't know how many pages were visited if done
+                    self.sweep_pages_per_tick = self.updated_speed(
+                        self.sweep_pages_per_tick, limit,
+                        read_timestamp() - start_sweeping)
             # XXX tweak the limits above
             #
             if done:
@@ -2224,6 +2375,58 @@ class IncrementalMiniMarkGC(MovingGCBase):
 
         debug_print("stopping, now in gc state: ", GC_STATES[self.gc_state])
         debug_stop("gc-collect-step")
+        duration = intmask(read_timestamp() - start)
+        self.num_major_collection_steps += 1
+        self.total_major_time += duration
+        if duration > self.max_major_step_time:
+            self.max_major_step_time = duration
+        self.hooks.fire_gc_collect_step(
+            duration=duration,
+            oldstate=oldstate,
+            newstate=self.gc_state)
+
+    def ticks_per_microsecond(self):
+        """The length of the ticks of read_timestamp(), found by comparing
+        with time.time() since setup().  Returns 0.0 if it is too early
+        to know."""
+        elapsed = (time.time() - self.calibration_time) * 1000000.0
+        if elapsed < 1000.0:
+            return 0.0
+        return (float(read_timestamp()) - self.calibration_ticks) / elapsed
+
+    def paced_step_size(self, speed, default_size):
+        """How much work a major collection step should do: as much as
+        it can in 'max_pause' microseconds at the given 'speed' (per
+        tick), or 'default_size' if there is no 'max_pause' or if we
+        don't know the speed yet.  Always at least 1."""
+        if self.max_pause <= 0.0 or speed <= 0.0:
+            return default_size
+        ticks_per_microsecond = self.ticks_per_microsecond()
+        if ticks_per_microsecond <= 0.0:
+            return default_size
+        size = self.max_pause * ticks_per_microsecond * speed
+        if size < 1.0:
+            return 1
+        if size > float(sys.maxint >> 1):
+            return sys.maxint >> 1
+        return int(size)
+
+    def updated_speed(self, speed, amount, ticks):
+        """Update one of the speeds used by paced_step_size() with a new
+        measure.  A slower measure is taken into account at once, to stay
+        within the 'max_pause' target; a faster one only gradually."""
+        if ticks <= 0 or amount <= 0:
+            return speed
+        measured = float(amount) / float(ticks)
+        if speed <= 0.0 or measured < speed:
+            return measured
+        return speed * 0.75 + measured * 0.25
+
+    def set_max_pause(self, max_pause):
+        """Set the 'max_pause' target in microseconds; 0 disables it."""
+        if max_pause < 0:
+            max_pause = 0
+        self.max_pause = float(max_pause)
 
     def _sweep_old_objects_pointing_to_pinned(self, obj, new_list):
         if self.header(obj).tid & GCFLAG_VISITED:
@@ -2322,7 +2525,13 @@ class IncrementalMiniMarkGC(MovingGCBase):
             self.objects_to_trace.append(obj)
 
     def _collect_ref_rec(self, root, ignored):
-        self.objects_to_trace.append(root.address[0])
+        obj = root.address[0]
+        # Don't push the objects that visit() would ignore anyway: in
+        # large graphs, most references are to objects already visited.
+        if self.header(obj).tid & (GCFLAG_VISITED | GCFLAG_NO_HEAP_PTRS |
+                                   GCFLAG_PINNED):
+            return
+        self.objects_to_trace.append(obj)
 
     def visit_all_objects(self):
         while self.objects_to_trace.non_empty():
@@ -620,6 +620,11 @@ class MiniMarkGC(MovingGCBase):
         if gen > 0:
             self.major_collection()
 
+    def release_memory(self):
+        """Return to the OS all the arenas that are entirely free.
+        Returns the number of bytes released."""
+        return self.ac.release_free_arenas(sys.maxint) * self.ac.arena_size
+
     def move_nursery_top(self, totalsize):
         size = self.nursery_cleanup
         ll_assert(self.nursery_real_top - self.nursery_top >= size,
@@ -1626,6 +1631,10 @@ class MiniMarkGC(MovingGCBase):
         # have the GCFLAG_VISITED flag.
         self.free_unvisited_rawmalloc_objects()
         #
+        # Return to the OS the arenas that stayed entirely free since
+        # the previous major collection.
+        self.ac.release_free_arenas(sys.maxint)
+        #
         # Ask the ArenaCollection to visit all objects.  Free the ones
         # that have not been visited above, and reset GCFLAG_VISITED on
         # the others.
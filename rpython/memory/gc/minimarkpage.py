@@ -34,12 +34,18 @@ ARENA_NULL = lltype.nullptr(ARENA)
 # The idea is that when we need a free page, we take it from the arena
 # which currently has the *lowest* number of free pages.  This allows
 # arenas with a lot of free pages to eventually become entirely free, at
-# which point they are returned to the OS.  If an arena has a total of
-# 64 pages, then we have 64 global lists, arenas_lists[0] to
+# which point they can be returned to the OS.  If an arena has a total
+# of 64 pages, then we have 64 global lists, arenas_lists[0] to
 # arenas_lists[63], such that arenas_lists[i] contains exactly those
 # arenas that have 'nfreepages == i'.  We allocate pages out of the
 # arena in 'current_arena'; when it is exhausted we pick another arena
 # with the smallest value for nfreepages (but > 0).
+#
+# The arenas that become entirely free at the end of a major collection
+# are not returned to the OS at once, but put in the list 'free_arenas'.
+# They are reused first when we need a new arena, and are only returned
+# to the OS by release_free_arenas(), which the GC calls later, outside
+# the last step of the major collection.
 
 # ____________________________________________________________
 #
@@ -140,6 +146,13 @@ class ArenaCollection(object):
         # the total memory used, counting every block in use, without
         # the additional bookkeeping stuff.
         self.total_memory_used = r_uint(0)
+        #
+        # the number of arenas currently allocated, including the free ones
+        self.arenas_count = 0
+        #
+        # the arenas that are entirely free, chained by 'nextarena'
+        self.free_arenas = ARENA_NULL
+        self.num_free_arenas = 0
 
 
     def _new_page_ptr_list(self, length):
@@ -251,6 +264,10 @@ class ArenaCollection(object):
             while arena:
                 yield arena
                 arena = arena.nextarena
+        arena = self.free_arenas
+        while arena:
+            yield arena
+            arena = arena.nextarena
 
 
     def _pick_next_arena(self):
@@ -285,6 +302,17 @@ class ArenaCollection(object):
         if self._pick_next_arena():
             return
         #
+        # Reuse an arena that is entirely free, if we have one.  All its
+        # pages are in its 'freepages' list.
+        if self.free_arenas != ARENA_NULL:
+            arena = self.free_arenas
+            self.free_arenas = arena.nextarena
+            self.num_free_arenas -= 1
+            arena.nextarena = ARENA_NULL
+            self.num_uninitialized_pages = 0
+            self.current_arena = arena
+            return
+        #
         # No more arena with any free page.  We must allocate a new arena.
         if not we_are_translated():
             for a in self._all_arenas():
@@ -311,6 +339,7 @@ class ArenaCollection(object):
         arena.freepages = firstpage
         self.num_uninitialized_pages = npages
         self.current_arena = arena
+        self.arenas_count += 1
         #
     allocate_new_arena._dont_inline_ = True
 
@@ -394,9 +423,11 @@ class ArenaCollection(object):
                 #
                 if arena.nfreepages == arena.totalpages:
                     #
-                    # The whole arena is empty.  Free it.
-                    llarena.arena_free(arena.base)
-                    lltype.free(arena, flavor='raw', track_allocation=False)
+                    # The whole arena is empty.  Keep it in 'free_arenas'
+                    # until it is reused or release_free_arenas() is called.
+                    arena.nextarena = self.free_arenas
+                    self.free_arenas = arena
+                    self.num_free_arenas += 1
                     #
                 else:
                     # Insert 'arena' in the correct arenas_lists[n]
@@ -412,6 +443,26 @@ class ArenaCollection(object):
         self.min_empty_nfreepages = 1
 
 
+    def release_free_arenas(self, max_arenas):
+        """Return to the OS at most 'max_arenas' of the arenas that are
+        entirely free.  Returns the number of arenas released.
+        """
+        count = 0
+        while self.free_arenas != ARENA_NULL and count < max_arenas:
+            arena = self.free_arenas
+            self.free_arenas = arena.nextarena
+            # Clearing the arena with arena_reset(.., 1) gives its pages
+            # back to the OS.  free() alone may keep them, e.g. if the
+            # arena is not at the end of malloc()'s heap.
+            llarena.arena_reset(arena.base, self.arena_size, 1)
+            llarena.arena_free(arena.base)
+            lltype.free(arena, flavor='raw', track_allocation=False)
+            self.num_free_arenas -= 1
+            self.arenas_count -= 1
+            count += 1
+        return count
+
+
     def mass_free_in_pages(self, size_class, ok_to_free_func, max_pages):
         nblocks = self.nblocks_for_size[size_class]
         block_size = size_class * WORD
@@ -479,8 +530,8 @@ class ArenaCollection(object):
         """Free a whole page."""
         #
         # Insert the freed page in the arena's 'freepages' list.
-        # If nfreepages == totalpages, then it will be freed at the
-        # end of mass_free().
+        # If nfreepages == totalpages, then it will be moved to the
+        # 'free_arenas' at the end of mass_free().
         arena = page.arena
         arena.nfreepages += 1
         pageaddr = llmemory.cast_ptr_to_adr(page)
@@ -668,8 +668,124 @@ class TestIncrementalMiniMarkGCSimple(TestMiniMarkGCSimple):
         self.gc.debug_gc_step_until(incminimark.STATE_SCANNING)
         assert self.stackroots[1].x == 13
 
+    def test_get_stats(self):
+        from rpython.rlib import rgc
+        gc = self.gc
+        assert gc.get_stats(rgc.NUM_MINOR_COLLECTS) == 0
+        assert gc.get_stats(rgc.NUM_MAJOR_COLLECTION_STEPS) == 0
+        self.stackroots.append(self.malloc(S))
+        gc.minor_collection()
+        gc.minor_collection()
+        assert gc.get_stats(rgc.NUM_MINOR_COLLECTS) == 2
+        assert gc.get_stats(rgc.NUM_MAJOR_COLLECTS) == 0
+        assert 0 <= gc.get_stats(rgc.MAX_MINOR_TIME) <= (
+            gc.get_stats(rgc.TOTAL_MINOR_TIME))
+        gc.collect()
+        assert gc.get_stats(rgc.NUM_MAJOR_COLLECTS) == 1
+        steps = gc.get_stats(rgc.NUM_MAJOR_COLLECTION_STEPS)
+        assert steps >= 4      # at least one step per GC state
+        assert gc.get_stats(rgc.NUM_MINOR_COLLECTS) >= 2 + steps
+        assert 0 <= gc.get_stats(rgc.MAX_MAJOR_STEP_TIME) <= (
+            gc.get_stats(rgc.TOTAL_MAJOR_TIME))
+        assert gc.get_stats(rgc.NURSERY_SIZE) == gc.nursery_size
+        assert gc.get_stats(rgc.TOTAL_MEMORY_USED) == (
+            gc.get_total_memory_used())
+        assert gc.get_stats(rgc.ARENAS_BYTES) == (
+            gc.get_stats(rgc.ARENAS_COUNT) * gc.ac.arena_size)
+        assert gc.get_stats(-1) == -1
+
+    def test_hooks(self):
+        from rpython.memory.gc.hook import GcHooks
+        class MyGcHooks(GcHooks):
+            def __init__(self):
+                self.minors = []
+                self.steps = []
+            def is_gc_minor_enabled(self):
+                return True
+            def is_gc_collect_step_enabled(self):
+                return True
+            def on_gc_minor(self, duration, total_memory_used,
+                            pinned_objects):
+                self.minors.append((duration, total_memory_used,
+                                    pinned_objects))
+            def on_gc_collect_step(self, duration, oldstate, newstate):
+                self.steps.append((oldstate, newstate))
+        hooks = self.gc.hooks = MyGcHooks()
+        self.stackroots.append(self.malloc(S))
+        self.gc.minor_collection()
+        [(duration, total_memory_used, pinned_objects)] = hooks.minors
+        assert duration >= 0
+        assert total_memory_used == self.gc.get_total_memory_used()
+        assert pinned_objects == 0
+        assert hooks.steps == []
+        self.gc.collect()
+        assert hooks.steps[0] == (incminimark.STATE_SCANNING,
+                                  incminimark.STATE_MARKING)
+        assert hooks.steps[-1] == (incminimark.STATE_FINALIZING,
+                                   incminimark.STATE_SCANNING)
+        for (oldstate, newstate), (oldstate2, newstate2) in zip(
+                hooks.steps, hooks.steps[1:]):
+            assert newstate == oldstate2
+        assert len(hooks.minors) >= 1 + len(hooks.steps)
+
+    def test_visit_does_not_push_visited_objects(self):
+        gc = self.gc
+        obj = self.malloc(S)
+        obj.prev = obj.next = obj
+        self.stackroots.append(obj)
+        gc.debug_gc_step_until(incminimark.STATE_MARKING)
+        while gc.objects_to_trace.non_empty():
+            gc.objects_to_trace.pop()
+        obj = self.stackroots[-1]
+        gc.visit(llmemory.cast_ptr_to_adr(obj))
+        # 'obj' points twice to itself, which is already visited
+        assert not gc.objects_to_trace.non_empty()
+        gc.debug_gc_step_until(incminimark.STATE_SCANNING)
+        assert self.stackroots[-1].next == self.stackroots[-1]
+
+    def test_max_pause(self):
+        from rpython.rlib import rgc
+        gc = self.gc
+        for i in range(100):
+            curobj = self.malloc(S)
+            curobj.x = i
+            self.stackroots.append(curobj)
+        gc.collect()
+        assert gc.mark_bytes_per_tick > 0.0
+        #
+        # without 'max_pause' or before knowing the tick length, the
+        # default step size is used
+        assert gc.paced_step_size(gc.mark_bytes_per_tick, 1234) == 1234
+        gc.set_max_pause(100)
+        gc.ticks_per_microsecond = lambda: 0.0
+        assert gc.paced_step_size(gc.mark_bytes_per_tick, 1234) == 1234
+        gc.ticks_per_microsecond = lambda: 2.0
+        assert gc.paced_step_size(0.0, 1234) == 1234
+        assert gc.paced_step_size(5.0, 1234) == 1000
+        assert gc.paced_step_size(0.001, 1234) == 1
+        #
+        # a slower speed is taken into account at once, a faster one
+        # only gradually
+        assert gc.updated_speed(0.0, 100, 10) == 10.0
+        assert gc.updated_speed(20.0, 100, 10) == 10.0
+        assert gc.updated_speed(10.0, 300, 10) == 15.0
+        assert gc.updated_speed(10.0, 0, 10) == 10.0
+        #
+        # the marking steps are sized from the speed measured
+        gc.mark_bytes_per_tick = 1.0 / 2.0
+        gc.gc_increment_step = 10 ** 6
+        gc.debug_gc_step_until(incminimark.STATE_MARKING)
+        gc.nursery_surviving_size = 0
+        gc.mark_bytes_per_tick = 1.0 / 2.0
+        gc.major_collection_step()
+        assert gc.objects_to_trace.non_empty()   # not all marked
+        gc.set_max_pause(0)
+        gc.debug_gc_step_until(incminimark.STATE_SCANNING)
+        assert gc.get_stats(rgc.MAX_PAUSE) == 0
+
 class TestIncrementalMiniMarkGCFull(DirectGCTest):
     from rpython.memory.gc.incminimark import IncrementalMiniMarkGC as GCClass
+
     def test_malloc_fixedsize_no_cleanup(self):
         p = self.malloc(S)
         import pytest
@@ -744,4 +860,61 @@ class TestIncrementalMiniMarkGCFull(DirectGCTest):
                 assert elem.prev == lltype.nullptr(S)
                 assert elem.next == lltype.nullptr(S)
 
-            
+    def test_release_memory(self):
+        gc = self.gc
+        for i in range(200):
+            self.stackroots.append(self.malloc(S))
+        gc.collect()
+        arenas = gc.ac.arenas_count
+        assert arenas > 5
+        del self.stackroots[:]
+        #
+        # gc.collect() releases the entirely free arenas, except the
+        # ones that fit in 'keep_free_size'
+        gc.keep_free_size = 2 * gc.ac.arena_size
+        gc.collect()
+        assert gc.ac.num_free_arenas == 2
+        assert gc.ac.arenas_count < arenas
+        #
+        # release_memory() releases them all
+        assert gc.release_memory() == 2 * gc.ac.arena_size
+        assert gc.ac.num_free_arenas == 0
+        assert gc.release_memory() == 0
+
+    def test_max_pause_keeps_up_with_allocations(self):
+        # with a tiny 'max_pause' and very slow speeds, the sweeping steps
+        # still free at least as much as the program allocates meanwhile
+        gc = self.gc
+        gc.set_max_pause(1)
+        gc.ticks_per_microsecond = lambda: 1.0
+        gc.updated_speed = lambda speed, amount, ticks: 1e-6
+        gc.mark_bytes_per_tick = 1e-6
+        gc.sweep_pages_per_tick = 1e-6
+        gc.sweep_rawmalloced_per_tick = 1e-6
+        limits = []
+        def mass_free_incremental(ok_to_free_func, max_pages):
+            limits.append(max_pages * gc.ac.page_size)
+            return orig_mass_free_incremental(ok_to_free_func, max_pages)
+        orig_mass_free_incremental = gc.ac.mass_free_incremental
+        gc.ac.mass_free_incremental = mass_free_incremental
+        def free_unvisited_rawmalloc_objects_step(nobjects):
+            limits.append(nobjects * gc.small_request_threshold)
+            return orig_free_unvisited_rawmalloc_objects_step(nobjects)
+        orig_free_unvisited_rawmalloc_objects_step = (
+            gc.free_unvisited_rawmalloc_objects_step)
+        gc.free_unvisited_rawmalloc_objects_step = (
+            free_unvisited_rawmalloc_objects_step)
+        peak = 0
+        for i in range(1000):
+            if i % 10 == 0:
+                self.stackroots.append(self.malloc(VAR, 100))
+            else:
+                self.stackroots.append(self.malloc(S))
+            if len(self.stackroots) > 20:
+                del self.stackroots[0]
+            peak = max(peak, gc.get_total_memory_used())
+        assert gc.num_major_collects > 0
+        assert limits
+        for limit in limits:
+            assert limit >= gc.nursery_size - gc.small_request_threshold
+        assert peak < 40 * gc.nursery_size
@@ -450,6 +450,7 @@ def test_random(incremental=False):
             fresh_extra = 0
             if not incremental:
                 ac.mass_free(ok_to_free)
+                ac.release_free_arenas(random.randrange(0, 2))
             else:
                 ac.mass_free_prepare()
                 while not ac.mass_free_incremental(ok_to_free,
@@ -458,6 +459,7 @@ def test_random(incremental=False):
                     prev = ac.total_memory_used
                     allocate_object(live_objects_extra)
                     fresh_extra += ac.total_memory_used - prev
+                ac.release_free_arenas(random.randrange(0, 2))
             #
             # Check that we have seen all objects
             assert sorted(ok_to_free.seen) == sorted(live_objects)
@@ -477,3 +479,37 @@ def test_random(incremental=False):
 
 def test_random_incremental():
     test_random(incremental=True)
+
+def test_free_arenas():
+    pagesize = hdrsize + 2*WORD
+    ac = ArenaCollection(SHIFT + pagesize*2, pagesize, 2*WORD)
+    ac.malloc(2*WORD)
+    arena1 = ac.current_arena
+    ac.malloc(2*WORD)
+    ac.malloc(2*WORD)     # needs a 2nd arena
+    arena2 = ac.current_arena
+    assert arena2 != arena1
+    assert ac.arenas_count == 2
+    #
+    # arena1 becomes entirely free: it is kept, not returned to the OS
+    ac.mass_free(OkToFree(ac, True, multiarenas=True))
+    assert ac.free_arenas == arena1
+    assert ac.num_free_arenas == 1
+    assert ac.arenas_count == 2
+    #
+    # it is reused when we need a new arena
+    ac.malloc(2*WORD)     # the freed page of arena2
+    ac.malloc(2*WORD)     # the last uninitialized page of arena2
+    ac.malloc(2*WORD)
+    assert ac.current_arena == arena1
+    assert ac.num_free_arenas == 0
+    assert ac.arenas_count == 2
+    #
+    ac.mass_free(OkToFree(ac, True, multiarenas=True))
+    assert ac.free_arenas == arena2
+    assert ac.num_free_arenas == 1
+    assert ac.release_free_arenas(0) == 0
+    assert ac.release_free_arenas(5) == 1
+    assert not ac.free_arenas
+    assert ac.num_free_arenas == 0
+    assert ac.arenas_count == 1
@@ -177,7 +177,11 @@ class BaseFrameworkGCTransformer(GCTransformer):
         self.gcdata = gcdata
         self.malloc_fnptr_cache = {}
 
-        gcdata.gc = GCClass(translator.config.translation, **GC_PARAMS)
+        # the hooks called by the GC, if the program provides some
+        # (see get_gchooks() in the translation driver)
+        gchooks = getattr(translator, '_gchooks', None)
+        gcdata.gc = GCClass(translator.config.translation, hooks=gchooks,
+                            **GC_PARAMS)
         root_walker = self.build_root_walker()
         root_walker.finished_minor_collection_func = finished_minor_collection
         self.root_walker = root_walker
@@ -331,6 +335,15 @@ class BaseFrameworkGCTransformer(GCTransformer):
         else:
             self.shrink_array_ptr = None
 
+        if hasattr(GCClass, 'get_stats'):
+            self.get_stats_ptr = getfn(GCClass.get_stats.im_func,
+                    [s_gc, annmodel.SomeInteger()], annmodel.SomeInteger())
+        if hasattr(GCClass, 'set_max_pause'):
+            self.set_max_pause_ptr = getfn(GCClass.set_max_pause.im_func,
+                    [s_gc, annmodel.SomeInteger()], annmodel.s_None)
+        if hasattr(GCClass, 'release_memory'):
+            self.release_memory_ptr = getfn(GCClass.release_memory.im_func,
+                    [s_gc], annmodel.SomeInteger())
         if hasattr(GCClass, 'heap_stats'):
             self.heap_stats_ptr = getfn(GCClass.heap_stats.im_func,
                     [s_gc], SomePtr(lltype.Ptr(ARRAY_TYPEID_MAP)),
@@ -823,6 +836,29 @@ class BaseFrameworkGCTransformer(GCTransformer):
                   resultvar=op.result)
         self.pop_roots(hop, livevars)
 
+    def gct_gc_get_stats(self, hop):
+        if not hasattr(self, 'get_stats_ptr'):
+            return GCTransformer.gct_gc_get_stats(self, hop)
+        op = hop.spaceop
+        hop.genop("direct_call",
+                  [self.get_stats_ptr, self.c_const_gc, op.args[0]],
+                  resultvar=op.result)
+
+    def gct_gc_set_max_pause(self, hop):
+        if not hasattr(self, 'set_max_pause_ptr'):
+            return GCTransformer.gct_gc_set_max_pause(self, hop)
+        op = hop.spaceop
+        hop.genop("direct_call",
+                  [self.set_max_pause_ptr, self.c_const_gc, op.args[0]])
+
+    def gct_gc_release_memory(self, hop):
+        if not hasattr(self, 'release_memory_ptr'):
+            return GCTransformer.gct_gc_release_memory(self, hop)
+        op = hop.spaceop
+        hop.genop("direct_call",
+                  [self.release_memory_ptr, self.c_const_gc],
+                  resultvar=op.result)
+
     def gct_get_member_index(self, hop):
         op = hop.spaceop
         v_typeid = op.args[0]
@@ -376,6 +376,17 @@ class BaseGCTransformer(object):
         return hop.cast_result(rmodel.inputconst(lltype.Ptr(ARRAY_TYPEID_MAP),
                                         lltype.nullptr(ARRAY_TYPEID_MAP)))
 
+    def gct_gc_get_stats(self, hop):
+        # this GC does not maintain any statistics
+        return hop.cast_result(rmodel.inputconst(lltype.Signed, -1))
+
+    def gct_gc_set_max_pause(self, hop):
+        pass
+
+    def gct_gc_release_memory(self, hop):
+        # this GC does not keep any memory for reuse
+        return hop.cast_result(rmodel.inputconst(lltype.Signed, 0))
+
 class MinimalGCTransformer(BaseGCTransformer):
     def __init__(self, parenttransformer):
         BaseGCTransformer.__init__(self, parenttransformer.translator)
@@ -78,6 +78,20 @@ class GCManagedHeap(object):
         if hasattr(self.gc, 'raw_malloc_memory_pressure'):
             self.gc.raw_malloc_memory_pressure(size)
 
+    def get_stats(self, stats_no):
+        if hasattr(self.gc, 'get_stats'):
+            return self.gc.get_stats(stats_no)
+        return -1
+
+    def set_max_pause(self, microseconds):
+        if hasattr(self.gc, 'set_max_pause'):
+            self.gc.set_max_pause(microseconds)
+
+    def release_memory(self):
+        if hasattr(self.gc, 'release_memory'):
+            return self.gc.release_memory()
+        return 0
+
     def shrink_array(self, p, smallersize):
         if hasattr(self.gc, 'shrink_array'):
             addr = llmemory.cast_ptr_to_adr(p)
@@ -9,6 +9,7 @@ from rpython.rtyper.lltypesystem import lltype, llmemory, rffi, llgroup
 from rpython.memory.gctransform import framework, shadowstack
 from rpython.rtyper.lltypesystem.lloperation import llop, void
 from rpython.rlib.objectmodel import compute_unique_id, we_are_translated
+from rpython.rlib.objectmodel import keepalive_until_here
 from rpython.rlib.debug import ll_assert
 from rpython.rlib import rgc
 from rpython.conftest import option
@@ -1297,6 +1298,93 @@ class TestIncrementalMiniMarkGC(TestMiniMarkGC):
         res = run([])
         assert res
 
+    def define_get_stats(cls):
+        class A(object):
+            pass
+        def f():
+            a = A()
+            minors = rgc.get_stats(rgc.NUM_MINOR_COLLECTS)
+            majors = rgc.get_stats(rgc.NUM_MAJOR_COLLECTS)
+            rgc.collect()
+            assert rgc.get_stats(rgc.NUM_MAJOR_COLLECTS) == majors + 1
+            assert rgc.get_stats(rgc.NUM_MINOR_COLLECTS) > minors
+            assert rgc.get_stats(rgc.TOTAL_MAJOR_TIME) >= 0
+            keepalive_until_here(a)
+            return rgc.get_stats(rgc.NURSERY_SIZE)
+        return f
+
+    def test_get_stats(self):
+        run = self.runner("get_stats")
+        res = run([])
+        assert res == 32*WORD
+
+    def define_max_pause(cls):
+        class A(object):
+            pass
+        def f():
+            rgc.set_max_pause(100)
+            a = A()
+            for i in range(3):
+                rgc.collect()
+            keepalive_until_here(a)
+            return rgc.get_stats(rgc.MAX_PAUSE)
+        return f
+
+    def test_max_pause(self):
+        run = self.runner("max_pause")
+        res = run([])
+        assert res == 100
+
+    def define_release_memory(cls):
+        class A(object):
+            pass
+        def f():
+            lst = [A() for i in range(10000)]
+            rgc.collect()
+            keepalive_until_here(lst)
+            lst = None
+            rgc.collect()
+            assert rgc.release_memory() >= 0
+            return rgc.release_memory()     # nothing left to release
+        return f
+
+    def test_release_memory(self):
+        run = self.runner("release_memory")
+        res = run([])
+        assert res == 0
+
+    def define_gc_hooks(cls):
+        from rpython.memory.gc.hook import GcHooks
+        # the hooks are only annotated with the GC, so the main program
+        # must not use them directly: they count in a raw array instead
+        counts = lltype.malloc(rffi.CArray(lltype.Signed), 2, flavor='raw',
+                               immortal=True)
+        class MyGcHooks(GcHooks):
+            def is_gc_minor_enabled(self):
+                return True
+            def is_gc_collect_step_enabled(self):
+                return True
+            def on_gc_minor(self, duration, total_memory_used,
+                            pinned_objects):
+                counts[0] += 1
+            def on_gc_collect_step(self, duration, oldstate, newstate):
+                counts[1] += 1
+        hooks = MyGcHooks()
+        def f():
+            counts[0] = counts[1] = 0
+            rgc.collect()
+            return counts[0] * 100 + counts[1]
+        def fixup(t):
+            t._gchooks = hooks
+        return f, None, fixup
+
+    def test_gc_hooks(self):
+        run = self.runner("gc_hooks")
+        res = run([])
+        minors, steps = divmod(res, 100)
+        assert steps >= 4
+        assert minors >= steps
+
 # ________________________________________________________________
 # tagged pointers
 
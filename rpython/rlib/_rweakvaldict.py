@@ -3,6 +3,7 @@ from rpython.rtyper.lltypesystem import lltype, llmemory, rdict
 from rpython.rtyper.lltypesystem.llmemory import weakref_create, weakref_deref
 from rpython.rtyper import rclass
 from rpython.rtyper.rclass import getinstancerepr
+from rpython.rtyper.error import TyperError
 from rpython.rtyper.rmodel import Repr
 from rpython.rlib.rweakref import RWeakValueDictionary
 from rpython.rlib import jit
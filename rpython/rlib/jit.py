@@ -543,14 +543,19 @@ PARAMETER_DOCS = {
     'function_threshold': 'number of times a function must run for it to become traced from start',
     'trace_eagerness': 'number of times a guard has to fail before we start compiling a bridge',
     'decay': 'amount to regularly decay counters by (0=none, 1000=max)',
+    'counter_table_size': 'number of entries of the table of loop and guard counters, up to 65536 (0 = start small and grow when counters evict each other)',
     'trace_limit': 'number of recorded operations before we abort tracing with ABORT_TOO_LONG',
     'inlining': 'inline python functions or not (1/0)',
     'loop_longevity': 'a parameter controlling how long loops will be kept before being freed, an estimate',
+    'loop_code_budget': 'total size in bytes of the machine code of the loops kept alive; when exceeded, the loops used the least are freed (0 = no limit)',
+    'deferred_bridges': 'generate the machine code of bridges later, when the program calls pypyjit.compile_pending_bridges() or when their guard keeps failing, instead of right after tracing them (1/0)',
     'retrace_limit': 'how many times we can try retracing before giving up',
     'max_retrace_guards': 'number of extra guards a retrace can cause',
     'max_unroll_loops': 'number of extra unrollings a loop can cause',
     'enable_opts': 'INTERNAL USE ONLY (MAY NOT WORK OR LEAD TO CRASHES): '
-                   'optimizations to enable, or all = %s' % ENABLE_ALL_OPTS,
+                   'optimizations to enable, or all = %s; '
+                   'add :vec to also vectorize loops over raw arrays'
+                   % ENABLE_ALL_OPTS,
     'max_unroll_recursion': 'how many levels deep to unroll a recursive function'
     }
 
@@ -558,9 +563,12 @@ PARAMETERS = {'threshold': 1039, # just above 1024, prime
               'function_threshold': 1619, # slightly more than one above, also prime
               'trace_eagerness': 200,
               'decay': 40,
+              'counter_table_size': 0,
               'trace_limit': 6000,
               'inlining': 1,
               'loop_longevity': 1000,
+              'loop_code_budget': 0,
+              'deferred_bridges': 0,
               'retrace_limit': 5,
               'max_retrace_guards': 15,
               'max_unroll_loops': 0,
@@ -589,7 +597,8 @@ class JitDriver(object):
                  get_printable_location=None, confirm_enter_jit=None,
                  can_never_inline=None, should_unroll_one_iteration=None,
                  name='jitdriver', check_untranslated=True,
-                 get_unique_id=None):
+                 get_unique_id=None, get_threshold=None,
+                 get_trace_limit=None):
         if greens is not None:
             self.greens = greens
         self.name = name
@@ -627,6 +636,8 @@ class JitDriver(object):
         self.confirm_enter_jit = confirm_enter_jit
         self.can_never_inline = can_never_inline
         self.should_unroll_one_iteration = should_unroll_one_iteration
+        self.get_threshold = get_threshold
+        self.get_trace_limit = get_trace_limit
         self.check_untranslated = check_untranslated
 
     def _freeze_(self):
@@ -798,6 +809,15 @@ def set_user_param(driver, text):
                 raise ValueError
 set_user_param._annspecialcase_ = 'specialize:arg(0)'
 
+def trace_next_iteration(driver, *greenargs):
+    """Make the JIT start tracing from the position given by the green
+    arguments of 'driver' the next time this position is reached, instead
+    of waiting until the 'threshold' is reached.  This can be used to warm
+    up a process with the positions that were found to be hot by a
+    previous run.
+    """
+    # special-cased by ExtRegistryEntry
+
 # ____________________________________________________________
 #
 # Annotation and rtyping of some of the JitDriver methods
@@ -984,6 +1004,29 @@ class ExtSetParam(ExtRegistryEntry):
         return hop.genop('jit_marker', vlist,
                          resulttype=lltype.Void)
 
+class ExtTraceNextIteration(ExtRegistryEntry):
+    # Replace a call to trace_next_iteration(myjitdriver, *greenargs)
+    # with an operation jit_marker('trace_next_iteration', myjitdriver,
+    # greenargs...)
+    _about_ = trace_next_iteration
+
+    def compute_result_annotation(self, s_driver, *args_s):
+        from rpython.annotator import model as annmodel
+        assert s_driver.is_constant()
+        assert len(args_s) == len(s_driver.const.greens)
+        return annmodel.s_None
+
+    def specialize_call(self, hop):
+        from rpython.rtyper.lltypesystem import lltype
+
+        hop.exception_cannot_occur()
+        vlist = [hop.inputconst(lltype.Void, 'trace_next_iteration'),
+                 hop.inputarg(lltype.Void, arg=0)]
+        for i in range(1, hop.nb_args):
+            vlist.append(hop.inputarg(hop.args_r[i], arg=i))
+        return hop.genop('jit_marker', vlist,
+                         resulttype=lltype.Void)
+
 class AsmInfo(object):
     """ An addition to JitDebugInfo concerning assembler. Attributes:
 
@@ -1152,6 +1195,9 @@ class Counters(object):
     NVIRTUALS
     NVHOLES
     NVREUSED
+    NUMBERINGS
+    NUMBERINGS_SHARED
+    NUMBERING_BYTES
     TOTAL_COMPILED_LOOPS
     TOTAL_COMPILED_BRIDGES
     TOTAL_FREED_LOOPS
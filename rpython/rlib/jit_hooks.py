@@ -2,7 +2,7 @@ from rpython.annotator import model as annmodel
 from rpython.rtyper.llannotation import SomePtr, lltype_to_annotation
 from rpython.rlib.objectmodel import specialize
 from rpython.rtyper.annlowlevel import (cast_instance_to_base_ptr,
-    cast_base_ptr_to_instance, llstr)
+    cast_base_ptr_to_instance, cast_instance_to_gcref, llstr)
 from rpython.rtyper.extregistry import ExtRegistryEntry
 from rpython.rtyper.lltypesystem import llmemory, lltype
 from rpython.rtyper import rclass
@@ -140,3 +140,77 @@ LOOP_RUN_CONTAINER = lltype.GcArray(lltype.Struct('elem',
 @register_helper(lltype.Ptr(LOOP_RUN_CONTAINER))
 def stats_get_loop_run_times(warmrunnerdesc):
     return warmrunnerdesc.metainterp_sd.cpu.get_all_loop_runs()
+
+GUARD_FAILURES_CONTAINER = lltype.GcArray(lltype.Struct('elem',
+                                                  ('number', lltype.Signed),
+                                                  ('counter', lltype.Signed),
+                                                  ('descr', llmemory.GCREF)))
+
+@register_helper(annmodel.s_None)
+def stats_set_guard_failure_counting(warmrunnerdesc, flag):
+    warmrunnerdesc.metainterp_sd.guard_failures.set_enabled(flag)
+
+@register_helper(annmodel.s_None)
+def stats_reset_guard_failures(warmrunnerdesc):
+    warmrunnerdesc.metainterp_sd.guard_failures.reset()
+
+@register_helper(lltype.Ptr(GUARD_FAILURES_CONTAINER))
+def stats_get_guard_failures(warmrunnerdesc):
+    from rpython.jit.metainterp.jitlog import guard_number
+    descrs = warmrunnerdesc.metainterp_sd.guard_failures.get_descrs()
+    result = lltype.malloc(GUARD_FAILURES_CONTAINER, len(descrs))
+    for i in range(len(descrs)):
+        descr = descrs[i]
+        result[i].number = guard_number(descr)
+        result[i].counter = descr.guard_failures
+        result[i].descr = cast_instance_to_gcref(descr)
+    return result
+
+MEMMGR_STATS = lltype.GcStruct('memmgr_stats',
+                               ('code_budget', lltype.Signed),
+                               ('code_size', lltype.Signed),
+                               ('loops', lltype.Signed),
+                               ('evicted_loops', lltype.Signed),
+                               ('evicted_code_size', lltype.Signed),
+                               ('retraced_loops', lltype.Signed))
+
+@register_helper(lltype.Ptr(MEMMGR_STATS))
+def stats_get_memmgr_stats(warmrunnerdesc):
+    memmgr = warmrunnerdesc.memory_manager
+    result = lltype.malloc(MEMMGR_STATS)
+    result.code_budget = memmgr.code_budget
+    result.code_size = memmgr.total_code_size
+    result.loops = len(memmgr.alive_loops)
+    result.evicted_loops = memmgr.evicted_loops
+    result.evicted_code_size = memmgr.evicted_code_size
+    result.retraced_loops = memmgr.retraced_loops
+    return result
+
+# ------------------------- deferred bridges ---------------------------
+
+@register_helper(annmodel.SomeInteger())
+def compile_pending_bridges(warmrunnerdesc, max_count):
+    metainterp_sd = warmrunnerdesc.metainterp_sd
+    return metainterp_sd.bridge_queue.compile_pending(metainterp_sd, max_count)
+
+@register_helper(annmodel.SomeInteger())
+def get_pending_bridge_count(warmrunnerdesc):
+    return len(warmrunnerdesc.metainterp_sd.bridge_queue.pending)
+
+JITCOUNTER_STATS = lltype.GcStruct('jitcounter_stats',
+                                   ('size', lltype.Signed),
+                                   ('fixed_size', lltype.Bool),
+                                   ('new_counters', lltype.Signed),
+                                   ('evicted_counters', lltype.Signed),
+                                   ('resizes', lltype.Signed))
+
+@register_helper(lltype.Ptr(JITCOUNTER_STATS))
+def stats_get_jitcounter_stats(warmrunnerdesc):
+    jitcounter = warmrunnerdesc.jitcounter
+    result = lltype.malloc(JITCOUNTER_STATS)
+    result.size = jitcounter.size
+    result.fixed_size = jitcounter.fixed_size
+    result.new_counters = jitcounter.new_counters
+    result.evicted_counters = jitcounter.evicted_counters
+    result.resizes = jitcounter.resizes
+    return result
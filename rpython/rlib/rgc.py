@@ -449,6 +449,46 @@ def get_typeids_list():
     "NOT_RPYTHON"
     raise NotImplementedError
 
+# The statistics that get_stats() can return.  The times are in ticks of
+# rtimer.read_timestamp(), except MAX_PAUSE, which is in microseconds;
+# the sizes are in bytes.
+NUM_MINOR_COLLECTS = 0
+NUM_MAJOR_COLLECTS = 1
+NUM_MAJOR_COLLECTION_STEPS = 2
+TOTAL_MINOR_TIME = 3
+MAX_MINOR_TIME = 4
+TOTAL_MAJOR_TIME = 5
+MAX_MAJOR_STEP_TIME = 6
+NURSERY_SIZE = 7
+ARENAS_COUNT = 8
+ARENAS_BYTES = 9
+RAWMALLOC_BYTES = 10
+TOTAL_MEMORY_USED = 11
+MAX_PAUSE = 12
+MARK_BYTES_PER_MICROSECOND = 13
+SWEEP_BYTES_PER_MICROSECOND = 14
+
+def get_stats(stats_no):
+    """Returns one of the statistics maintained by the GC, as listed
+    above, or -1 if the GC does not maintain it.  Only incminimark
+    maintains them all.
+    NOT_RPYTHON: when running untranslated, no collection ever occurs
+    and all statistics are 0."""
+    return 0
+
+def set_max_pause(microseconds):
+    """Ask the GC to size the steps of its major collections so that
+    they take at most the given number of microseconds; 0 means to use
+    fixed-size steps.  Only incminimark supports it; the other GCs
+    ignore it."""
+    pass
+
+def release_memory():
+    """Return to the OS the memory that the GC keeps for reuse, i.e.
+    the arenas that are entirely free.  Returns the number of bytes
+    released, which is always 0 for GCs other than (inc)minimark."""
+    return 0
+
 def has_gcflag_extra():
     "NOT_RPYTHON"
     return True
@@ -659,6 +699,41 @@ class Entry(ExtRegistryEntry):
         hop.exception_is_here()
         return hop.genop('gc_typeids_list', [], resulttype = hop.r_result)
 
+class Entry(ExtRegistryEntry):
+    _about_ = get_stats
+
+    def compute_result_annotation(self, s_stats_no):
+        from rpython.annotator.model import SomeInteger
+        return SomeInteger()
+
+    def specialize_call(self, hop):
+        vlist = hop.inputargs(lltype.Signed)
+        hop.exception_cannot_occur()
+        return hop.genop('gc_get_stats', vlist, resulttype = hop.r_result)
+
+class Entry(ExtRegistryEntry):
+    _about_ = set_max_pause
+
+    def compute_result_annotation(self, s_microseconds):
+        from rpython.annotator import model as annmodel
+        return annmodel.s_None
+
+    def specialize_call(self, hop):
+        vlist = hop.inputargs(lltype.Signed)
+        hop.exception_cannot_occur()
+        return hop.genop('gc_set_max_pause', vlist, resulttype=lltype.Void)
+
+class Entry(ExtRegistryEntry):
+    _about_ = release_memory
+
+    def compute_result_annotation(self):
+        from rpython.annotator.model import SomeInteger
+        return SomeInteger()
+
+    def specialize_call(self, hop):
+        hop.exception_cannot_occur()
+        return hop.genop('gc_release_memory', [], resulttype=hop.r_result)
+
 class Entry(ExtRegistryEntry):
     _about_ = (has_gcflag_extra, get_gcflag_extra, toggle_gcflag_extra)
     def compute_result_annotation(self, s_arg=None):
@@ -7,7 +7,8 @@ from rpython.annotator.model import (SomeObject, SomeString, s_None, SomeChar,
 from rpython.rtyper.llannotation import SomePtr
 from rpython.rlib import jit
 from rpython.rlib.objectmodel import newlist_hint, resizelist_hint, specialize
-from rpython.rlib.rarithmetic import ovfcheck, LONG_BIT as BLOOM_WIDTH
+from rpython.rlib.rarithmetic import ovfcheck, r_uint, intmask, LONG_BIT
+from rpython.rlib.rarithmetic import LONG_BIT as BLOOM_WIDTH
 from rpython.rlib.buffer import Buffer
 from rpython.rlib.unicodedata import unicodedb_5_2_0 as unicodedb
 from rpython.rtyper.extregistry import ExtRegistryEntry
@@ -328,6 +329,11 @@ def _search(value, other, start, end, mode):
     if w < 0:
         return -1
 
+    if (mode != SEARCH_RFIND and m >= TWO_WAY_MIN_NEEDLE and
+            n >= TWO_WAY_MIN_HAYSTACK):
+        return two_way_search(value, other, start, end,
+                              mode == SEARCH_COUNT)
+
     mlast = m - 1
     skip = mlast - 1
     mask = 0
@@ -396,6 +402,146 @@ def _search(value, other, start, end, mode):
         return -1
     return count
 
+# The two-way algorithm of Crochemore and Perrin searches in linear time and
+# constant space.  It needs some preprocessing of the needle and is usually
+# slower than the search above, which is however quadratic in the worst case
+# (e.g. searching 'a' * 99 + 'b' in 'a' * 10000).  So it is only used for
+# long needles in long haystacks.
+TWO_WAY_MIN_NEEDLE = 100
+TWO_WAY_MIN_HAYSTACK = 2000
+
+@specialize.call_location()
+def _maximal_suffix(other, m, invert):
+    """Return the start (minus one) and the period of the maximal suffix of
+    'other', for the ordering of the characters (inverted if 'invert')."""
+    ms = -1
+    j = 0
+    k = p = 1
+    while j + k < m:
+        a = ord(other[j + k])
+        b = ord(other[ms + k])
+        if invert:
+            a, b = b, a
+        if a < b:
+            j += k
+            k = 1
+            p = j - ms
+        elif a == b:
+            if k != p:
+                k += 1
+            else:
+                j += p
+                k = 1
+        else:
+            ms = j
+            j = ms + 1
+            k = p = 1
+    return ms, p
+
+@specialize.call_location()
+def critical_factorization(other, m):
+    """Return (ell, period): 'other[:ell] + other[ell:]' is a critical
+    factorization of the needle, and 'period' is the period of the right
+    half.  Used by the two-way search.  'other' can also be the chars of a
+    low-level string, hence the specialization on the call location instead
+    of the argument type."""
+    ms1, p1 = _maximal_suffix(other, m, False)
+    ms2, p2 = _maximal_suffix(other, m, True)
+    if ms1 > ms2:
+        return ms1 + 1, p1
+    return ms2 + 1, p2
+
+@specialize.call_location()
+def two_way_search(value, other, start, end, count_all):
+    """Return the index of the first occurrence of 'other' in
+    'value[start:end]', or -1; or if 'count_all' is true, the number of
+    non-overlapping occurrences.  'value' and 'other' can also be the chars
+    of low-level strings, like for critical_factorization()."""
+    n = end - start
+    m = len(other)
+    ell, period = critical_factorization(other, m)
+    count = 0
+    periodic = True
+    for i in range(ell):
+        if other[i] != other[i + period]:
+            periodic = False
+            break
+    j = 0
+    if periodic:
+        # 'memory' is the length of the prefix of the needle that is known
+        # to match after a shift by 'period'
+        memory = 0
+        while j <= n - m:
+            i = max(ell, memory)
+            while i < m and other[i] == value[start + i + j]:
+                i += 1
+            if i < m:
+                j += i - ell + 1
+                memory = 0
+                continue
+            i = ell - 1
+            while i >= memory and other[i] == value[start + i + j]:
+                i -= 1
+            if i < memory:
+                if not count_all:
+                    return start + j
+                count += 1
+                j += m
+                memory = 0
+            else:
+                j += period
+                memory = m - period
+    else:
+        period = max(ell, m - ell) + 1
+        while j <= n - m:
+            i = ell
+            while i < m and other[i] == value[start + i + j]:
+                i += 1
+            if i < m:
+                j += i - ell + 1
+                continue
+            i = ell - 1
+            while i >= 0 and other[i] == value[start + i + j]:
+                i -= 1
+            if i < 0:
+                if not count_all:
+                    return start + j
+                count += 1
+                j += m
+            else:
+                j += period
+    if not count_all:
+        return -1
+    return count
+
+# -------------- word-at-a-time helpers ----------------
+#
+# A machine word is used as a vector of SWAR_BYTES chars, to look at all of
+# them with a few integer operations.  Reading the words out of a string is
+# up to the caller, see ll_find_char() in rpython/rtyper/lltypesystem/rstr.py.
+
+SWAR_BYTES = LONG_BIT // 8
+_SWAR_ONES = r_uint(-1) // r_uint(0xff)      # 0x0101...01
+_SWAR_LOW7 = _SWAR_ONES * r_uint(0x7f)       # 0x7f7f...7f
+_SWAR_HIGH = _SWAR_ONES * r_uint(0x80)       # 0x8080...80
+
+def swar_broadcast(c):
+    """Return the word whose bytes are all equal to the char 'c'."""
+    return _SWAR_ONES * r_uint(ord(c))
+
+def swar_match_mask(word, pattern):
+    """Return a word with the highest bit set in the bytes where 'word' and
+    'pattern' are equal, and all the other bits cleared."""
+    x = word ^ pattern
+    # no carry can cross a byte boundary here, unlike the usual
+    # '(x - ONES) & ~x & HIGH', so the result is exact for every byte
+    t = ((x & _SWAR_LOW7) + _SWAR_LOW7) | x
+    return ~t & _SWAR_HIGH
+
+def swar_count_matches(mask):
+    """Return the number of bytes marked in a result of swar_match_mask()."""
+    return intmask(((mask >> 7) * _SWAR_ONES) >> (LONG_BIT - 8))
+
 # -------------- numeric parsing support --------------------
 
 def strip_spaces(s):
@@ -19,6 +19,46 @@ def test_collect():
 
     assert res is None
 
+def test_get_stats():
+    def f():
+        return rgc.get_stats(rgc.NUM_MINOR_COLLECTS)
+
+    t, typer, graph = gengraph(f, [])
+    ops = list(graph.iterblockops())
+    assert len(ops) == 1
+    op = ops[0][1]
+    assert op.opname == 'gc_get_stats'
+
+    assert f() == 0
+    res = interpret(f, [])
+    assert res == 0
+
+def test_set_max_pause():
+    def f(n):
+        rgc.set_max_pause(n)
+
+    t, typer, graph = gengraph(f, [int])
+    ops = list(graph.iterblockops())
+    assert len(ops) == 1
+    op = ops[0][1]
+    assert op.opname == 'gc_set_max_pause'
+
+    interpret(f, [500])
+
+def test_release_memory():
+    def f():
+        return rgc.release_memory()
+
+    t, typer, graph = gengraph(f, [])
+    ops = list(graph.iterblockops())
+    assert len(ops) == 1
+    op = ops[0][1]
+    assert op.opname == 'gc_release_memory'
+
+    assert f() == 0
+    res = interpret(f, [])
+    assert res == 0
+
 def test_collect_0():
     if sys.version_info < (2, 5):
         py.test.skip("requires Python 2.5 to call gc.collect() with an arg")
@@ -3,6 +3,9 @@ import sys, py
 from rpython.rlib.rstring import StringBuilder, UnicodeBuilder, split, rsplit
 from rpython.rlib.rstring import replace, startswith, endswith
 from rpython.rlib.rstring import find, rfind, count
+from rpython.rlib.rstring import (critical_factorization, swar_broadcast,
+    swar_match_mask, swar_count_matches, SWAR_BYTES)
+from rpython.rlib.rarithmetic import r_uint
 from rpython.rlib.buffer import StringBuffer
 from rpython.rtyper.test.tool import BaseRtypingTest
 
@@ -231,6 +234,42 @@ def test_search():
     check_search(count, 'one two three', 'e', 0, 1, res=0)
     check_search(count, 'one two three', '', 0, 13, res=14)
 
+def test_search_long_needle():
+    # uses the two-way algorithm
+    needle = 'a' * 99 + 'b'
+    value = 'a' * 3000 + needle + 'a' * 500 + needle + 'ab'
+    for args in [(0, len(value)), (3001, len(value)), (3050, 3500),
+                 (2000, 3099), (2000, 3100), (0, 3599)]:
+        for func in [find, count]:
+            res = func(value, needle, *args)
+            assert func(list(value), needle, *args) == res
+            assert func(value, StringBuffer(needle), *args) == res
+    assert find(list(value), needle, 0, len(value)) == 3000
+    assert find(list(value), needle, 3001, len(value)) == 3600
+    assert find(list(value), needle, 3050, 3500) == -1
+    assert count(list(value), needle, 0, len(value)) == 2
+    periodic = 'abc' * 40
+    value = 'abcab' * 500 + periodic * 2 + 'abc'
+    assert find(list(value), periodic, 0, len(value)) == value.find(periodic)
+    assert count(list(value), periodic, 0, len(value)) == 2
+
+def test_critical_factorization():
+    assert critical_factorization('abaab', 5) == (2, 3)
+    assert critical_factorization('aaaa', 4) == (0, 1)
+    assert critical_factorization('banana', 6) == (2, 2)
+
+def test_swar():
+    def word(s):
+        res = r_uint(0)
+        for c in s:
+            res = (res << 8) | ord(c)
+        return res
+    s = 'axbx\x00\xffxx'[:SWAR_BYTES]
+    for c in 'abx\x00\xff\x7f':
+        mask = swar_match_mask(word(s), swar_broadcast(c))
+        assert mask == word(['\x80' if c1 == c else '\x00' for c1 in s])
+        assert swar_count_matches(mask) == s.count(c)
+
 
 class TestTranslates(BaseRtypingTest):
     def test_split_rsplit(self):
@@ -709,6 +709,15 @@ class LLFrame(object):
     def op_gc_add_memory_pressure(self, size):
         self.heap.add_memory_pressure(size)
 
+    def op_gc_get_stats(self, stats_no):
+        return self.heap.get_stats(stats_no)
+
+    def op_gc_set_max_pause(self, microseconds):
+        self.heap.set_max_pause(microseconds)
+
+    def op_gc_release_memory(self):
+        return self.heap.release_memory()
+
     def op_shrink_array(self, obj, smallersize):
         return self.heap.shrink_array(obj, smallersize)
 
@@ -5,7 +5,8 @@ from rpython.rtyper.lltypesystem.llmemory import weakref_create, weakref_deref
 
 setfield = setattr
 from operator import setitem as setarrayitem
-from rpython.rlib.rgc import can_move, collect, add_memory_pressure
+from rpython.rlib.rgc import can_move, collect, add_memory_pressure, get_stats
+from rpython.rlib.rgc import set_max_pause, release_memory
 
 def setinterior(toplevelcontainer, inneraddr, INNERTYPE, newvalue,
                 offsets=None):
@@ -500,6 +500,9 @@ LL_OPERATIONS = {
     'gc_typeids_list'     : LLOp(),
     'gc_gcflag_extra'     : LLOp(),
     'gc_add_memory_pressure': LLOp(),
+    'gc_get_stats'        : LLOp(),
+    'gc_set_max_pause'    : LLOp(),
+    'gc_release_memory'   : LLOp(),
 
     # ------- JIT & GC interaction, only for some GCs ----------
 
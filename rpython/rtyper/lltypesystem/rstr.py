@@ -4,9 +4,13 @@ from rpython.annotator import model as annmodel
 from rpython.rlib import jit, types
 from rpython.rlib.debug import ll_assert
 from rpython.rlib.objectmodel import (malloc_zero_filled, we_are_translated,
-    _hash_string, keepalive_until_here, specialize, enforceargs)
+    _hash_string, keepalive_until_here, specialize, enforceargs,
+    running_on_llinterp)
 from rpython.rlib.signature import signature
-from rpython.rlib.rarithmetic import ovfcheck
+from rpython.rlib.rarithmetic import ovfcheck, r_uint
+from rpython.rlib.rstring import (SWAR_BYTES, swar_broadcast, swar_match_mask,
+    swar_count_matches, two_way_search, TWO_WAY_MIN_NEEDLE,
+    TWO_WAY_MIN_HAYSTACK)
 from rpython.rtyper.error import TyperError
 from rpython.rtyper.lltypesystem import ll_str, llmemory
 from rpython.rtyper.lltypesystem.lltype import (GcStruct, Signed, Array, Char,
@@ -270,6 +274,25 @@ def bloom(mask, c):
     return mask & (1 << (ord(c) & (BLOOM_WIDTH - 1)))
 
 
+def ll_str_read_word(s, i):
+    """Return the chars s.chars[i:i+SWAR_BYTES] of a STR as one word.  The
+    order of the bytes in the word is not specified."""
+    if not we_are_translated() or running_on_llinterp:
+        word = r_uint(0)
+        for j in range(SWAR_BYTES):
+            word = (word << 8) | r_uint(ord(s.chars[i + j]))
+        return word
+    # xxx same warning as in copy_string_contents(): no GC operation at
+    # all between the cast_ptr_to_adr() and the read
+    adr = llmemory.cast_ptr_to_adr(s) + (llmemory.offsetof(STR, 'chars') +
+                                         llmemory.itemoffsetof(STR.chars, 0) +
+                                         llmemory.sizeof(Char) * i)
+    word = adr.unsigned[0]
+    keepalive_until_here(s)
+    return word
+ll_str_read_word._always_inline_ = True
+
+
 class LLHelpers(AbstractLLHelpers):
     from rpython.rtyper.annlowlevel import llstr, llunicode
 
@@ -629,6 +652,17 @@ class LLHelpers(AbstractLLHelpers):
         i = start
         if end > len(s.chars):
             end = len(s.chars)
+        if typeOf(s) == Ptr(STR) and end - i >= 2 * SWAR_BYTES:
+            # look at whole words, starting from an aligned position
+            while i & (SWAR_BYTES - 1):
+                if s.chars[i] == ch:
+                    return i
+                i += 1
+            pattern = swar_broadcast(ch)
+            while i + SWAR_BYTES <= end:
+                if swar_match_mask(ll_str_read_word(s, i), pattern):
+                    break      # the char is in this word, find it below
+                i += SWAR_BYTES
         while i < end:
             if s.chars[i] == ch:
                 return i
@@ -654,6 +688,16 @@ class LLHelpers(AbstractLLHelpers):
         i = start
         if end > len(s.chars):
             end = len(s.chars)
+        if typeOf(s) == Ptr(STR) and end - i >= 2 * SWAR_BYTES:
+            while i & (SWAR_BYTES - 1):
+                if s.chars[i] == ch:
+                    count += 1
+                i += 1
+            pattern = swar_broadcast(ch)
+            while i + SWAR_BYTES <= end:
+                mask = swar_match_mask(ll_str_read_word(s, i), pattern)
+                count += swar_count_matches(mask)
+                i += SWAR_BYTES
         while i < end:
             if s.chars[i] == ch:
                 count += 1
@@ -732,6 +776,11 @@ class LLHelpers(AbstractLLHelpers):
         if w < 0:
             return -1
 
+        if (mode != FAST_RFIND and m >= TWO_WAY_MIN_NEEDLE and
+                n >= TWO_WAY_MIN_HAYSTACK):
+            return two_way_search(s1.chars, s2.chars, start, end,
+                                  mode == FAST_COUNT)
+
         mlast = m - 1
         skip = mlast - 1
         mask = 0
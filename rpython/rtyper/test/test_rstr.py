@@ -373,6 +373,30 @@ class AbstractTestRstr(BaseRtypingTest):
             res = self.interpret(fn, [i, j])
             assert res == fn(i, j)
 
+    def test_find_char_long(self):
+        const = self.const
+        def fn(i, j):
+            assert i >= 0
+            assert j >= 0
+            s = const('abcdefghij') * 5 + const('x') + const('abxdef') * 3
+            return (s.find(const('x'), i, j) * 1000 + s.count(const('x'), i, j)
+                    + s.find(const('y'), i, j) * 1000000)
+        for (i, j) in [(0, 99), (1, 50), (3, 51), (17, 99), (50, 70),
+                       (51, 60), (60, 99)]:
+            res = self.interpret(fn, [i, j])
+            assert res == fn(i, j)
+
+    def test_find_long_needle(self):
+        const = self.const
+        def fn(i):
+            assert i >= 0
+            needle = const('a') * 120 + const('b')
+            s = const('a') * (2500 + i) + needle + const('a') * 200 + needle
+            return (s.find(needle) * 10 + s.count(needle) +
+                    s.find(needle, 2700 + i) * 100000)
+        res = self.interpret(fn, [3])
+        assert res == fn(3)
+
     def test_find_AnnotatorError(self):
         const = self.const
         def f():
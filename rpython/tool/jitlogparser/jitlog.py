@@ -0,0 +1,222 @@
+"""Streaming reader for the binary logs written by the JIT when the
+environment variable JITLOG is set (see rpython/jit/metainterp/jitlog.py
+for the format).
+
+    for event in read_jitlog(filename):
+        if isinstance(event, Trace):
+            ...
+
+The events are Trace, Abort and GuardFailures instances, returned one
+by one as the file is read.  Apart from the current event, only the table
+of strings of the log is kept in memory, so that logs of any size can be
+processed.
+
+Run as a script to print a summary of a log:
+
+    python jitlog.py <logfile>
+"""
+
+import sys
+
+from rpython.jit.metainterp import jitlog
+from rpython.tool.jitlogparser.parser import Op
+
+
+class JitLogError(Exception):
+    pass
+
+
+class Trace(object):
+    """A loop or a bridge.  'type' is 'loop', 'entry bridge' or 'bridge';
+    'number' is the number of the loop, or the number of the guard that
+    a bridge comes from.  'operations' is a list of parser.Op."""
+
+    def __init__(self, type, number, name, addr, size, inputargs,
+                 operations):
+        self.type = type
+        self.number = number
+        self.name = name
+        self.addr = addr
+        self.size = size
+        self.inputargs = inputargs
+        self.operations = operations
+
+    def is_bridge(self):
+        return self.type == 'bridge'
+
+    def __repr__(self):
+        return '<Trace %s %d %r, %d ops>' % (self.type, self.number,
+                                             self.name, len(self.operations))
+
+
+class Abort(object):
+    """Tracing was aborted for 'reason', e.g. 'ABORT_TOO_LONG'.  'name' is
+    the location where tracing started, or '' if tracing a bridge."""
+
+    def __init__(self, reason, name):
+        self.reason = reason
+        self.name = name
+
+    def __repr__(self):
+        return '<Abort %s %r>' % (self.reason, self.name)
+
+
+class GuardFailures(object):
+    """'counts' maps guard numbers to the number of times they failed
+    since the previous GuardFailures event."""
+
+    def __init__(self, counts):
+        self.counts = counts
+
+    def __repr__(self):
+        return '<GuardFailures for %d guards>' % (len(self.counts),)
+
+
+class JitLogReader(object):
+    def __init__(self, f, chunk_size=65536):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.data = ''
+        self.pos = 0
+        self.strings = {}
+        if self._read(len(jitlog.JITLOG_HEADER)) != jitlog.JITLOG_HEADER:
+            raise JitLogError("not a jitlog file, or unsupported version")
+
+    def _at_end(self):
+        if self.pos == len(self.data):
+            self.data = self.f.read(self.chunk_size)
+            self.pos = 0
+        return not self.data
+
+    def _read(self, n):
+        end = self.pos + n
+        while end > len(self.data):
+            more = self.f.read(max(self.chunk_size, n))
+            if not more:
+                raise JitLogError("truncated jitlog")
+            self.data = self.data[self.pos:] + more
+            self.pos = 0
+            end = n
+        result = self.data[self.pos:end]
+        self.pos = end
+        return result
+
+    def _read_varint(self):
+        result = 0
+        shift = 0
+        while True:
+            byte = ord(self._read(1))
+            result |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        return (result >> 1) ^ -(result & 1)
+
+    def _read_string(self):
+        index = self._read_varint()
+        try:
+            return self.strings[index]
+        except KeyError:
+            raise JitLogError("unknown string %d" % (index,))
+
+    def _read_strings(self):
+        return [self._read_string() for i in range(self._read_varint())]
+
+    def __iter__(self):
+        while not self._at_end():
+            mark = self._read(1)
+            if mark == jitlog.MARK_STRING:
+                index = self._read_varint()
+                self.strings[index] = self._read(self._read_varint())
+            elif mark == jitlog.MARK_RESET:
+                self.strings.clear()
+            elif mark == jitlog.MARK_TRACE:
+                yield self._read_trace()
+            elif mark == jitlog.MARK_ABORT:
+                reason = self._read_string()
+                yield Abort(reason, self._read_string())
+            elif mark == jitlog.MARK_GUARD_FAILURES:
+                counts = {}
+                for i in range(self._read_varint()):
+                    number = self._read_varint()
+                    counts[number] = self._read_varint()
+                yield GuardFailures(counts)
+            else:
+                raise JitLogError("unknown record %r" % (mark,))
+
+    def _read_trace(self):
+        type = self._read_string()
+        number = self._read_varint()
+        name = self._read_string()
+        addr = self._read_varint()
+        size = self._read_varint()
+        inputargs = self._read_strings()
+        operations = [self._read_operation()
+                      for i in range(self._read_varint())]
+        return Trace(type, number, name, addr, size, inputargs, operations)
+
+    def _read_operation(self):
+        flags = ord(self._read(1))
+        name = self._read_string()
+        index = self._read_varint()
+        if index == -1:
+            res = None
+        else:
+            res = self.strings[index]
+        args = self._read_strings()
+        descr = None
+        failargs = None
+        if flags & jitlog.FLAG_DESCR:
+            descr = self._read_string()
+        if flags & jitlog.FLAG_GUARD:
+            descr = '<Guard0x%x>' % (self._read_varint(),)
+            failargs = self._read_strings()
+        op = Op(name, args, res, descr, failargs)
+        if flags & jitlog.FLAG_OFFSET:
+            op.offset = self._read_varint()
+        return op
+
+
+def read_jitlog(filename):
+    """Return an iterator over the events in the given jitlog file."""
+    with open(filename, 'rb') as f:
+        for event in JitLogReader(f):
+            yield event
+
+def summarize(events, top=20):
+    loops = bridges = 0
+    aborts = {}
+    failures = {}
+    guard_names = {}
+    for event in events:
+        if isinstance(event, Trace):
+            if event.is_bridge():
+                bridges += 1
+            else:
+                loops += 1
+            for op in event.operations:
+                if op.is_guard():
+                    guard_names[op.guard_no] = (op.name, event.name)
+        elif isinstance(event, Abort):
+            aborts[event.reason] = aborts.get(event.reason, 0) + 1
+        else:
+            for number, count in event.counts.items():
+                failures[number] = failures.get(number, 0) + count
+    lines = ['loops:   %d' % (loops,),
+             'bridges: %d' % (bridges,),
+             'aborts:  %d' % (sum(aborts.values()),)]
+    for reason, count in sorted(aborts.items(), key=lambda x: -x[1]):
+        lines.append('    %-30s %d' % (reason, count))
+    lines.append('most failing guards:')
+    for number, count in sorted(failures.items(),
+                                key=lambda x: -x[1])[:top]:
+        name, location = guard_names.get(number, ('?', ''))
+        lines.append('    %10d  0x%x %s %s' % (count, number, name, location))
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print __doc__
+        sys.exit(1)
+    print summarize(read_jitlog(sys.argv[1]))
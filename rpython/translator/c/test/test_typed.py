@@ -409,6 +409,35 @@ class TestTypedTestCase(object):
                 res = fn(i, j)
                 assert res is testfn(i, j)
 
+    def test_str_find_char(self):
+        # reads the chars a word at a time
+        chars = ['x', '\x00', '\x7f', '\x80', '\xff']
+        s = ''.join([chr(i) for i in range(256)]) * 2 + 'x' * 13
+        def testfn(i, j, k):
+            assert i >= 0
+            assert j >= 0
+            c = chars[k]
+            return s.find(c, i, j) * 1000 + s.count(c, i, j)
+        fn = self.getcompiled(testfn, [int, int, int])
+        for (i, j) in [(0, len(s)), (1, 200), (3, 130), (121, 128),
+                       (128, 257), (250, 400), (256, len(s) - 1),
+                       (500, len(s))]:
+            for k in range(len(chars)):
+                res = fn(i, j, k)
+                assert res == testfn(i, j, k)
+
+    def test_str_find_long_needle(self):
+        # uses the two-way search
+        def testfn(i):
+            assert i >= 0
+            needle = 'a' * 120 + 'b'
+            s = 'a' * (2500 + i) + needle + 'a' * 200 + needle
+            return (s.find(needle) * 10 + s.count(needle) +
+                    s.find(needle, 2700 + i) * 100000)
+        fn = self.getcompiled(testfn, [int])
+        for i in range(3):
+            assert fn(i) == testfn(i)
+
     def test_str_join(self):
         def testfn(i, j):
             s1 = ['', ',', ' and ']
@@ -413,6 +413,12 @@ class TranslationDriver(SimpleTaskEngine):
 
         standalone = self.standalone
 
+        # the target can give hooks that the GC calls, as an instance
+        # of a subclass of rpython.memory.gc.hook.GcHooks
+        get_gchooks = self.extra.get('get_gchooks', None)
+        if get_gchooks is not None:
+            translator._gchooks = get_gchooks(self)
+
         if standalone:
             from rpython.translator.c.genc import CStandaloneBuilder
             cbuilder = CStandaloneBuilder(self.translator, self.entry_point,
@@ -0,0 +1,65 @@
+"""
+Benchmark for the marking done by the major collections: it builds a
+large graph of objects, in which most objects are referenced from
+several places, and times full collections of it.
+
+    targetgcmarkbench-c [num_nodes [num_edges [num_collections]]]
+"""
+import os, time
+from rpython.rlib import rgc
+
+
+class Node(object):
+    def __init__(self, num_edges):
+        self.edges = [None] * num_edges
+
+
+def build_graph(num_nodes, num_edges):
+    nodes = [Node(num_edges) for i in range(num_nodes)]
+    seed = 12345
+    for node in nodes:
+        for j in range(num_edges):
+            # a simple linear congruential generator
+            seed = (seed * 1103515245 + 12345) & 0x7fffffff
+            node.edges[j] = nodes[seed % num_nodes]
+    return nodes
+
+def entry_point(argv):
+    num_nodes = 1000000
+    num_edges = 4
+    num_collections = 5
+    if len(argv) > 1:
+        num_nodes = int(argv[1])
+    if len(argv) > 2:
+        num_edges = int(argv[2])
+    if len(argv) > 3:
+        num_collections = int(argv[3])
+    os.write(1, "Building a graph of %d nodes with %d edges each\n" %
+             (num_nodes, num_edges))
+    t_start = time.time()
+    nodes = build_graph(num_nodes, num_edges)
+    os.write(1, "Built in %f secs\n" % (time.time() - t_start))
+    total = 0.0
+    for i in range(num_collections):
+        t_start = time.time()
+        rgc.collect()
+        t = time.time() - t_start
+        os.write(1, "Full collection: %f secs\n" % (t,))
+        total += t
+    os.write(1, "Average: %f secs per collection of %d nodes\n" %
+             (total / num_collections, len(nodes)))
+    return 0
+
+# _____ Define and setup target ___
+
+def target(*args):
+    return entry_point, None
+
+"""
+Why is this a stand-alone target?
+
+The above target specifies None as the argument types list.
+This is a case treated specially in the driver.py . If the list
+of input types is empty, it is meant to be a list of strings,
+actually implementing argv of the executable.
+"""